@@ -0,0 +1,66 @@
+"""Add account deletion jobs table and events indexes
+
+Adds:
+- account_deletion_jobs table tracking background account deletions
+- Indexes on events.user_id and events.trip_id so batched deletes
+  (and per-trip event lookups) don't scan the whole events table
+- Index on trips.last_checkin so the foreign key check run for every
+  deleted event doesn't scan the whole trips table
+
+Revision ID: d4e5f6g7h8i9
+Revises: c3d4e5f6g7h8
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6g7h8i9'
+down_revision: Union[str, None] = 'c3d4e5f6g7h8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add account_deletion_jobs table and events indexes."""
+
+    # No foreign key to users: the job row must outlive the user it deletes
+    op.create_table(
+        'account_deletion_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),  # pending, running, completed, failed
+        sa.Column('current_step', sa.String(50), nullable=True),
+        sa.Column('rows_deleted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+    # Index for looking up a user's latest job
+    op.create_index('idx_account_deletion_jobs_user_id', 'account_deletion_jobs', ['user_id'])
+    # Index for the scheduler picking up pending/stale jobs
+    op.create_index('idx_account_deletion_jobs_status', 'account_deletion_jobs', ['status'])
+
+    # events table
+    op.create_index('ix_events_user_id', 'events', ['user_id'])
+    op.create_index('ix_events_trip_id', 'events', ['trip_id'])
+
+    # trips table (referenced by the events foreign key check on delete)
+    op.create_index('ix_trips_last_checkin', 'trips', ['last_checkin'])
+
+
+def downgrade() -> None:
+    """Remove account_deletion_jobs table and events indexes."""
+    op.drop_index('ix_trips_last_checkin', 'trips')
+    op.drop_index('ix_events_trip_id', 'events')
+    op.drop_index('ix_events_user_id', 'events')
+
+    op.drop_index('idx_account_deletion_jobs_status', 'account_deletion_jobs')
+    op.drop_index('idx_account_deletion_jobs_user_id', 'account_deletion_jobs')
+    op.drop_table('account_deletion_jobs')
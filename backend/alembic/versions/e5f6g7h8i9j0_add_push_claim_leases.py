@@ -0,0 +1,35 @@
+"""Add push claim lease columns to trips and trip_participants
+
+Adds push_lease_until, set when the push scheduler claims a row for a
+notification phase. Sends happen outside any transaction while the lease
+is held; the outcome transaction clears it. An expired lease (crashed
+worker) makes the row claimable again.
+
+Revision ID: e5f6g7h8i9j0
+Revises: d4e5f6g7h8i9
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6g7h8i9j0'
+down_revision: Union[str, None] = 'd4e5f6g7h8i9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add push_lease_until to trips and trip_participants."""
+    op.add_column('trips', sa.Column('push_lease_until', sa.DateTime(), nullable=True))
+    op.add_column('trip_participants', sa.Column('push_lease_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove push_lease_until from trips and trip_participants."""
+    op.drop_column('trip_participants', 'push_lease_until')
+    op.drop_column('trips', 'push_lease_until')
@@ -0,0 +1,61 @@
+"""Add next_reminder_at to trips and trip_participants
+
+Materializes when the next check-in reminder is due (UTC, quiet hours
+already folded in) so the push scheduler selects due reminders with an
+indexed range scan. Partial indexes cover only the rows that can receive
+reminders. Existing active rows are backfilled one interval after their
+last reminder; quiet hours are applied the first time the scheduler picks
+them up.
+
+Revision ID: f6g7h8i9j0k1
+Revises: e5f6g7h8i9j0
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6g7h8i9j0k1'
+down_revision: Union[str, None] = 'e5f6g7h8i9j0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add next_reminder_at, backfill active rows and index due lookups."""
+    op.add_column('trips', sa.Column('next_reminder_at', sa.DateTime(), nullable=True))
+    op.add_column('trip_participants', sa.Column('next_reminder_at', sa.DateTime(), nullable=True))
+
+    op.execute("""
+        UPDATE trips
+        SET next_reminder_at = COALESCE(last_checkin_reminder, timezone('utc', now()))
+            + make_interval(mins => COALESCE(checkin_interval_min, 30))
+        WHERE status = 'active'
+    """)
+    op.execute("""
+        UPDATE trip_participants
+        SET next_reminder_at = COALESCE(last_checkin_reminder, timezone('utc', now()))
+            + make_interval(mins => COALESCE(checkin_interval_min, 30))
+        WHERE status = 'accepted' AND role = 'participant'
+    """)
+
+    op.create_index(
+        'ix_trips_next_reminder_at', 'trips', ['next_reminder_at'],
+        postgresql_where=sa.text("status = 'active'")
+    )
+    op.create_index(
+        'ix_trip_participants_next_reminder_at', 'trip_participants', ['next_reminder_at'],
+        postgresql_where=sa.text("status = 'accepted' AND role = 'participant'")
+    )
+
+
+def downgrade() -> None:
+    """Remove next_reminder_at from trips and trip_participants."""
+    op.drop_index('ix_trip_participants_next_reminder_at', table_name='trip_participants')
+    op.drop_index('ix_trips_next_reminder_at', table_name='trips')
+    op.drop_column('trip_participants', 'next_reminder_at')
+    op.drop_column('trips', 'next_reminder_at')
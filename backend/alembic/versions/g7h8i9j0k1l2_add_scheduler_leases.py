@@ -0,0 +1,40 @@
+"""Add scheduler_leases table for scheduler leader election
+
+One row per coordinated role (currently just 'scheduler'). The process
+whose holder id is on an unexpired row runs the background jobs; others
+stand by and take over once the lease expires. Lease rows are used instead
+of session advisory locks because the production database is reached
+through a transaction-mode pooler, which doesn't pin a session to a client.
+
+Revision ID: g7h8i9j0k1l2
+Revises: f6g7h8i9j0k1
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'g7h8i9j0k1l2'
+down_revision: Union[str, None] = 'f6g7h8i9j0k1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create scheduler_leases."""
+    op.create_table(
+        'scheduler_leases',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('holder', sa.String(), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Drop scheduler_leases."""
+    op.drop_table('scheduler_leases')
@@ -0,0 +1,47 @@
+"""Add unique index for one-shot trip events
+
+'overdue' and 'notify' events mark scheduler state transitions that happen
+at most once per trip. A unique partial index on events(trip_id, what) lets
+the scheduler claim a transition with INSERT ... ON CONFLICT DO NOTHING
+instead of checking for an existing event first. Duplicates left by
+earlier concurrent sweeps are removed (keeping the oldest) before the
+index is created.
+
+Revision ID: h8i9j0k1l2m3
+Revises: g7h8i9j0k1l2
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'h8i9j0k1l2m3'
+down_revision: Union[str, None] = 'g7h8i9j0k1l2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Deduplicate one-shot events and add the unique partial index."""
+    op.execute("""
+        DELETE FROM events e
+        USING events older
+        WHERE e.trip_id = older.trip_id
+          AND e.what = older.what
+          AND e.what IN ('overdue', 'notify')
+          AND older.id < e.id
+    """)
+    op.create_index(
+        'uq_events_trip_one_shot', 'events', ['trip_id', 'what'],
+        unique=True,
+        postgresql_where=sa.text("what IN ('overdue', 'notify')")
+    )
+
+
+def downgrade() -> None:
+    """Drop the one-shot event index."""
+    op.drop_index('uq_events_trip_one_shot', table_name='events')
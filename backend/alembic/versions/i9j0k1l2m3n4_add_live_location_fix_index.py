@@ -0,0 +1,44 @@
+"""Add unique index on live location fixes
+
+Offline clients upload buffered fixes in batches and may resend a batch
+whose response was lost. A unique index on live_locations(trip_id, user_id,
+timestamp) lets the batch insert drop already-stored fixes with
+ON CONFLICT DO NOTHING, and serves the latest-fix-per-user lookup. Duplicate
+fixes (keeping the oldest row) are removed before the index is created.
+
+Revision ID: i9j0k1l2m3n4
+Revises: h8i9j0k1l2m3
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'i9j0k1l2m3n4'
+down_revision: Union[str, None] = 'h8i9j0k1l2m3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Deduplicate live location fixes and add the unique index."""
+    op.execute("""
+        DELETE FROM live_locations l
+        USING live_locations older
+        WHERE l.trip_id = older.trip_id
+          AND l.user_id = older.user_id
+          AND l.timestamp = older.timestamp
+          AND older.id < l.id
+    """)
+    op.create_index(
+        'uq_live_locations_trip_user_timestamp', 'live_locations', ['trip_id', 'user_id', 'timestamp'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Remove the unique index."""
+    op.drop_index('uq_live_locations_trip_user_timestamp', table_name='live_locations')
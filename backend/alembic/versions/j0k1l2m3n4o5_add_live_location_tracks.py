@@ -0,0 +1,57 @@
+"""Add live location tracks table
+
+Older live location fixes are packed into encoded chunks per (trip, user)
+instead of being trimmed to the newest 100 rows per trip (see
+src/services/live_tracks.py). live_locations keeps the newest fixes of each
+track.
+
+Revision ID: j0k1l2m3n4o5
+Revises: i9j0k1l2m3n4
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'j0k1l2m3n4o5'
+down_revision: Union[str, None] = 'i9j0k1l2m3n4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create live_location_tracks."""
+    op.create_table(
+        'live_location_tracks',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('trip_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('ended_at', sa.DateTime(), nullable=False),
+        sa.Column('point_count', sa.Integer(), nullable=False),
+        # Encoded polyline of the chunk's fixes
+        sa.Column('path', sa.Text(), nullable=False),
+        # Delta-encoded seconds since started_at, one per fix
+        sa.Column('offsets', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'idx_live_location_tracks_trip_user_started', 'live_location_tracks', ['trip_id', 'user_id', 'started_at']
+    )
+    # For the retention job's age cutoff and account deletion
+    op.create_index('idx_live_location_tracks_ended_at', 'live_location_tracks', ['ended_at'])
+    op.create_index('idx_live_location_tracks_user_id', 'live_location_tracks', ['user_id'])
+
+
+def downgrade() -> None:
+    """Drop live_location_tracks."""
+    op.drop_index('idx_live_location_tracks_user_id', table_name='live_location_tracks')
+    op.drop_index('idx_live_location_tracks_ended_at', table_name='live_location_tracks')
+    op.drop_index('idx_live_location_tracks_trip_user_started', table_name='live_location_tracks')
+    op.drop_table('live_location_tracks')
@@ -0,0 +1,109 @@
+"""Partition live_locations and notification_logs by time
+
+Both tables are append-only and pruned by age (see src/services/retention.py).
+As range-partitioned tables the retention job drops whole expired partitions
+instead of deleting rows: live_locations by day on timestamp,
+notification_logs by month on created_at. Partitions covering the retained
+window and the next few days/months are created here; a DEFAULT partition
+takes rows outside them. The primary key becomes (id, <partition column>),
+as Postgres requires; ids still come from the same sequence.
+
+Postgres only: on SQLite the tables stay as they are and retention falls
+back to chunked deletes.
+
+Revision ID: k1l2m3n4o5p6
+Revises: j0k1l2m3n4o5
+Create Date: 2026-10-18
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'k1l2m3n4o5p6'
+down_revision: Union[str, None] = 'j0k1l2m3n4o5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, partition column, unit, past partitions, future partitions)
+PARTITIONED_TABLES = [
+    ('live_locations', 'timestamp', 'day', 8, 3),
+    ('notification_logs', 'created_at', 'month', 3, 3),
+]
+
+INDEXES = {
+    'live_locations': [
+        'CREATE INDEX idx_live_locations_trip_timestamp ON live_locations (trip_id, "timestamp")',
+        'CREATE UNIQUE INDEX uq_live_locations_trip_user_timestamp ON live_locations (trip_id, user_id, "timestamp")',
+    ],
+    'notification_logs': [
+        'CREATE INDEX ix_notification_logs_user_id ON notification_logs (user_id)',
+        'CREATE INDEX ix_notification_logs_status ON notification_logs (status)',
+    ],
+}
+
+FOREIGN_KEYS = {
+    'live_locations': [
+        'ADD CONSTRAINT live_locations_trip_id_fkey FOREIGN KEY (trip_id) REFERENCES trips(id) ON DELETE CASCADE',
+        'ADD CONSTRAINT live_locations_user_id_fkey FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE',
+    ],
+    'notification_logs': [
+        'ADD CONSTRAINT notification_logs_user_id_fkey FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE',
+    ],
+}
+
+
+def _starts(unit: str, past: int, future: int) -> list[datetime]:
+    """Partition starts from `past` units ago to `future` units ahead."""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == 'day':
+        return [today + timedelta(days=offset) for offset in range(-past, future + 2)]
+    months = today.year * 12 + today.month - 1
+    return [datetime(month // 12, month % 12 + 1, 1) for month in range(months - past, months + future + 2)]
+
+
+def _rebuild(table: str, partition_by: str | None, primary_key: str, partitions: list[str]) -> None:
+    """Recreate `table` (optionally partitioned), copying its rows, sequence, indexes and foreign keys."""
+    old = f'{table}_old'
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS){partition_by or ""}')
+    for partition in partitions:
+        op.execute(partition)
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.execute(f'DROP TABLE {old}')
+
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})')
+    for index in INDEXES[table]:
+        op.execute(index)
+    for foreign_key in FOREIGN_KEYS[table]:
+        op.execute(f'ALTER TABLE {table} {foreign_key}')
+
+
+def upgrade() -> None:
+    """Convert the tables to range-partitioned tables."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, column, unit, past, future in PARTITIONED_TABLES:
+        starts = _starts(unit, past, future)
+        name_format = '%Y%m' if unit == 'month' else '%Y%m%d'
+        partitions = [f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT']
+        for start, end in zip(starts, starts[1:]):
+            partitions.append(
+                f"CREATE TABLE {table}_p{start:{name_format}} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            )
+        _rebuild(table, f' PARTITION BY RANGE ("{column}")', f'id, "{column}"', partitions)
+
+
+def downgrade() -> None:
+    """Convert the tables back to plain tables."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, _, _, _, _ in PARTITIONED_TABLES:
+        _rebuild(table, None, 'id', [])
@@ -0,0 +1,141 @@
+"""Add checkout vote counters to trips
+
+trips.accepted_count is the number of accepted trip_participants (owner
+included) and trips.votes_cast the number of checkout_votes. Triggers keep
+both current on every insert, delete and status change, so checkout voting
+reads quorum state from the trip row instead of counting participants and
+votes while holding the trip lock (see vote_checkout in
+src/api/participants.py).
+
+Revision ID: l2m3n4o5p6q7
+Revises: k1l2m3n4o5p6
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l2m3n4o5p6q7'
+down_revision: Union[str, None] = 'k1l2m3n4o5p6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+POSTGRES_TRIGGERS = [
+    """
+    CREATE FUNCTION trips_count_accepted() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status AND OLD.trip_id = NEW.trip_id THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'accepted' THEN
+            UPDATE trips SET accepted_count = accepted_count - 1 WHERE id = OLD.trip_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'accepted' THEN
+            UPDATE trips SET accepted_count = accepted_count + 1 WHERE id = NEW.trip_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER trip_participants_accepted_count
+    AFTER INSERT OR DELETE OR UPDATE OF status, trip_id ON trip_participants
+    FOR EACH ROW EXECUTE FUNCTION trips_count_accepted()
+    """,
+    """
+    CREATE FUNCTION trips_count_votes() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            UPDATE trips SET votes_cast = votes_cast - 1 WHERE id = OLD.trip_id;
+        ELSE
+            UPDATE trips SET votes_cast = votes_cast + 1 WHERE id = NEW.trip_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER checkout_votes_votes_cast
+    AFTER INSERT OR DELETE ON checkout_votes
+    FOR EACH ROW EXECUTE FUNCTION trips_count_votes()
+    """,
+]
+
+# Local development database
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER trip_participants_accepted_insert AFTER INSERT ON trip_participants
+    WHEN NEW.status = 'accepted'
+    BEGIN UPDATE trips SET accepted_count = accepted_count + 1 WHERE id = NEW.trip_id; END
+    """,
+    """
+    CREATE TRIGGER trip_participants_accepted_delete AFTER DELETE ON trip_participants
+    WHEN OLD.status = 'accepted'
+    BEGIN UPDATE trips SET accepted_count = accepted_count - 1 WHERE id = OLD.trip_id; END
+    """,
+    """
+    CREATE TRIGGER trip_participants_accepted_update AFTER UPDATE OF status, trip_id ON trip_participants
+    WHEN OLD.status IS NOT NEW.status OR OLD.trip_id != NEW.trip_id
+    BEGIN
+        UPDATE trips SET accepted_count = accepted_count - 1 WHERE id = OLD.trip_id AND OLD.status = 'accepted';
+        UPDATE trips SET accepted_count = accepted_count + 1 WHERE id = NEW.trip_id AND NEW.status = 'accepted';
+    END
+    """,
+    """
+    CREATE TRIGGER checkout_votes_votes_cast_insert AFTER INSERT ON checkout_votes
+    BEGIN UPDATE trips SET votes_cast = votes_cast + 1 WHERE id = NEW.trip_id; END
+    """,
+    """
+    CREATE TRIGGER checkout_votes_votes_cast_delete AFTER DELETE ON checkout_votes
+    BEGIN UPDATE trips SET votes_cast = votes_cast - 1 WHERE id = OLD.trip_id; END
+    """,
+]
+
+
+def upgrade() -> None:
+    """Add the counters, backfill them and install the triggers maintaining them."""
+    op.add_column('trips', sa.Column('accepted_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('trips', sa.Column('votes_cast', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        """
+        UPDATE trips SET accepted_count = (
+            SELECT COUNT(*) FROM trip_participants
+            WHERE trip_participants.trip_id = trips.id AND trip_participants.status = 'accepted'
+        )
+        WHERE id IN (SELECT trip_id FROM trip_participants)
+        """
+    )
+    op.execute(
+        """
+        UPDATE trips SET votes_cast = (
+            SELECT COUNT(*) FROM checkout_votes WHERE checkout_votes.trip_id = trips.id
+        )
+        WHERE id IN (SELECT trip_id FROM checkout_votes)
+        """
+    )
+
+    triggers = POSTGRES_TRIGGERS if op.get_bind().dialect.name == 'postgresql' else SQLITE_TRIGGERS
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    """Remove the triggers and counters."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER checkout_votes_votes_cast ON checkout_votes')
+        op.execute('DROP TRIGGER trip_participants_accepted_count ON trip_participants')
+        op.execute('DROP FUNCTION trips_count_votes()')
+        op.execute('DROP FUNCTION trips_count_accepted()')
+    else:
+        for name in ('checkout_votes_votes_cast_delete', 'checkout_votes_votes_cast_insert',
+                     'trip_participants_accepted_update', 'trip_participants_accepted_delete',
+                     'trip_participants_accepted_insert'):
+            op.execute(f'DROP TRIGGER {name}')
+
+    op.drop_column('trips', 'votes_cast')
+    op.drop_column('trips', 'accepted_count')
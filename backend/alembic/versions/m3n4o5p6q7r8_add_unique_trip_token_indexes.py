@@ -0,0 +1,51 @@
+"""Add unique indexes on trip check-in/check-out tokens
+
+/t/{token}/checkin and /t/{token}/checkout find their trip by
+trips.checkin_token / trips.checkout_token, which had no index, so every
+magic-link click scanned trips. Tokens are random per trip; unique indexes
+make each click an index lookup and guarantee a link can only ever reach
+one trip. Later trips sharing a token (possible only with hand-inserted
+data) get a fresh one before the indexes are created.
+
+Revision ID: m3n4o5p6q7r8
+Revises: l2m3n4o5p6q7
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm3n4o5p6q7r8'
+down_revision: Union[str, None] = 'l2m3n4o5p6q7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOKEN_COLUMNS = ('checkin_token', 'checkout_token')
+
+
+def upgrade() -> None:
+    """Re-issue duplicate tokens and add the unique indexes."""
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    for column in TOKEN_COLUMNS:
+        if postgres:
+            new_token = f"md5(random()::text || t.id::text) || md5(random()::text || t.{column})"
+        else:
+            # Local development database
+            new_token = "lower(hex(randomblob(32)))"
+        op.execute(f"""
+            UPDATE trips AS t SET {column} = {new_token}
+            WHERE EXISTS (
+                SELECT 1 FROM trips older
+                WHERE older.{column} = t.{column} AND older.id < t.id
+            )
+        """)
+        op.create_index(f'uq_trips_{column}', 'trips', [column], unique=True)
+
+
+def downgrade() -> None:
+    """Drop the token indexes."""
+    for column in TOKEN_COLUMNS:
+        op.drop_index(f'uq_trips_{column}', table_name='trips')
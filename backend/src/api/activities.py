@@ -1,10 +1,11 @@
 from typing import Any
 
 import sqlalchemy
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from pydantic import BaseModel
 
 from src import database as db
+from src.api import http_cache
 
 router = APIRouter(
     prefix="/api/v1/activities",
@@ -23,11 +24,26 @@ class Activity(BaseModel):
 
 
 @router.get("/", response_model=list[Activity])
-def get_activities():
+def get_activities(request: Request, response: Response):
     """
     Returns all activity types and their data
+
+    The response carries a weak ETag derived from the table contents. A client
+    sending it back in If-None-Match gets 304 without the rows being loaded.
     """
     with db.engine.begin() as connection:
+        version = connection.execute(
+            sqlalchemy.text(
+                """
+                SELECT md5(COALESCE(string_agg(a::text, '|' ORDER BY a.id), ''))
+                FROM activities a
+                """
+            )
+        ).scalar_one()
+        etag = http_cache.version_etag(version)
+        if http_cache.etag_matches(request.headers.get("if-none-match"), etag):
+            return http_cache.not_modified(etag)
+
         activities = connection.execute(
             sqlalchemy.text(
                 """
@@ -37,6 +53,8 @@ def get_activities():
             )
         ).mappings().all()
 
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = http_cache.CACHE_CONTROL
     return [Activity(**row) for row in activities]
 
 
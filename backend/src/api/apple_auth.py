@@ -1,12 +1,17 @@
 """Apple Sign In JWT validation utilities."""
 import logging
+import threading
 import time
 
-import requests
 from fastapi import HTTPException, status
 from jose import jwk, jwt
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
 
+from src.services.lazy_imports import lazy_import
+
+# Only needed to download Apple's public keys
+requests = lazy_import("requests")
+
 logger = logging.getLogger(__name__)
 
 # Apple's public keys endpoint
@@ -16,33 +21,101 @@ APPLE_PUBLIC_KEYS_URL = "https://appleid.apple.com/auth/keys"
 _apple_keys_cache: dict | None = None
 _apple_keys_cache_time: float = 0
 _apple_keys_cache_ttl: int = 3600  # Cache for 1 hour
+# Refresh in the background once the cache is this close to expiring, so
+# sign-in requests never wait on Apple's JWKS endpoint
+_apple_keys_refresh_ahead: int = 600  # 10 minutes
+# Keep serving stale keys while a refresh is failing (Apple rotates keys rarely)
+_apple_keys_max_stale: int = 86400  # 24 hours
+
+# Guards against starting more than one background refresh at a time
+_apple_keys_refresh_lock = threading.Lock()
+_apple_keys_refreshing: bool = False
+
+# PEM-encoded public keys by (kid, modulus), so jwk.construct runs once per key
+_apple_pem_cache: dict[tuple[str, str], str] = {}
+
+
+def _download_apple_public_keys() -> dict:
+    """Download Apple's JWKS and store it in the cache.
+
+    Raises:
+        requests.RequestException: If the download fails
+    """
+    global _apple_keys_cache, _apple_keys_cache_time
+
+    response = requests.get(APPLE_PUBLIC_KEYS_URL, timeout=10)
+    response.raise_for_status()
+    keys = response.json()
+
+    # Update cache
+    _apple_keys_cache = keys
+    _apple_keys_cache_time = time.time()
+    _apple_pem_cache.clear()
+
+    return keys
+
+
+def refresh_apple_public_keys() -> bool:
+    """Refresh the cached Apple public keys, keeping the old keys on failure.
+
+    Called from the background refresh thread and the scheduler warm-up job.
+
+    Returns:
+        True if fresh keys were downloaded, False otherwise
+    """
+    global _apple_keys_refreshing
+    try:
+        _download_apple_public_keys()
+        logger.info("Refreshed Apple public keys")
+        return True
+    except requests.RequestException as e:
+        logger.warning(f"Background refresh of Apple public keys failed: {e}")
+        return False
+    finally:
+        with _apple_keys_refresh_lock:
+            _apple_keys_refreshing = False
+
+
+def _schedule_background_refresh() -> None:
+    """Start a background refresh of Apple's keys unless one is already running."""
+    global _apple_keys_refreshing
+    with _apple_keys_refresh_lock:
+        if _apple_keys_refreshing:
+            return
+        _apple_keys_refreshing = True
+
+    threading.Thread(
+        target=refresh_apple_public_keys,
+        name="apple-jwks-refresh",
+        daemon=True
+    ).start()
 
 
 def _fetch_apple_public_keys() -> dict:
     """
     Fetch Apple's public keys from their JWKS endpoint.
 
+    Serves cached keys while they are fresh. Close to expiry (and for up to
+    24 hours past it) the cached keys are still returned immediately while a
+    background thread fetches new ones. Only a cold or very stale cache
+    blocks on the network.
+
     Returns:
         Dict containing the JWKS (JSON Web Key Set)
     """
-    global _apple_keys_cache, _apple_keys_cache_time
-
     # Check cache first
     current_time = time.time()
-    if _apple_keys_cache and (current_time - _apple_keys_cache_time) < _apple_keys_cache_ttl:
-        return _apple_keys_cache
+    if _apple_keys_cache:
+        age = current_time - _apple_keys_cache_time
+        if age < _apple_keys_cache_ttl - _apple_keys_refresh_ahead:
+            return _apple_keys_cache
+        if age < _apple_keys_max_stale:
+            _schedule_background_refresh()
+            return _apple_keys_cache
 
     # Fetch fresh keys
     try:
-        response = requests.get(APPLE_PUBLIC_KEYS_URL, timeout=10)
-        response.raise_for_status()
-        keys = response.json()
-
-        # Update cache
-        _apple_keys_cache = keys
-        _apple_keys_cache_time = current_time
-
-        return keys
+        return _download_apple_public_keys()
     except requests.RequestException as e:
         logger.error(f"Failed to fetch Apple public keys: {e}")
         raise HTTPException(
@@ -51,6 +124,16 @@ def _fetch_apple_public_keys() -> dict:
         )
 
 
+def _get_apple_public_key_pem(apple_public_key: dict) -> str:
+    """Convert an Apple JWK to PEM, reusing the result for repeat sign-ins."""
+    cache_key = (apple_public_key.get("kid", ""), apple_public_key.get("n", ""))
+    pem = _apple_pem_cache.get(cache_key)
+    if pem is None:
+        pem = jwk.construct(apple_public_key).to_pem()
+        _apple_pem_cache[cache_key] = pem
+    return pem
+
+
 def _get_apple_public_key(token: str) -> dict | None:
     """
     Get the specific public key from Apple's JWKS that matches the token's key ID.
@@ -119,7 +202,7 @@ def validate_apple_identity_token(
 
         # Convert JWK to PEM format for python-jose
         try:
-            public_key_pem = jwk.construct(apple_public_key).to_pem()
+            public_key_pem = _get_apple_public_key_pem(apple_public_key)
         except Exception as e:
             logger.error(f"Failed to construct public key from Apple JWK: {e}")
             raise HTTPException(
@@ -188,3 +271,4 @@ def clear_apple_keys_cache():
     global _apple_keys_cache, _apple_keys_cache_time
     _apple_keys_cache = None
     _apple_keys_cache_time = 0
+    _apple_pem_cache.clear()
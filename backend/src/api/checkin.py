@@ -1,15 +1,16 @@
 """Public check-in/check-out endpoints using tokens (no auth required)"""
 import asyncio
+import inspect
 import logging
 from datetime import UTC, datetime, timedelta
 
-import sqlalchemy
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, status
 from pydantic import BaseModel
+from sqlalchemy import DateTime, Float, Integer, String
 
 from src import database as db
-from src.api.trips import _get_all_trip_email_contacts
-from src.services.geocoding import reverse_geocode_sync
+from src.services import magic_links, recipients, statements
+from src.services.geocoding import reverse_geocode_precise
 from src.services.notifications import (
     send_checkin_update_emails,
     send_data_refresh_push,
@@ -22,6 +23,7 @@ from src.services.notifications import (
     send_trip_completed_emails,
     send_trip_completed_push,
 )
+from src.services.reminders import DEFAULT_CHECKIN_REMINDER_INTERVAL, fold_quiet_hours
 
 log = logging.getLogger(__name__)
 
@@ -30,8 +32,18 @@ def safe_background_task(task_name: str):
     """Decorator to wrap background tasks with error handling and logging.
 
     Ensures background task failures are logged but don't crash the worker.
+    Works for both sync tasks (run on the threadpool) and async ones (run on
+    the event loop).
     """
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    log.exception(f"[BackgroundTask] {task_name} failed: {e}")
+            return async_wrapper
+
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
@@ -49,247 +61,177 @@ class CheckinResponse(BaseModel):
     message: str
 
 
+# Hot-path statements for token check-in/out, built once at import (see src/services/statements.py).
+# Each link's whole state transition is one statement, found through the unique token indexes.
+
+# Logs the check-in event and resets the trip: back to active, warnings and transition flags
+# cleared (so Live Activity updates work if the trip extends past the new ETA), and the next
+# reminder one interval out. Quiet hours are folded in afterwards (see _DEFER_REMINDER).
+# The count subquery sees the statement's snapshot, without the event being inserted.
+_CHECK_IN = statements.register(
+    "checkin.check_in",
+    """
+    WITH event AS (
+        INSERT INTO events (user_id, trip_id, what, timestamp, lat, lon)
+        SELECT user_id, id, 'checkin', :now, :lat, :lon
+        FROM trips
+        WHERE checkin_token = :token
+        AND status IN ('active', 'overdue', 'overdue_notified')
+        RETURNING id, trip_id
+    )
+    UPDATE trips t
+    SET last_checkin = event.id,
+        status = 'active',
+        last_grace_warning = NULL,
+        last_checkin_reminder = :now,
+        next_reminder_at = :now + make_interval(
+            mins => COALESCE(NULLIF(t.checkin_interval_min, 0), :default_interval)),
+        notified_eta_transition = false,
+        notified_grace_transition = false
+    FROM event, activities a
+    WHERE t.id = event.trip_id
+    AND a.id = t.activity
+    AND t.status IN ('active', 'overdue', 'overdue_notified')
+    RETURNING t.id, t.user_id, t.title, t.timezone, t.location_text, t.eta, t.grace_min,
+              t.is_group_trip, t.notify_start_hour, t.notify_end_hour, t.next_reminder_at,
+              a.name AS activity_name,
+              (SELECT COUNT(*) FROM events e
+               WHERE e.trip_id = t.id AND e.what = 'checkin') + 1 AS checkin_count
+    """,
+    token=String,
+    now=DateTime,
+    lat=Float,
+    lon=Float,
+    default_interval=Integer
+)
+
+_DEFER_REMINDER = statements.register(
+    "checkin.defer_reminder",
+    "UPDATE trips SET next_reminder_at = :next_reminder_at WHERE id = :trip_id",
+    next_reminder_at=DateTime,
+    trip_id=Integer
+)
+
+# Locks the trip so the previous status is the one being replaced, completes it and logs the
+# event. A duplicate click blocked on the lock finds the trip completed and gets no row.
+_CHECK_OUT = statements.register(
+    "checkin.check_out",
+    """
+    WITH locked AS (
+        SELECT id, status
+        FROM trips
+        WHERE checkout_token = :token
+        AND status IN ('active', 'overdue', 'overdue_notified')
+        FOR UPDATE
+    ),
+    completed AS (
+        UPDATE trips t
+        SET status = 'completed',
+            completed_at = :now
+        FROM locked
+        WHERE t.id = locked.id
+        RETURNING t.id, t.user_id, t.title, locked.status AS previous_status,
+                  t.timezone, t.location_text, t.checkin_token, t.activity
+    ),
+    event AS (
+        INSERT INTO events (user_id, trip_id, what, timestamp)
+        SELECT user_id, id, 'complete', :now
+        FROM completed
+    )
+    SELECT c.id, c.user_id, c.title, c.previous_status, c.timezone, c.location_text,
+           c.checkin_token, a.name AS activity_name
+    FROM completed c
+    JOIN activities a ON a.id = c.activity
+    """,
+    token=String,
+    now=DateTime
+)
+
+_UPSERT_OWNER_LOCATION = statements.register(
+    "checkin.upsert_owner_location",
+    """
+    INSERT INTO trip_participants (trip_id, user_id, role, status, last_checkin_at, last_lat, last_lon, joined_at, invited_by)
+    VALUES (:trip_id, :user_id, 'owner', 'accepted', :now, :lat, :lon, :now, :user_id)
+    ON CONFLICT (trip_id, user_id)
+    DO UPDATE SET last_checkin_at = :now, last_lat = :lat, last_lon = :lon
+    """,
+    trip_id=Integer,
+    user_id=Integer,
+    lat=Float,
+    lon=Float
+)
+
+
 @router.get("/{token}/checkin", response_model=CheckinResponse)
-def checkin_with_token(
+async def checkin_with_token(
     token: str,
     background_tasks: BackgroundTasks,
     lat: float | None = Query(None, description="Latitude of check-in location"),
     lon: float | None = Query(None, description="Longitude of check-in location")
 ):
-    """Check in to a trip using a magic token. Optionally include lat/lon coordinates."""
-    with db.engine.begin() as connection:
-        # Find trip by checkin_token with activity name, timezone, location, ETA, and grace period
-        trip = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT t.id, t.user_id, t.title, t.status, t.contact1, t.contact2, t.contact3,
-                       t.timezone, t.location_text, t.eta, t.notify_self, t.grace_min,
-                       t.is_group_trip, a.name as activity_name
-                FROM trips t
-                JOIN activities a ON t.activity = a.id
-                WHERE t.checkin_token = :token
-                AND t.status IN ('active', 'overdue', 'overdue_notified')
-                """
-            ),
-            {"token": token}
-        ).fetchone()
+    """Check in to a trip using a magic token. Optionally include lat/lon coordinates.
+
+    Async end to end (asyncpg connection, notifications awaited on the event loop),
+    so a burst of check-ins doesn't queue for threadpool threads. A repeated click
+    within MAGIC_LINK_DEDUPE_SECONDS gets the first response without checking in
+    or notifying anyone again (see src/services/magic_links.py).
+    """
+    return await magic_links.run_once(
+        "checkin", token, lambda: _check_in(token, background_tasks, lat, lon)
+    )
+
+
+async def _check_in(
+    token: str, background_tasks: BackgroundTasks, lat: float | None, lon: float | None
+) -> CheckinResponse:
+    async with db.async_engine().begin() as connection:
+        # Log the check-in event with location coordinates and reset the trip in one statement
+        now = datetime.now(UTC)
+        now_utc = now.replace(tzinfo=None)  # For timestamp (without time zone) columns
+        trip = (await connection.execute(
+            _CHECK_IN,
+            {
+                "token": token,
+                "now": now_utc,
+                "lat": lat,
+                "lon": lon,
+                "default_interval": DEFAULT_CHECKIN_REMINDER_INTERVAL
+            }
+        )).fetchone()
 
         if not trip:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Invalid or expired check-in link"
             )
+        log.info(f"[Checkin] Checked in to trip {trip.id} with lat={lat}, lon={lon}")
 
-        # Log the check-in event with location coordinates
-        now = datetime.now(UTC)
-        log.info(f"[Checkin] About to INSERT event with lat={lat}, lon={lon}, types: lat={type(lat)}, lon={type(lon)}")
-        result = connection.execute(
-            sqlalchemy.text(
-                """
-                INSERT INTO events (user_id, trip_id, what, timestamp, lat, lon)
-                VALUES (:user_id, :trip_id, 'checkin', :timestamp, :lat, :lon)
-                RETURNING id
-                """
-            ),
-            {"user_id": trip.user_id, "trip_id": trip.id, "timestamp": now.isoformat(), "lat": lat, "lon": lon}
+        # Push the next reminder out of quiet hours (only trips that set them can need it)
+        next_reminder_at = fold_quiet_hours(
+            trip.next_reminder_at, trip.notify_start_hour, trip.notify_end_hour, trip.timezone
         )
-        row = result.fetchone()
-        if row is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create check-in event"
+        if next_reminder_at != trip.next_reminder_at:
+            await connection.execute(
+                _DEFER_REMINDER,
+                {"next_reminder_at": next_reminder_at, "trip_id": trip.id}
             )
-        event_id = row[0]
-        log.info(f"[Checkin] Created event id={event_id} with lat={lat}, lon={lon}")
-
-        # Update last check-in event reference, reset status to active, and clear warning timestamps
-        # Also reset transition flags so Live Activity updates work if trip extends past new ETA
-        connection.execute(
-            sqlalchemy.text(
-                """
-                UPDATE trips
-                SET last_checkin = :last_checkin_event_id,
-                    status = 'active',
-                    last_grace_warning = NULL,
-                    last_checkin_reminder = :now,
-                    notified_eta_transition = false,
-                    notified_grace_transition = false
-                WHERE id = :trip_id
-                """
-            ),
-            {"last_checkin_event_id": event_id, "trip_id": trip.id, "now": now.isoformat()}
-        )
-
-        # For group trips, also update the participant's location
-        # Check if trip is a group trip and if user is a participant
-        is_group = connection.execute(
-            sqlalchemy.text("SELECT is_group_trip FROM trips WHERE id = :trip_id"),
-            {"trip_id": trip.id}
-        ).fetchone()
 
-        if is_group and is_group.is_group_trip:
+        # For group trips, also update the owner's participant location
+        if trip.is_group_trip:
             # Update or insert owner's check-in location using upsert
             # This handles the case where the owner's trip_participants record doesn't exist yet
             # (it's only created when the first participant is invited)
-            connection.execute(
-                sqlalchemy.text(
-                    """
-                    INSERT INTO trip_participants (trip_id, user_id, role, status, last_checkin_at, last_lat, last_lon, joined_at, invited_by)
-                    VALUES (:trip_id, :user_id, 'owner', 'accepted', :now, :lat, :lon, :now, :user_id)
-                    ON CONFLICT (trip_id, user_id)
-                    DO UPDATE SET last_checkin_at = :now, last_lat = :lat, last_lon = :lon
-                    """
-                ),
-                {"trip_id": trip.id, "user_id": trip.user_id, "now": now.isoformat(), "lat": lat, "lon": lon}
+            await connection.execute(
+                _UPSERT_OWNER_LOCATION,
+                {"trip_id": trip.id, "user_id": trip.user_id, "now": now_utc, "lat": lat, "lon": lon}
             )
             log.info(f"[Checkin] Updated/inserted participant location for owner {trip.user_id} in group trip {trip.id}")
 
-        # Fetch user name and email for notification
-        user = connection.execute(
-            sqlalchemy.text("SELECT first_name, last_name, email FROM users WHERE id = :user_id"),
-            {"user_id": trip.user_id}
-        ).fetchone()
-        user_name = f"{user.first_name} {user.last_name}".strip() if user else "Someone"
-        if not user_name:
-            user_name = "A Homebound user"
-        owner_email = user.email if user and trip.notify_self else None
-
-        # Fetch all contact emails - following the same pattern as participant check-in
-        # which is known to work correctly
-        log.info(f"[Checkin] Fetching contacts for trip {trip.id}, is_group_trip={trip.is_group_trip}")
-
-        # Step 1: Get owner's email contacts from trips.contact1/2/3
-        # Owner's contacts watch the owner
-        owner_email_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT c.id, c.name, c.email
-                FROM contacts c
-                JOIN trips t ON (c.id = t.contact1 OR c.id = t.contact2 OR c.id = t.contact3)
-                WHERE t.id = :trip_id AND c.email IS NOT NULL
-                """
-            ),
-            {"trip_id": trip.id}
-        ).fetchall()
-
-        contacts_for_email = [
-            {**dict(c._mapping), "watched_user_name": user_name}
-            for c in owner_email_contacts
-        ]
-        log.info(f"[Checkin] Found {len(contacts_for_email)} owner email contacts")
-
-        # Step 2: Get ALL accepted participants and their contacts
-        # Always check for participants regardless of is_group_trip flag
-        # Get all accepted participants (excluding owner)
-        accepted_participants = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT tp.user_id,
-                       COALESCE(TRIM(u.first_name || ' ' || u.last_name), 'Participant') as participant_name
-                FROM trip_participants tp
-                JOIN users u ON tp.user_id = u.id
-                WHERE tp.trip_id = :trip_id
-                  AND tp.status = 'accepted'
-                  AND tp.role = 'participant'
-                """
-            ),
-            {"trip_id": trip.id}
-        ).fetchall()
-        log.info(f"[Checkin] Found {len(accepted_participants)} accepted participants")
-
-        # For each participant, get their email contacts
-        for participant in accepted_participants:
-            participant_name = participant.participant_name.strip() if participant.participant_name else "Participant"
-            participant_user_id = participant.user_id
-            log.info(f"[Checkin] Fetching contacts for participant {participant_user_id} ({participant_name})")
-
-            # Get this participant's email contacts from participant_trip_contacts
-            participant_email_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT c.id, c.name, c.email
-                    FROM participant_trip_contacts ptc
-                    JOIN contacts c ON ptc.contact_id = c.id
-                    WHERE ptc.trip_id = :trip_id
-                      AND ptc.participant_user_id = :participant_user_id
-                      AND ptc.contact_id IS NOT NULL
-                      AND c.email IS NOT NULL
-                    """
-                ),
-                {"trip_id": trip.id, "participant_user_id": participant_user_id}
-            ).fetchall()
-
-            # Add to contacts list with participant's name as watched_user_name
-            for pc in participant_email_contacts:
-                if pc.email:
-                    contacts_for_email.append({
-                        "id": pc.id,
-                        "name": pc.name,
-                        "email": pc.email,
-                        "watched_user_name": participant_name
-                    })
-            log.info(f"[Checkin] Found {len(participant_email_contacts)} email contacts for participant {participant_name}")
-
-            # Get this participant's friend contacts (friends who have email)
-            participant_friend_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT friend.id as id,
-                           TRIM(friend.first_name || ' ' || friend.last_name) as name,
-                           friend.email as email
-                    FROM participant_trip_contacts ptc
-                    JOIN users friend ON ptc.friend_user_id = friend.id
-                    WHERE ptc.trip_id = :trip_id
-                      AND ptc.participant_user_id = :participant_user_id
-                      AND ptc.friend_user_id IS NOT NULL
-                      AND friend.email IS NOT NULL
-                    """
-                ),
-                {"trip_id": trip.id, "participant_user_id": participant_user_id}
-            ).fetchall()
-
-            # Add to contacts list with participant's name as watched_user_name
-            for pfc in participant_friend_contacts:
-                if pfc.email:
-                    contacts_for_email.append({
-                        "id": -pfc.id,  # Negative to indicate it's a user, not a contact
-                        "name": pfc.name or "Friend",
-                        "email": pfc.email,
-                        "watched_user_name": participant_name
-                    })
-            log.info(f"[Checkin] Found {len(participant_friend_contacts)} friend contacts for participant {participant_name}")
-
-        # Step 3: Get owner's friend safety contacts (friends who have email)
-        # Owner's friends also watch the owner
-        owner_friend_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT friend.id as id,
-                       TRIM(friend.first_name || ' ' || friend.last_name) as name,
-                       friend.email as email
-                FROM trip_safety_contacts tsc
-                JOIN users friend ON tsc.friend_user_id = friend.id
-                WHERE tsc.trip_id = :trip_id
-                  AND tsc.friend_user_id IS NOT NULL
-                  AND friend.email IS NOT NULL
-                ORDER BY tsc.position
-                """
-            ),
-            {"trip_id": trip.id}
-        ).fetchall()
-
-        # Add owner's friends to contacts list (they watch the owner)
-        for ofc in owner_friend_contacts:
-            if ofc.email:
-                contacts_for_email.append({
-                    "id": -ofc.id,  # Negative to indicate it's a user, not a contact
-                    "name": ofc.name or "Friend",
-                    "email": ofc.email,
-                    "watched_user_name": user_name  # Owner's friends watch the owner
-                })
-        log.info(f"[Checkin] Found {len(owner_friend_contacts)} owner friend contacts")
-
-        log.info(f"[Checkin] Total {len(contacts_for_email)} contacts for email notifications")
+        # Everyone watching the trip, each reached once (see src/services/recipients.py)
+        plan = await connection.run_sync(recipients.plan_delivery, trip.id, "checkin")
+        user_name = plan.owner_name
+        owner_email = plan.owner_email
+        contacts_for_email = plan.emails
         for c in contacts_for_email:
             log.info(f"[Checkin] Contact: {c.get('email')} watching {c.get('watched_user_name')}")
 
@@ -306,13 +248,6 @@ def checkin_with_token(
             coordinates_for_background = (lat, lon)
             log.info(f"[Checkin] Received coordinates: {coordinates_str}")
 
-        # Get check-in count for Live Activity update
-        checkin_count_row = connection.execute(
-            sqlalchemy.text("SELECT COUNT(*) FROM events WHERE trip_id = :trip_id AND what = 'checkin'"),
-            {"trip_id": trip.id}
-        ).fetchone()
-        checkin_count = checkin_count_row[0] if checkin_count_row else 1
-
         # Parse ETA for Live Activity update
         eta_dt = None
         if trip.eta:
@@ -326,7 +261,7 @@ def checkin_with_token(
         trip_id_for_la = trip.id
         eta_for_la = eta_dt or now
         now_for_la = now
-        checkin_count_for_la = checkin_count
+        checkin_count_for_la = trip.checkin_count
 
         # After check-in, user is no longer overdue - they just confirmed they're okay
         # The trip status is reset to 'active', so is_overdue should be False
@@ -336,8 +271,8 @@ def checkin_with_token(
 
         # Always send Live Activity update (runs in background)
         @safe_background_task("send_live_activity_update")
-        def send_live_activity_sync():
-            asyncio.run(send_live_activity_update(
+        async def send_live_activity():
+            await send_live_activity_update(
                 trip_id=trip_id_for_la,
                 status="active",
                 eta=eta_for_la,
@@ -345,29 +280,29 @@ def checkin_with_token(
                 is_overdue=is_overdue_for_la,
                 checkin_count=checkin_count_for_la,
                 grace_min=grace_min_for_la
-            ))
+            )
 
-        background_tasks.add_task(send_live_activity_sync)
+        background_tasks.add_task(send_live_activity)
 
         # Schedule background task to send checkin update emails to contacts and push to user
         @safe_background_task("send_checkin_notifications")
-        def send_notifications_sync():
+        async def send_notifications():
             # Send push notification to user confirming check-in
-            asyncio.run(send_push_to_user(
+            await send_push_to_user(
                 trip.user_id,
                 "Checked In",
                 f"You've checked in to '{trip.title}'. Stay safe!"
-            ))
+            )
 
             # Do geocoding in background to avoid blocking the response
             location_name = None
             if coordinates_for_background:
-                location_name = reverse_geocode_sync(coordinates_for_background[0], coordinates_for_background[1])
+                location_name = await reverse_geocode_precise(coordinates_for_background[0], coordinates_for_background[1])
                 if location_name:
                     log.info(f"[Checkin] Reverse geocoded to: {location_name}")
 
             # Send emails to contacts
-            asyncio.run(send_checkin_update_emails(
+            await send_checkin_update_emails(
                 trip=trip_data,
                 contacts=contacts_for_email,
                 user_name=user_name,
@@ -376,82 +311,43 @@ def checkin_with_token(
                 coordinates=coordinates_str,
                 location_name=location_name,
                 owner_email=owner_email
-            ))
+            )
 
         if contacts_for_email or owner_email:
-            background_tasks.add_task(send_notifications_sync)
+            background_tasks.add_task(send_notifications)
         num_contacts = len(contacts_for_email)
         log.info(f"[Checkin] Scheduled checkin update emails for {num_contacts} contacts")
 
-        # Send push notifications to friend safety contacts
-        friend_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT friend_user_id FROM trip_safety_contacts
-                WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                ORDER BY position
-                """
-            ),
-            {"trip_id": trip.id}
-        ).fetchall()
-        friend_user_ids = [f.friend_user_id for f in friend_contacts]
-
-        # For group trips, also include participant friend contacts
-        if trip.is_group_trip:
-            participant_friend_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT DISTINCT friend_user_id FROM participant_trip_contacts
-                    WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                    """
-                ),
-                {"trip_id": trip.id}
-            ).fetchall()
-            existing_friend_ids = set(friend_user_ids)
-            for pfc in participant_friend_contacts:
-                if pfc.friend_user_id not in existing_friend_ids:
-                    friend_user_ids.append(pfc.friend_user_id)
-                    existing_friend_ids.add(pfc.friend_user_id)
-            log.info(f"[Checkin] Added {len(participant_friend_contacts)} participant friend contacts")
-
+        # Send push notifications to friend safety contacts (owner's and participants')
+        friend_user_ids = plan.friend_pushes
         if friend_user_ids:
             trip_title_for_push = trip.title
             user_name_for_push = user_name
 
             @safe_background_task("send_friend_checkin_push")
-            def send_friend_checkin_sync():
+            async def send_friend_checkin():
                 for friend_id in friend_user_ids:
-                    asyncio.run(send_friend_checkin_push(
+                    await send_friend_checkin_push(
                         friend_user_id=friend_id,
                         user_name=user_name_for_push,
                         trip_title=trip_title_for_push
-                    ))
+                    )
 
-            background_tasks.add_task(send_friend_checkin_sync)
+            background_tasks.add_task(send_friend_checkin)
             log.info(f"[Checkin] Scheduled check-in push notifications for {len(friend_user_ids)} friend contacts")
 
         # For group trips, send refresh push to all participants so they see updated check-in count
-        if is_group and is_group.is_group_trip:
-            all_participant_ids = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT user_id FROM trip_participants
-                    WHERE trip_id = :trip_id AND status = 'accepted'
-                    """
-                ),
-                {"trip_id": trip.id}
-            ).fetchall()
-
-            if all_participant_ids:
-                trip_id_for_refresh = trip.id
-
-                @safe_background_task("send_refresh_pushes")
-                def send_refresh_pushes():
-                    for p in all_participant_ids:
-                        asyncio.run(send_data_refresh_push(p.user_id, "trip", trip_id_for_refresh))
-
-                background_tasks.add_task(send_refresh_pushes)
-                log.info(f"[Checkin] Scheduled refresh pushes for {len(all_participant_ids)} participants")
+        if trip.is_group_trip:
+            all_participant_ids = [trip.user_id, *plan.participant_ids]
+            trip_id_for_refresh = trip.id
+
+            @safe_background_task("send_refresh_pushes")
+            async def send_refresh_pushes():
+                for participant_id in all_participant_ids:
+                    await send_data_refresh_push(participant_id, "trip", trip_id_for_refresh)
+
+            background_tasks.add_task(send_refresh_pushes)
+            log.info(f"[Checkin] Scheduled refresh pushes for {len(all_participant_ids)} participants")
 
         return CheckinResponse(
             ok=True,
@@ -461,23 +357,21 @@ def checkin_with_token(
 
 @router.get("/{token}/checkout", response_model=CheckinResponse)
 def checkout_with_token(token: str, background_tasks: BackgroundTasks):
-    """Complete/check out of a trip using a magic token"""
+    """Complete/check out of a trip using a magic token.
+
+    A repeated click within MAGIC_LINK_DEDUPE_SECONDS gets the first response
+    instead of a 404 for the now completed trip, and notifies nobody again.
+    """
+    return magic_links.run_once_sync("checkout", token, lambda: _check_out(token, background_tasks))
+
+
+def _check_out(token: str, background_tasks: BackgroundTasks) -> CheckinResponse:
     with db.engine.begin() as connection:
-        # Find trip by checkout_token with activity name, timezone, and location
-        # Allow checkout for active, overdue, and overdue_notified trips
+        # Complete the trip by checkout_token (active, overdue or overdue_notified) and log the event
+        now = datetime.now(UTC)
         trip = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT t.id, t.user_id, t.title, t.status, t.contact1, t.contact2, t.contact3,
-                       t.timezone, t.location_text, t.notify_self, t.is_group_trip,
-                       a.name as activity_name
-                FROM trips t
-                JOIN activities a ON t.activity = a.id
-                WHERE t.checkout_token = :token
-                AND t.status IN ('active', 'overdue', 'overdue_notified')
-                """
-            ),
-            {"token": token}
+            _CHECK_OUT,
+            {"token": token, "now": now.replace(tzinfo=None)}
         ).fetchone()
 
         if not trip:
@@ -486,46 +380,23 @@ def checkout_with_token(token: str, background_tasks: BackgroundTasks):
                 detail="Invalid or expired check-out link"
             )
 
-        # Check if trip was overdue (contacts were already notified)
-        was_overdue = trip.status in ('overdue', 'overdue_notified')
-
-        # Mark trip as completed
-        now = datetime.now(UTC)
-        connection.execute(
-            sqlalchemy.text(
-                """
-                UPDATE trips
-                SET status = 'completed',
-                    completed_at = :now
-                WHERE id = :trip_id
-                """
-            ),
-            {"now": now.isoformat(), "trip_id": trip.id}
-        )
-
-        # Log the checkout event
-        connection.execute(
-            sqlalchemy.text(
-                """
-                INSERT INTO events (user_id, trip_id, what, timestamp)
-                VALUES (:user_id, :trip_id, 'complete', :timestamp)
-                """
-            ),
-            {"user_id": trip.user_id, "trip_id": trip.id, "timestamp": now.isoformat()}
+        response = CheckinResponse(
+            ok=True,
+            message=f"Successfully completed '{trip.title}' - you're safe!"
         )
+        # The trip's check-in link is no longer valid
+        magic_links.forget("checkin", trip.checkin_token)
 
-        # Fetch user name and email for notification
-        user = connection.execute(
-            sqlalchemy.text("SELECT first_name, last_name, email FROM users WHERE id = :user_id"),
-            {"user_id": trip.user_id}
-        ).fetchone()
-        user_name = f"{user.first_name} {user.last_name}".strip() if user else "Someone"
-        if not user_name:
-            user_name = "A Homebound user"
-        owner_email = user.email if user and trip.notify_self else None
+        # Check if trip was overdue (contacts were already notified)
+        was_overdue = trip.previous_status in ('overdue', 'overdue_notified')
 
-        # Fetch all contact emails (owner + participants for group trips)
-        contacts_for_email = _get_all_trip_email_contacts(connection, trip)
+        # Everyone watching the trip, each reached once (see src/services/recipients.py)
+        plan = recipients.plan_delivery(
+            connection, trip.id, "overdue_resolved" if was_overdue else "checkout", actor_id=trip.user_id
+        )
+        user_name = plan.owner_name
+        owner_email = plan.owner_email
+        contacts_for_email = plan.emails
 
         # Build trip dict for email notification
         trip_data = {"title": trip.title, "location_text": trip.location_text}
@@ -581,37 +452,8 @@ def checkout_with_token(token: str, background_tasks: BackgroundTasks):
         email_type = "overdue resolved" if was_overdue else "completion"
         log.info(f"[Checkout] Scheduled {email_type} emails for {len(contacts_for_email)} contacts")
 
-        # Send push notifications to friend safety contacts
-        friend_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT friend_user_id FROM trip_safety_contacts
-                WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                ORDER BY position
-                """
-            ),
-            {"trip_id": trip.id}
-        ).fetchall()
-        friend_user_ids = [f.friend_user_id for f in friend_contacts]
-
-        # For group trips, also include participant friend contacts
-        if trip.is_group_trip:
-            participant_friend_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT DISTINCT friend_user_id FROM participant_trip_contacts
-                    WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                    """
-                ),
-                {"trip_id": trip.id}
-            ).fetchall()
-            existing_friend_ids = set(friend_user_ids)
-            for pfc in participant_friend_contacts:
-                if pfc.friend_user_id not in existing_friend_ids:
-                    friend_user_ids.append(pfc.friend_user_id)
-                    existing_friend_ids.add(pfc.friend_user_id)
-            log.info(f"[Checkout] Added {len(participant_friend_contacts)} participant friend contacts")
-
+        # Send push notifications to friend safety contacts (owner's and participants')
+        friend_user_ids = plan.friend_pushes
         if friend_user_ids:
             trip_title_for_push = trip.title
             user_name_for_push = user_name
@@ -637,40 +479,28 @@ def checkout_with_token(token: str, background_tasks: BackgroundTasks):
             push_type = "overdue resolved" if was_overdue else "completed"
             log.info(f"[Checkout] Scheduled {push_type} push notifications for {len(friend_user_ids)} friend contacts")
 
-        # For group trips, notify all other accepted participants
-        if trip.is_group_trip:
-            group_participants = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT user_id FROM trip_participants
-                    WHERE trip_id = :trip_id AND user_id != :owner_id AND status = 'accepted'
-                    """
-                ),
-                {"trip_id": trip.id, "owner_id": trip.user_id}
-            ).fetchall()
-            participant_ids = [p.user_id for p in group_participants]
-
-            if participant_ids:
-                trip_title_for_participants = trip.title
-                owner_name_for_participants = user_name
-                trip_id_for_participants = trip.id
-
-                @safe_background_task("send_participant_completion_push")
-                def send_participant_completion_push():
-                    for pid in participant_ids:
-                        asyncio.run(send_trip_completed_push(
-                            participant_user_id=pid,
-                            completer_name=owner_name_for_participants,
-                            trip_title=trip_title_for_participants,
-                            trip_id=trip_id_for_participants
-                        ))
-                        # Also send refresh push so their UI updates immediately
-                        asyncio.run(send_data_refresh_push(pid, "trip", trip_id_for_participants))
+        # For group trips, notify the other accepted participants and refresh all of them
+        participant_ids = plan.participant_pushes
+        refresh_ids = plan.participant_ids
+        if participant_ids or refresh_ids:
+            trip_title_for_participants = trip.title
+            owner_name_for_participants = user_name
+            trip_id_for_participants = trip.id
+
+            @safe_background_task("send_participant_completion_push")
+            def send_participant_completion_push():
+                for pid in participant_ids:
+                    asyncio.run(send_trip_completed_push(
+                        participant_user_id=pid,
+                        completer_name=owner_name_for_participants,
+                        trip_title=trip_title_for_participants,
+                        trip_id=trip_id_for_participants
+                    ))
+                # Also send refresh push so their UI updates immediately
+                for pid in refresh_ids:
+                    asyncio.run(send_data_refresh_push(pid, "trip", trip_id_for_participants))
 
-                background_tasks.add_task(send_participant_completion_push)
-                log.info(f"[Checkout] Scheduled completion push and refresh to {len(participant_ids)} group trip participants")
+            background_tasks.add_task(send_participant_completion_push)
+            log.info(f"[Checkout] Scheduled completion push to {len(participant_ids)} and refresh to {len(refresh_ids)} group trip participants")
 
-        return CheckinResponse(
-            ok=True,
-            message=f"Successfully completed '{trip.title}' - you're safe!"
-        )
+        return response
@@ -0,0 +1,75 @@
+"""Pre-rendered JSON responses for large list endpoints.
+
+By default FastAPI re-validates an endpoint's return value against its
+response_model, converts it to plain Python (dump_python), and encodes that
+with the stdlib json module. For endpoints that already build their response
+models (so the data was validated once on construction), that doubles the
+work per object.
+
+Marking an endpoint with @prerendered_json on a router using
+PrerenderedJSONRoute serializes the returned models straight to bytes with
+the response_model's pydantic-core serializer and returns them as a Response,
+which FastAPI passes through untouched. The endpoint function itself is
+unchanged (it still returns models when called directly, e.g. from tests),
+and response_model still drives the OpenAPI schema.
+
+Usage:
+    router = APIRouter(prefix="/api/v1/trips", route_class=PrerenderedJSONRoute)
+
+    @router.get("/", response_model=list[TripResponse])
+    @prerendered_json
+    def get_trips(...) -> list[TripResponse]:
+        ...
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+
+_MARKER = "__prerendered_json__"
+
+
+def prerendered_json(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Mark an endpoint to be served as pre-rendered JSON by PrerenderedJSONRoute."""
+    setattr(endpoint, _MARKER, True)
+    return endpoint
+
+
+def render_json(adapter: TypeAdapter, content: Any, status_code: int = 200) -> Response:
+    """Serialize `content` with a pydantic TypeAdapter into a JSON Response."""
+    return Response(content=adapter.dump_json(content), status_code=status_code, media_type="application/json")
+
+
+def _wrap(call: Callable[..., Any], adapter: TypeAdapter, status_code: int) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_endpoint(*args, **kwargs):
+            result = await call(*args, **kwargs)
+            return result if isinstance(result, Response) else render_json(adapter, result, status_code)
+        return async_endpoint
+
+    @functools.wraps(call)
+    def endpoint(*args, **kwargs):
+        result = call(*args, **kwargs)
+        return result if isinstance(result, Response) else render_json(adapter, result, status_code)
+    return endpoint
+
+
+class PrerenderedJSONRoute(APIRoute):
+    """APIRoute that serves @prerendered_json endpoints without response re-validation.
+
+    Routes whose endpoint isn't marked (or has no response_model) behave
+    exactly like APIRoute.
+    """
+
+    def get_route_handler(self):
+        if getattr(self.endpoint, _MARKER, False) and self.response_model is not None:
+            adapter = TypeAdapter(self.response_model)
+            self.dependant.call = _wrap(self.endpoint, adapter, self.status_code or 200)
+        return super().get_route_handler()
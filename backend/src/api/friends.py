@@ -10,11 +10,15 @@ from pydantic import BaseModel
 
 from src import database as db
 from src.api import auth
+from src.api.fast_json import PrerenderedJSONRoute, prerendered_json
+from src.services import friendships, live_tracks
+from src.services.geocoding import reverse_geocode_precise
 from src.services.notifications import send_data_refresh_push, send_friend_request_accepted_push
 
 router = APIRouter(
     prefix="/api/v1/friends",
     tags=["friends"],
+    route_class=PrerenderedJSONRoute,
 )
 
 # Reusable invites are permanent (no expiry)
@@ -85,7 +89,10 @@ def _get_friendship(connection, user_id: int, other_user_id: int):
 
 
 def _create_friendship(connection, user_id: int, other_user_id: int) -> None:
-    """Create a friendship between two users."""
+    """Create a friendship between two users.
+
+    Run it inside friendships.invalidating(), adding both users to the set it yields.
+    """
     # Ensure user_id_1 < user_id_2 for the constraint
     id1, id2 = min(user_id, other_user_id), max(user_id, other_user_id)
     connection.execute(
@@ -591,7 +598,7 @@ def accept_invite(
     user_id: int = Depends(auth.get_current_user_id)
 ):
     """Accept a friend invite and create the friendship."""
-    with db.engine.begin() as connection:
+    with friendships.invalidating() as changed, db.engine.begin() as connection:
         # Get the invite
         invite = connection.execute(
             sqlalchemy.text(
@@ -649,6 +656,7 @@ def accept_invite(
         # Create the friendship (handle race condition where friendship was created between check and insert)
         try:
             _create_friendship(connection, user_id, inviter_id)
+            changed.update((user_id, inviter_id))
         except sqlalchemy.exc.IntegrityError:
             # Friendship already exists (race condition)
             raise HTTPException(
@@ -797,13 +805,14 @@ def get_pending_invites(user_id: int = Depends(auth.get_current_user_id)):
 # ==================== Friends List Endpoints ====================
 
 @router.get("/", response_model=list[FriendResponse])
+@prerendered_json
 def get_friends(user_id: int = Depends(auth.get_current_user_id)):
     """Get all friends for the current user with their stats."""
     with db.engine.begin() as connection:
-        # Query friendships where user is either user_id_1 or user_id_2
+        # Friendships where user is either user_id_1 or user_id_2 (one indexed lookup per side)
         friends = connection.execute(
             sqlalchemy.text(
-                """
+                f"""
                 SELECT
                     u.id as user_id,
                     u.first_name,
@@ -811,11 +820,8 @@ def get_friends(user_id: int = Depends(auth.get_current_user_id)):
                     u.profile_photo_url,
                     u.created_at as member_since,
                     f.created_at as friendship_since
-                FROM friendships f
-                JOIN users u ON (
-                    (f.user_id_1 = :user_id AND u.id = f.user_id_2) OR
-                    (f.user_id_2 = :user_id AND u.id = f.user_id_1)
-                )
+                FROM ({friendships.FRIEND_IDS_SQL}) f
+                JOIN users u ON u.id = f.friend_id
                 ORDER BY f.created_at DESC
                 """
             ),
@@ -910,8 +916,26 @@ class FriendActiveTrip(BaseModel):
     monitored_participant: MonitoredParticipant | None = None
 
 
+# Nominatim asks clients to keep request rates low; bound the fan-out per response
+_GEOCODE_CONCURRENCY = 4
+
+
+async def _reverse_geocode_all(coordinates) -> dict[tuple[float, float], str | None]:
+    """Reverse geocode (lat, lon) pairs concurrently. Failed lookups map to None."""
+    semaphore = asyncio.Semaphore(_GEOCODE_CONCURRENCY)
+
+    async def lookup(lat, lon):
+        async with semaphore:
+            return await reverse_geocode_precise(lat, lon)
+
+    coordinates = list(coordinates)
+    names = await asyncio.gather(*(lookup(lat, lon) for lat, lon in coordinates))
+    return dict(zip(coordinates, names))
+
+
 @router.get("/active-trips", response_model=list[FriendActiveTrip])
-def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
+@prerendered_json
+async def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
     """Get all active/planned trips where the current user is a friend safety contact.
 
     This allows friends to see the status of trips they're monitoring.
@@ -923,16 +947,18 @@ def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
     For group trips, also returns trips where the user is a safety contact for
     a participant (via participant_trip_contacts). In this case, the check-in
     and live location data shown is for the monitored participant, not the owner.
+
+    Reads run on the async engine; check-in locations are reverse geocoded
+    concurrently once the connection is back in the pool.
     """
     import json
     import logging
-    from src.services.geocoding import reverse_geocode_sync
     log = logging.getLogger(__name__)
     log.info(f"[Friends] get_friend_active_trips called for user_id={user_id}")
 
-    with db.engine.begin() as connection:
+    async with db.async_engine().begin() as connection:
         # Query 1: Solo trips where user is owner's friend safety contact
-        solo_trips = connection.execute(
+        solo_trips = (await connection.execute(
             sqlalchemy.text(
                 """
                 SELECT t.id, t.user_id, t.title, t.start, t.eta, t.grace_min,
@@ -958,10 +984,10 @@ def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
                 """
             ),
             {"current_user_id": user_id}
-        ).mappings().fetchall()
+        )).mappings().fetchall()
 
         # Query 2: Group trips where user is a participant's friend safety contact
-        group_trips = connection.execute(
+        group_trips = (await connection.execute(
             sqlalchemy.text(
                 """
                 SELECT DISTINCT ON (t.id)
@@ -994,7 +1020,7 @@ def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
                 """
             ),
             {"current_user_id": user_id}
-        ).mappings().fetchall()
+        )).mappings().fetchall()
 
         # Combine trips, avoiding duplicates (solo trips take precedence)
         solo_trip_ids = {trip["id"] for trip in solo_trips}
@@ -1014,7 +1040,7 @@ def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
 
         # Batch load check-in events for all trips
         # For group trips with monitored participant, filter by user_id
-        checkin_events_raw = connection.execute(
+        checkin_events_raw = (await connection.execute(
             sqlalchemy.text(
                 """
                 SELECT trip_id, user_id, timestamp, lat, lon
@@ -1024,7 +1050,7 @@ def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
                 """
             ),
             {"trip_ids": trip_ids}
-        ).fetchall()
+        )).fetchall()
 
         # Group check-in events by trip_id (limit 10 per trip)
         # Show all check-ins for the trip (not filtered by user)
@@ -1035,7 +1061,7 @@ def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
 
         # Batch load live locations for all trips
         # For group trips, we need to get participant's live location
-        live_locations_raw = connection.execute(
+        live_locations_raw = (await connection.execute(
             sqlalchemy.text(
                 """
                 SELECT DISTINCT ON (trip_id, user_id) trip_id, user_id, latitude, longitude, speed, timestamp
@@ -1045,7 +1071,7 @@ def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
                 """
             ),
             {"trip_ids": trip_ids}
-        ).fetchall()
+        )).fetchall()
 
         # Map: trip_id -> (user_id -> live_location)
         live_loc_by_trip_user: dict[int, dict[int, object]] = {}
@@ -1055,7 +1081,7 @@ def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
             live_loc_by_trip_user[row.trip_id][row.user_id] = row
 
         # Batch load pending update requests for all trips
-        pending_requests_raw = connection.execute(
+        pending_requests_raw = (await connection.execute(
             sqlalchemy.text(
                 """
                 SELECT trip_id FROM update_requests
@@ -1065,132 +1091,133 @@ def get_friend_active_trips(user_id: int = Depends(auth.get_current_user_id)):
                 """
             ),
             {"trip_ids": trip_ids, "user_id": user_id}
-        ).fetchall()
+        )).fetchall()
 
         pending_map = {row.trip_id for row in pending_requests_raw}
 
-        result = []
-        for trip in all_trips:
-            # Parse activity colors (may be JSON string or dict)
-            colors = trip["activity_colors"]
-            if isinstance(colors, str):
-                colors = json.loads(colors)
-
-            # Format datetime fields
-            start_str = trip["start"]
-            if hasattr(start_str, 'isoformat'):
-                start_str = start_str.isoformat()
-            eta_str = trip["eta"]
-            if hasattr(eta_str, 'isoformat'):
-                eta_str = eta_str.isoformat()
-            last_checkin_str = trip["last_checkin_at"]
-            if last_checkin_str is not None and hasattr(last_checkin_str, 'isoformat'):
-                last_checkin_str = last_checkin_str.isoformat()
-
-            # Get visibility settings (from owner for solo, from participant for group)
-            share_checkin_locations = trip.get("friend_share_checkin_locations", True)
-            share_live_location = trip.get("friend_share_live_location", False)
-            share_notes = trip.get("friend_share_notes", True)
-            allow_update_requests = trip.get("friend_allow_update_requests", True)
-
-            # Build check-in locations from batch-loaded data
-            checkin_locations = None
-            if share_checkin_locations:
-                events = checkin_map.get(trip["id"], [])
-                if events:
-                    checkin_locations = []
-                    for event in events:
-                        ts = event.timestamp
-                        if hasattr(ts, 'isoformat'):
-                            ts = ts.isoformat()
-                        # Try to reverse geocode the location
-                        location_name = None
-                        if event.lat and event.lon:
-                            try:
-                                location_name = reverse_geocode_sync(event.lat, event.lon)
-                            except Exception:
-                                pass
-                        checkin_locations.append(CheckinLocation(
-                            timestamp=ts,
-                            latitude=event.lat,
-                            longitude=event.lon,
-                            location_name=location_name
-                        ))
-
-            # Build live location from batch-loaded data
-            live_location = None
-            trip_has_live_location = trip.get("share_live_location", False)
-            if share_live_location and trip_has_live_location:
-                trip_live_locs = live_loc_by_trip_user.get(trip["id"], {})
-                monitored_user = trip.get("monitored_user_id")
-                # For group trips, get the monitored participant's live location
-                # For solo trips, get the owner's live location
-                target_user = monitored_user if monitored_user else trip["user_id"]
-                live_loc = trip_live_locs.get(target_user)
-                if live_loc:
-                    ts = live_loc.timestamp
+    # Reverse geocode each distinct check-in location shown to the friend
+    coordinates = {
+        (event.lat, event.lon)
+        for trip in all_trips if trip.get("friend_share_checkin_locations", True)
+        for event in checkin_map[trip["id"]] if event.lat and event.lon
+    }
+    location_names = await _reverse_geocode_all(coordinates)
+
+    result = []
+    for trip in all_trips:
+        # Parse activity colors (may be JSON string or dict)
+        colors = trip["activity_colors"]
+        if isinstance(colors, str):
+            colors = json.loads(colors)
+
+        # Format datetime fields
+        start_str = trip["start"]
+        if hasattr(start_str, 'isoformat'):
+            start_str = start_str.isoformat()
+        eta_str = trip["eta"]
+        if hasattr(eta_str, 'isoformat'):
+            eta_str = eta_str.isoformat()
+        last_checkin_str = trip["last_checkin_at"]
+        if last_checkin_str is not None and hasattr(last_checkin_str, 'isoformat'):
+            last_checkin_str = last_checkin_str.isoformat()
+
+        # Get visibility settings (from owner for solo, from participant for group)
+        share_checkin_locations = trip.get("friend_share_checkin_locations", True)
+        share_live_location = trip.get("friend_share_live_location", False)
+        share_notes = trip.get("friend_share_notes", True)
+        allow_update_requests = trip.get("friend_allow_update_requests", True)
+
+        # Build check-in locations from batch-loaded data
+        checkin_locations = None
+        if share_checkin_locations:
+            events = checkin_map.get(trip["id"], [])
+            if events:
+                checkin_locations = []
+                for event in events:
+                    ts = event.timestamp
                     if hasattr(ts, 'isoformat'):
                         ts = ts.isoformat()
-                    live_location = LiveLocationData(
-                        latitude=live_loc.latitude,
-                        longitude=live_loc.longitude,
-                        speed=live_loc.speed,
-                        timestamp=ts
-                    )
-
-            # Check for pending update requests from batch-loaded data
-            has_pending_update = False
-            if allow_update_requests:
-                has_pending_update = trip["id"] in pending_map
-
-            # Build monitored participant info for group trips
-            monitored_participant = None
-            is_group_trip = trip.get("is_group_trip", False) or trip.get("monitored_user_id") is not None
-            if trip.get("monitored_user_id"):
-                monitored_participant = MonitoredParticipant(
-                    user_id=trip["monitored_user_id"],
-                    first_name=trip["monitored_first_name"] or "",
-                    last_name=trip["monitored_last_name"] or "",
-                    profile_photo_url=trip["monitored_profile_photo_url"]
+                    checkin_locations.append(CheckinLocation(
+                        timestamp=ts,
+                        latitude=event.lat,
+                        longitude=event.lon,
+                        location_name=location_names.get((event.lat, event.lon))
+                    ))
+
+        # Build live location from batch-loaded data
+        live_location = None
+        trip_has_live_location = trip.get("share_live_location", False)
+        if share_live_location and trip_has_live_location:
+            trip_live_locs = live_loc_by_trip_user.get(trip["id"], {})
+            monitored_user = trip.get("monitored_user_id")
+            # For group trips, get the monitored participant's live location
+            # For solo trips, get the owner's live location
+            target_user = monitored_user if monitored_user else trip["user_id"]
+            live_loc = trip_live_locs.get(target_user)
+            if live_loc:
+                ts = live_loc.timestamp
+                if hasattr(ts, 'isoformat'):
+                    ts = ts.isoformat()
+                live_location = LiveLocationData(
+                    latitude=live_loc.latitude,
+                    longitude=live_loc.longitude,
+                    speed=live_loc.speed,
+                    timestamp=ts
                 )
 
-            result.append(FriendActiveTrip(
-                id=trip["id"],
-                owner=FriendActiveTripOwner(
-                    user_id=trip["user_id"],
-                    first_name=trip["first_name"] or "",
-                    last_name=trip["last_name"] or "",
-                    profile_photo_url=trip["profile_photo_url"]
-                ),
-                title=trip["title"],
-                activity_name=trip["activity_name"],
-                activity_icon=trip["activity_icon"],
-                activity_colors=colors,
-                status=trip["status"],
-                start=start_str,
-                eta=eta_str,
-                grace_min=trip["grace_min"],
-                location_text=trip["location_text"],
-                start_location_text=trip["start_location_text"],
-                notes=trip["notes"] if share_notes else None,
-                timezone=trip["timezone"],
-                last_checkin_at=last_checkin_str,
-                # Enhanced friend visibility fields
-                checkin_locations=checkin_locations,
-                live_location=live_location,
-                destination_lat=trip["gen_lat"],
-                destination_lon=trip["gen_lon"],
-                start_lat=trip.get("start_lat"),
-                start_lon=trip.get("start_lon"),
-                has_pending_update_request=has_pending_update,
-                # Group trip fields
-                is_group_trip=is_group_trip,
-                monitored_participant=monitored_participant
-            ))
+        # Check for pending update requests from batch-loaded data
+        has_pending_update = False
+        if allow_update_requests:
+            has_pending_update = trip["id"] in pending_map
+
+        # Build monitored participant info for group trips
+        monitored_participant = None
+        is_group_trip = trip.get("is_group_trip", False) or trip.get("monitored_user_id") is not None
+        if trip.get("monitored_user_id"):
+            monitored_participant = MonitoredParticipant(
+                user_id=trip["monitored_user_id"],
+                first_name=trip["monitored_first_name"] or "",
+                last_name=trip["monitored_last_name"] or "",
+                profile_photo_url=trip["monitored_profile_photo_url"]
+            )
 
-        # Sort by start time
-        result.sort(key=lambda t: t.start)
-        return result
+        result.append(FriendActiveTrip(
+            id=trip["id"],
+            owner=FriendActiveTripOwner(
+                user_id=trip["user_id"],
+                first_name=trip["first_name"] or "",
+                last_name=trip["last_name"] or "",
+                profile_photo_url=trip["profile_photo_url"]
+            ),
+            title=trip["title"],
+            activity_name=trip["activity_name"],
+            activity_icon=trip["activity_icon"],
+            activity_colors=colors,
+            status=trip["status"],
+            start=start_str,
+            eta=eta_str,
+            grace_min=trip["grace_min"],
+            location_text=trip["location_text"],
+            start_location_text=trip["start_location_text"],
+            notes=trip["notes"] if share_notes else None,
+            timezone=trip["timezone"],
+            last_checkin_at=last_checkin_str,
+            # Enhanced friend visibility fields
+            checkin_locations=checkin_locations,
+            live_location=live_location,
+            destination_lat=trip["gen_lat"],
+            destination_lon=trip["gen_lon"],
+            start_lat=trip.get("start_lat"),
+            start_lon=trip.get("start_lon"),
+            has_pending_update_request=has_pending_update,
+            # Group trip fields
+            is_group_trip=is_group_trip,
+            monitored_participant=monitored_participant
+        ))
+
+    # Sort by start time
+    result.sort(key=lambda t: t.start)
+    return result
 
 
 # ==================== Update Request Endpoint ====================
@@ -1330,6 +1357,81 @@ def request_trip_update(
         )
 
 
+# ==================== Live Location Track Endpoint ====================
+
+class LiveLocationTrack(BaseModel):
+    """Breadcrumb trail of a friend's live location over a whole trip.
+
+    path is an encoded polyline (precision 5) and offsets holds each point's
+    seconds since started_at, delta encoded with the same algorithm.
+    """
+    trip_id: int
+    user_id: int
+    point_count: int
+    started_at: str | None
+    path: str
+    offsets: str
+
+
+_TRACKED_USER_SQL = """
+    SELECT t.user_id AS tracked_user_id
+    FROM trips t
+    JOIN trip_safety_contacts tsc ON tsc.trip_id = t.id
+    JOIN users u ON t.user_id = u.id
+    WHERE t.id = :trip_id AND tsc.friend_user_id = :user_id
+    AND t.status IN ('active', 'overdue', 'overdue_notified')
+    AND t.share_live_location AND u.friend_share_live_location
+    UNION ALL
+    SELECT ptc.participant_user_id AS tracked_user_id
+    FROM participant_trip_contacts ptc
+    JOIN trips t ON t.id = ptc.trip_id
+    JOIN trip_participants tp ON tp.trip_id = t.id AND tp.user_id = ptc.participant_user_id
+    JOIN users participant ON ptc.participant_user_id = participant.id
+    WHERE ptc.trip_id = :trip_id AND ptc.friend_user_id = :user_id
+    AND t.status IN ('active', 'overdue', 'overdue_notified')
+    AND tp.status = 'accepted' AND tp.share_location AND participant.friend_share_live_location
+    LIMIT 1
+"""
+
+
+@router.get("/trips/{trip_id}/track", response_model=LiveLocationTrack)
+def get_friend_trip_track(trip_id: int, user_id: int = Depends(auth.get_current_user_id)):
+    """Get the full live location trail of a trip the user is monitoring.
+
+    Visibility follows the live location in /active-trips: the owner's trail
+    for a friend safety contact, or the monitored participant's trail for a
+    participant's friend contact, if they share live location with friends.
+    """
+    with db.engine.begin() as connection:
+        tracked = connection.execute(
+            sqlalchemy.text(_TRACKED_USER_SQL),
+            {"trip_id": trip_id, "user_id": user_id}
+        ).fetchone()
+
+        if not tracked:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Live location is not shared with you for this trip"
+            )
+
+        points = live_tracks.load_track(connection, trip_id, tracked.tracked_user_id)
+
+    if not points:
+        return LiveLocationTrack(
+            trip_id=trip_id, user_id=tracked.tracked_user_id, point_count=0, started_at=None, path="", offsets=""
+        )
+
+    started_at, path, offsets = live_tracks.encode_track(points)
+    return LiveLocationTrack(
+        trip_id=trip_id,
+        user_id=tracked.tracked_user_id,
+        point_count=len(points),
+        started_at=started_at.isoformat(),
+        path=path,
+        offsets=offsets
+    )
+
+
 # ==================== Individual Friend Endpoints ====================
 
 @router.get("/{friend_user_id}", response_model=FriendResponse)
@@ -1384,7 +1486,7 @@ def get_friend(friend_user_id: int, user_id: int = Depends(auth.get_current_user
 @router.delete("/{friend_user_id}")
 def remove_friend(friend_user_id: int, user_id: int = Depends(auth.get_current_user_id)):
     """Remove a friend."""
-    with db.engine.begin() as connection:
+    with friendships.invalidating() as changed, db.engine.begin() as connection:
         # Verify they are friends and get the friendship
         friendship = _get_friendship(connection, user_id, friend_user_id)
         if not friendship:
@@ -1404,6 +1506,7 @@ def remove_friend(friend_user_id: int, user_id: int = Depends(auth.get_current_u
             ),
             {"id1": id1, "id2": id2}
         )
+        changed.update((user_id, friend_user_id))
 
         return {"ok": True, "message": "Friend removed"}
 
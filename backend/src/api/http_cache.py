@@ -0,0 +1,127 @@
+"""Conditional GET (ETag / If-None-Match) for JSON API responses.
+
+ConditionalGetMiddleware gives every successful JSON GET response a strong
+ETag (a hash of the body) and answers a matching If-None-Match with
+304 Not Modified, so a client re-polling an unchanged /trips/ or
+/friends/active-trips downloads headers only. The handler still runs; only
+the transfer is saved.
+
+Endpoints that can derive a version cheaply (e.g. an aggregate over a small
+table) can skip the row-to-model work as well:
+
+    etag = http_cache.version_etag(version)
+    if request is not None and http_cache.etag_matches(request.headers.get("if-none-match"), etag):
+        return http_cache.not_modified(etag)
+    ...
+    response.headers["ETag"] = etag
+
+Responses that already carry an ETag pass through the middleware untouched.
+ETags are computed on the uncompressed body, so GZipMiddleware must wrap this
+middleware (be added after it) and a client's stored ETag stays valid whether
+or not it asked for gzip.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Response
+from starlette.datastructures import Headers, MutableHeaders
+
+# Authenticated per-user data: browsers/URLSession may store it but must revalidate,
+# shared caches must not store it
+CACHE_CONTROL = "private, no-cache"
+
+# Larger (streamed) JSON bodies are passed through without an ETag rather than buffered
+MAX_BUFFERED_BODY = 4 * 1024 * 1024
+
+
+def strong_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def version_etag(version: str) -> str:
+    """Weak ETag for a representation identified by a version string."""
+    return f'W/"{version}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison, RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == target for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """304 response for a matching If-None-Match."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+class ConditionalGetMiddleware:
+    """ASGI middleware adding strong ETags and 304 responses to JSON GETs."""
+
+    def __init__(self, app, max_body_size: int = MAX_BUFFERED_BODY):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message = None
+        chunks: list[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def send_with_etag(message):
+            nonlocal start_message, size, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if (message["status"] != 200 or "etag" in headers
+                        or not headers.get("content-type", "").startswith("application/json")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if message.get("more_body", False):
+                if size > self.max_body_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                return
+
+            body = b"".join(chunks)
+            etag = strong_etag(body)
+            headers = MutableHeaders(raw=list(start_message.get("headers", [])))
+            headers["etag"] = etag
+            headers.setdefault("cache-control", CACHE_CONTROL)
+
+            if etag_matches(if_none_match, etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send({**start_message, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,86 @@
+"""Router registration, optionally deferred until a request needs the router.
+
+Importing an API module builds its pydantic models and routes, and including
+its router builds FastAPI's dependency and response models: together about
+half of the server's import time. On a serverless platform (vercel.json
+routes every request to src/api/server.py) that is paid on every cold start,
+even though one invocation usually serves a single endpoint.
+
+RouterRegistry knows each router's module and path prefix without importing
+it. load_all() includes every router up front (the default). With
+LAZY_ROUTERS=true, LazyRouterMiddleware instead includes a router when the
+first request under its prefix arrives; routers sharing a prefix are loaded
+together in their registration order, so route precedence is unchanged.
+Requesting the OpenAPI schema or docs loads everything.
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+from dataclasses import dataclass
+
+from fastapi import FastAPI
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RouterSpec:
+    prefix: str  # Path prefix all of the module's routes live under
+    module: str
+    attributes: tuple[str, ...] = ("router",)
+
+    def matches(self, path: str) -> bool:
+        return path == self.prefix or path.startswith(self.prefix.rstrip("/") + "/")
+
+
+class RouterRegistry:
+    """Routers of an app, included into it on demand."""
+
+    def __init__(self, app: FastAPI, specs: tuple[RouterSpec, ...]):
+        self.app = app
+        self._pending = list(specs)
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> list[RouterSpec]:
+        return list(self._pending)
+
+    def load_all(self) -> None:
+        self._load(lambda spec: True)
+
+    def load_for_path(self, path: str) -> None:
+        """Include the routers serving `path` (all of them for the schema and docs)."""
+        if not self._pending:
+            return
+        if path in (self.app.openapi_url, self.app.docs_url, self.app.redoc_url):
+            self.load_all()
+            return
+        prefixes = {spec.prefix for spec in self._pending if spec.matches(path)}
+        if prefixes:
+            self._load(lambda spec: spec.prefix in prefixes)
+
+    def _load(self, wanted) -> None:
+        with self._lock:
+            for spec in [spec for spec in self._pending if wanted(spec)]:
+                module = importlib.import_module(spec.module)
+                for attribute in spec.attributes:
+                    self.app.include_router(getattr(module, attribute))
+                self._pending.remove(spec)
+                log.debug(f"Included routers from {spec.module}")
+            # The cached schema doesn't have the new routes
+            self.app.openapi_schema = None
+
+
+class LazyRouterMiddleware:
+    """ASGI middleware that includes a request's routers before routing it."""
+
+    def __init__(self, app, registry: RouterRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            self.registry.load_for_path(scope["path"])
+        await self.app(scope, receive, send)
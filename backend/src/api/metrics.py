@@ -0,0 +1,32 @@
+"""Prometheus metrics endpoint"""
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from src import config
+from src.services.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+settings = config.get_settings()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(request: Request):
+    """Expose process metrics in the Prometheus text format.
+
+    Open in DEV_MODE. Otherwise requires `Authorization: Bearer <METRICS_TOKEN>`
+    and is disabled entirely (404) when METRICS_TOKEN is not configured.
+    """
+    if not settings.DEV_MODE:
+        if not settings.METRICS_TOKEN:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+        auth = request.headers.get("authorization") or ""
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(auth.encode(), expected.encode()):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
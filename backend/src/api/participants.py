@@ -9,10 +9,14 @@ from typing import Optional
 import sqlalchemy
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from pydantic import BaseModel
+from sqlalchemy import DateTime, Integer
 
 from src import database as db
 from src.api import auth
+from src.api.fast_json import PrerenderedJSONRoute, prerendered_json
+from src.services import friendships, recipients, statements
 from src.services.geocoding import reverse_geocode_sync
+from src.services.reminders import compute_next_reminder_at, reschedule_participant_reminder
 from src.services.notifications import (
     send_checkin_update_emails,
     send_checkout_vote_push,
@@ -118,21 +122,6 @@ class ParticipantLocationResponse(BaseModel):
 
 # ==================== Helper Functions ====================
 
-def _is_friend(connection, user_id: int, friend_user_id: int) -> bool:
-    """Check if two users are friends."""
-    id1, id2 = min(user_id, friend_user_id), max(user_id, friend_user_id)
-    result = connection.execute(
-        sqlalchemy.text(
-            """
-            SELECT id FROM friendships
-            WHERE user_id_1 = :id1 AND user_id_2 = :id2
-            """
-        ),
-        {"id1": id1, "id2": id2}
-    ).fetchone()
-    return result is not None
-
-
 def _get_trip_with_access(connection, trip_id: int, user_id: int):
     """Get trip if user has access (owner or accepted participant).
 
@@ -226,7 +215,8 @@ def _to_iso8601(dt) -> str | None:
 router = APIRouter(
     prefix="/api/v1/trips",
     tags=["participants"],
-    dependencies=[Depends(auth.get_current_user_id)]
+    dependencies=[Depends(auth.get_current_user_id)],
+    route_class=PrerenderedJSONRoute
 )
 
 
@@ -315,12 +305,12 @@ def invite_participants(
             )
 
         # Validate all friend IDs
-        for friend_id in body.friend_user_ids:
-            if not _is_friend(connection, user_id, friend_id):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"User {friend_id} is not in your friends list"
-                )
+        not_friends = friendships.non_friends(connection, user_id, body.friend_user_ids)
+        if not_friends:
+            raise HTTPException(
+                status_code=400,
+                detail=f"User {not_friends[0]} is not in your friends list"
+            )
 
         now = datetime.now(UTC)
         now_iso = now.isoformat()
@@ -435,7 +425,77 @@ def invite_participants(
         ]
 
 
+def _load_participant_list(connection, trip, user_id: int) -> ParticipantListResponse:
+    """Build the participant list for a trip the caller already has access to.
+
+    Args:
+        trip: Row with at least id and group_settings
+    """
+    settings = _parse_group_settings(trip.group_settings)
+
+    # Fetch participants with user info
+    participants = connection.execute(
+        sqlalchemy.text(
+            """
+            SELECT p.*, u.first_name, u.last_name, u.email, u.profile_photo_url
+            FROM trip_participants p
+            JOIN users u ON p.user_id = u.id
+            WHERE p.trip_id = :trip_id
+            ORDER BY p.role DESC, p.joined_at NULLS LAST, p.invited_at
+            """
+        ),
+        {"trip_id": trip.id}
+    ).fetchall()
+
+    # Count checkout votes and whether the current user has voted in one pass
+    votes = connection.execute(
+        sqlalchemy.text(
+            """
+            SELECT COUNT(*) AS count, COALESCE(BOOL_OR(user_id = :user_id), false) AS has_voted
+            FROM checkout_votes
+            WHERE trip_id = :trip_id
+            """
+        ),
+        {"trip_id": trip.id, "user_id": user_id}
+    ).fetchone()
+    vote_count = votes.count if votes else 0
+    has_voted = bool(votes.has_voted) if votes else False
+
+    # Calculate votes needed (use ceiling to ensure threshold is met)
+    # e.g., 3 participants * 50% = 1.5 -> 2 votes needed
+    accepted_count = sum(1 for p in participants if p.status == 'accepted')
+    votes_needed = max(1, math.ceil(accepted_count * settings.vote_threshold)) if settings.checkout_mode == "vote" else 0
+
+    return ParticipantListResponse(
+        participants=[
+            ParticipantResponse(
+                id=p.id,
+                user_id=p.user_id,
+                role=p.role,
+                status=p.status,
+                invited_at=_to_iso8601(p.invited_at) or "",
+                invited_by=p.invited_by,
+                joined_at=_to_iso8601(p.joined_at),
+                left_at=_to_iso8601(p.left_at),
+                last_checkin_at=_to_iso8601(p.last_checkin_at),
+                last_lat=p.last_lat,
+                last_lon=p.last_lon,
+                user_name=f"{p.first_name} {p.last_name}".strip() or None,
+                user_email=p.email,
+                profile_photo_url=p.profile_photo_url,
+                share_location=p.share_location if hasattr(p, 'share_location') else False
+            )
+            for p in participants
+        ],
+        checkout_votes=vote_count,
+        checkout_votes_needed=votes_needed,
+        group_settings=settings,
+        user_has_voted=has_voted
+    )
+
+
 @router.get("/{trip_id}/participants", response_model=ParticipantListResponse)
+@prerendered_json
 def get_participants(
     trip_id: int,
     user_id: int = Depends(auth.get_current_user_id)
@@ -447,75 +507,11 @@ def get_participants(
         if not trip:
             raise HTTPException(status_code=404, detail="Trip not found or access denied")
 
-        settings = _parse_group_settings(trip.group_settings)
-
-        # Fetch participants with user info
-        participants = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT p.*, u.first_name, u.last_name, u.email, u.profile_photo_url
-                FROM trip_participants p
-                JOIN users u ON p.user_id = u.id
-                WHERE p.trip_id = :trip_id
-                ORDER BY p.role DESC, p.joined_at NULLS LAST, p.invited_at
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchall()
-
-        # Count checkout votes
-        votes = connection.execute(
-            sqlalchemy.text(
-                "SELECT COUNT(*) as count FROM checkout_votes WHERE trip_id = :trip_id"
-            ),
-            {"trip_id": trip_id}
-        ).fetchone()
-        vote_count = votes.count if votes else 0
-
-        # Check if current user has voted
-        user_vote = connection.execute(
-            sqlalchemy.text(
-                "SELECT id FROM checkout_votes WHERE trip_id = :trip_id AND user_id = :user_id"
-            ),
-            {"trip_id": trip_id, "user_id": user_id}
-        ).fetchone()
-        has_voted = user_vote is not None
-
-        # Calculate votes needed (use ceiling to ensure threshold is met)
-        # e.g., 3 participants * 50% = 1.5 -> 2 votes needed
-        accepted_count = sum(1 for p in participants if p.status == 'accepted')
-        votes_needed = max(1, math.ceil(accepted_count * settings.vote_threshold)) if settings.checkout_mode == "vote" else 0
-
-        return ParticipantListResponse(
-            participants=[
-                ParticipantResponse(
-                    id=p.id,
-                    user_id=p.user_id,
-                    role=p.role,
-                    status=p.status,
-                    invited_at=_to_iso8601(p.invited_at) or "",
-                    invited_by=p.invited_by,
-                    joined_at=_to_iso8601(p.joined_at),
-                    left_at=_to_iso8601(p.left_at),
-                    last_checkin_at=_to_iso8601(p.last_checkin_at),
-                    last_lat=p.last_lat,
-                    last_lon=p.last_lon,
-                    user_name=f"{p.first_name} {p.last_name}".strip() or None,
-                    user_email=p.email,
-                    profile_photo_url=p.profile_photo_url,
-                    share_location=p.share_location if hasattr(p, 'share_location') else False
-                )
-                for p in participants
-            ],
-            checkout_votes=vote_count,
-            checkout_votes_needed=votes_needed,
-            group_settings=settings,
-            user_has_voted=has_voted
-        )
+        return _load_participant_list(connection, trip, user_id)
 
 
 @router.post("/{trip_id}/participants/accept")
-def accept_invitation(
+async def accept_invitation(
     trip_id: int,
     request: AcceptInvitationRequest,
     background_tasks: BackgroundTasks,
@@ -537,7 +533,7 @@ def accept_invitation(
             detail="Maximum of 3 safety contacts allowed"
         )
 
-    with db.engine.begin() as connection:
+    async with db.async_engine().begin() as connection:
         # Verify all email contacts belong to this user
         if request.safety_contact_ids:
             placeholders = ", ".join([f":contact_id_{i}" for i in range(len(request.safety_contact_ids))])
@@ -545,7 +541,7 @@ def accept_invitation(
             for i, cid in enumerate(request.safety_contact_ids):
                 params[f"contact_id_{i}"] = cid
 
-            contact_count = connection.execute(
+            contact_count = (await connection.execute(
                 sqlalchemy.text(
                     f"""
                     SELECT COUNT(*) FROM contacts
@@ -553,7 +549,7 @@ def accept_invitation(
                     """
                 ),
                 params
-            ).scalar()
+            )).scalar()
 
             if contact_count != len(request.safety_contact_ids):
                 raise HTTPException(
@@ -563,22 +559,17 @@ def accept_invitation(
 
         # Verify all friend IDs are actually friends
         if request.safety_friend_ids:
-            for friend_id in request.safety_friend_ids:
-                id1, id2 = min(user_id, friend_id), max(user_id, friend_id)
-                is_friend = connection.execute(
-                    sqlalchemy.text(
-                        "SELECT 1 FROM friendships WHERE user_id_1 = :id1 AND user_id_2 = :id2"
-                    ),
-                    {"id1": id1, "id2": id2}
-                ).fetchone()
-                if not is_friend:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"User {friend_id} is not your friend"
-                    )
+            not_friends = await connection.run_sync(
+                friendships.non_friends, user_id, request.safety_friend_ids
+            )
+            if not_friends:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"User {not_friends[0]} is not your friend"
+                )
 
         # Check if user has a pending invitation
-        participant = connection.execute(
+        participant = (await connection.execute(
             sqlalchemy.text(
                 """
                 SELECT id, status FROM trip_participants
@@ -586,7 +577,7 @@ def accept_invitation(
                 """
             ),
             {"trip_id": trip_id, "user_id": user_id}
-        ).fetchone()
+        )).fetchone()
 
         if not participant:
             log.warning(f"[ACCEPT] No invitation found for trip {trip_id}, user {user_id}")
@@ -607,9 +598,9 @@ def accept_invitation(
             )
 
         # Accept the invitation and store personal notification settings
-        now = datetime.now(UTC).isoformat()
+        now = datetime.now(UTC).replace(tzinfo=None)
         log.info(f"[ACCEPT] Updating status to 'accepted' for trip {trip_id}, user {user_id}, share_location={request.share_my_location}")
-        connection.execute(
+        await connection.execute(
             sqlalchemy.text(
                 """
                 UPDATE trip_participants
@@ -632,10 +623,13 @@ def accept_invitation(
                 "share_location": request.share_my_location
             }
         )
+        await connection.run_sync(
+            reschedule_participant_reminder, trip_id, user_id, datetime.now(UTC)
+        )
         log.info(f"[ACCEPT] Status updated successfully for trip {trip_id}, user {user_id}")
 
         # Clear any existing contacts (in case of re-acceptance)
-        connection.execute(
+        await connection.execute(
             sqlalchemy.text(
                 "DELETE FROM participant_trip_contacts WHERE trip_id = :trip_id AND participant_user_id = :user_id"
             ),
@@ -645,7 +639,7 @@ def accept_invitation(
         # Store participant's safety contacts (email contacts first, then friends)
         position = 1
         for contact_id in request.safety_contact_ids:
-            connection.execute(
+            await connection.execute(
                 sqlalchemy.text(
                     """
                     INSERT INTO participant_trip_contacts (trip_id, participant_user_id, contact_id, position)
@@ -663,7 +657,7 @@ def accept_invitation(
 
         # Store friend contacts
         for friend_id in request.safety_friend_ids:
-            connection.execute(
+            await connection.execute(
                 sqlalchemy.text(
                     """
                     INSERT INTO participant_trip_contacts (trip_id, participant_user_id, friend_user_id, position)
@@ -681,7 +675,7 @@ def accept_invitation(
 
         # Get trip details for notification (including status for Bug 1 fix)
         # Also fetch owner's contact IDs to exclude from participant notification
-        trip = connection.execute(
+        trip = (await connection.execute(
             sqlalchemy.text("""
                 SELECT t.user_id, t.title, t.status, t.timezone, t.location_text, t.eta,
                        t.has_separate_locations, t.start_location_text, a.name as activity_name,
@@ -691,26 +685,26 @@ def accept_invitation(
                 WHERE t.id = :trip_id
             """),
             {"trip_id": trip_id}
-        ).fetchone()
+        )).fetchone()
 
         # Get accepter's name
-        accepter = connection.execute(
+        accepter = (await connection.execute(
             sqlalchemy.text("SELECT first_name, last_name, email FROM users WHERE id = :user_id"),
             {"user_id": user_id}
-        ).fetchone()
+        )).fetchone()
         accepter_name = f"{accepter.first_name} {accepter.last_name}".strip() if accepter else "Someone"
 
         # Send push notification to trip owner
         if trip and trip.user_id != user_id:
             owner_id = trip.user_id
             trip_title = trip.title
-            def send_accepted_push():
-                asyncio.run(send_trip_invitation_accepted_push(
+            async def send_accepted_push():
+                await send_trip_invitation_accepted_push(
                     owner_user_id=owner_id,
                     accepter_name=accepter_name,
                     trip_title=trip_title,
                     trip_id=trip_id
-                ))
+                )
 
             background_tasks.add_task(send_accepted_push)
 
@@ -719,7 +713,7 @@ def accept_invitation(
             log.info(f"[ACCEPT] Trip {trip_id} is active - sending trip start notifications to new participant's contacts")
 
             # Get the new participant's email contacts for this trip
-            participant_email_contacts = connection.execute(
+            participant_email_contacts = (await connection.execute(
                 sqlalchemy.text("""
                     SELECT c.id, c.name, c.email
                     FROM participant_trip_contacts ptc
@@ -729,7 +723,7 @@ def accept_invitation(
                       AND c.email IS NOT NULL
                 """),
                 {"trip_id": trip_id, "user_id": user_id}
-            ).fetchall()
+            )).fetchall()
 
             contacts_for_email = [
                 {**dict(c._mapping), "watched_user_name": accepter_name}
@@ -737,7 +731,7 @@ def accept_invitation(
             ]
 
             # Also get participant's friend contacts' emails
-            participant_friend_email_contacts = connection.execute(
+            participant_friend_email_contacts = (await connection.execute(
                 sqlalchemy.text("""
                     SELECT friend.id as id,
                            TRIM(friend.first_name || ' ' || friend.last_name) as name,
@@ -750,7 +744,7 @@ def accept_invitation(
                       AND friend.email IS NOT NULL
                 """),
                 {"trip_id": trip_id, "user_id": user_id}
-            ).fetchall()
+            )).fetchall()
 
             # No deduplication - each notification is personalized with watched_user_name
             # so if same email watches multiple users, they should get separate emails
@@ -767,8 +761,8 @@ def accept_invitation(
                 trip_data = {"title": trip.title, "location_text": trip.location_text, "eta": trip.eta}
                 start_location = trip.start_location_text if trip.has_separate_locations else None
 
-                def send_trip_start_emails():
-                    asyncio.run(send_trip_starting_now_emails(
+                async def send_trip_start_emails():
+                    await send_trip_starting_now_emails(
                         trip=trip_data,
                         contacts=contacts_for_email,
                         user_name=accepter_name,
@@ -776,13 +770,13 @@ def accept_invitation(
                         user_timezone=trip.timezone,
                         start_location=start_location,
                         owner_email=None  # Don't notify the participant themselves
-                    ))
+                    )
 
                 background_tasks.add_task(send_trip_start_emails)
                 log.info(f"[ACCEPT] Scheduled trip start emails for {len(contacts_for_email)} contacts of new participant")
 
             # Get participant's friend contacts for push notifications
-            participant_friend_contacts = connection.execute(
+            participant_friend_contacts = (await connection.execute(
                 sqlalchemy.text("""
                     SELECT friend_user_id FROM participant_trip_contacts
                     WHERE trip_id = :trip_id
@@ -790,26 +784,26 @@ def accept_invitation(
                       AND friend_user_id IS NOT NULL
                 """),
                 {"trip_id": trip_id, "user_id": user_id}
-            ).fetchall()
+            )).fetchall()
 
             friend_user_ids = [f.friend_user_id for f in participant_friend_contacts]
             if friend_user_ids:
                 trip_title_for_push = trip.title
                 user_name_for_push = accepter_name
 
-                def send_friend_trip_start_push():
+                async def send_friend_trip_start_push():
                     for friend_id in friend_user_ids:
-                        asyncio.run(send_friend_trip_starting_push(
+                        await send_friend_trip_starting_push(
                             friend_user_id=friend_id,
                             user_name=user_name_for_push,
                             trip_title=trip_title_for_push
-                        ))
+                        )
 
                 background_tasks.add_task(send_friend_trip_start_push)
                 log.info(f"[ACCEPT] Scheduled trip start push for {len(friend_user_ids)} friend contacts of new participant")
 
         # Send data refresh push to all other accepted participants
-        other_participants = connection.execute(
+        other_participants = (await connection.execute(
             sqlalchemy.text(
                 """
                 SELECT user_id FROM trip_participants
@@ -817,11 +811,11 @@ def accept_invitation(
                 """
             ),
             {"trip_id": trip_id, "user_id": user_id}
-        ).fetchall()
+        )).fetchall()
 
         for participant in other_participants:
-            def send_refresh(uid=participant.user_id):
-                asyncio.run(send_data_refresh_push(uid, "trip", trip_id))
+            async def send_refresh(uid=participant.user_id):
+                await send_data_refresh_push(uid, "trip", trip_id)
             background_tasks.add_task(send_refresh)
 
         return {"ok": True, "message": "Invitation accepted"}
@@ -1047,123 +1041,118 @@ def remove_participant(
         return {"ok": True, "message": "Participant removed"}
 
 
-@router.get("/{trip_id}/locations", response_model=list[ParticipantLocationResponse])
-def get_participant_locations(
-    trip_id: int,
-    user_id: int = Depends(auth.get_current_user_id)
-):
-    """Get location data for all participants in a group trip."""
-    with db.engine.begin() as connection:
-        trip = _get_trip_with_access(connection, trip_id, user_id)
+def _load_participant_locations(connection, trip, user_id: int) -> list[ParticipantLocationResponse]:
+    """Build participant locations for a trip the caller already has access to.
 
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found or access denied")
-
-        settings = _parse_group_settings(trip.group_settings)
-
-        # If location sharing between participants is disabled and user is not owner
-        if not settings.share_locations_between_participants and trip.user_id != user_id:
-            # Only return the user's own location
-            participant = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT p.user_id, p.last_checkin_at, p.last_lat, p.last_lon,
-                           u.first_name, u.last_name
-                    FROM trip_participants p
-                    JOIN users u ON p.user_id = u.id
-                    WHERE p.trip_id = :trip_id AND p.user_id = :user_id AND p.status = 'accepted'
-                    """
-                ),
-                {"trip_id": trip_id, "user_id": user_id}
-            ).fetchone()
-
-            if not participant:
-                return []
-
-            return [
-                ParticipantLocationResponse(
-                    user_id=participant.user_id,
-                    user_name=f"{participant.first_name} {participant.last_name}".strip() or None,
-                    last_checkin_at=_to_iso8601(participant.last_checkin_at),
-                    last_lat=participant.last_lat,
-                    last_lon=participant.last_lon
-                )
-            ]
+    Args:
+        trip: Row with at least id, user_id and group_settings
+    """
+    settings = _parse_group_settings(trip.group_settings)
 
-        # Get all accepted participants with their locations
-        # Include share_location field to respect participant privacy preferences
-        participants = connection.execute(
+    # If location sharing between participants is disabled and user is not owner
+    if not settings.share_locations_between_participants and trip.user_id != user_id:
+        # Only return the user's own location
+        participant = connection.execute(
             sqlalchemy.text(
                 """
                 SELECT p.user_id, p.last_checkin_at, p.last_lat, p.last_lon,
-                       p.share_location, u.first_name, u.last_name
+                       u.first_name, u.last_name
                 FROM trip_participants p
                 JOIN users u ON p.user_id = u.id
-                WHERE p.trip_id = :trip_id AND p.status = 'accepted'
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchall()
-
-        # Also get live locations if available (only for participants who share location)
-        live_locations = {}
-        live_rows = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT DISTINCT ON (ll.user_id) ll.user_id, ll.latitude, ll.longitude, ll.timestamp
-                FROM live_locations ll
-                JOIN trip_participants tp ON ll.trip_id = tp.trip_id AND ll.user_id = tp.user_id
-                WHERE ll.trip_id = :trip_id AND tp.share_location = true
-                ORDER BY ll.user_id, ll.timestamp DESC
+                WHERE p.trip_id = :trip_id AND p.user_id = :user_id AND p.status = 'accepted'
                 """
             ),
-            {"trip_id": trip_id}
-        ).fetchall()
+            {"trip_id": trip.id, "user_id": user_id}
+        ).fetchone()
 
-        for row in live_rows:
-            live_locations[row.user_id] = {
-                "lat": row.latitude,
-                "lon": row.longitude,
-                "timestamp": _to_iso8601(row.timestamp)
-            }
+        if not participant:
+            return []
 
-        # Build response, respecting share_location preference
-        # Users always see their own location, owner sees all, others see only those who opted in
-        is_owner = trip.user_id == user_id
-        result = []
-        for p in participants:
-            # Determine if location should be visible
-            show_location = (
-                p.user_id == user_id or  # Always show own location
-                is_owner or               # Owner sees all locations
-                p.share_location          # Participant opted in to share
+        return [
+            ParticipantLocationResponse(
+                user_id=participant.user_id,
+                user_name=f"{participant.first_name} {participant.last_name}".strip() or None,
+                last_checkin_at=_to_iso8601(participant.last_checkin_at),
+                last_lat=participant.last_lat,
+                last_lon=participant.last_lon
             )
+        ]
 
-            if show_location:
-                result.append(ParticipantLocationResponse(
-                    user_id=p.user_id,
-                    user_name=f"{p.first_name} {p.last_name}".strip() or None,
-                    last_checkin_at=_to_iso8601(p.last_checkin_at),
-                    last_lat=p.last_lat,
-                    last_lon=p.last_lon,
-                    live_lat=live_locations.get(p.user_id, {}).get("lat"),
-                    live_lon=live_locations.get(p.user_id, {}).get("lon"),
-                    live_timestamp=live_locations.get(p.user_id, {}).get("timestamp")
-                ))
-            else:
-                # Include participant but without location data
-                result.append(ParticipantLocationResponse(
-                    user_id=p.user_id,
-                    user_name=f"{p.first_name} {p.last_name}".strip() or None,
-                    last_checkin_at=None,
-                    last_lat=None,
-                    last_lon=None,
-                    live_lat=None,
-                    live_lon=None,
-                    live_timestamp=None
-                ))
+    # Get all accepted participants with their latest live location in one query.
+    # Live locations are only joined for participants who opted in to sharing.
+    participants = connection.execute(
+        sqlalchemy.text(
+            """
+            SELECT p.user_id, p.last_checkin_at, p.last_lat, p.last_lon,
+                   p.share_location, u.first_name, u.last_name,
+                   ll.latitude AS live_lat, ll.longitude AS live_lon, ll.timestamp AS live_timestamp
+            FROM trip_participants p
+            JOIN users u ON p.user_id = u.id
+            LEFT JOIN LATERAL (
+                SELECT latitude, longitude, timestamp
+                FROM live_locations
+                WHERE trip_id = p.trip_id AND user_id = p.user_id AND p.share_location = true
+                ORDER BY timestamp DESC
+                LIMIT 1
+            ) ll ON true
+            WHERE p.trip_id = :trip_id AND p.status = 'accepted'
+            """
+        ),
+        {"trip_id": trip.id}
+    ).fetchall()
+
+    # Build response, respecting share_location preference
+    # Users always see their own location, owner sees all, others see only those who opted in
+    is_owner = trip.user_id == user_id
+    result = []
+    for p in participants:
+        # Determine if location should be visible
+        show_location = (
+            p.user_id == user_id or  # Always show own location
+            is_owner or               # Owner sees all locations
+            p.share_location          # Participant opted in to share
+        )
 
-        return result
+        if show_location:
+            result.append(ParticipantLocationResponse(
+                user_id=p.user_id,
+                user_name=f"{p.first_name} {p.last_name}".strip() or None,
+                last_checkin_at=_to_iso8601(p.last_checkin_at),
+                last_lat=p.last_lat,
+                last_lon=p.last_lon,
+                live_lat=p.live_lat,
+                live_lon=p.live_lon,
+                live_timestamp=_to_iso8601(p.live_timestamp)
+            ))
+        else:
+            # Include participant but without location data
+            result.append(ParticipantLocationResponse(
+                user_id=p.user_id,
+                user_name=f"{p.first_name} {p.last_name}".strip() or None,
+                last_checkin_at=None,
+                last_lat=None,
+                last_lon=None,
+                live_lat=None,
+                live_lon=None,
+                live_timestamp=None
+            ))
+
+    return result
+
+
+@router.get("/{trip_id}/locations", response_model=list[ParticipantLocationResponse])
+def get_participant_locations(
+    trip_id: int,
+    user_id: int = Depends(auth.get_current_user_id)
+):
+    """Get location data for all participants in a group trip."""
+    with db.engine.begin() as connection:
+        trip = _get_trip_with_access(connection, trip_id, user_id)
+
+        if not trip:
+            raise HTTPException(status_code=404, detail="Trip not found or access denied")
+
+        return _load_participant_locations(connection, trip, user_id)
 
 
 @router.post("/{trip_id}/checkin", response_model=CheckinResponse)
@@ -1186,6 +1175,7 @@ def participant_checkin(
                 """
                 SELECT t.id, t.user_id, t.title, t.status, t.is_group_trip,
                        t.timezone, t.location_text, t.eta,
+                       t.checkin_interval_min, t.notify_start_hour, t.notify_end_hour,
                        a.name as activity_name
                 FROM trips t
                 JOIN activities a ON t.activity = a.id
@@ -1254,12 +1244,20 @@ def participant_checkin(
                     status = 'active',
                     last_grace_warning = NULL,
                     last_checkin_reminder = :now,
+                    next_reminder_at = :next_reminder_at,
                     notified_eta_transition = false,
                     notified_grace_transition = false
                 WHERE id = :trip_id
                 """
             ),
-            {"event_id": event_id, "trip_id": trip_id, "now": now_iso}
+            {
+                "event_id": event_id,
+                "trip_id": trip_id,
+                "now": now_iso,
+                "next_reminder_at": compute_next_reminder_at(
+                    now, trip.checkin_interval_min, trip.notify_start_hour, trip.notify_end_hour, trip.timezone
+                )
+            }
         )
 
         # Update participant's check-in location (if participant record exists)
@@ -1284,251 +1282,30 @@ def participant_checkin(
         if not checker_name:
             checker_name = "A participant"
 
-        # Fetch owner's name for watched_user_name on owner's contacts
-        owner = connection.execute(
-            sqlalchemy.text("SELECT first_name, last_name FROM users WHERE id = :user_id"),
-            {"user_id": trip.user_id}
-        ).fetchone()
-        owner_name = f"{owner.first_name} {owner.last_name}".strip() if owner else "Trip owner"
-        if not owner_name:
-            owner_name = "Trip owner"
-
-        # Get all other accepted participants for notifications (if group trip)
-        if trip.is_group_trip:
-            other_participants = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT user_id FROM trip_participants
-                    WHERE trip_id = :trip_id AND user_id != :checker_id AND status = 'accepted'
-                    """
-                ),
-                {"trip_id": trip_id, "checker_id": user_id}
-            ).fetchall()
-
-            other_participant_ids = [p.user_id for p in other_participants]
-
-            if other_participant_ids:
-                trip_title = trip.title
-                coordinates = (lat, lon) if lat is not None and lon is not None else None
-
-                def send_checkin_notifications():
-                    for pid in other_participant_ids:
-                        asyncio.run(send_participant_checkin_push(
-                            participant_user_id=pid,
-                            checker_name=checker_name,
-                            trip_title=trip_title,
-                            trip_id=trip_id,
-                            coordinates=coordinates
-                        ))
-
-                background_tasks.add_task(send_checkin_notifications)
-                log.info(f"[Participants] Scheduled check-in notifications for {len(other_participant_ids)} participants")
-
-        # Get checking-in participant's email safety contacts for this trip
-        participant_email_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT c.id, c.name, c.email
-                FROM participant_trip_contacts ptc
-                JOIN contacts c ON ptc.contact_id = c.id
-                WHERE ptc.trip_id = :trip_id
-                AND ptc.participant_user_id = :user_id
-                AND c.email IS NOT NULL
-                """
-            ),
-            {"trip_id": trip_id, "user_id": user_id}
-        ).fetchall()
-
-        # Participant's contacts watch the participant (checker)
-        contacts_for_email = [
-            {**dict(c._mapping), "watched_user_name": checker_name}
-            for c in participant_email_contacts
-        ]
-
-        # Also get trip owner's email contacts so they're notified of participant check-ins
-        owner_email_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT c.id, c.name, c.email
-                FROM contacts c
-                JOIN trips t ON (c.id = t.contact1 OR c.id = t.contact2 OR c.id = t.contact3)
-                WHERE t.id = :trip_id AND c.email IS NOT NULL
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchall()
-
-        # Owner's contacts watch the owner, not the participant
-        for oc in owner_email_contacts:
-            if oc.email:
-                contacts_for_email.append({
-                    **dict(oc._mapping),
-                    "watched_user_name": owner_name  # Owner's contacts watch the owner
-                })
-
-        # Get checking-in participant's friend contacts WITH email for email notifications
-        participant_friend_email_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT friend.id as id,
-                       TRIM(friend.first_name || ' ' || friend.last_name) as name,
-                       friend.email as email
-                FROM participant_trip_contacts ptc
-                JOIN users friend ON ptc.friend_user_id = friend.id
-                WHERE ptc.trip_id = :trip_id
-                AND ptc.participant_user_id = :user_id
-                AND ptc.friend_user_id IS NOT NULL
-                AND friend.email IS NOT NULL
-                """
-            ),
-            {"trip_id": trip_id, "user_id": user_id}
-        ).fetchall()
-
-        # Add participant's friends to email list (they watch the participant)
-        for pfc in participant_friend_email_contacts:
-            if pfc.email:
-                contacts_for_email.append({
-                    "id": -pfc.id,
-                    "name": pfc.name or "Friend",
-                    "email": pfc.email,
-                    "watched_user_name": checker_name
-                })
-
-        # Get owner's friend contacts WITH email for email notifications
-        owner_friend_email_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT friend.id as id,
-                       TRIM(friend.first_name || ' ' || friend.last_name) as name,
-                       friend.email as email
-                FROM trip_safety_contacts tsc
-                JOIN users friend ON tsc.friend_user_id = friend.id
-                WHERE tsc.trip_id = :trip_id
-                AND tsc.friend_user_id IS NOT NULL
-                AND friend.email IS NOT NULL
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchall()
-
-        # Add owner's friends to email list (they watch the owner)
-        for ofc in owner_friend_email_contacts:
-            if ofc.email:
-                contacts_for_email.append({
-                    "id": -ofc.id,
-                    "name": ofc.name or "Friend",
-                    "email": ofc.email,
-                    "watched_user_name": owner_name
-                })
-
-        # Get ALL other accepted participants and their contacts
-        # This ensures everyone watching any participant is notified
-        other_accepted_participants = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT tp.user_id,
-                       COALESCE(TRIM(u.first_name || ' ' || u.last_name), 'Participant') as participant_name
-                FROM trip_participants tp
-                JOIN users u ON tp.user_id = u.id
-                WHERE tp.trip_id = :trip_id
-                  AND tp.status = 'accepted'
-                  AND tp.role = 'participant'
-                  AND tp.user_id != :checking_in_user_id
-                """
-            ),
-            {"trip_id": trip_id, "checking_in_user_id": user_id}
-        ).fetchall()
-
-        # For each other participant, get their email and friend contacts
-        for other_participant in other_accepted_participants:
-            other_participant_name = other_participant.participant_name.strip() if other_participant.participant_name else "Participant"
-            other_participant_user_id = other_participant.user_id
-
-            # Get other participant's email contacts
-            other_participant_email_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT c.id, c.name, c.email
-                    FROM participant_trip_contacts ptc
-                    JOIN contacts c ON ptc.contact_id = c.id
-                    WHERE ptc.trip_id = :trip_id
-                      AND ptc.participant_user_id = :participant_user_id
-                      AND ptc.contact_id IS NOT NULL
-                      AND c.email IS NOT NULL
-                    """
-                ),
-                {"trip_id": trip_id, "participant_user_id": other_participant_user_id}
-            ).fetchall()
-
-            for opc in other_participant_email_contacts:
-                if opc.email:
-                    contacts_for_email.append({
-                        "id": opc.id,
-                        "name": opc.name,
-                        "email": opc.email,
-                        "watched_user_name": other_participant_name
-                    })
-
-            # Get other participant's friend contacts
-            other_participant_friend_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT friend.id as id,
-                           TRIM(friend.first_name || ' ' || friend.last_name) as name,
-                           friend.email as email
-                    FROM participant_trip_contacts ptc
-                    JOIN users friend ON ptc.friend_user_id = friend.id
-                    WHERE ptc.trip_id = :trip_id
-                      AND ptc.participant_user_id = :participant_user_id
-                      AND ptc.friend_user_id IS NOT NULL
-                      AND friend.email IS NOT NULL
-                    """
-                ),
-                {"trip_id": trip_id, "participant_user_id": other_participant_user_id}
-            ).fetchall()
-
-            for opfc in other_participant_friend_contacts:
-                if opfc.email:
-                    contacts_for_email.append({
-                        "id": -opfc.id,
-                        "name": opfc.name or "Friend",
-                        "email": opfc.email,
-                        "watched_user_name": other_participant_name
-                    })
-
+        # Everyone watching the trip, each reached once (see src/services/recipients.py)
+        plan = recipients.plan_delivery(connection, trip_id, "participant_checkin", actor_id=user_id)
+        contacts_for_email = plan.emails
+        friend_user_ids = plan.friend_pushes
         log.info(f"[Participants] Total {len(contacts_for_email)} contacts for email notifications")
 
-        # Get checking-in participant's friend safety contacts (for push notifications)
-        participant_friend_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT friend_user_id FROM participant_trip_contacts
-                WHERE trip_id = :trip_id
-                AND participant_user_id = :user_id
-                AND friend_user_id IS NOT NULL
-                """
-            ),
-            {"trip_id": trip_id, "user_id": user_id}
-        ).fetchall()
-
-        friend_user_ids = [f.friend_user_id for f in participant_friend_contacts]
+        # Notify the rest of the group (owner included)
+        if trip.is_group_trip and plan.participant_pushes:
+            other_participant_ids = plan.participant_pushes
+            trip_title = trip.title
+            coordinates = (lat, lon) if lat is not None and lon is not None else None
 
-        # Also get trip owner's friend contacts (for push notifications)
-        owner_friend_contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT friend_user_id FROM trip_safety_contacts
-                WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchall()
+            def send_checkin_notifications():
+                for pid in other_participant_ids:
+                    asyncio.run(send_participant_checkin_push(
+                        participant_user_id=pid,
+                        checker_name=checker_name,
+                        trip_title=trip_title,
+                        trip_id=trip_id,
+                        coordinates=coordinates
+                    ))
 
-        existing_friend_ids = set(friend_user_ids)
-        for ofc in owner_friend_contacts:
-            if ofc.friend_user_id not in existing_friend_ids:
-                friend_user_ids.append(ofc.friend_user_id)
-                existing_friend_ids.add(ofc.friend_user_id)
+            background_tasks.add_task(send_checkin_notifications)
+            log.info(f"[Participants] Scheduled check-in notifications for {len(other_participant_ids)} participants")
 
         # Prepare location info for notifications (geocoding moved to background)
         coordinates_str = f"{lat:.6f}, {lon:.6f}" if lat is not None and lon is not None else None
@@ -1587,23 +1364,7 @@ def participant_checkin(
 
         # Send refresh pushes to owner and other participants so they see updated check-in count
         if trip.is_group_trip:
-            refresh_user_ids = []
-
-            # Add owner if checker is not the owner
-            if not is_owner:
-                refresh_user_ids.append(trip.user_id)
-
-            # Add all other accepted participants
-            other_participants_for_refresh = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT user_id FROM trip_participants
-                    WHERE trip_id = :trip_id AND user_id != :checker_id AND status = 'accepted'
-                    """
-                ),
-                {"trip_id": trip_id, "checker_id": user_id}
-            ).fetchall()
-            refresh_user_ids.extend([p.user_id for p in other_participants_for_refresh])
+            refresh_user_ids = [uid for uid in (trip.user_id, *plan.participant_ids) if uid != user_id]
 
             if refresh_user_ids:
                 trip_id_for_refresh = trip_id
@@ -1623,8 +1384,117 @@ def participant_checkin(
         )
 
 
+# ==================== Checkout Votes ====================
+# Vote state is kept on the trip row: accepted_count and votes_cast are
+# maintained by triggers on trip_participants and checkout_votes (migration
+# l2m3n4o5p6q7). Everything needed to validate a vote is read before taking
+# the trip lock; the lock is then held only for casting the vote and
+# _TALLY_VOTES, which checks quorum and completes the trip in one statement.
+
+_ACTIVE_STATUSES = ('active', 'overdue', 'overdue_notified')
+
+_VOTE_CONTEXT = statements.register(
+    "participants.vote_context",
+    """
+    SELECT t.user_id, t.status, t.title, t.group_settings, t.accepted_count, t.votes_cast,
+           tp.status AS participant_status,
+           EXISTS (
+               SELECT 1 FROM checkout_votes cv WHERE cv.trip_id = t.id AND cv.user_id = :user_id
+           ) AS has_voted,
+           u.first_name, u.last_name,
+           ARRAY(
+               SELECT other.user_id FROM trip_participants other
+               WHERE other.trip_id = t.id AND other.status = 'accepted' AND other.user_id != :user_id
+           ) AS other_participant_ids
+    FROM trips t
+    LEFT JOIN trip_participants tp ON tp.trip_id = t.id AND tp.user_id = :user_id
+    LEFT JOIN users u ON u.id = :user_id
+    WHERE t.id = :trip_id
+    """,
+    trip_id=Integer,
+    user_id=Integer
+)
+
+# Locks the trip and records the vote only if the trip is still active once the lock is held
+_CAST_VOTE = statements.register(
+    "participants.cast_vote",
+    """
+    WITH trip AS (
+        SELECT id FROM trips
+        WHERE id = :trip_id AND status IN ('active', 'overdue', 'overdue_notified')
+        FOR UPDATE
+    )
+    INSERT INTO checkout_votes (trip_id, user_id, voted_at)
+    SELECT id, :user_id, :now FROM trip
+    ON CONFLICT (trip_id, user_id) DO NOTHING
+    """,
+    trip_id=Integer,
+    user_id=Integer,
+    now=DateTime
+)
+
+# Same rounding as _votes_needed: CEIL over a double, like math.ceil
+_TALLY_VOTES = statements.register(
+    "participants.tally_votes",
+    """
+    UPDATE trips
+    SET status = CASE
+            WHEN votes_cast >= GREATEST(1, CEIL(accepted_count * CAST(:threshold AS FLOAT8)))
+            THEN 'completed' ELSE status
+        END,
+        completed_at = CASE
+            WHEN votes_cast >= GREATEST(1, CEIL(accepted_count * CAST(:threshold AS FLOAT8)))
+            THEN :now ELSE completed_at
+        END
+    WHERE id = :trip_id AND status IN ('active', 'overdue', 'overdue_notified')
+    RETURNING status, accepted_count, votes_cast
+    """,
+    trip_id=Integer,
+    now=DateTime
+)
+
+_CLEAR_VOTES = statements.register(
+    "participants.clear_votes",
+    "DELETE FROM checkout_votes WHERE trip_id = :trip_id",
+    trip_id=Integer
+)
+
+_REMOVE_VOTE = statements.register(
+    "participants.remove_vote",
+    "DELETE FROM checkout_votes WHERE trip_id = :trip_id AND user_id = :user_id RETURNING id",
+    trip_id=Integer,
+    user_id=Integer
+)
+
+_VOTE_COUNTS = statements.register(
+    "participants.vote_counts",
+    "SELECT status, accepted_count, votes_cast FROM trips WHERE id = :trip_id",
+    trip_id=Integer
+)
+
+
+def _vote_threshold(settings: GroupSettings) -> float:
+    """Share of accepted participants whose votes complete the trip (0 means one vote)."""
+    return settings.vote_threshold if settings.checkout_mode == "vote" else 0.0
+
+
+def _votes_needed(settings: GroupSettings, accepted_count: int) -> int:
+    # Use ceiling to ensure threshold is met (e.g., 3 participants * 50% = 1.5 -> 2 votes needed)
+    return max(1, math.ceil(accepted_count * _vote_threshold(settings)))
+
+
+def _already_completed_response() -> CheckoutVoteResponse:
+    return CheckoutVoteResponse(
+        ok=True,
+        message="Trip already completed",
+        votes_cast=0,
+        votes_needed=0,
+        trip_completed=True
+    )
+
+
 @router.post("/{trip_id}/checkout/vote", response_model=CheckoutVoteResponse)
-def vote_checkout(
+async def vote_checkout(
     trip_id: int,
     background_tasks: BackgroundTasks,
     user_id: int = Depends(auth.get_current_user_id)
@@ -1635,57 +1505,31 @@ def vote_checkout(
     In 'anyone' mode, this immediately completes the trip.
     In 'owner_only' mode, only the owner can complete the trip.
 
-    Uses SELECT FOR UPDATE to prevent race conditions when multiple
-    participants vote simultaneously.
+    Votes are counted on the trip row under its lock, so when participants
+    vote simultaneously exactly one of them completes the trip. Runs on the
+    event loop (asyncpg), so votes waiting on that lock don't hold threadpool
+    threads.
     """
-    with db.engine.begin() as connection:
-        # Lock the trip row to prevent race conditions
-        # This ensures only one vote can complete the trip at a time
-        trip = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT id, user_id, status, is_group_trip, group_settings
-                FROM trips
-                WHERE id = :trip_id
-                FOR UPDATE
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchone()
+    async with db.async_engine().begin() as connection:
+        params = {"trip_id": trip_id, "user_id": user_id}
+        context = (await connection.execute(_VOTE_CONTEXT, params)).fetchone()
 
-        if not trip:
+        if not context:
             raise HTTPException(status_code=404, detail="Trip not found")
 
         # Check if user has access (owner or accepted participant)
-        is_owner = trip.user_id == user_id
-        if not is_owner:
-            participant = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT id FROM trip_participants
-                    WHERE trip_id = :trip_id AND user_id = :user_id AND status = 'accepted'
-                    """
-                ),
-                {"trip_id": trip_id, "user_id": user_id}
-            ).fetchone()
-            if not participant:
-                raise HTTPException(status_code=403, detail="Access denied")
+        is_owner = context.user_id == user_id
+        if not is_owner and context.participant_status != 'accepted':
+            raise HTTPException(status_code=403, detail="Access denied")
 
         # Handle idempotency: if trip is already completed, return success
-        if trip.status == 'completed':
-            return CheckoutVoteResponse(
-                ok=True,
-                message="Trip already completed",
-                votes_cast=0,
-                votes_needed=0,
-                trip_completed=True
-            )
+        if context.status == 'completed':
+            return _already_completed_response()
 
-        if trip.status not in ('active', 'overdue', 'overdue_notified'):
+        if context.status not in _ACTIVE_STATUSES:
             raise HTTPException(status_code=400, detail="Trip is not active")
 
-        settings = _parse_group_settings(trip.group_settings)
-        is_owner = trip.user_id == user_id
+        settings = _parse_group_settings(context.group_settings)
 
         # Check permission based on checkout mode
         if settings.checkout_mode == "owner_only" and not is_owner:
@@ -1694,117 +1538,44 @@ def vote_checkout(
                 detail="Only the trip owner can end this trip"
             )
 
-        # Count accepted participants
-        accepted_count_result = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT COUNT(*) as count FROM trip_participants
-                WHERE trip_id = :trip_id AND status = 'accepted'
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchone()
-        accepted_count = accepted_count_result.count if accepted_count_result else 1
-
-        # Calculate votes needed
-        if settings.checkout_mode == "vote":
-            # Use ceiling to ensure threshold is met (e.g., 3 participants * 50% = 1.5 -> 2 votes needed)
-            votes_needed = max(1, math.ceil(accepted_count * settings.vote_threshold))
-        else:
-            # "anyone" mode - 1 vote is enough
-            votes_needed = 1
-
-        # Check if user already voted
-        existing_vote = connection.execute(
-            sqlalchemy.text(
-                "SELECT id FROM checkout_votes WHERE trip_id = :trip_id AND user_id = :user_id"
-            ),
-            {"trip_id": trip_id, "user_id": user_id}
-        ).fetchone()
-
-        if not existing_vote:
-            # Record the vote
-            connection.execute(
-                sqlalchemy.text(
-                    """
-                    INSERT INTO checkout_votes (trip_id, user_id, voted_at)
-                    VALUES (:trip_id, :user_id, :now)
-                    """
-                ),
-                {"trip_id": trip_id, "user_id": user_id, "now": datetime.now(UTC).isoformat()}
-            )
-
-        # Count total votes (only from currently accepted participants)
-        vote_count_result = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT COUNT(*) as count FROM checkout_votes cv
-                JOIN trip_participants tp ON cv.trip_id = tp.trip_id AND cv.user_id = tp.user_id
-                WHERE cv.trip_id = :trip_id AND tp.status = 'accepted'
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchone()
-        vote_count = vote_count_result.count if vote_count_result else 0
-
-        # Check if threshold is reached
-        trip_completed = vote_count >= votes_needed
-
-        # Get voter name and trip title for notifications
-        voter = connection.execute(
-            sqlalchemy.text("SELECT first_name, last_name FROM users WHERE id = :user_id"),
-            {"user_id": user_id}
-        ).fetchone()
-        voter_name = f"{voter.first_name} {voter.last_name}".strip() if voter else "Someone"
+        now = datetime.now(UTC).replace(tzinfo=None)  # voted_at and completed_at are naive UTC
+        await connection.execute(_CAST_VOTE, {"trip_id": trip_id, "user_id": user_id, "now": now})
+        tally = (await connection.execute(
+            _TALLY_VOTES, {"trip_id": trip_id, "threshold": _vote_threshold(settings), "now": now}
+        )).fetchone()
+
+        if not tally:
+            # Completed (or ended) by someone else while this vote waited for the lock
+            counts = (await connection.execute(_VOTE_COUNTS, {"trip_id": trip_id})).fetchone()
+            if counts and counts.status == 'completed':
+                return _already_completed_response()
+            raise HTTPException(status_code=400, detail="Trip is not active")
 
-        trip_info = connection.execute(
-            sqlalchemy.text("SELECT title FROM trips WHERE id = :trip_id"),
-            {"trip_id": trip_id}
-        ).fetchone()
-        trip_title = trip_info.title if trip_info else "the trip"
+        vote_count = tally.votes_cast
+        votes_needed = _votes_needed(settings, tally.accepted_count)
+        trip_completed = tally.status == 'completed'
 
-        # Get all accepted participant IDs for notifications
-        all_participants = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT user_id FROM trip_participants
-                WHERE trip_id = :trip_id AND status = 'accepted' AND user_id != :voter_id
-                """
-            ),
-            {"trip_id": trip_id, "voter_id": user_id}
-        ).fetchall()
-        other_participant_ids = [p.user_id for p in all_participants]
+        voter_name = "Someone"
+        if context.first_name is not None:
+            voter_name = f"{context.first_name} {context.last_name}".strip()
+        trip_title = context.title or "the trip"
+        other_participant_ids = list(context.other_participant_ids)
 
         if trip_completed:
-            # Complete the trip
-            connection.execute(
-                sqlalchemy.text(
-                    """
-                    UPDATE trips
-                    SET status = 'completed', completed_at = :now
-                    WHERE id = :trip_id
-                    """
-                ),
-                {"trip_id": trip_id, "now": datetime.now(UTC).isoformat()}
-            )
-
             # Clear checkout votes
-            connection.execute(
-                sqlalchemy.text("DELETE FROM checkout_votes WHERE trip_id = :trip_id"),
-                {"trip_id": trip_id}
-            )
+            await connection.execute(_CLEAR_VOTES, {"trip_id": trip_id})
 
             # Send completion notifications to all participants
             if other_participant_ids:
-                def send_completed_pushes():
+                async def send_completed_pushes():
                     for pid in other_participant_ids:
-                        asyncio.run(send_trip_completed_by_vote_push(
+                        await send_trip_completed_by_vote_push(
                             participant_user_id=pid,
                             trip_title=trip_title,
                             trip_id=trip_id
-                        ))
+                        )
                         # Also send refresh push to update UI
-                        asyncio.run(send_data_refresh_push(pid, "trip", trip_id))
+                        await send_data_refresh_push(pid, "trip", trip_id)
 
                 background_tasks.add_task(send_completed_pushes)
 
@@ -1821,18 +1592,18 @@ def vote_checkout(
 
         # Trip not completed yet - send vote notification to other participants
         if other_participant_ids and settings.checkout_mode == "vote":
-            def send_vote_pushes():
+            async def send_vote_pushes():
                 for pid in other_participant_ids:
-                    asyncio.run(send_checkout_vote_push(
+                    await send_checkout_vote_push(
                         participant_user_id=pid,
                         voter_name=voter_name,
                         trip_title=trip_title,
                         trip_id=trip_id,
                         votes_count=vote_count,
                         votes_needed=votes_needed
-                    ))
+                    )
                     # Also send refresh push to update vote count in UI
-                    asyncio.run(send_data_refresh_push(pid, "trip", trip_id))
+                    await send_data_refresh_push(pid, "trip", trip_id)
 
             background_tasks.add_task(send_vote_pushes)
 
@@ -1858,105 +1629,47 @@ def remove_vote(
     """
     with db.engine.begin() as connection:
         # Verify trip exists and user is owner or participant
-        trip = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT t.id, t.user_id, t.status, t.title, t.group_settings, t.is_group_trip
-                FROM trips t
-                LEFT JOIN trip_participants tp ON tp.trip_id = t.id AND tp.user_id = :user_id
-                WHERE t.id = :trip_id
-                  AND (t.user_id = :user_id OR tp.user_id IS NOT NULL)
-                """
-            ),
-            {"trip_id": trip_id, "user_id": user_id}
-        ).fetchone()
+        params = {"trip_id": trip_id, "user_id": user_id}
+        context = connection.execute(_VOTE_CONTEXT, params).fetchone()
 
-        if not trip:
+        if not context or (context.user_id != user_id and context.participant_status is None):
             raise HTTPException(status_code=404, detail="Trip not found")
 
-        if trip.status not in ('active', 'overdue', 'overdue_notified'):
+        if context.status not in _ACTIVE_STATUSES:
             raise HTTPException(status_code=400, detail="Trip is not active")
 
-        # Parse group settings
-        settings = _parse_group_settings(trip.group_settings)
-
-        # Count accepted participants + owner
-        accepted_count_result = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT COUNT(*) as count FROM trip_participants
-                WHERE trip_id = :trip_id AND status = 'accepted'
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchone()
-        accepted_count = (accepted_count_result.count if accepted_count_result else 0) + 1  # +1 for owner
-
-        # Calculate votes needed based on mode
-        if settings.checkout_mode == "vote":
-            votes_needed = max(1, math.ceil(accepted_count * settings.vote_threshold))
-        else:
-            votes_needed = 1
-
-        # Check if user has a vote to remove
-        existing_vote = connection.execute(
-            sqlalchemy.text(
-                "SELECT id FROM checkout_votes WHERE trip_id = :trip_id AND user_id = :user_id"
-            ),
-            {"trip_id": trip_id, "user_id": user_id}
-        ).fetchone()
+        settings = _parse_group_settings(context.group_settings)
 
-        if not existing_vote:
+        if not context.has_voted:
             # No vote to remove - return current vote count
-            vote_count = connection.execute(
-                sqlalchemy.text("SELECT COUNT(*) FROM checkout_votes WHERE trip_id = :trip_id"),
-                {"trip_id": trip_id}
-            ).scalar() or 0
-
             return CheckoutVoteResponse(
                 ok=True,
                 message="No vote to remove",
-                votes_cast=vote_count,
-                votes_needed=votes_needed,
+                votes_cast=context.votes_cast,
+                votes_needed=_votes_needed(settings, context.accepted_count),
                 trip_completed=False,
                 user_has_voted=False
             )
 
-        # Remove the vote
-        connection.execute(
-            sqlalchemy.text("DELETE FROM checkout_votes WHERE trip_id = :trip_id AND user_id = :user_id"),
-            {"trip_id": trip_id, "user_id": user_id}
-        )
-
-        # Get updated vote count
-        vote_count = connection.execute(
-            sqlalchemy.text("SELECT COUNT(*) FROM checkout_votes WHERE trip_id = :trip_id"),
-            {"trip_id": trip_id}
-        ).scalar() or 0
+        # Remove the vote (the trigger decrements votes_cast), then read the updated counts
+        connection.execute(_REMOVE_VOTE, {"trip_id": trip_id, "user_id": user_id})
+        counts = connection.execute(_VOTE_COUNTS, {"trip_id": trip_id}).fetchone()
+        vote_count = counts.votes_cast
+        votes_needed = _votes_needed(settings, counts.accepted_count)
 
         log.info(f"[Participants] User {user_id} removed vote from trip {trip_id} ({vote_count}/{votes_needed})")
 
-        # Send refresh push to other participants
-        other_participant_ids = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT user_id FROM trip_participants
-                WHERE trip_id = :trip_id AND user_id != :user_id AND status = 'accepted'
-                """
-            ),
-            {"trip_id": trip_id, "user_id": user_id}
-        ).fetchall()
-
-        # Also include owner if not the current user
-        if trip.user_id != user_id:
-            other_participant_ids = list(other_participant_ids) + [type('obj', (object,), {'user_id': trip.user_id})]
+        # Send refresh push to other participants, including the owner if not the current user
+        other_participant_ids = list(context.other_participant_ids)
+        if context.user_id != user_id and context.user_id not in other_participant_ids:
+            other_participant_ids.append(context.user_id)
 
         if other_participant_ids:
             trip_id_for_refresh = trip_id
 
             def send_refresh_pushes():
-                for p in other_participant_ids:
-                    asyncio.run(send_data_refresh_push(p.user_id, "trip", trip_id_for_refresh))
+                for uid in other_participant_ids:
+                    asyncio.run(send_data_refresh_push(uid, "trip", trip_id_for_refresh))
 
             background_tasks.add_task(send_refresh_pushes)
 
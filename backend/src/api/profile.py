@@ -4,20 +4,12 @@ from datetime import datetime, UTC
 
 import sqlalchemy
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from src import database as db
 from src.api import auth
-
-
-def _safe_float(value) -> float | None:
-    """Safely convert a value to float, returning None if conversion fails."""
-    if value is None:
-        return None
-    try:
-        return float(value)
-    except (ValueError, TypeError):
-        return None
+from src.services import account_data
 
 
 router = APIRouter(
@@ -234,231 +226,96 @@ def export_user_data(user_id: int = Depends(auth.get_current_user_id)):
 
         # Get all trips
         trips = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT t.*, a.name as activity_name, a.icon as activity_icon
-                FROM trips t
-                LEFT JOIN activities a ON t.activity = a.id
-                WHERE t.user_id = :user_id
-                ORDER BY t.created_at DESC
-                """
-            ),
+            sqlalchemy.text(account_data.EXPORT_TRIPS_QUERY),
             {"user_id": user_id}
         ).fetchall()
 
         # Get all contacts
         contacts = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT id, name, email
-                FROM contacts
-                WHERE user_id = :user_id
-                ORDER BY id DESC
-                """
-            ),
+            sqlalchemy.text(account_data.EXPORT_CONTACTS_QUERY),
             {"user_id": user_id}
         ).fetchall()
 
         # Format response
         return {
             "exported_at": datetime.now(UTC).isoformat(),
-            "profile": {
-                "id": user.id,
-                "email": user.email,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "age": user.age,
-                "created_at": str(user.created_at) if user.created_at else None
-            },
-            "trips": [
-                {
-                    "id": t.id,
-                    "title": t.title,
-                    "activity": t.activity_name,
-                    "activity_icon": t.activity_icon,
-                    "start_at": str(t.start) if t.start else None,
-                    "eta_at": str(t.eta) if t.eta else None,
-                    "grace_minutes": t.grace_min,
-                    "location_text": t.location_text,
-                    "location_lat": _safe_float(t.gen_lat),
-                    "location_lng": _safe_float(t.gen_lon),
-                    "notes": t.notes,
-                    "status": t.status,
-                    "completed_at": str(t.completed_at) if hasattr(t, 'completed_at') and t.completed_at else None,
-                    "created_at": str(t.created_at) if hasattr(t, 'created_at') and t.created_at else None
-                }
-                for t in trips
-            ],
-            "contacts": [
-                {
-                    "id": c.id,
-                    "name": c.name,
-                    "email": c.email
-                }
-                for c in contacts
-            ],
+            "profile": account_data.format_export_profile(user),
+            "trips": [account_data.format_export_trip(t) for t in trips],
+            "contacts": [account_data.format_export_contact(c) for c in contacts],
             "total_trips": len(trips),
             "total_contacts": len(contacts)
         }
 
 
-@router.delete("/account")
-def delete_account(user_id: int = Depends(auth.get_current_user_id)):
-    """Delete current user's account and all associated data.
+@router.get("/export/stream")
+def export_user_data_stream(user_id: int = Depends(auth.get_current_user_id)):
+    """Stream all user data as NDJSON (one JSON record per line).
 
-    Deletes all user data in order to satisfy foreign key constraints.
-    This ensures complete removal for GDPR compliance.
+    Same data as /export, but read through a server-side cursor and sent in
+    chunks, so large histories don't have to be built in memory first.
     """
-    with db.engine.begin() as connection:
-        # Get user's trip IDs for cascade deletion
-        user_trips = connection.execute(
-            sqlalchemy.text("SELECT id FROM trips WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        ).fetchall()
-        trip_ids = [t.id for t in user_trips]
-
-        # Get user's contact IDs for cascade deletion
-        user_contacts = connection.execute(
-            sqlalchemy.text("SELECT id FROM contacts WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        ).fetchall()
-        contact_ids = [c.id for c in user_contacts]
-
-        # Get user's contact group IDs
-        user_groups = connection.execute(
-            sqlalchemy.text("SELECT id FROM contact_groups WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        ).fetchall()
-        group_ids = [g.id for g in user_groups]
-
-        # 1. Delete participant-related data (deepest level)
-        if trip_ids:
-            connection.execute(
-                sqlalchemy.text(
-                    """
-                    DELETE FROM participant_trip_contacts
-                    WHERE trip_id = ANY(:trip_ids)
-                    """
-                ),
-                {"trip_ids": trip_ids}
-            )
-            connection.execute(
-                sqlalchemy.text("DELETE FROM trip_participants WHERE trip_id = ANY(:trip_ids)"),
-                {"trip_ids": trip_ids}
-            )
-            connection.execute(
-                sqlalchemy.text("DELETE FROM trip_safety_contacts WHERE trip_id = ANY(:trip_ids)"),
-                {"trip_ids": trip_ids}
-            )
+    from src.services.subscription_check import get_limits
+    limits = get_limits(user_id)
+    if not limits.export:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Data export requires Homebound+"
+        )
 
-        # 2. Delete trip participants where user is a participant (not owner)
-        connection.execute(
+    with db.engine.connect() as connection:
+        user = connection.execute(
             sqlalchemy.text(
                 """
-                DELETE FROM participant_trip_contacts
-                WHERE participant_user_id = :user_id
+                SELECT id, email, first_name, last_name, age, created_at
+                FROM users
+                WHERE id = :user_id
                 """
             ),
             {"user_id": user_id}
-        )
-        connection.execute(
-            sqlalchemy.text("DELETE FROM trip_participants WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        )
-
-        # 3. Delete events (they reference trips via trip_id)
-        connection.execute(
-            sqlalchemy.text("DELETE FROM events WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        )
-
-        # 4. Delete live activity tokens and live locations
-        if trip_ids:
-            connection.execute(
-                sqlalchemy.text("DELETE FROM live_activity_tokens WHERE trip_id = ANY(:trip_ids)"),
-                {"trip_ids": trip_ids}
-            )
-            connection.execute(
-                sqlalchemy.text("DELETE FROM live_locations WHERE trip_id = ANY(:trip_ids)"),
-                {"trip_ids": trip_ids}
-            )
-
-        # 5. Delete trips (they reference contacts via FKs)
-        connection.execute(
-            sqlalchemy.text("DELETE FROM trips WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        )
+        ).fetchone()
 
-        # 6. Delete contact group members and groups
-        if group_ids:
-            connection.execute(
-                sqlalchemy.text("DELETE FROM contact_group_members WHERE group_id = ANY(:group_ids)"),
-                {"group_ids": group_ids}
-            )
-        connection.execute(
-            sqlalchemy.text("DELETE FROM contact_groups WHERE user_id = :user_id"),
-            {"user_id": user_id}
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
         )
 
-        # 7. Delete saved contacts (now safe since trips are deleted)
-        connection.execute(
-            sqlalchemy.text("DELETE FROM contacts WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        )
+    return StreamingResponse(
+        account_data.iter_user_export_ndjson(user_id, user=user),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="homebound-export.ndjson"'}
+    )
 
-        # 8. Delete friendships (both directions)
-        connection.execute(
-            sqlalchemy.text(
-                """
-                DELETE FROM friendships
-                WHERE user_id_1 = :user_id OR user_id_2 = :user_id
-                """
-            ),
-            {"user_id": user_id}
-        )
 
-        # 9. Delete friend invites
-        connection.execute(
-            sqlalchemy.text(
-                """
-                DELETE FROM friend_invites
-                WHERE inviter_id = :user_id OR accepted_by = :user_id
-                """
-            ),
-            {"user_id": user_id}
-        )
+@router.delete("/account")
+def delete_account(background: bool = False, user_id: int = Depends(auth.get_current_user_id)):
+    """Delete current user's account and all associated data.
 
-        # 10. Delete subscriptions
-        connection.execute(
-            sqlalchemy.text("DELETE FROM subscriptions WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        )
+    Deletes all user data in order to satisfy foreign key constraints.
+    This ensures complete removal for GDPR compliance.
 
-        # 11. Delete pinned activities
-        connection.execute(
-            sqlalchemy.text("DELETE FROM pinned_activities WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        )
+    Rows are deleted in bounded batches, each in its own short transaction.
+    With `background=true` the deletion is queued and run by the scheduler;
+    poll GET /account/deletion for progress.
+    """
+    if background:
+        job = account_data.create_deletion_job(user_id)
+        return {"ok": True, "message": "Account deletion scheduled", **job}
 
-        # 12. Delete devices
-        connection.execute(
-            sqlalchemy.text("DELETE FROM devices WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        )
+    account_data.delete_user_data(user_id)
+    return {"ok": True, "message": "Account deleted successfully"}
 
-        # 13. Delete login tokens
-        connection.execute(
-            sqlalchemy.text("DELETE FROM login_tokens WHERE user_id = :user_id"),
-            {"user_id": user_id}
-        )
 
-        # 14. Finally delete the user
-        connection.execute(
-            sqlalchemy.text("DELETE FROM users WHERE id = :user_id"),
-            {"user_id": user_id}
+@router.get("/account/deletion")
+def get_account_deletion_status(user_id: int = Depends(auth.get_current_user_id)):
+    """Get progress of the current user's most recent background account deletion."""
+    job = account_data.get_latest_deletion_job(user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No account deletion found"
         )
-
-        return {"ok": True, "message": "Account deleted successfully"}
+    return job
 
 
 # ==================== Friend Visibility Settings ====================
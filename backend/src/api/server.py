@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -9,11 +10,12 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 
 from src import config
-from src.api import activities, auth_endpoints, checkin, contacts, devices, friends, invite_page, live_activity_tokens, participants, profile, stats, subscriptions, trips
-from src.services.scheduler import start_scheduler, stop_scheduler
-from src.services.app_store import app_store_service
+from src.api.http_cache import ConditionalGetMiddleware
+from src.api.lazy_routers import LazyRouterMiddleware, RouterRegistry, RouterSpec
+from src.services.query_metrics import QueryMetricsMiddleware
 
 # Configure logging based on environment
 settings = config.get_settings()
@@ -28,9 +30,22 @@ limiter = Limiter(key_func=get_remote_address)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle - start and stop background services."""
+    # Imported here so processes that don't run the lifespan (or the scheduler) skip
+    # APScheduler and the App Store client on cold start
+    from src.services.app_store import app_store_service
+    from src.services.notifications import refresh_coalescer
+    from src.services.scheduler import keep_apple_key_material_warm, start_scheduler, stop_scheduler
+
     # Startup
-    log.info("Starting background scheduler...")
-    start_scheduler()
+    refresh_coalescer.start()
+    key_refresh = None
+    if settings.RUN_SCHEDULER_IN_WEB:
+        log.info("Starting background scheduler...")
+        start_scheduler()
+    else:
+        log.info("Background scheduler runs in a separate worker (RUN_SCHEDULER_IN_WEB=false)")
+        # The worker's refresh job warms only its own caches; webhooks and sign-ins are served here
+        key_refresh = asyncio.create_task(keep_apple_key_material_warm())
 
     # SECURITY WARNING: Check Apple App Store Server API configuration
     if not app_store_service.is_configured:
@@ -51,8 +66,15 @@ async def lifespan(app: FastAPI):
 
     yield
     # Shutdown
-    log.info("Stopping background scheduler...")
-    stop_scheduler()
+    if settings.RUN_SCHEDULER_IN_WEB:
+        log.info("Stopping background scheduler...")
+        stop_scheduler()
+    if key_refresh is not None:
+        key_refresh.cancel()
+    await refresh_coalescer.stop()
+
+    from src import database as db
+    await db.dispose_async_engine()
 
 
 description = """
@@ -116,7 +138,21 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["Authorization", "X-Auth-Token", "Content-Type", "Accept"],
+    allow_headers=["Authorization", "X-Auth-Token", "Content-Type", "Accept", "If-None-Match"],
+    expose_headers=["Server-Timing", "ETag"],
+)
+
+# ETag on JSON GET responses, 304 Not Modified for a matching If-None-Match
+app.add_middleware(ConditionalGetMiddleware)
+
+# Per-request SQL query count/timing: Server-Timing header, logs and /metrics
+app.add_middleware(QueryMetricsMiddleware)
+
+# Compress larger responses (outermost, so ETags above are computed on the uncompressed body)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL,
 )
 
 # Mount static files for Open Graph images and AASA file
@@ -128,21 +164,31 @@ if static_dir.exists():
     if well_known_dir.exists():
         app.mount("/.well-known", StaticFiles(directory=well_known_dir), name="well-known")
 
-# Include routers
-app.include_router(auth_endpoints.router)
-app.include_router(trips.router)
-app.include_router(participants.router)
-app.include_router(activities.router)
-app.include_router(contacts.router)
-app.include_router(friends.router)
-app.include_router(devices.router)
-app.include_router(live_activity_tokens.router)
-app.include_router(checkin.router)
-app.include_router(profile.router)
-app.include_router(stats.router)
-app.include_router(subscriptions.router)
-app.include_router(subscriptions.webhook_router)  # Apple webhook (no auth)
-app.include_router(invite_page.router)
+# Routers in include order, by the path prefix they serve (see src/api/lazy_routers.py)
+ROUTERS = (
+    RouterSpec("/api/v1/auth", "src.api.auth_endpoints"),
+    RouterSpec("/api/v1/trips", "src.api.trips"),
+    RouterSpec("/api/v1/trips", "src.api.participants"),
+    RouterSpec("/api/v1/activities", "src.api.activities"),
+    RouterSpec("/api/v1/contacts", "src.api.contacts"),
+    RouterSpec("/api/v1/friends", "src.api.friends"),
+    RouterSpec("/api/v1/devices", "src.api.devices"),
+    RouterSpec("/api/v1/live-activity-tokens", "src.api.live_activity_tokens"),
+    RouterSpec("/t", "src.api.checkin"),
+    RouterSpec("/api/v1/profile", "src.api.profile"),
+    RouterSpec("/api/v1/stats", "src.api.stats"),
+    # Includes the Apple webhook (no auth)
+    RouterSpec("/api/v1/subscriptions", "src.api.subscriptions", ("router", "webhook_router")),
+    RouterSpec("/f", "src.api.invite_page"),
+    RouterSpec("/metrics", "src.api.metrics"),
+)
+
+routers = RouterRegistry(app, ROUTERS)
+if settings.LAZY_ROUTERS:
+    # Serverless cold starts: import each router when its first request arrives
+    app.add_middleware(LazyRouterMiddleware, registry=routers)
+else:
+    routers.load_all()
 
 
 @app.get("/")
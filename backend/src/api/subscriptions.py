@@ -5,12 +5,11 @@ and Apple App Store Server Notifications webhook.
 """
 
 import base64
+import hashlib
 import json
 import logging
-import random
 from datetime import datetime, timedelta, UTC
 
-import httpx
 import sqlalchemy
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes
@@ -23,6 +22,10 @@ from src import database as db
 from src.api import auth
 from src.services.subscription_check import get_limits_dict, get_user_tier
 from src.services.app_store import app_store_service
+from src.services.lazy_imports import lazy_import
+
+# Only needed to download Apple's root certificates
+httpx = lazy_import("httpx")
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +35,7 @@ VALID_PRODUCT_IDS = {
     "com.homeboundapp.homebound.plus.yearly",
 }
 
-# Webhook deduplication TTL (7 days)
+# Webhook deduplication TTL (7 days); expired rows are removed by the retention job
 WEBHOOK_DEDUP_TTL_DAYS = 7
 
 # Pending webhook TTL (1 hour - if verify-purchase doesn't arrive, webhook is stale)
@@ -450,19 +453,6 @@ async def verify_purchase(body: VerifyPurchaseRequest, user_id: int = Depends(au
             )
             # Process the pending webhook in a separate call after this transaction commits
 
-        # Clean up expired pending webhooks periodically (1% chance)
-        if random.random() < 0.01:
-            conn.execute(
-                sqlalchemy.text(
-                    """
-                    DELETE FROM pending_webhooks
-                    WHERE expires_at < :now
-                    """
-                ),
-                {"now": datetime.now(UTC)}
-            )
-            logger.info("Cleaned up expired pending webhooks")
-
         return VerifyPurchaseResponse(
             ok=True,
             tier=new_tier,
@@ -746,11 +736,22 @@ APPLE_ROOT_CA_G2_URL = "https://www.apple.com/certificateauthority/AppleRootCA-G
 # Cache for Apple root certificates
 _apple_root_certs: list[x509.Certificate] | None = None
 
+# Parsed x5c signing certificates keyed by SHA-256 fingerprint of the DER bytes.
+# Apple signs every notification with the same few leaf certificates, so this
+# stays tiny; the size cap only guards against a flood of unknown certs.
+_x5c_cert_cache: dict[bytes, x509.Certificate] = {}
+X5C_CERT_CACHE_MAX_ENTRIES = 32
+
+
+async def get_apple_root_certificates(force_refresh: bool = False) -> list[x509.Certificate]:
+    """Fetch and cache Apple's root CA certificates.
 
-async def get_apple_root_certificates() -> list[x509.Certificate]:
-    """Fetch and cache Apple's root CA certificates."""
+    Args:
+        force_refresh: Re-download even if certificates are cached. The
+            scheduler uses this to refresh the cache off the request path.
+    """
     global _apple_root_certs
-    if _apple_root_certs is not None:
+    if _apple_root_certs is not None and not force_refresh:
         return _apple_root_certs
 
     certs = []
@@ -765,8 +766,31 @@ async def get_apple_root_certificates() -> list[x509.Certificate]:
             except Exception as e:
                 logger.warning(f"Failed to load Apple root cert from {url}: {e}")
 
-    _apple_root_certs = certs
-    return certs
+    # Don't let a failed refresh wipe out certificates we already have
+    if certs or _apple_root_certs is None:
+        _apple_root_certs = certs
+    return _apple_root_certs
+
+
+def _load_x5c_certificate(cert_b64: str) -> x509.Certificate:
+    """Parse a base64 DER certificate from an x5c header, reusing cached parses."""
+    cert_der = base64.b64decode(cert_b64)
+    fingerprint = hashlib.sha256(cert_der).digest()
+
+    cert = _x5c_cert_cache.get(fingerprint)
+    if cert is None:
+        cert = x509.load_der_x509_certificate(cert_der)
+        if len(_x5c_cert_cache) >= X5C_CERT_CACHE_MAX_ENTRIES:
+            _x5c_cert_cache.clear()
+        _x5c_cert_cache[fingerprint] = cert
+    return cert
+
+
+def clear_apple_certificate_cache():
+    """Clear cached root and x5c certificates. Useful for testing."""
+    global _apple_root_certs
+    _apple_root_certs = None
+    _x5c_cert_cache.clear()
 
 
 def decode_jws_payload(signed_payload: str, verify: bool = True) -> dict:
@@ -800,8 +824,7 @@ def decode_jws_payload(signed_payload: str, verify: bool = True) -> dict:
             raise ValueError("No certificate chain in JWS header")
 
         # Load the signing certificate (first in chain)
-        cert_der = base64.b64decode(x5c[0])
-        signing_cert = x509.load_der_x509_certificate(cert_der)
+        signing_cert = _load_x5c_certificate(x5c[0])
 
         # Verify signature
         raw_signature = base64.urlsafe_b64decode(signature_b64 + "==")
@@ -1164,19 +1187,6 @@ async def apple_webhook(request: Request):
                     {"uuid": notification_uuid, "type": notification_type, "expires_at": expires_at}
                 )
 
-                # Clean up expired entries periodically (1% chance per request)
-                if random.random() < 0.01:
-                    connection.execute(
-                        sqlalchemy.text(
-                            """
-                            DELETE FROM processed_webhooks
-                            WHERE expires_at < :now
-                            """
-                        ),
-                        {"now": datetime.now(UTC)}
-                    )
-                    logger.info("Cleaned up expired webhook deduplication entries")
-
         # Process the notification
         result = handle_notification(notification_type, subtype, data)
 
@@ -1,27 +1,45 @@
 """Trip management endpoints"""
 import asyncio
+import hashlib
 import json
 import logging
 import secrets
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from typing import Optional
 
 import sqlalchemy
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import Float, Integer
 
 from src import database as db
 from src.api import auth
 from src.api.activities import Activity
-from src.services.geocoding import reverse_geocode_sync
+from src.api.fast_json import PrerenderedJSONRoute, prerendered_json
+from src.api.participants import (
+    ParticipantListResponse,
+    ParticipantLocationResponse,
+    _load_participant_list,
+    _load_participant_locations,
+)
+from src.services import friendships, live_tracks, recipients, statements
+from src.services.geocoding import reverse_geocode_precise
+from src.services.reminders import (
+    compute_next_reminder_at,
+    reschedule_participant_reminders,
+    reschedule_trip_reminder,
+)
 from src.services.notifications import (
+    send_background_push_to_user,
     send_data_refresh_push,
     send_friend_trip_completed_push,
     send_friend_trip_created_push,
     send_friend_trip_extended_push,
     send_friend_trip_starting_push,
+    send_push_to_user,
     send_trip_cancelled_push,
     send_trip_completed_emails,
+    send_trip_completed_push,
     send_trip_created_emails,
     send_trip_extended_emails,
     send_trip_starting_now_emails,
@@ -30,19 +48,116 @@ from src.services.notifications import (
 log = logging.getLogger(__name__)
 
 
-def _is_friend(connection, user_id: int, friend_user_id: int) -> bool:
-    """Check if two users are friends."""
-    id1, id2 = min(user_id, friend_user_id), max(user_id, friend_user_id)
-    result = connection.execute(
-        sqlalchemy.text(
-            """
-            SELECT id FROM friendships
-            WHERE user_id_1 = :id1 AND user_id_2 = :id2
-            """
-        ),
-        {"id1": id1, "id2": id2}
-    ).fetchone()
-    return result is not None
+# ==================== Hot-path statements ====================
+# Built once at import (see src/services/statements.py)
+
+_TRIP_FRIEND_CONTACTS = statements.register(
+    "trips.trip_friend_contacts",
+    """
+    SELECT friend_user_id, position
+    FROM trip_safety_contacts
+    WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
+    ORDER BY position
+    """,
+    trip_id=Integer
+)
+
+_ACTIVE_TRIP = statements.register(
+    "trips.active_trip",
+    """
+    SELECT t.id, t.user_id, t.title, t.start, t.eta, t.grace_min,
+           t.location_text, t.gen_lat, t.gen_lon,
+           t.start_location_text, t.start_lat, t.start_lon, t.has_separate_locations,
+           t.notes, t.status, t.completed_at,
+           t.last_checkin, t.created_at, t.contact1, t.contact2, t.contact3,
+           t.checkin_token, t.checkout_token,
+           t.checkin_interval_min, t.notify_start_hour, t.notify_end_hour,
+           t.timezone, t.start_timezone, t.eta_timezone, t.notify_self, t.share_live_location,
+           t.is_group_trip, t.group_settings,
+           t.custom_start_message, t.custom_overdue_message,
+           a.id as activity_id, a.name as activity_name, a.icon as activity_icon,
+           a.default_grace_minutes, a.colors as activity_colors,
+           a.messages as activity_messages, a.safety_tips, a."order" as activity_order,
+           (SELECT COUNT(*) FROM trip_participants WHERE trip_id = t.id AND status = 'accepted') as participant_count
+    FROM trips t
+    JOIN activities a ON t.activity = a.id
+    LEFT JOIN trip_participants tp ON t.id = tp.trip_id AND tp.user_id = :user_id AND tp.status = 'accepted'
+    WHERE (t.user_id = :user_id OR tp.user_id IS NOT NULL)
+      AND t.status IN ('active', 'overdue', 'overdue_notified')
+    ORDER BY t.created_at DESC
+    LIMIT 1
+    """,
+    user_id=Integer
+)
+
+_LIVE_LOCATION_TRIP = statements.register(
+    "trips.live_location_trip",
+    """
+    SELECT id, user_id, share_live_location, status, is_group_trip
+    FROM trips
+    WHERE id = :trip_id
+    """,
+    trip_id=Integer
+)
+
+_LIVE_LOCATION_PARTICIPANT = statements.register(
+    "trips.live_location_participant",
+    """
+    SELECT id FROM trip_participants
+    WHERE trip_id = :trip_id AND user_id = :user_id AND status = 'accepted'
+    """,
+    trip_id=Integer,
+    user_id=Integer
+)
+
+_LAST_LIVE_LOCATION = statements.register(
+    "trips.last_live_location",
+    """
+    SELECT timestamp FROM live_locations
+    WHERE trip_id = :trip_id AND user_id = :user_id
+    ORDER BY timestamp DESC
+    LIMIT 1
+    """,
+    trip_id=Integer,
+    user_id=Integer
+)
+
+_INSERT_LIVE_LOCATION = statements.register(
+    "trips.insert_live_location",
+    """
+    INSERT INTO live_locations
+    (trip_id, user_id, latitude, longitude, altitude, horizontal_accuracy, speed, timestamp)
+    VALUES (:trip_id, :user_id, :lat, :lon, :alt, :acc, :speed, :ts)
+    """,
+    trip_id=Integer,
+    user_id=Integer,
+    lat=Float,
+    lon=Float,
+    alt=Float,
+    acc=Float,
+    speed=Float
+)
+
+_INSERT_LIVE_LOCATION_BATCH = statements.register(
+    "trips.insert_live_location_batch",
+    """
+    WITH inserted AS (
+        INSERT INTO live_locations
+        (trip_id, user_id, latitude, longitude, altitude, horizontal_accuracy, speed, timestamp)
+        SELECT :trip_id, :user_id, f.lat, f.lon, f.alt, f.acc, f.speed, f.ts
+        FROM unnest(
+            CAST(:lats AS double precision[]), CAST(:lons AS double precision[]),
+            CAST(:alts AS double precision[]), CAST(:accs AS double precision[]),
+            CAST(:speeds AS double precision[]), CAST(:timestamps AS timestamp[])
+        ) AS f(lat, lon, alt, acc, speed, ts)
+        ON CONFLICT (trip_id, user_id, timestamp) DO NOTHING
+        RETURNING 1
+    )
+    SELECT COUNT(*) FROM inserted
+    """,
+    trip_id=Integer,
+    user_id=Integer
+)
 
 
 def _save_trip_safety_contacts(
@@ -100,14 +215,7 @@ def _get_friend_contacts_for_trip(connection, trip_id: int) -> dict[str, int | N
     Returns a dict with friend_contact1, friend_contact2, friend_contact3.
     """
     result = connection.execute(
-        sqlalchemy.text(
-            """
-            SELECT friend_user_id, position
-            FROM trip_safety_contacts
-            WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-            ORDER BY position
-            """
-        ),
+        _TRIP_FRIEND_CONTACTS,
         {"trip_id": trip_id}
     ).fetchall()
 
@@ -282,7 +390,8 @@ def _get_all_trip_email_contacts(connection, trip) -> list[dict]:
 router = APIRouter(
     prefix="/api/v1/trips",
     tags=["trips"],
-    dependencies=[Depends(auth.get_current_user_id)]
+    dependencies=[Depends(auth.get_current_user_id)],
+    route_class=PrerenderedJSONRoute
 )
 
 
@@ -515,13 +624,107 @@ class TimelineEvent(BaseModel):
     user_name: str | None = None
 
 
+def _trip_response(trip, friend_contacts: dict[str, int | None]) -> TripResponse:
+    """Build a TripResponse from a trip row joined with its activity columns.
+
+    Args:
+        trip: Mapping from the trip/activity SELECT used by the read endpoints
+        friend_contacts: friend_contact1/2/3 from the trip_safety_contacts junction table
+    """
+    activity = Activity(
+        id=trip["activity_id"],
+        name=trip["activity_name"],
+        icon=trip["activity_icon"],
+        default_grace_minutes=trip["default_grace_minutes"],
+        colors=parse_json_field(trip["activity_colors"], dict),
+        messages=parse_json_field(trip["activity_messages"], dict),
+        safety_tips=parse_json_field(trip["safety_tips"], list),
+        order=trip["activity_order"]
+    )
+
+    return TripResponse(
+        id=trip["id"],
+        user_id=trip["user_id"],
+        title=trip["title"],
+        activity=activity,
+        start=to_iso8601_required(trip["start"]),
+        eta=to_iso8601_required(trip["eta"]),
+        grace_min=trip["grace_min"],
+        location_text=trip["location_text"],
+        gen_lat=trip["gen_lat"],
+        gen_lon=trip["gen_lon"],
+        start_location_text=trip["start_location_text"],
+        start_lat=trip["start_lat"],
+        start_lon=trip["start_lon"],
+        has_separate_locations=trip["has_separate_locations"],
+        notes=trip["notes"],
+        status=trip["status"],
+        completed_at=to_iso8601(trip["completed_at"]),
+        last_checkin=to_iso8601(trip["last_checkin"]),
+        created_at=to_iso8601_required(trip["created_at"]),
+        contact1=trip["contact1"],
+        contact2=trip["contact2"],
+        contact3=trip["contact3"],
+        friend_contact1=friend_contacts["friend_contact1"],
+        friend_contact2=friend_contacts["friend_contact2"],
+        friend_contact3=friend_contacts["friend_contact3"],
+        checkin_token=trip["checkin_token"],
+        checkout_token=trip["checkout_token"],
+        checkin_interval_min=trip["checkin_interval_min"],
+        notify_start_hour=trip["notify_start_hour"],
+        notify_end_hour=trip["notify_end_hour"],
+        timezone=trip["timezone"],
+        start_timezone=trip["start_timezone"],
+        eta_timezone=trip["eta_timezone"],
+        notify_self=trip["notify_self"],
+        share_live_location=trip.get("share_live_location", False),
+        custom_start_message=trip.get("custom_start_message"),
+        custom_overdue_message=trip.get("custom_overdue_message"),
+        is_group_trip=trip.get("is_group_trip", False),
+        group_settings=parse_group_settings(trip.get("group_settings")),
+        participant_count=trip.get("participant_count", 0)
+    )
+
+
+def _check_trip_allowed(user_id: int, body: TripCreate) -> None:
+    """Check the trip against the user's subscription limits (raises HTTPException)."""
+    from src.services.subscription_check import (
+        check_contact_limit,
+        check_custom_intervals_allowed,
+        check_custom_messages_allowed,
+        check_group_trips_allowed
+    )
+
+    # Count total contacts and check against subscription limit
+    contact_count = sum(1 for c in [
+        body.contact1, body.contact2, body.contact3,
+        body.friend_contact1, body.friend_contact2, body.friend_contact3
+    ] if c is not None)
+    check_contact_limit(user_id, contact_count)
+
+    # Check if user can set custom check-in intervals (premium feature)
+    check_custom_intervals_allowed(user_id, body.checkin_interval_min)
+
+    # Check if user can set custom messages (premium feature)
+    if body.custom_start_message or body.custom_overdue_message:
+        check_custom_messages_allowed(user_id)
+
+    # Check if user can create group trips (premium feature)
+    if body.is_group_trip:
+        check_group_trips_allowed(user_id)
+
+
 @router.post("/", response_model=TripResponse, status_code=status.HTTP_201_CREATED)
-def create_trip(
+async def create_trip(
     body: TripCreate,
     background_tasks: BackgroundTasks,
     user_id: int = Depends(auth.get_current_user_id)
 ):
-    """Create a new trip"""
+    """Create a new trip
+
+    Runs on the event loop (asyncpg). The subscription limit checks still use
+    the sync engine, so they run on a worker thread.
+    """
     # Log incoming request for debugging
     log.info(f"[Trips] Creating trip for user_id={user_id}")
     log.info(f"[Trips] title={body.title}, activity={body.activity}")
@@ -542,39 +745,57 @@ def create_trip(
             detail="At least one emergency contact (contact1 or friend_contact1) is required"
         )
 
-    # Count total contacts and check against subscription limit
-    contact_count = sum(1 for c in [
-        body.contact1, body.contact2, body.contact3,
-        body.friend_contact1, body.friend_contact2, body.friend_contact3
-    ] if c is not None)
-
-    from src.services.subscription_check import (
-        check_contact_limit,
-        check_custom_intervals_allowed,
-        check_custom_messages_allowed,
-        check_group_trips_allowed
-    )
-    check_contact_limit(user_id, contact_count)
-
-    # Check if user can set custom check-in intervals (premium feature)
-    check_custom_intervals_allowed(user_id, body.checkin_interval_min)
-
-    # Check if user can set custom messages (premium feature)
-    if body.custom_start_message or body.custom_overdue_message:
-        check_custom_messages_allowed(user_id)
-
-    # Check if user can create group trips (premium feature)
-    if body.is_group_trip:
-        check_group_trips_allowed(user_id)
+    await asyncio.to_thread(_check_trip_allowed, user_id, body)
+
+    # Resolve "Current Location" to a proper place name via reverse geocoding.
+    # Done before opening the transaction so no pooled connection waits on Nominatim.
+    location_text = body.location_text
+    log.info(f"[Trips] Location: '{location_text}' at ({body.gen_lat}, {body.gen_lon})")
+    if location_text and location_text.lower().strip() == "current location":
+        log.info("[Trips] Detected 'Current Location', checking coordinates...")
+        # Check for valid coordinates (not None and not 0,0)
+        has_valid_coords = (
+            body.gen_lat is not None and
+            body.gen_lon is not None and
+            (body.gen_lat != 0.0 or body.gen_lon != 0.0)
+        )
+        if has_valid_coords and body.gen_lat is not None and body.gen_lon is not None:
+            log.info(f"[Trips] Reverse geocoding at ({body.gen_lat}, {body.gen_lon})")
+            geocoded = await reverse_geocode_precise(body.gen_lat, body.gen_lon)
+            if geocoded:
+                location_text = geocoded
+                log.info(f"[Trips] Geocoded to: {location_text}")
+            else:
+                log.warning("[Trips] Geocoding failed, keeping 'Current Location'")
+        else:
+            log.warning(f"[Trips] No valid coords: ({body.gen_lat}, {body.gen_lon})")
+
+    # Resolve "Current Location" for start location if separate locations are used
+    start_location_text = body.start_location_text
+    if body.has_separate_locations and start_location_text and start_location_text.lower().strip() == "current location":
+        log.info("[Trips] Detected 'Current Location' for start, checking coordinates...")
+        has_valid_start_coords = (
+            body.start_lat is not None and
+            body.start_lon is not None and
+            (body.start_lat != 0.0 or body.start_lon != 0.0)
+        )
+        if has_valid_start_coords and body.start_lat is not None and body.start_lon is not None:
+            log.info(f"[Trips] Reverse geocoding start at ({body.start_lat}, {body.start_lon})")
+            geocoded_start = await reverse_geocode_precise(body.start_lat, body.start_lon)
+            if geocoded_start:
+                start_location_text = geocoded_start
+                log.info(f"[Trips] Start geocoded to: {start_location_text}")
+            else:
+                log.warning("[Trips] Start geocoding failed, keeping 'Current Location'")
 
-    with db.engine.begin() as connection:
+    async with db.async_engine().begin() as connection:
         # Verify activity exists and get its ID
         # Normalize activity name: convert to lowercase and replace underscores with spaces
         # This allows "scuba_diving" to match "Scuba Diving"
         normalized_activity = body.activity.lower().replace('_', ' ')
         log.info(f"[Trips] Looking up activity: '{body.activity}' -> '{normalized_activity}'")
 
-        activity = connection.execute(
+        activity = (await connection.execute(
             sqlalchemy.text(
                 """
                 SELECT id, name
@@ -583,13 +804,13 @@ def create_trip(
                 """
             ),
             {"activity": body.activity}
-        ).fetchone()
+        )).fetchone()
 
         if not activity:
             # List available activities for debugging
-            all_activities = connection.execute(
+            all_activities = (await connection.execute(
                 sqlalchemy.text("SELECT id, name FROM activities")
-            ).fetchall()
+            )).fetchall()
             log.warning(f"[Trips] Activity '{body.activity}' not found!")
             available = [a.name for a in all_activities]
             log.info(f"[Trips] Available activities: {available}")
@@ -607,7 +828,7 @@ def create_trip(
         for contact_id in [body.contact1, body.contact2, body.contact3]:
             if contact_id is not None:
                 log.info(f"[Trips] Checking contact_id={contact_id}")
-                contact = connection.execute(
+                contact = (await connection.execute(
                     sqlalchemy.text(
                         """
                         SELECT id
@@ -616,16 +837,16 @@ def create_trip(
                         """
                     ),
                     {"contact_id": contact_id, "user_id": user_id}
-                ).fetchone()
+                )).fetchone()
 
                 if not contact:
                     # List user's contacts for debugging
-                    user_contacts = connection.execute(
+                    user_contacts = (await connection.execute(
                         sqlalchemy.text(
                             "SELECT id, name FROM contacts WHERE user_id = :user_id"
                         ),
                         {"user_id": user_id}
-                    ).fetchall()
+                    )).fetchall()
                     log.warning(f"[Trips] Contact {contact_id} not found!")
                     contact_ids_available = [c.id for c in user_contacts]
                     log.info(f"[Trips] User's contacts: {contact_ids_available}")
@@ -638,16 +859,16 @@ def create_trip(
 
         # Verify friend contacts are actually friends with the user
         log.info("[Trips] Verifying friend contacts...")
-        for friend_id in [body.friend_contact1, body.friend_contact2, body.friend_contact3]:
-            if friend_id is not None:
-                log.info(f"[Trips] Checking friend_id={friend_id}")
-                if not _is_friend(connection, user_id, friend_id):
-                    log.warning(f"[Trips] User {friend_id} is not a friend!")
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"User {friend_id} is not in your friends list"
-                    )
-                log.info(f"[Trips] Friend {friend_id} verified")
+        not_friends = await connection.run_sync(
+            friendships.non_friends, user_id,
+            [body.friend_contact1, body.friend_contact2, body.friend_contact3]
+        )
+        if not_friends:
+            log.warning(f"[Trips] User {not_friends[0]} is not a friend!")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User {not_friends[0]} is not in your friends list"
+            )
 
         # Validate that coordinates are provided (iOS should always send these)
         if body.gen_lat is None or body.gen_lon is None:
@@ -675,46 +896,6 @@ def create_trip(
         start_time = body.start if body.start.tzinfo else body.start.replace(tzinfo=UTC)
         initial_status = 'planned' if start_time > current_time else 'active'
 
-        # Resolve "Current Location" to a proper place name via reverse geocoding
-        location_text = body.location_text
-        log.info(f"[Trips] Location: '{location_text}' at ({body.gen_lat}, {body.gen_lon})")
-        if location_text and location_text.lower().strip() == "current location":
-            log.info("[Trips] Detected 'Current Location', checking coordinates...")
-            # Check for valid coordinates (not None and not 0,0)
-            has_valid_coords = (
-                body.gen_lat is not None and
-                body.gen_lon is not None and
-                (body.gen_lat != 0.0 or body.gen_lon != 0.0)
-            )
-            if has_valid_coords and body.gen_lat is not None and body.gen_lon is not None:
-                log.info(f"[Trips] Reverse geocoding at ({body.gen_lat}, {body.gen_lon})")
-                geocoded = reverse_geocode_sync(body.gen_lat, body.gen_lon)
-                if geocoded:
-                    location_text = geocoded
-                    log.info(f"[Trips] Geocoded to: {location_text}")
-                else:
-                    log.warning("[Trips] Geocoding failed, keeping 'Current Location'")
-            else:
-                log.warning(f"[Trips] No valid coords: ({body.gen_lat}, {body.gen_lon})")
-
-        # Resolve "Current Location" for start location if separate locations are used
-        start_location_text = body.start_location_text
-        if body.has_separate_locations and start_location_text and start_location_text.lower().strip() == "current location":
-            log.info("[Trips] Detected 'Current Location' for start, checking coordinates...")
-            has_valid_start_coords = (
-                body.start_lat is not None and
-                body.start_lon is not None and
-                (body.start_lat != 0.0 or body.start_lon != 0.0)
-            )
-            if has_valid_start_coords and body.start_lat is not None and body.start_lon is not None:
-                log.info(f"[Trips] Reverse geocoding start at ({body.start_lat}, {body.start_lon})")
-                geocoded_start = reverse_geocode_sync(body.start_lat, body.start_lon)
-                if geocoded_start:
-                    start_location_text = geocoded_start
-                    log.info(f"[Trips] Start geocoded to: {start_location_text}")
-                else:
-                    log.warning("[Trips] Start geocoding failed, keeping 'Current Location'")
-
         # Prepare group settings JSON if group trip
         group_settings_json = None
         if body.is_group_trip and body.group_settings:
@@ -727,7 +908,7 @@ def create_trip(
         # If starting immediately (is_starting_now), set notified_trip_started = true to prevent
         # scheduler from sending duplicate trip start emails
         is_starting_now = initial_status == 'active'
-        result = connection.execute(
+        result = (await connection.execute(
             sqlalchemy.text(
                 """
                 INSERT INTO trips (
@@ -739,7 +920,7 @@ def create_trip(
                     checkin_token, checkout_token, timezone, start_timezone, eta_timezone,
                     checkin_interval_min, notify_start_hour, notify_end_hour, notify_self,
                     share_live_location, is_group_trip, group_settings, notified_trip_started,
-                    custom_start_message, custom_overdue_message
+                    custom_start_message, custom_overdue_message, next_reminder_at
                 ) VALUES (
                     :user_id, :title, :activity, :start, :eta, :grace_min,
                     :location_text, :gen_lat, :gen_lon,
@@ -749,7 +930,7 @@ def create_trip(
                     :checkin_token, :checkout_token, :timezone, :start_timezone, :eta_timezone,
                     :checkin_interval_min, :notify_start_hour, :notify_end_hour, :notify_self,
                     :share_live_location, :is_group_trip, :group_settings, :notified_trip_started,
-                    :custom_start_message, :custom_overdue_message
+                    :custom_start_message, :custom_overdue_message, :next_reminder_at
                 )
                 RETURNING id
                 """
@@ -758,8 +939,8 @@ def create_trip(
                 "user_id": user_id,
                 "title": body.title,
                 "activity": activity_id,
-                "start": body.start.isoformat(),
-                "eta": body.eta.isoformat(),
+                "start": start_time,
+                "eta": body.eta if body.eta.tzinfo else body.eta.replace(tzinfo=UTC),
                 "grace_min": body.grace_min,
                 "location_text": location_text or "Unknown Location",  # Default if not provided
                 "gen_lat": body.gen_lat,  # Already validated as not None
@@ -773,7 +954,7 @@ def create_trip(
                 "contact1": body.contact1,
                 "contact2": body.contact2,
                 "contact3": body.contact3,
-                "created_at": datetime.now(UTC).isoformat(),
+                "created_at": current_time.replace(tzinfo=None),
                 "checkin_token": checkin_token,
                 "checkout_token": checkout_token,
                 "timezone": body.timezone,
@@ -788,9 +969,14 @@ def create_trip(
                 "group_settings": group_settings_json,
                 "notified_trip_started": is_starting_now,  # Prevent duplicate scheduler notifications
                 "custom_start_message": body.custom_start_message,
-                "custom_overdue_message": body.custom_overdue_message
+                "custom_overdue_message": body.custom_overdue_message,
+                # Planned trips get theirs when they're activated
+                "next_reminder_at": compute_next_reminder_at(
+                    current_time, body.checkin_interval_min,
+                    body.notify_start_hour, body.notify_end_hour, body.timezone
+                ) if is_starting_now else None
             }
-        )
+        ))
         row = result.fetchone()
         if row is None:
             raise HTTPException(
@@ -802,10 +988,10 @@ def create_trip(
         # If group trip, add owner and invited participants
         participant_count = 0
         if body.is_group_trip:
-            now = datetime.now(UTC).isoformat()
+            now = current_time.replace(tzinfo=None)
 
             # Add owner as participant
-            connection.execute(
+            await connection.execute(
                 sqlalchemy.text(
                     """
                     INSERT INTO trip_participants (trip_id, user_id, role, status, joined_at, invited_by)
@@ -818,10 +1004,13 @@ def create_trip(
 
             # Add invited participants
             if body.participant_ids:
+                not_friends = set(await connection.run_sync(
+                    friendships.non_friends, user_id, body.participant_ids
+                ))
                 for participant_id in body.participant_ids:
                     # Verify they're friends
-                    if _is_friend(connection, user_id, participant_id):
-                        connection.execute(
+                    if participant_id not in not_friends:
+                        await connection.execute(
                             sqlalchemy.text(
                                 """
                                 INSERT INTO trip_participants (trip_id, user_id, role, status, invited_at, invited_by)
@@ -834,15 +1023,15 @@ def create_trip(
                         log.warning(f"[Trips] User {participant_id} is not a friend, skipping invitation")
 
         # Save to trip_safety_contacts junction table (supports both email contacts and friends)
-        _save_trip_safety_contacts(
-            connection,
+        await connection.run_sync(
+            _save_trip_safety_contacts,
             trip_id,
             contact_ids=[body.contact1, body.contact2, body.contact3],
             friend_user_ids=[body.friend_contact1, body.friend_contact2, body.friend_contact3]
         )
 
         # Fetch created trip with full activity data
-        trip = connection.execute(
+        trip = (await connection.execute(
             sqlalchemy.text(
                 """
                 SELECT t.id, t.user_id, t.title, t.start, t.eta, t.grace_min,
@@ -864,7 +1053,7 @@ def create_trip(
                 """
             ),
             {"trip_id": trip_id}
-        ).mappings().fetchone()
+        )).mappings().fetchone()
         if trip is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -884,10 +1073,10 @@ def create_trip(
         )
 
         # Fetch user name and email for notification
-        user = connection.execute(
+        user = (await connection.execute(
             sqlalchemy.text("SELECT first_name, last_name, email FROM users WHERE id = :user_id"),
             {"user_id": user_id}
-        ).fetchone()
+        )).fetchone()
         user_name = f"{user.first_name} {user.last_name}".strip() if user else "Someone"
         if not user_name:
             user_name = "A Homebound user"
@@ -898,14 +1087,16 @@ def create_trip(
         # Fetch contacts with email for notification
         # Use _get_all_trip_email_contacts() for consistency with start_trip and checkin
         # This includes participant contacts for group trips (though unlikely to exist at creation time)
-        trip_for_contacts = connection.execute(
+        trip_for_contacts = (await connection.execute(
             sqlalchemy.text("""
                 SELECT id, user_id, is_group_trip, contact1, contact2, contact3
                 FROM trips WHERE id = :id
             """),
             {"id": trip_id}
-        ).fetchone()
-        contacts_for_email = _get_all_trip_email_contacts(connection, trip_for_contacts)
+        )).fetchone()
+        contacts_for_email = await connection.run_sync(
+            _get_all_trip_email_contacts, trip_for_contacts
+        )
 
         # Build trip dict for email notification
         trip_data = {
@@ -923,12 +1114,12 @@ def create_trip(
         # Capture custom start message for immediate trips
         custom_start_msg = body.custom_start_message
 
-        # Schedule background task to send emails to contacts
+        # Schedule background task to send emails to contacts (awaited on the event loop)
         # Use different email templates based on whether trip is starting now or upcoming
-        def send_emails_sync():
+        async def send_emails():
             if is_starting_now:
                 # Trip is starting immediately - send "starting now" email
-                asyncio.run(send_trip_starting_now_emails(
+                await send_trip_starting_now_emails(
                     trip=trip_data,
                     contacts=contacts_for_email,
                     user_name=user_name,
@@ -937,10 +1128,10 @@ def create_trip(
                     start_location=trip_start_location,
                     owner_email=owner_email,
                     custom_message=custom_start_msg
-                ))
+                )
             else:
                 # Trip is scheduled for later - send "upcoming trip" email
-                asyncio.run(send_trip_created_emails(
+                await send_trip_created_emails(
                     trip=trip_data,
                     contacts=contacts_for_email,
                     user_name=user_name,
@@ -948,15 +1139,15 @@ def create_trip(
                     user_timezone=user_timezone,
                     start_location=trip_start_location,
                     owner_email=owner_email
-                ))
+                )
 
-        background_tasks.add_task(send_emails_sync)
+        background_tasks.add_task(send_emails)
         email_type = "starting now" if is_starting_now else "upcoming trip"
         num_contacts = len(contacts_for_email)
         log.info(f"[Trips] Scheduled {email_type} emails for {num_contacts} contacts")
 
         # Get friend contacts from junction table
-        friend_contacts = _get_friend_contacts_for_trip(connection, trip_id)
+        friend_contacts = await connection.run_sync(_get_friend_contacts_for_trip, trip_id)
         log.info(f"[Trips] create_trip: Retrieved friend contacts for trip {trip_id}: {friend_contacts}")
 
         # Send push notifications to friend safety contacts
@@ -970,24 +1161,24 @@ def create_trip(
 
         if friend_user_ids:
             trip_title_for_push = trip["title"]
-            def send_friend_push_sync():
+            async def send_friend_pushes():
                 for friend_id in friend_user_ids:
                     log.info(f"[Trips] Sending {email_type} push to friend {friend_id}")
                     if is_starting_now:
-                        asyncio.run(send_friend_trip_starting_push(
+                        await send_friend_trip_starting_push(
                             friend_user_id=friend_id,
                             user_name=user_name,
                             trip_title=trip_title_for_push,
                             custom_message=custom_start_msg
-                        ))
+                        )
                     else:
-                        asyncio.run(send_friend_trip_created_push(
+                        await send_friend_trip_created_push(
                             friend_user_id=friend_id,
                             user_name=user_name,
                             trip_title=trip_title_for_push
-                        ))
+                        )
 
-            background_tasks.add_task(send_friend_push_sync)
+            background_tasks.add_task(send_friend_pushes)
             log.info(f"[Trips] Scheduled {email_type} push notifications for {len(friend_user_ids)} friend contacts")
         else:
             log.info(f"[Trips] create_trip: No friend contacts to notify for trip {trip_id}")
@@ -1046,6 +1237,7 @@ def create_trip(
 
 
 @router.get("/", response_model=list[TripResponse])
+@prerendered_json
 def get_trips(user_id: int = Depends(auth.get_current_user_id)):
     """Get all trips for the current user with full activity data.
 
@@ -1087,67 +1279,11 @@ def get_trips(user_id: int = Depends(auth.get_current_user_id)):
 
         result = []
         for trip in trips:
-            # Construct Activity object for each trip
-            activity = Activity(
-                id=trip["activity_id"],
-                name=trip["activity_name"],
-                icon=trip["activity_icon"],
-                default_grace_minutes=trip["default_grace_minutes"],
-                colors=parse_json_field(trip["activity_colors"], dict),
-                messages=parse_json_field(trip["activity_messages"], dict),
-                safety_tips=parse_json_field(trip["safety_tips"], list),
-                order=trip["activity_order"]
-            )
-
             # Get friend contacts from pre-loaded batch
             friend_contacts = friend_contacts_map.get(trip["id"], {
                 "friend_contact1": None, "friend_contact2": None, "friend_contact3": None
             })
-
-            result.append(
-                TripResponse(
-                    id=trip["id"],
-                    user_id=trip["user_id"],
-                    title=trip["title"],
-                    activity=activity,
-                    start=to_iso8601_required(trip["start"]),
-                    eta=to_iso8601_required(trip["eta"]),
-                    grace_min=trip["grace_min"],
-                    location_text=trip["location_text"],
-                    gen_lat=trip["gen_lat"],
-                    gen_lon=trip["gen_lon"],
-                    start_location_text=trip["start_location_text"],
-                    start_lat=trip["start_lat"],
-                    start_lon=trip["start_lon"],
-                    has_separate_locations=trip["has_separate_locations"],
-                    notes=trip["notes"],
-                    status=trip["status"],
-                    completed_at=to_iso8601(trip["completed_at"]),
-                    last_checkin=to_iso8601(trip["last_checkin"]),
-                    created_at=to_iso8601_required(trip["created_at"]),
-                    contact1=trip["contact1"],
-                    contact2=trip["contact2"],
-                    contact3=trip["contact3"],
-                    friend_contact1=friend_contacts["friend_contact1"],
-                    friend_contact2=friend_contacts["friend_contact2"],
-                    friend_contact3=friend_contacts["friend_contact3"],
-                    checkin_token=trip["checkin_token"],
-                    checkout_token=trip["checkout_token"],
-                    checkin_interval_min=trip["checkin_interval_min"],
-                    notify_start_hour=trip["notify_start_hour"],
-                    notify_end_hour=trip["notify_end_hour"],
-                    timezone=trip["timezone"],
-                    start_timezone=trip["start_timezone"],
-                    eta_timezone=trip["eta_timezone"],
-                    notify_self=trip["notify_self"],
-                    share_live_location=trip.get("share_live_location", False),
-                    custom_start_message=trip.get("custom_start_message"),
-                    custom_overdue_message=trip.get("custom_overdue_message"),
-                    is_group_trip=trip.get("is_group_trip", False),
-                    group_settings=parse_group_settings(trip.get("group_settings")),
-                    participant_count=trip.get("participant_count", 0)
-                )
-            )
+            result.append(_trip_response(trip, friend_contacts))
 
         return result
 
@@ -1161,94 +1297,17 @@ def get_active_trip(user_id: int = Depends(auth.get_current_user_id)):
     """
     with db.engine.begin() as connection:
         trip = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT t.id, t.user_id, t.title, t.start, t.eta, t.grace_min,
-                       t.location_text, t.gen_lat, t.gen_lon,
-                       t.start_location_text, t.start_lat, t.start_lon, t.has_separate_locations,
-                       t.notes, t.status, t.completed_at,
-                       t.last_checkin, t.created_at, t.contact1, t.contact2, t.contact3,
-                       t.checkin_token, t.checkout_token,
-                       t.checkin_interval_min, t.notify_start_hour, t.notify_end_hour,
-                       t.timezone, t.start_timezone, t.eta_timezone, t.notify_self, t.share_live_location,
-                       t.is_group_trip, t.group_settings,
-                       t.custom_start_message, t.custom_overdue_message,
-                       a.id as activity_id, a.name as activity_name, a.icon as activity_icon,
-                       a.default_grace_minutes, a.colors as activity_colors,
-                       a.messages as activity_messages, a.safety_tips, a."order" as activity_order,
-                       (SELECT COUNT(*) FROM trip_participants WHERE trip_id = t.id AND status = 'accepted') as participant_count
-                FROM trips t
-                JOIN activities a ON t.activity = a.id
-                LEFT JOIN trip_participants tp ON t.id = tp.trip_id AND tp.user_id = :user_id AND tp.status = 'accepted'
-                WHERE (t.user_id = :user_id OR tp.user_id IS NOT NULL)
-                  AND t.status IN ('active', 'overdue', 'overdue_notified')
-                ORDER BY t.created_at DESC
-                LIMIT 1
-                """
-            ),
+            _ACTIVE_TRIP,
             {"user_id": user_id}
         ).mappings().fetchone()
 
         if not trip:
             return None
 
-        # Construct Activity object from trip data
-        activity = Activity(
-            id=trip["activity_id"],
-            name=trip["activity_name"],
-            icon=trip["activity_icon"],
-            default_grace_minutes=trip["default_grace_minutes"],
-            colors=parse_json_field(trip["activity_colors"], dict),
-            messages=parse_json_field(trip["activity_messages"], dict),
-            safety_tips=parse_json_field(trip["safety_tips"], list),
-            order=trip["activity_order"]
-        )
-
         # Get friend contacts from junction table
         friend_contacts = _get_friend_contacts_for_trip(connection, trip["id"])
 
-        return TripResponse(
-            id=trip["id"],
-            user_id=trip["user_id"],
-            title=trip["title"],
-            activity=activity,
-            start=to_iso8601_required(trip["start"]),
-            eta=to_iso8601_required(trip["eta"]),
-            grace_min=trip["grace_min"],
-            location_text=trip["location_text"],
-            gen_lat=trip["gen_lat"],
-            gen_lon=trip["gen_lon"],
-            start_location_text=trip["start_location_text"],
-            start_lat=trip["start_lat"],
-            start_lon=trip["start_lon"],
-            has_separate_locations=trip["has_separate_locations"],
-            notes=trip["notes"],
-            status=trip["status"],
-            completed_at=to_iso8601(trip["completed_at"]),
-            last_checkin=to_iso8601(trip["last_checkin"]),
-            created_at=to_iso8601_required(trip["created_at"]),
-            contact1=trip["contact1"],
-            contact2=trip["contact2"],
-            contact3=trip["contact3"],
-            friend_contact1=friend_contacts["friend_contact1"],
-            friend_contact2=friend_contacts["friend_contact2"],
-            friend_contact3=friend_contacts["friend_contact3"],
-            checkin_token=trip["checkin_token"],
-            checkout_token=trip["checkout_token"],
-            checkin_interval_min=trip["checkin_interval_min"],
-            notify_start_hour=trip["notify_start_hour"],
-            notify_end_hour=trip["notify_end_hour"],
-            timezone=trip["timezone"],
-            start_timezone=trip["start_timezone"],
-            eta_timezone=trip["eta_timezone"],
-            notify_self=trip["notify_self"],
-            share_live_location=trip.get("share_live_location", False),
-            custom_start_message=trip.get("custom_start_message"),
-            custom_overdue_message=trip.get("custom_overdue_message"),
-            is_group_trip=trip.get("is_group_trip", False),
-            group_settings=parse_group_settings(trip.get("group_settings")),
-            participant_count=trip.get("participant_count", 0)
-        )
+        return _trip_response(trip, friend_contacts)
 
 
 @router.get("/{trip_id}", response_model=TripResponse)
@@ -1286,63 +1345,10 @@ def get_trip(trip_id: int, user_id: int = Depends(auth.get_current_user_id)):
                 detail="Trip not found"
             )
 
-        # Construct Activity object from trip data
-        activity = Activity(
-            id=trip["activity_id"],
-            name=trip["activity_name"],
-            icon=trip["activity_icon"],
-            default_grace_minutes=trip["default_grace_minutes"],
-            colors=parse_json_field(trip["activity_colors"], dict),
-            messages=parse_json_field(trip["activity_messages"], dict),
-            safety_tips=parse_json_field(trip["safety_tips"], list),
-            order=trip["activity_order"]
-        )
-
         # Get friend contacts from junction table
         friend_contacts = _get_friend_contacts_for_trip(connection, trip["id"])
 
-        return TripResponse(
-            id=trip["id"],
-            user_id=trip["user_id"],
-            title=trip["title"],
-            activity=activity,
-            start=to_iso8601_required(trip["start"]),
-            eta=to_iso8601_required(trip["eta"]),
-            grace_min=trip["grace_min"],
-            location_text=trip["location_text"],
-            gen_lat=trip["gen_lat"],
-            gen_lon=trip["gen_lon"],
-            start_location_text=trip["start_location_text"],
-            start_lat=trip["start_lat"],
-            start_lon=trip["start_lon"],
-            has_separate_locations=trip["has_separate_locations"],
-            notes=trip["notes"],
-            status=trip["status"],
-            completed_at=to_iso8601(trip["completed_at"]),
-            last_checkin=to_iso8601(trip["last_checkin"]),
-            created_at=to_iso8601_required(trip["created_at"]),
-            contact1=trip["contact1"],
-            contact2=trip["contact2"],
-            contact3=trip["contact3"],
-            friend_contact1=friend_contacts["friend_contact1"],
-            friend_contact2=friend_contacts["friend_contact2"],
-            friend_contact3=friend_contacts["friend_contact3"],
-            checkin_token=trip["checkin_token"],
-            checkout_token=trip["checkout_token"],
-            checkin_interval_min=trip["checkin_interval_min"],
-            notify_start_hour=trip["notify_start_hour"],
-            notify_end_hour=trip["notify_end_hour"],
-            timezone=trip["timezone"],
-            start_timezone=trip["start_timezone"],
-            eta_timezone=trip["eta_timezone"],
-            notify_self=trip["notify_self"],
-            share_live_location=trip.get("share_live_location", False),
-            custom_start_message=trip.get("custom_start_message"),
-            custom_overdue_message=trip.get("custom_overdue_message"),
-            is_group_trip=trip.get("is_group_trip", False),
-            group_settings=parse_group_settings(trip.get("group_settings")),
-            participant_count=trip.get("participant_count", 0)
-        )
+        return _trip_response(trip, friend_contacts)
 
 
 @router.put("/{trip_id}", response_model=TripResponse)
@@ -1458,14 +1464,14 @@ def update_trip(
                 params[contact_field] = contact_id
 
         # Handle friend contact validation if any friend contacts are being updated
-        for friend_field in ["friend_contact1", "friend_contact2", "friend_contact3"]:
-            friend_id = getattr(body, friend_field)
-            if friend_id is not None:
-                if not _is_friend(connection, user_id, friend_id):
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"User {friend_id} is not in your friends list"
-                    )
+        not_friends = friendships.non_friends(
+            connection, user_id, [body.friend_contact1, body.friend_contact2, body.friend_contact3]
+        )
+        if not_friends:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User {not_friends[0]} is not in your friends list"
+            )
 
         # Handle simple field updates
         simple_fields = {
@@ -1515,6 +1521,11 @@ def update_trip(
             connection.execute(sqlalchemy.text(update_sql), params)
             log.info(f"[Trips] Updated trip {trip_id}: {update_fields}")
 
+        # Reminder settings changed: recompute the pending reminder from the last one sent
+        reminder_settings = (body.checkin_interval_min, body.notify_start_hour, body.notify_end_hour, body.timezone)
+        if any(value is not None for value in reminder_settings):
+            reschedule_trip_reminder(connection, trip_id)
+
         # Update trip_safety_contacts junction table if contacts changed
         any_contact_changed = any([
             body.contact1 is not None,
@@ -1688,16 +1699,17 @@ def complete_trip(
                 detail="Trip is not active or overdue"
             )
 
-        # Fetch user name and email for notification
+        # Fetch user name for notification
         user = connection.execute(
-            sqlalchemy.text("SELECT first_name, last_name, email FROM users WHERE id = :user_id"),
+            sqlalchemy.text("SELECT first_name, last_name FROM users WHERE id = :user_id"),
             {"user_id": user_id}
         ).fetchone()
         user_name = f"{user.first_name} {user.last_name}".strip() if user else "User"
-        owner_email = user.email if user and trip.notify_self else None
 
-        # Fetch all contact emails (owner + participants for group trips)
-        contacts_for_email = _get_all_trip_email_contacts(connection, trip)
+        # Everyone watching the trip, each reached once (see src/services/recipients.py)
+        plan = recipients.plan_delivery(connection, trip_id, "checkout", actor_id=user_id)
+        contacts_for_email = plan.emails
+        owner_email = plan.owner_email
 
         # Update trip status
         connection.execute(
@@ -1733,33 +1745,8 @@ def complete_trip(
         if contacts_for_email or owner_email:
             background_tasks.add_task(send_emails_sync)
 
-        # Send push notifications to friend safety contacts
-        friend_contacts = _get_friend_contacts_for_trip(connection, trip_id)
-        friend_user_ids = [
-            friend_contacts["friend_contact1"],
-            friend_contacts["friend_contact2"],
-            friend_contacts["friend_contact3"]
-        ]
-        friend_user_ids = [f for f in friend_user_ids if f is not None]
-
-        # For group trips, also include participant friend contacts
-        if trip.is_group_trip:
-            participant_friend_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT DISTINCT friend_user_id FROM participant_trip_contacts
-                    WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                    """
-                ),
-                {"trip_id": trip_id}
-            ).fetchall()
-            existing_friend_ids = set(friend_user_ids)
-            for pfc in participant_friend_contacts:
-                if pfc.friend_user_id not in existing_friend_ids:
-                    friend_user_ids.append(pfc.friend_user_id)
-                    existing_friend_ids.add(pfc.friend_user_id)
-            log.info(f"[Trips] complete_trip: Added {len(participant_friend_contacts)} participant friend contacts")
-
+        # Send push notifications to friend safety contacts (owner's and participants')
+        friend_user_ids = plan.friend_pushes
         if friend_user_ids:
             trip_title_for_push = trip.title
             user_name_for_push = user_name
@@ -1774,6 +1761,31 @@ def complete_trip(
             background_tasks.add_task(send_friend_completed_push_sync)
             log.info(f"[Trips] Scheduled completed push notifications for {len(friend_user_ids)} friend contacts")
 
+        # For group trips, tell the rest of the group (the owner too, when a participant
+        # completes it) and refresh everyone's trip
+        if trip.is_group_trip:
+            participant_ids = plan.participant_pushes
+            refresh_user_ids = [uid for uid in [trip.user_id, *plan.participant_ids] if uid != user_id]
+            trip_title_for_participants = trip.title
+            completer_name = user_name
+
+            def send_participant_completed_push_sync():
+                for participant_id in participant_ids:
+                    asyncio.run(send_trip_completed_push(
+                        participant_user_id=participant_id,
+                        completer_name=completer_name,
+                        trip_title=trip_title_for_participants,
+                        trip_id=trip_id
+                    ))
+                for uid in refresh_user_ids:
+                    asyncio.run(send_data_refresh_push(uid, "trip", trip_id))
+
+            background_tasks.add_task(send_participant_completed_push_sync)
+            log.info(
+                f"[Trips] Scheduled completed push to {len(participant_ids)} and refresh to "
+                f"{len(refresh_user_ids)} group trip members"
+            )
+
         return {"ok": True, "message": "Trip completed successfully"}
 
 
@@ -1793,6 +1805,7 @@ def start_trip(
                        t.start_location_text, t.has_separate_locations,
                        t.contact1, t.contact2, t.contact3, t.timezone, t.is_group_trip,
                        t.custom_start_message,
+                       t.checkin_interval_min, t.notify_start_hour, t.notify_end_hour,
                        a.name as activity_name
                 FROM trips t
                 JOIN activities a ON t.activity = a.id
@@ -1814,15 +1827,12 @@ def start_trip(
                 detail="Trip is not in planned status"
             )
 
-        # Fetch user name for email
-        user = connection.execute(
-            sqlalchemy.text("SELECT first_name, last_name FROM users WHERE id = :user_id"),
-            {"user_id": user_id}
-        ).fetchone()
-        user_name = f"{user.first_name} {user.last_name}".strip() if user else "User"
-
-        # Fetch all contact emails (owner + participants for group trips)
-        contacts_for_email = _get_all_trip_email_contacts(connection, trip)
+        # Everyone watching the trip, each reached once (see src/services/recipients.py).
+        # Participants' email contacts were told when their participant joined.
+        plan = recipients.plan_delivery(connection, trip_id, "trip_started", actor_id=user_id)
+        user_name = plan.owner_name
+        owner_email = plan.owner_email
+        contacts_for_email = plan.emails
 
         # Update trip status to active and set start time to now (for early starts)
         # Also set notified_trip_started = true to prevent scheduler from sending duplicate emails
@@ -1832,12 +1842,21 @@ def start_trip(
                 UPDATE trips
                 SET status = 'active',
                     start = now(),
-                    notified_trip_started = true
+                    notified_trip_started = true,
+                    next_reminder_at = :next_reminder_at
                 WHERE id = :trip_id
                 """
             ),
-            {"trip_id": trip_id}
+            {
+                "trip_id": trip_id,
+                "next_reminder_at": compute_next_reminder_at(
+                    datetime.now(UTC), trip.checkin_interval_min,
+                    trip.notify_start_hour, trip.notify_end_hour, trip.timezone
+                )
+            }
         )
+        if trip.is_group_trip:
+            reschedule_participant_reminders(connection, [trip_id], datetime.now(UTC))
 
         # Prepare data for email
         trip_data = {
@@ -1859,40 +1878,39 @@ def start_trip(
                 activity_name=activity_name,
                 user_timezone=user_timezone,
                 start_location=trip_start_location,
+                owner_email=owner_email,
                 custom_message=custom_start_msg
             ))
 
-        if contacts_for_email:
+        if contacts_for_email or owner_email:
             background_tasks.add_task(send_emails_sync)
 
-        # Send push notifications to friend safety contacts
-        friend_contacts = _get_friend_contacts_for_trip(connection, trip_id)
-        log.info(f"[Trips] start_trip: Retrieved friend contacts for trip {trip_id}: {friend_contacts}")
-        friend_user_ids = [
-            friend_contacts["friend_contact1"],
-            friend_contacts["friend_contact2"],
-            friend_contacts["friend_contact3"]
-        ]
-        friend_user_ids = [f for f in friend_user_ids if f is not None]
+        # The scheduler won't send its trip-started pushes (notified_trip_started is set),
+        # so participants get them here: visible to those who want trip reminders, and a
+        # background push to all so their Live Activity starts
+        if trip.is_group_trip and plan.participant_ids:
+            participant_ids = plan.participant_pushes
+            live_activity_ids = plan.participant_ids
+            trip_title_for_participants = trip.title
+
+            def send_participant_started_push_sync():
+                start_data = {"sync": "start_live_activity", "trip_id": trip_id}
+                for participant_id in participant_ids:
+                    asyncio.run(send_push_to_user(
+                        participant_id,
+                        "Trip Started",
+                        f"The group trip '{trip_title_for_participants}' has started. Stay safe!",
+                        data=start_data,
+                        notification_type="trip_reminder"
+                    ))
+                for participant_id in live_activity_ids:
+                    asyncio.run(send_background_push_to_user(participant_id, data=start_data))
 
-        # For group trips, also include participant friend contacts
-        if trip.is_group_trip:
-            participant_friend_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT DISTINCT friend_user_id FROM participant_trip_contacts
-                    WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                    """
-                ),
-                {"trip_id": trip_id}
-            ).fetchall()
-            existing_friend_ids = set(friend_user_ids)
-            for pfc in participant_friend_contacts:
-                if pfc.friend_user_id not in existing_friend_ids:
-                    friend_user_ids.append(pfc.friend_user_id)
-                    existing_friend_ids.add(pfc.friend_user_id)
-            log.info(f"[Trips] start_trip: Added {len(participant_friend_contacts)} participant friend contacts")
+            background_tasks.add_task(send_participant_started_push_sync)
+            log.info(f"[Trips] start_trip: Scheduled trip started pushes for {len(live_activity_ids)} participants")
 
+        # Send push notifications to friend safety contacts (owner's and participants')
+        friend_user_ids = plan.friend_pushes
         log.info(f"[Trips] start_trip: Friend user IDs to notify: {friend_user_ids}")
 
         if friend_user_ids:
@@ -1936,7 +1954,9 @@ def extend_trip(
             sqlalchemy.text(
                 """
                 SELECT t.id, t.status, t.eta, t.title, t.contact1, t.contact2, t.contact3,
-                       t.timezone, t.notify_self, t.user_id, t.is_group_trip, a.name as activity_name
+                       t.timezone, t.notify_self, t.user_id, t.is_group_trip,
+                       t.checkin_interval_min, t.notify_start_hour, t.notify_end_hour,
+                       a.name as activity_name
                 FROM trips t
                 JOIN activities a ON t.activity = a.id
                 WHERE t.id = :trip_id
@@ -2026,14 +2046,18 @@ def extend_trip(
             sqlalchemy.text(
                 """
                 UPDATE trips
-                SET eta = :new_eta, status = 'active', last_checkin = :last_checkin
+                SET eta = :new_eta, status = 'active', last_checkin = :last_checkin,
+                    next_reminder_at = :next_reminder_at
                 WHERE id = :trip_id
                 """
             ),
             {
                 "trip_id": trip_id,
                 "new_eta": new_eta.isoformat(),
-                "last_checkin": checkin_event_id
+                "last_checkin": checkin_event_id,
+                "next_reminder_at": compute_next_reminder_at(
+                    now, trip.checkin_interval_min, trip.notify_start_hour, trip.notify_end_hour, trip.timezone
+                )
             }
         )
 
@@ -2077,18 +2101,19 @@ def extend_trip(
             )
             log.info(f"[Trips] Updated trip_participants for user {user_id} on extend for trip {trip_id}")
 
-        # Fetch user name and email for notification
+        # Fetch user name for notification
         user = connection.execute(
-            sqlalchemy.text("SELECT first_name, last_name, email FROM users WHERE id = :user_id"),
+            sqlalchemy.text("SELECT first_name, last_name FROM users WHERE id = :user_id"),
             {"user_id": user_id}
         ).fetchone()
         user_name = f"{user.first_name} {user.last_name}".strip() if user else "Someone"
         if not user_name:
             user_name = "A Homebound user"
-        owner_email = user.email if user and trip.notify_self else None
 
-        # Fetch all contact emails (owner + participants for group trips)
-        contacts_for_email = _get_all_trip_email_contacts(connection, trip)
+        # Everyone watching the trip, each reached once (see src/services/recipients.py)
+        plan = recipients.plan_delivery(connection, trip_id, "extended", actor_id=user_id)
+        contacts_for_email = plan.emails
+        owner_email = plan.owner_email
 
         # Build trip dict for email notification (with new ETA)
         trip_data = {
@@ -2116,33 +2141,8 @@ def extend_trip(
         num_contacts = len(contacts_for_email)
         log.info(f"[Trips] Scheduled extended trip emails for {num_contacts} contacts")
 
-        # Send push notifications to friend safety contacts
-        friend_contacts = _get_friend_contacts_for_trip(connection, trip_id)
-        friend_user_ids = [
-            friend_contacts["friend_contact1"],
-            friend_contacts["friend_contact2"],
-            friend_contacts["friend_contact3"]
-        ]
-        friend_user_ids = [f for f in friend_user_ids if f is not None]
-
-        # For group trips, also include participant friend contacts
-        if trip.is_group_trip:
-            participant_friend_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT DISTINCT friend_user_id FROM participant_trip_contacts
-                    WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                    """
-                ),
-                {"trip_id": trip_id}
-            ).fetchall()
-            existing_friend_ids = set(friend_user_ids)
-            for pfc in participant_friend_contacts:
-                if pfc.friend_user_id not in existing_friend_ids:
-                    friend_user_ids.append(pfc.friend_user_id)
-                    existing_friend_ids.add(pfc.friend_user_id)
-            log.info(f"[Trips] extend_trip: Added {len(participant_friend_contacts)} participant friend contacts")
-
+        # Send push notifications to friend safety contacts (owner's and participants')
+        friend_user_ids = plan.friend_pushes
         if friend_user_ids:
             trip_title_for_push = trip.title
             user_name_for_push = user_name
@@ -2162,23 +2162,7 @@ def extend_trip(
 
         # For group trips, send refresh pushes to owner (if not the extender) and all other participants
         if trip.is_group_trip:
-            refresh_user_ids = []
-
-            # Add owner if extender is not the owner
-            if trip.user_id != user_id:
-                refresh_user_ids.append(trip.user_id)
-
-            # Add all other accepted participants
-            other_participants = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT user_id FROM trip_participants
-                    WHERE trip_id = :trip_id AND user_id != :extender_id AND status = 'accepted'
-                    """
-                ),
-                {"trip_id": trip_id, "extender_id": user_id}
-            ).fetchall()
-            refresh_user_ids.extend([p.user_id for p in other_participants])
+            refresh_user_ids = [uid for uid in [trip.user_id, *plan.participant_ids] if uid != user_id]
 
             if refresh_user_ids:
                 trip_id_for_refresh = trip_id
@@ -2321,6 +2305,37 @@ def delete_trip(
             return {"ok": True, "message": "Trip deleted successfully"}
 
 
+def _load_timeline(connection, trip_id: int) -> list[TimelineEvent]:
+    """Timeline events for a trip, newest first, with the acting user's name."""
+    events = connection.execute(
+        sqlalchemy.text(
+            """
+            SELECT e.id, e.what AS kind, e.timestamp AS at, e.lat, e.lon, e.extended_by,
+                   e.user_id, u.first_name, u.last_name
+            FROM events e
+            LEFT JOIN users u ON e.user_id = u.id
+            WHERE e.trip_id = :trip_id
+            ORDER BY e.timestamp DESC
+            """
+        ),
+        {"trip_id": trip_id}
+    ).fetchall()
+
+    return [
+        TimelineEvent(
+            id=e.id,
+            kind=e.kind,
+            at=e.at.isoformat() if e.at else "",
+            lat=e.lat,
+            lon=e.lon,
+            extended_by=e.extended_by,
+            user_id=e.user_id,
+            user_name=f"{e.first_name} {e.last_name}".strip() if e.first_name else None
+        )
+        for e in events
+    ]
+
+
 @router.get("/{trip_id}/timeline", response_model=list[TimelineEvent])
 def get_trip_timeline(trip_id: int, user_id: int = Depends(auth.get_current_user_id)):
     """Get timeline events for a specific trip"""
@@ -2350,34 +2365,7 @@ def get_trip_timeline(trip_id: int, user_id: int = Depends(auth.get_current_user
                 detail="Trip not found"
             )
 
-        # Fetch timeline events with user info
-        events = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT e.id, e.what AS kind, e.timestamp AS at, e.lat, e.lon, e.extended_by,
-                       e.user_id, u.first_name, u.last_name
-                FROM events e
-                LEFT JOIN users u ON e.user_id = u.id
-                WHERE e.trip_id = :trip_id
-                ORDER BY e.timestamp DESC
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchall()
-
-        return [
-            TimelineEvent(
-                id=e.id,
-                kind=e.kind,
-                at=e.at.isoformat() if e.at else "",
-                lat=e.lat,
-                lon=e.lon,
-                extended_by=e.extended_by,
-                user_id=e.user_id,
-                user_name=f"{e.first_name} {e.last_name}".strip() if e.first_name else None
-            )
-            for e in events
-        ]
+        return _load_timeline(connection, trip_id)
 
 
 # ==================== My Trip Contacts ====================
@@ -2400,6 +2388,81 @@ class MyTripContactsResponse(BaseModel):
     contacts: list[TripContactResponse]
 
 
+def _load_my_trip_contacts(connection, trip, user_id: int) -> list[TripContactResponse]:
+    """Safety contacts for the current user on a trip, email contacts first.
+
+    The owner's contacts come from trips.contact1/2/3 and trip_safety_contacts;
+    a participant's come from participant_trip_contacts. Each side is a single
+    UNION ALL query.
+
+    Args:
+        trip: Row with at least id, user_id and contact1/2/3
+    """
+    if trip.user_id == user_id:
+        contact_ids = [c for c in (trip.contact1, trip.contact2, trip.contact3) if c is not None]
+        rows = connection.execute(
+            sqlalchemy.text(
+                """
+                SELECT 'email' AS type, c.id AS contact_id, c.name, c.email,
+                       NULL::integer AS friend_user_id, NULL AS first_name, NULL AS last_name,
+                       NULL AS profile_photo_url, 0 AS section, array_position(CAST(:ids AS integer[]), c.id) AS position
+                FROM contacts c
+                WHERE c.id = ANY(CAST(:ids AS integer[]))
+                UNION ALL
+                SELECT 'friend', NULL, NULL, NULL,
+                       tsc.friend_user_id, u.first_name, u.last_name,
+                       u.profile_photo_url, 1, tsc.position
+                FROM trip_safety_contacts tsc
+                JOIN users u ON tsc.friend_user_id = u.id
+                WHERE tsc.trip_id = :trip_id AND tsc.friend_user_id IS NOT NULL
+                ORDER BY section, position
+                """
+            ),
+            {"trip_id": trip.id, "ids": contact_ids}
+        ).fetchall()
+    else:
+        rows = connection.execute(
+            sqlalchemy.text(
+                """
+                SELECT 'email' AS type, c.id AS contact_id, c.name, c.email,
+                       NULL::integer AS friend_user_id, NULL AS first_name, NULL AS last_name,
+                       NULL AS profile_photo_url, 0 AS section, ptc.position
+                FROM participant_trip_contacts ptc
+                JOIN contacts c ON ptc.contact_id = c.id
+                WHERE ptc.trip_id = :trip_id AND ptc.participant_user_id = :user_id
+                UNION ALL
+                SELECT 'friend', NULL, NULL, NULL,
+                       ptc.friend_user_id, u.first_name, u.last_name,
+                       u.profile_photo_url, 1, ptc.position
+                FROM participant_trip_contacts ptc
+                JOIN users u ON ptc.friend_user_id = u.id
+                WHERE ptc.trip_id = :trip_id AND ptc.participant_user_id = :user_id
+                    AND ptc.friend_user_id IS NOT NULL
+                ORDER BY section, position
+                """
+            ),
+            {"trip_id": trip.id, "user_id": user_id}
+        ).fetchall()
+
+    contacts: list[TripContactResponse] = []
+    for row in rows:
+        if row.type == "email":
+            contacts.append(TripContactResponse(
+                type="email",
+                contact_id=row.contact_id,
+                name=row.name,
+                email=row.email
+            ))
+        else:
+            contacts.append(TripContactResponse(
+                type="friend",
+                friend_user_id=row.friend_user_id,
+                friend_name=f"{row.first_name} {row.last_name}".strip() or None,
+                profile_photo_url=row.profile_photo_url
+            ))
+    return contacts
+
+
 @router.get("/{trip_id}/my-contacts", response_model=MyTripContactsResponse)
 def get_my_trip_contacts(trip_id: int, user_id: int = Depends(auth.get_current_user_id)):
     """Get the current user's safety contacts for a trip.
@@ -2428,63 +2491,8 @@ def get_my_trip_contacts(trip_id: int, user_id: int = Depends(auth.get_current_u
                 detail="Trip not found"
             )
 
-        is_owner = trip.user_id == user_id
-        contacts: list[TripContactResponse] = []
-        log.info(f"[MyContacts] trip_id={trip_id}, user_id={user_id}, is_owner={is_owner}")
-
-        if is_owner:
-            # Owner: get contacts from trip table and trip_safety_contacts
-
-            # Get email contacts (contact1, contact2, contact3)
-            contact_ids = [trip.contact1, trip.contact2, trip.contact3]
-            log.info(f"[MyContacts] Owner email contact_ids from trips table: {contact_ids}")
-            contact_ids = [c for c in contact_ids if c is not None]
-            log.info(f"[MyContacts] Owner email contact_ids (filtered): {contact_ids}")
-
-            if contact_ids:
-                email_contacts = connection.execute(
-                    sqlalchemy.text(
-                        "SELECT id, name, email FROM contacts WHERE id = ANY(:ids)"
-                    ),
-                    {"ids": contact_ids}
-                ).fetchall()
-                log.info(f"[MyContacts] Owner email_contacts query returned {len(email_contacts)} rows")
-
-                for c in email_contacts:
-                    contacts.append(TripContactResponse(
-                        type="email",
-                        contact_id=c.id,
-                        name=c.name,
-                        email=c.email
-                    ))
-
-            # Get friend contacts from trip_safety_contacts
-            friend_rows = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT tsc.friend_user_id, u.first_name, u.last_name, u.profile_photo_url
-                    FROM trip_safety_contacts tsc
-                    JOIN users u ON tsc.friend_user_id = u.id
-                    WHERE tsc.trip_id = :trip_id AND tsc.friend_user_id IS NOT NULL
-                    ORDER BY tsc.position
-                    """
-                ),
-                {"trip_id": trip_id}
-            ).fetchall()
-            log.info(f"[MyContacts] Owner friend_rows query returned {len(friend_rows)} rows")
-
-            for f in friend_rows:
-                contacts.append(TripContactResponse(
-                    type="friend",
-                    friend_user_id=f.friend_user_id,
-                    friend_name=f"{f.first_name} {f.last_name}".strip() or None,
-                    profile_photo_url=f.profile_photo_url
-                ))
-
-            log.info(f"[MyContacts] Owner total contacts: {len(contacts)}")
-
-        else:
-            # Participant: check they have accepted the trip
+        if trip.user_id != user_id:
+            # Participant: check they have been added to the trip
             participant = connection.execute(
                 sqlalchemy.text(
                     """
@@ -2501,66 +2509,150 @@ def get_my_trip_contacts(trip_id: int, user_id: int = Depends(auth.get_current_u
                     detail="Trip not found or access denied"
                 )
 
-            # Debug: Get raw count from participant_trip_contacts
-            ptc_count = connection.execute(
-                sqlalchemy.text(
-                    "SELECT COUNT(*) FROM participant_trip_contacts WHERE trip_id = :trip_id AND participant_user_id = :user_id"
-                ),
-                {"trip_id": trip_id, "user_id": user_id}
-            ).scalar() or 0
-            log.info(f"[MyContacts] Participant has {ptc_count} rows in participant_trip_contacts")
+        contacts = _load_my_trip_contacts(connection, trip, user_id)
+        log.info(f"[MyContacts] trip_id={trip_id}, user_id={user_id}, is_owner={trip.user_id == user_id}, contacts={len(contacts)}")
 
-            # Get participant's contacts from participant_trip_contacts
-            # Email contacts
-            email_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT c.id, c.name, c.email
-                    FROM participant_trip_contacts ptc
-                    JOIN contacts c ON ptc.contact_id = c.id
-                    WHERE ptc.trip_id = :trip_id AND ptc.participant_user_id = :user_id
-                    ORDER BY ptc.position
-                    """
-                ),
-                {"trip_id": trip_id, "user_id": user_id}
-            ).fetchall()
-            log.info(f"[MyContacts] Participant email_contacts query returned {len(email_contacts)} rows")
-
-            for c in email_contacts:
-                contacts.append(TripContactResponse(
-                    type="email",
-                    contact_id=c.id,
-                    name=c.name,
-                    email=c.email
-                ))
+        return MyTripContactsResponse(contacts=contacts)
 
-            # Friend contacts
-            friend_contacts = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT ptc.friend_user_id, u.first_name, u.last_name, u.profile_photo_url
-                    FROM participant_trip_contacts ptc
-                    JOIN users u ON ptc.friend_user_id = u.id
-                    WHERE ptc.trip_id = :trip_id AND ptc.participant_user_id = :user_id
-                        AND ptc.friend_user_id IS NOT NULL
-                    ORDER BY ptc.position
-                    """
-                ),
-                {"trip_id": trip_id, "user_id": user_id}
-            ).fetchall()
-            log.info(f"[MyContacts] Participant friend_contacts query returned {len(friend_contacts)} rows")
-
-            for f in friend_contacts:
-                contacts.append(TripContactResponse(
-                    type="friend",
-                    friend_user_id=f.friend_user_id,
-                    friend_name=f"{f.first_name} {f.last_name}".strip() or None,
-                    profile_photo_url=f.profile_photo_url
-                ))
 
-            log.info(f"[MyContacts] Participant total contacts: {len(contacts)}")
+# ==================== Trip Detail ====================
 
-        return MyTripContactsResponse(contacts=contacts)
+TRIP_DETAIL_SECTIONS = ("trip", "timeline", "participants", "locations", "my_contacts")
+
+
+class TripDetailResponse(BaseModel):
+    """Everything the trip screen shows, loaded behind a single access check.
+
+    Sections not requested via include=, or whose version matched the one the
+    client sent in versions=, are left as None and listed in `unchanged` for the latter.
+    """
+    trip_id: int
+    version: str  # Changes whenever any returned section's version changes
+    versions: dict[str, str]  # Per-section content version
+    unchanged: list[str] = []
+    trip: TripResponse | None = None
+    timeline: list[TimelineEvent] | None = None
+    participants: ParticipantListResponse | None = None
+    locations: list[ParticipantLocationResponse] | None = None
+    my_contacts: list[TripContactResponse] | None = None
+
+
+def _parse_csv_param(value: str | None) -> list[str]:
+    """Split a comma-separated query parameter, dropping blanks."""
+    if not value:
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _section_version(section: BaseModel | list[BaseModel]) -> str:
+    """Short content hash of a serialized section, stable across requests."""
+    if isinstance(section, list):
+        payload = [item.model_dump(mode="json") for item in section]
+    else:
+        payload = section.model_dump(mode="json")
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+@router.get("/{trip_id}/detail", response_model=TripDetailResponse)
+def get_trip_detail(
+    trip_id: int,
+    include: str | None = None,
+    versions: str | None = None,
+    user_id: int = Depends(auth.get_current_user_id)
+):
+    """Get a trip and its sub-resources in one request.
+
+    Replaces the GET /trips/{id}, /timeline, /participants, /locations and
+    /my-contacts round trips when opening a trip: access is checked once
+    (owner or accepted participant) on the same query that loads the trip,
+    and every section runs in the same transaction.
+
+    Args:
+        include: Comma-separated sections to return (default: all of
+            trip, timeline, participants, locations, my_contacts)
+        versions: Comma-separated section:version pairs from a previous
+            response; sections whose version is unchanged are omitted
+    """
+    sections = _parse_csv_param(include) or list(TRIP_DETAIL_SECTIONS)
+    unknown = [name for name in sections if name not in TRIP_DETAIL_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include section(s): {', '.join(unknown)}"
+        )
+
+    known_versions: dict[str, str] = {}
+    for pair in _parse_csv_param(versions):
+        name, _, version = pair.partition(":")
+        known_versions[name] = version
+
+    with db.engine.begin() as connection:
+        trip = connection.execute(
+            sqlalchemy.text(
+                """
+                SELECT t.id, t.user_id, t.title, t.start, t.eta, t.grace_min,
+                       t.location_text, t.gen_lat, t.gen_lon,
+                       t.start_location_text, t.start_lat, t.start_lon, t.has_separate_locations,
+                       t.notes, t.status, t.completed_at,
+                       t.last_checkin, t.created_at, t.contact1, t.contact2, t.contact3,
+                       t.checkin_token, t.checkout_token,
+                       t.checkin_interval_min, t.notify_start_hour, t.notify_end_hour,
+                       t.timezone, t.start_timezone, t.eta_timezone, t.notify_self, t.share_live_location,
+                       t.is_group_trip, t.group_settings,
+                       t.custom_start_message, t.custom_overdue_message,
+                       a.id as activity_id, a.name as activity_name, a.icon as activity_icon,
+                       a.default_grace_minutes, a.colors as activity_colors,
+                       a.messages as activity_messages, a.safety_tips, a."order" as activity_order,
+                       (SELECT COUNT(*) FROM trip_participants WHERE trip_id = t.id AND status = 'accepted') as participant_count
+                FROM trips t
+                JOIN activities a ON t.activity = a.id
+                WHERE t.id = :trip_id
+                AND (
+                    t.user_id = :user_id
+                    OR EXISTS (
+                        SELECT 1 FROM trip_participants tp
+                        WHERE tp.trip_id = t.id AND tp.user_id = :user_id AND tp.status = 'accepted'
+                    )
+                )
+                """
+            ),
+            {"trip_id": trip_id, "user_id": user_id}
+        ).fetchone()
+
+        if not trip:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Trip not found"
+            )
+
+        loaded: dict[str, BaseModel | list[BaseModel]] = {}
+        for name in sections:
+            if name == "trip":
+                friend_contacts = _get_friend_contacts_for_trip(connection, trip.id)
+                loaded[name] = _trip_response(trip._mapping, friend_contacts)
+            elif name == "timeline":
+                loaded[name] = _load_timeline(connection, trip.id)
+            elif name == "participants":
+                loaded[name] = _load_participant_list(connection, trip, user_id)
+            elif name == "locations":
+                loaded[name] = _load_participant_locations(connection, trip, user_id)
+            elif name == "my_contacts":
+                loaded[name] = _load_my_trip_contacts(connection, trip, user_id)
+
+    section_versions = {name: _section_version(section) for name, section in loaded.items()}
+    unchanged = [name for name, version in section_versions.items() if known_versions.get(name) == version]
+    overall = hashlib.sha256(
+        ",".join(f"{name}:{section_versions[name]}" for name in sorted(section_versions)).encode()
+    ).hexdigest()[:16]
+
+    return TripDetailResponse(
+        trip_id=trip_id,
+        version=overall,
+        versions=section_versions,
+        unchanged=unchanged,
+        **{name: section for name, section in loaded.items() if name not in unchanged}
+    )
 
 
 # ==================== Live Location Sharing ====================
@@ -2579,6 +2671,83 @@ class LiveLocationResponse(BaseModel):
     message: str
 
 
+# Largest batch of buffered fixes accepted in one upload
+MAX_LIVE_LOCATION_BATCH = 1000
+# Fixes stamped further ahead of the server clock than this are rejected
+LIVE_LOCATION_MAX_CLOCK_SKEW = timedelta(minutes=2)
+
+
+class LiveLocationFix(LiveLocationUpdate):
+    """A location fix buffered on the device, with the time it was recorded."""
+    timestamp: datetime
+
+
+class LiveLocationBatch(BaseModel):
+    """Request body for uploading buffered live location fixes."""
+    fixes: list[LiveLocationFix] = Field(min_length=1, max_length=MAX_LIVE_LOCATION_BATCH)
+
+
+class LiveLocationBatchResponse(BaseModel):
+    ok: bool
+    message: str
+    received: int
+    inserted: int
+    duplicates: int  # Fixes already stored or repeated within the batch
+
+
+def _check_live_location_access(connection, trip_id: int, user_id: int):
+    """Load a trip for a live location upload, raising unless the user may upload.
+
+    Requires the trip to belong to the user or the user to be an accepted
+    participant, the trip to be active and live location sharing to be enabled.
+    """
+    # Get trip details
+    trip = connection.execute(
+        _LIVE_LOCATION_TRIP,
+        {"trip_id": trip_id}
+    ).fetchone()
+
+    if not trip:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found"
+        )
+
+    # Check if user has access (owner or accepted participant)
+    is_owner = trip.user_id == user_id
+    is_accepted_participant = False
+
+    if not is_owner and trip.is_group_trip:
+        participant = connection.execute(
+            _LIVE_LOCATION_PARTICIPANT,
+            {"trip_id": trip_id, "user_id": user_id}
+        ).fetchone()
+        is_accepted_participant = participant is not None
+
+    if not is_owner and not is_accepted_participant:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to update location for this trip"
+        )
+
+    # Check if trip is in an active state
+    active_statuses = ('active', 'overdue', 'overdue_notified')
+    if trip.status not in active_statuses:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Trip is not active (status: {trip.status})"
+        )
+
+    # Check if live location sharing is enabled for this trip
+    if not trip.share_live_location:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Live location sharing is not enabled for this trip"
+        )
+
+    return trip
+
+
 @router.post("/{trip_id}/live-location", response_model=LiveLocationResponse)
 def update_live_location(
     trip_id: int,
@@ -2599,74 +2768,14 @@ def update_live_location(
     - Trip must have share_live_location enabled
     """
     with db.engine.begin() as connection:
-        # Get trip details
-        trip = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT id, user_id, share_live_location, status, is_group_trip
-                FROM trips
-                WHERE id = :trip_id
-                """
-            ),
-            {"trip_id": trip_id}
-        ).fetchone()
-
-        if not trip:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Trip not found"
-            )
-
-        # Check if user has access (owner or accepted participant)
-        is_owner = trip.user_id == user_id
-        is_accepted_participant = False
-
-        if not is_owner and trip.is_group_trip:
-            participant = connection.execute(
-                sqlalchemy.text(
-                    """
-                    SELECT id FROM trip_participants
-                    WHERE trip_id = :trip_id AND user_id = :user_id AND status = 'accepted'
-                    """
-                ),
-                {"trip_id": trip_id, "user_id": user_id}
-            ).fetchone()
-            is_accepted_participant = participant is not None
-
-        if not is_owner and not is_accepted_participant:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You are not authorized to update location for this trip"
-            )
-
-        # Check if trip is in an active state
-        active_statuses = ('active', 'overdue', 'overdue_notified')
-        if trip.status not in active_statuses:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Trip is not active (status: {trip.status})"
-            )
-
-        # Check if live location sharing is enabled for this trip
-        if not trip.share_live_location:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Live location sharing is not enabled for this trip"
-            )
+        _check_live_location_access(connection, trip_id, user_id)
 
         now = datetime.now(UTC)
 
         # Rate limiting: Check if user has updated within the last 10 seconds
         RATE_LIMIT_SECONDS = 10
         last_update = connection.execute(
-            sqlalchemy.text(
-                """
-                SELECT timestamp FROM live_locations
-                WHERE trip_id = :trip_id AND user_id = :user_id
-                ORDER BY timestamp DESC
-                LIMIT 1
-                """
-            ),
+            _LAST_LIVE_LOCATION,
             {"trip_id": trip_id, "user_id": user_id}
         ).fetchone()
 
@@ -2696,13 +2805,7 @@ def update_live_location(
 
         # Insert the new location
         connection.execute(
-            sqlalchemy.text(
-                """
-                INSERT INTO live_locations
-                (trip_id, user_id, latitude, longitude, altitude, horizontal_accuracy, speed, timestamp)
-                VALUES (:trip_id, :user_id, :lat, :lon, :alt, :acc, :speed, :ts)
-                """
-            ),
+            _INSERT_LIVE_LOCATION,
             {
                 "trip_id": trip_id,
                 "user_id": user_id,
@@ -2715,27 +2818,79 @@ def update_live_location(
             }
         )
 
-        # Clean up old locations (keep last 100 per trip)
-        connection.execute(
-            sqlalchemy.text(
-                """
-                DELETE FROM live_locations
-                WHERE trip_id = :trip_id AND id NOT IN (
-                    SELECT id FROM live_locations
-                    WHERE trip_id = :trip_id
-                    ORDER BY timestamp DESC
-                    LIMIT 100
-                )
-                """
-            ),
-            {"trip_id": trip_id}
-        )
+        # Pack older locations into the compact track once a full chunk has built up
+        live_tracks.compact_if_needed(connection, trip_id, user_id)
 
         log.info(f"[LiveLocation] Updated location for trip {trip_id}: {body.latitude}, {body.longitude}")
 
         return LiveLocationResponse(ok=True, message="Location updated")
 
 
+@router.post("/{trip_id}/live-location/batch", response_model=LiveLocationBatchResponse)
+def upload_live_locations(
+    trip_id: int,
+    body: LiveLocationBatch,
+    user_id: int = Depends(auth.get_current_user_id)
+):
+    """Upload live location fixes buffered while the device was offline.
+
+    The iOS app queues fixes while it has no signal and flushes them in one
+    request when it reconnects. Fixes are stored with the time the device
+    recorded them, so the per-update rate limit of POST /live-location does
+    not apply. Fixes already stored (e.g. a retried upload) and repeated
+    timestamps within the batch are skipped.
+
+    Access requirements are the same as for POST /live-location. Fixes older
+    than an already compacted part of the track are merged into it by time
+    when the track is read.
+    """
+    now = datetime.now(UTC)
+
+    # Deduplicate by timestamp (first fix wins) and order oldest first
+    fixes: dict[datetime, LiveLocationFix] = {}
+    for fix in body.fixes:
+        timestamp = fix.timestamp if fix.timestamp.tzinfo else fix.timestamp.replace(tzinfo=UTC)
+        if timestamp > now + LIVE_LOCATION_MAX_CLOCK_SKEW:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Location timestamp {fix.timestamp.isoformat()} is in the future"
+            )
+        # live_locations.timestamp is stored as naive UTC
+        fixes.setdefault(timestamp.astimezone(UTC).replace(tzinfo=None), fix)
+    ordered = sorted(fixes.items())
+
+    with db.engine.begin() as connection:
+        _check_live_location_access(connection, trip_id, user_id)
+
+        # One multi-row insert; the latest position (newest timestamp) changes atomically with it
+        inserted = connection.execute(
+            _INSERT_LIVE_LOCATION_BATCH,
+            {
+                "trip_id": trip_id,
+                "user_id": user_id,
+                "lats": [fix.latitude for _, fix in ordered],
+                "lons": [fix.longitude for _, fix in ordered],
+                "alts": [fix.altitude for _, fix in ordered],
+                "accs": [fix.horizontal_accuracy for _, fix in ordered],
+                "speeds": [fix.speed for _, fix in ordered],
+                "timestamps": [timestamp for timestamp, _ in ordered],
+            }
+        ).scalar_one()
+
+        # Pack older locations into the compact track once a full chunk has built up
+        live_tracks.compact_if_needed(connection, trip_id, user_id)
+
+    log.info(f"[LiveLocation] Stored {inserted}/{len(body.fixes)} buffered locations for trip {trip_id}")
+
+    return LiveLocationBatchResponse(
+        ok=True,
+        message=f"Stored {inserted} locations",
+        received=len(body.fixes),
+        inserted=inserted,
+        duplicates=len(body.fixes) - inserted
+    )
+
+
 @router.post("/debug/check-overdue")
 async def debug_check_overdue(user_id: int = Depends(auth.get_current_user_id)):
     """Debug endpoint to manually trigger overdue check.
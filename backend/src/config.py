@@ -94,6 +94,66 @@ class Settings:
     # Notification backend settings
     EMAIL_BACKEND: str = os.getenv("EMAIL_BACKEND", "console")  # "resend" or "console"
     PUSH_BACKEND: str = os.getenv("PUSH_BACKEND", "dummy")  # "apns" or "dummy"
+    # Data-refresh pushes for the same user, sync type and trip within this many seconds are
+    # sent as one (see services/refresh_coalescer.py); 0 sends each immediately
+    REFRESH_PUSH_COALESCE_SECONDS: float = float(os.getenv("REFRESH_PUSH_COALESCE_SECONDS", "2"))
+
+    # Observability settings
+    # Bearer token required by GET /metrics outside DEV_MODE (endpoint disabled when empty)
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    # Requests above either threshold are logged as warnings with their slowest statement
+    SLOW_REQUEST_QUERY_THRESHOLD: int = int(os.getenv("SLOW_REQUEST_QUERY_THRESHOLD", "50"))
+    SLOW_REQUEST_DB_MS_THRESHOLD: float = float(os.getenv("SLOW_REQUEST_DB_MS_THRESHOLD", "500"))
+
+    # Response optimization settings
+    # JSON bodies at least this large are gzip-compressed for clients sending Accept-Encoding: gzip
+    GZIP_MINIMUM_SIZE: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1000"))
+    GZIP_COMPRESS_LEVEL: int = int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))  # 1 (fastest) - 9 (smallest)
+
+    # Cold start settings
+    # Import each API router on the first request under its prefix instead of at startup
+    # (see api/lazy_routers.py); for serverless deployments, where every cold start pays for it
+    LAZY_ROUTERS: bool = os.getenv("LAZY_ROUTERS", "false").lower() == "true"
+
+    # Friend graph settings
+    # Seconds a per-process friend set stays cached (see services/friendships.py); 0 disables the cache
+    FRIEND_CACHE_TTL_SECONDS: float = float(os.getenv("FRIEND_CACHE_TTL_SECONDS", "30"))
+
+    # Magic link settings
+    # Seconds a repeated /t/{token}/checkin or /checkout click gets the first response instead of
+    # running again (see services/magic_links.py); 0 disables it
+    MAGIC_LINK_DEDUPE_SECONDS: float = float(os.getenv("MAGIC_LINK_DEDUPE_SECONDS", "30"))
+
+    # Data retention settings (see services/retention.py)
+    LIVE_LOCATION_RETENTION_DAYS: int = int(os.getenv("LIVE_LOCATION_RETENTION_DAYS", "7"))
+    NOTIFICATION_LOG_RETENTION_DAYS: int = int(os.getenv("NOTIFICATION_LOG_RETENTION_DAYS", "90"))
+
+    # Database pool settings
+    # API pool, used by request handlers. FastAPI runs sync endpoints on a 40-thread pool,
+    # so requests beyond pool size + overflow queue here (see homebound_db_pool_* metrics)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "3"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "7"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a connection
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "300"))
+    # Pre-ping costs a round trip per checkout. When false, a connection that fails with a
+    # disconnect error is invalidated along with every older pooled connection instead
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Compiled-statement cache entries per engine (SQLAlchemy's default is 500)
+    DB_QUERY_CACHE_SIZE: int = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+    # Pool for async endpoints (asyncpg, see database.async_engine). Waiting for one of these
+    # connections doesn't hold a thread, so it can be small relative to the requests it serves
+    ASYNC_DB_POOL_SIZE: int = int(os.getenv("ASYNC_DB_POOL_SIZE", "5"))
+    ASYNC_DB_MAX_OVERFLOW: int = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "10"))
+    # Separate pool for scheduler jobs so background sweeps can't take API connections
+    SCHEDULER_DB_POOL_SIZE: int = int(os.getenv("SCHEDULER_DB_POOL_SIZE", "2"))
+    SCHEDULER_DB_MAX_OVERFLOW: int = int(os.getenv("SCHEDULER_DB_MAX_OVERFLOW", "3"))
+
+    # Background scheduler settings
+    # Run the scheduler inside web processes; set false when a standalone worker
+    # (python -m src.services.scheduler) handles background jobs
+    RUN_SCHEDULER_IN_WEB: bool = os.getenv("RUN_SCHEDULER_IN_WEB", "true").lower() == "true"
+    # Only the process holding the leader lease runs jobs; standbys take over after it expires
+    SCHEDULER_LEADER_LEASE_SECONDS: int = int(os.getenv("SCHEDULER_LEADER_LEASE_SECONDS", "30"))
 
 
 @lru_cache
@@ -1,13 +1,47 @@
+import asyncio
 import logging
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 
 from src import config
+from src.services import query_metrics
 
 logger = logging.getLogger(__name__)
 
+settings = config.get_settings()
+
 # Get connection URL from config
-connection_url = config.get_settings().POSTGRES_URI
+connection_url = settings.POSTGRES_URI
+
+
+def _create_pooled_engine(url: str, name: str, pool_size: int, max_overflow: int):
+    """Create a PostgreSQL engine with its own connection pool.
+
+    The pool name labels the homebound_db_pool_* metrics (see query_metrics).
+    """
+    pooled_engine = create_engine(
+        url,
+        poolclass=query_metrics.TimedQueuePool,  # QueuePool that reports checkout wait and pool usage
+        pool_logging_name=name,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,  # Verify connections before using (one round trip per checkout)
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,  # Recycle connections (Transaction mode preference)
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,  # Compiled SQL cache (see services/statements.py)
+        echo=False  # Set to True for SQL debugging
+    )
+    logger.info(
+        f"SQLAlchemy engine '{name}' created with pool_size={pool_size}, max_overflow={max_overflow}, "
+        f"pre_ping={settings.DB_POOL_PRE_PING}"
+    )
+    return pooled_engine
+
 
 # Check if using SQLite (for local development)
 if connection_url.startswith("sqlite"):
@@ -17,6 +51,7 @@ if connection_url.startswith("sqlite"):
         connect_args={"check_same_thread": False},  # Required for SQLite with FastAPI
         echo=False
     )
+    scheduler_engine = engine
     logger.info("Using SQLite database")
 else:
     # PostgreSQL configuration
@@ -37,14 +72,116 @@ else:
         separator = "&" if "?" in connection_url else "?"
         connection_url = f"{connection_url}{separator}sslmode=require"
 
-    # Create engine with connection pooling settings optimized for Supabase Transaction Mode
-    # Transaction mode can handle many more concurrent connections via multiplexing
-    engine = create_engine(
-        connection_url,
-        pool_pre_ping=True,  # Verify connections before using
-        pool_size=3,  # Reduced base pool size for better connection management
-        max_overflow=7,  # Allow up to 7 additional connections (10 total max)
-        pool_recycle=300,  # Recycle connections after 5 minutes (Transaction mode preference)
-        echo=False  # Set to True for SQL debugging
+    # Request handlers and background jobs get separate pools, so a scheduler sweep
+    # holding connections can't make API requests queue for one (and vice versa)
+    engine = _create_pooled_engine(
+        connection_url, "api", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    )
+    scheduler_engine = _create_pooled_engine(
+        connection_url, "scheduler", settings.SCHEDULER_DB_POOL_SIZE, settings.SCHEDULER_DB_MAX_OVERFLOW
+    )
+
+# Per-request query counting and timing, plus pool telemetry (see src/services/query_metrics.py)
+query_metrics.install(engine)
+query_metrics.install(scheduler_engine)
+
+# Helpers shared by request handlers and scheduler jobs (notifications, account
+# deletion) connect through current_engine(). Scheduler jobs run inside
+# scheduler_pool(), so those helpers take scheduler connections there too.
+# The flag is a context variable: asyncio tasks and asyncio.to_thread() carry it.
+_on_scheduler_pool: ContextVar[bool] = ContextVar("db_on_scheduler_pool", default=False)
+
+
+def current_engine():
+    """The scheduler engine inside scheduler_pool(), the API engine otherwise."""
+    return scheduler_engine if _on_scheduler_pool.get() else engine
+
+
+@contextmanager
+def scheduler_pool():
+    """Route current_engine() to the scheduler pool for the enclosed code."""
+    token = _on_scheduler_pool.set(True)
+    try:
+        yield
+    finally:
+        _on_scheduler_pool.reset(token)
+
+
+# ==================== Async engine ====================
+# Async endpoints use asyncpg (aiosqlite for local SQLite) through their own
+# pool, so a request waiting on the database yields the event loop instead of
+# holding one of FastAPI's threadpool threads. asyncpg connections belong to
+# the event loop that opened them; the server runs one loop, but tests and
+# scripts driving handlers with asyncio.run() start many, so each running loop
+# gets its own engine. Close it with dispose_async_engine() before the loop ends.
+
+_async_engines: dict = {}
+_async_engines_lock = threading.Lock()
+
+
+def _async_url():
+    url = make_url(connection_url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    query = dict(url.query)
+    # asyncpg calls libpq's sslmode "ssl"
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(drivername="postgresql+asyncpg", query=query)
+
+
+def _create_async_engine():
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = _async_url()
+    if url.get_backend_name() == "sqlite":
+        return create_async_engine(url, echo=False)
+
+    connect_args = {}
+    if url.port == 6543:
+        # Supabase transaction mode: each transaction may run on a different server
+        # connection, so prepared statements must not be cached or reuse names
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    pooled_engine = create_async_engine(
+        url,
+        poolclass=query_metrics.TimedAsyncQueuePool,
+        pool_logging_name="api_async",
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_size=settings.ASYNC_DB_POOL_SIZE,
+        max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=connect_args,
+        echo=False
     )
-    logger.info("SQLAlchemy engine created with pool_size=3, max_overflow=7")
+    query_metrics.install(pooled_engine.sync_engine)
+    return pooled_engine
+
+
+def async_engine():
+    """The async engine for the running event loop, created on first use.
+
+    Usage:
+        async with db.async_engine().begin() as connection:
+            row = (await connection.execute(statement, params)).fetchone()
+    """
+    loop = asyncio.get_running_loop()
+    with _async_engines_lock:
+        engine_for_loop = _async_engines.get(loop)
+        if engine_for_loop is None:
+            engine_for_loop = _async_engines[loop] = _create_async_engine()
+            logger.info(f"Async engine created with pool_size={settings.ASYNC_DB_POOL_SIZE}")
+        return engine_for_loop
+
+
+async def dispose_async_engine() -> None:
+    """Close the running loop's async engine and its pooled connections."""
+    with _async_engines_lock:
+        engine_for_loop = _async_engines.pop(asyncio.get_running_loop(), None)
+    if engine_for_loop is not None:
+        await engine_for_loop.dispose()
@@ -27,8 +27,8 @@ class DummyPush:
         log.debug("[DUMMY PUSH] token=%s title=%r body=%r data=%s category=%s", device_token, title, body, data, category)
         return PushResult(ok=True, status=200, detail="dummy")
 
-    async def send_background(self, device_token: str, data: dict) -> PushResult:
-        log.debug("[DUMMY BACKGROUND PUSH] token=%s data=%s", device_token, data)
+    async def send_background(self, device_token: str, data: dict, collapse_id: str | None = None) -> PushResult:
+        log.debug("[DUMMY BACKGROUND PUSH] token=%s data=%s collapse_id=%s", device_token, data, collapse_id)
         return PushResult(ok=True, status=200, detail="dummy")
 
 
@@ -124,7 +124,7 @@ class APNsClient:
                 detail = r.text or r.headers.get("apns-id", "unknown error")
         return PushResult(ok=ok, status=r.status_code, detail=detail)
 
-    async def send_background(self, device_token: str, data: dict) -> PushResult:
+    async def send_background(self, device_token: str, data: dict, collapse_id: str | None = None) -> PushResult:
         """Send a background push notification that wakes the app.
 
         Uses apns-push-type: background with content-available: 1
@@ -133,6 +133,8 @@ class APNsClient:
         Args:
             device_token: The APNs device token
             data: Custom data payload to include
+            collapse_id: Optional apns-collapse-id; APNs keeps only the newest
+                undelivered push with the same id
 
         Returns:
             PushResult with ok status and details
@@ -146,6 +148,8 @@ class APNsClient:
             "apns-priority": "5",  # Must be 5 for background pushes (not 10)
             "content-type": "application/json",
         }
+        if collapse_id:
+            headers["apns-collapse-id"] = collapse_id
         payload: dict[str, Any] = {
             "aps": {
                 "content-available": 1  # Required for background wake
@@ -245,7 +249,9 @@ class DummyPushWithLiveActivity(DummyPush):
         live_activity_token: str,
         content_state: dict,
         event: str = "update",
-        timestamp: int | None = None
+        timestamp: int | None = None,
+        stale_date: int | None = None,
+        relevance_score: int = 100
     ) -> PushResult:
         log.debug("[DUMMY LIVE ACTIVITY] token=%s... event=%s state=%s", live_activity_token[:20], event, content_state)
         return PushResult(ok=True, status=200, detail="dummy")
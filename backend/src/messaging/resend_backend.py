@@ -5,9 +5,11 @@ import re
 from pathlib import Path
 from typing import Any, cast
 
-import resend
-
 from ..config import settings
+from ..services.lazy_imports import lazy_import
+
+# The SDK is only needed once an email is sent
+resend = lazy_import("resend")
 
 # Template directory
 TEMPLATES_DIR = Path(__file__).parent / "emails"
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+Benchmark account export and deletion against a seeded heavy user.
+
+Seeds one user with many trips, events and contacts, then measures:
+- /profile/export (fully materialized JSON) vs /profile/export/stream (NDJSON)
+  wall time and peak Python memory
+- batched account deletion: total time, number of transactions and the
+  longest single transaction (the longest time any lock is held)
+
+Usage:
+    python -m src.scripts.bench_account_data
+    python -m src.scripts.bench_account_data --trips 20000 --events-per-trip 10 --batch-size 1000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import sqlalchemy
+
+from .. import database as db
+from ..services import account_data
+
+BENCH_EMAIL = "bench-heavy-user@homeboundapp.com"
+
+# Rows per multi-row INSERT while seeding
+SEED_CHUNK_SIZE = 1000
+
+
+def seed_heavy_user(trips: int, events_per_trip: int, contacts: int) -> int:
+    """Create (or recreate) the benchmark user and return its id."""
+    with db.engine.begin() as conn:
+        existing = conn.execute(
+            sqlalchemy.text("SELECT id FROM users WHERE email = :email"),
+            {"email": BENCH_EMAIL}
+        ).fetchone()
+    if existing:
+        account_data.delete_user_data(existing.id, batch_size=5000)
+
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        user_id = conn.execute(
+            sqlalchemy.text("""
+                INSERT INTO users (email, first_name, last_name, age, subscription_tier)
+                VALUES (:email, 'Bench', 'User', 40, 'plus')
+                RETURNING id
+            """),
+            {"email": BENCH_EMAIL}
+        ).fetchone()[0]
+
+        conn.execute(
+            sqlalchemy.text("""
+                INSERT INTO contacts (user_id, name, email)
+                SELECT :user_id, 'Contact ' || n, 'bench-contact-' || n || '@example.com'
+                FROM generate_series(1, :contacts) AS n
+            """),
+            {"user_id": user_id, "contacts": contacts}
+        )
+        contact_id = conn.execute(
+            sqlalchemy.text("SELECT MIN(id) FROM contacts WHERE user_id = :user_id"),
+            {"user_id": user_id}
+        ).scalar()
+        activity_id = conn.execute(sqlalchemy.text("SELECT MIN(id) FROM activities")).scalar()
+
+    # Trips and events in bounded multi-row chunks
+    for offset in range(0, trips, SEED_CHUNK_SIZE):
+        count = min(SEED_CHUNK_SIZE, trips - offset)
+        with db.engine.begin() as conn:
+            conn.execute(
+                sqlalchemy.text("""
+                    WITH new_trips AS (
+                        INSERT INTO trips (user_id, title, activity, start, eta, grace_min,
+                                           location_text, gen_lat, gen_lon, contact1, status,
+                                           notes, completed_at)
+                        SELECT :user_id, 'Bench trip ' || n, :activity,
+                               :now - (n || ' hours')::interval,
+                               :now - (n || ' hours')::interval + interval '2 hours',
+                               30, 'Bench Trailhead', 37.7, -122.4, :contact_id, 'completed',
+                               'Seeded for benchmarking', :now
+                        FROM generate_series(:first, :last) AS n
+                        RETURNING id
+                    )
+                    INSERT INTO events (user_id, trip_id, what, timestamp)
+                    SELECT :user_id, new_trips.id, 'checkin', :now
+                    FROM new_trips, generate_series(1, :events_per_trip)
+                """),
+                {
+                    "user_id": user_id,
+                    "activity": activity_id,
+                    "contact_id": contact_id,
+                    "now": now - timedelta(days=1),
+                    "first": offset + 1,
+                    "last": offset + count,
+                    "events_per_trip": events_per_trip,
+                }
+            )
+
+    return user_id
+
+
+def _measure(fn) -> tuple[float, int]:
+    """Run fn, returning (seconds, peak traced bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_export(user_id: int) -> None:
+    from ..api.profile import export_user_data
+
+    def full_export():
+        export_user_data(user_id=user_id)
+
+    def stream_export():
+        for _ in account_data.iter_user_export_ndjson(user_id):
+            pass
+
+    full_s, full_peak = _measure(full_export)
+    stream_s, stream_peak = _measure(stream_export)
+
+    print("\nExport")
+    print(f"  JSON (materialized): {full_s * 1000:8.1f} ms   peak {full_peak / 1024 / 1024:7.1f} MiB")
+    print(f"  NDJSON (streamed):   {stream_s * 1000:8.1f} ms   peak {stream_peak / 1024 / 1024:7.1f} MiB")
+
+
+def bench_delete(user_id: int, batch_size: int) -> None:
+    batch_times: list[float] = []
+    last = [time.perf_counter()]
+
+    def on_progress(step: str, deleted: int) -> None:
+        now = time.perf_counter()
+        batch_times.append(now - last[0])
+        last[0] = now
+
+    start = time.perf_counter()
+    counts = account_data.delete_user_data(user_id, batch_size=batch_size, on_progress=on_progress)
+    total = time.perf_counter() - start
+
+    print(f"\nDeletion (batch_size={batch_size})")
+    print(f"  Rows deleted:          {sum(counts.values())}")
+    print(f"  Total time:            {total * 1000:8.1f} ms")
+    print(f"  Batches:               {len(batch_times)}")
+    if batch_times:
+        print(f"  Longest batch:         {max(batch_times) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark account export and deletion for a heavy user"
+    )
+    parser.add_argument("--trips", type=int, default=5000, help="Trips to seed")
+    parser.add_argument("--events-per-trip", type=int, default=10, help="Events per trip")
+    parser.add_argument("--contacts", type=int, default=50, help="Contacts to seed")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=account_data.DELETION_BATCH_SIZE,
+        help="Rows per deletion batch"
+    )
+
+    args = parser.parse_args()
+
+    print(
+        f"Seeding heavy user: {args.trips} trips, "
+        f"{args.trips * args.events_per_trip} events, {args.contacts} contacts..."
+    )
+    start = time.perf_counter()
+    user_id = seed_heavy_user(args.trips, args.events_per_trip, args.contacts)
+    print(f"Seeded user {user_id} in {time.perf_counter() - start:.1f} s")
+
+    bench_export(user_id)
+    bench_delete(user_id, args.batch_size)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+"""
+Benchmark hot API endpoints and scheduler jobs against generated load data.
+
+Seeds a dataset with src.scripts.loadgen (unless --skip-seed), then reports
+p50/p99 latency and SQL queries per call for:
+- GET  /api/v1/trips/                   (trip list)
+- GET  /api/v1/friends/                 (friend list)
+- GET  /api/v1/friends/active-trips     (friends' active trips feed)
+- GET  /api/v1/trips/{id}/participants  (group trip participants)
+- POST /api/v1/trips/{id}/live-location (live location ingest)
+- scheduler sweeps: check_overdue_trips, check_push_notifications,
+  check_live_activity_transitions
+
+Requests go through the full ASGI stack in-process (no network); query counts
+are read from each response's Server-Timing header. Push and
+email are forced to the dummy/console backends. The scheduler is not started;
+jobs are invoked directly. Note the first overdue sweep does the real work of
+notifying contacts for the seeded overdue trips; later sweeps are steady state.
+
+Requires PostgreSQL (the app's SQL is Postgres-specific).
+
+Usage:
+    python -m src.scripts.bench_api --users 2000 --requests 200
+    python -m src.scripts.bench_api --skip-seed --requests 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import re
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+
+import sqlalchemy
+
+from .. import database as db
+from ..config import get_settings
+from ..services.query_metrics import track_queries
+from . import loadgen
+
+_SERVER_TIMING_QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class BenchResult:
+    name: str
+    timings_ms: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _timed_request(result: BenchResult, send) -> None:
+    """Time one request; the query count comes from its Server-Timing header."""
+    start = time.perf_counter()
+    response = send()
+    result.timings_ms.append((time.perf_counter() - start) * 1000)
+    match = _SERVER_TIMING_QUERIES_RE.search(response.headers.get("server-timing", ""))
+    result.queries.append(int(match.group(1)) if match else 0)
+    if response.status_code != 200:
+        result.errors += 1
+
+
+def _auth_headers(user_id: int) -> dict[str, str]:
+    from ..api.auth_endpoints import create_jwt_pair
+
+    access, _ = create_jwt_pair(user_id, f"user{user_id}@{loadgen.LOADGEN_EMAIL_DOMAIN}")
+    return {"Authorization": f"Bearer {access}"}
+
+
+def bench_endpoints(data: loadgen.GeneratedData, requests: int) -> list[BenchResult]:
+    from fastapi.testclient import TestClient
+
+    from ..api.server import app
+
+    # No context manager: skips the lifespan, so the scheduler is not started
+    client = TestClient(app)
+    rng = random.Random(0)
+    results = []
+
+    def get(name: str, path_for_user) -> None:
+        result = BenchResult(name)
+        for _ in range(requests):
+            user_id = rng.choice(data.user_ids)
+            headers = _auth_headers(user_id)
+            _timed_request(result, lambda: client.get(path_for_user(user_id), headers=headers))
+        results.append(result)
+
+    get("GET /trips/", lambda _: "/api/v1/trips/")
+    get("GET /friends/", lambda _: "/api/v1/friends/")
+    get("GET /friends/active-trips", lambda _: "/api/v1/friends/active-trips")
+
+    owners = _group_trip_owners(data.group_trip_ids)
+    if owners:
+        result = BenchResult("GET /trips/{id}/participants")
+        for _ in range(requests):
+            trip_id, owner_id = rng.choice(owners)
+            headers = _auth_headers(owner_id)
+            _timed_request(result, lambda: client.get(f"/api/v1/trips/{trip_id}/participants", headers=headers))
+        results.append(result)
+
+    # Live location is rate limited per trip and user, so each trip is posted once
+    if data.live_location_trips:
+        result = BenchResult("POST /trips/{id}/live-location")
+        for trip_id, owner_id in data.live_location_trips[:requests]:
+            headers = _auth_headers(owner_id)
+            body = {"latitude": 37.7749 + rng.random() / 100, "longitude": -122.4194, "speed": 1.1}
+            _timed_request(result, lambda: client.post(
+                f"/api/v1/trips/{trip_id}/live-location", json=body, headers=headers
+            ))
+        results.append(result)
+
+    return results
+
+
+def _group_trip_owners(trip_ids: list[int]) -> list[tuple[int, int]]:
+    if not trip_ids:
+        return []
+    with db.engine.begin() as conn:
+        rows = conn.execute(
+            sqlalchemy.text("SELECT id, user_id FROM trips WHERE id = ANY(:ids)"),
+            {"ids": trip_ids}
+        ).fetchall()
+    return [(r.id, r.user_id) for r in rows]
+
+
+def bench_scheduler(iterations: int) -> list[BenchResult]:
+    from ..services import scheduler
+
+    results = []
+    for name, job in (
+        ("check_overdue_trips", scheduler.check_overdue_trips),
+        ("check_push_notifications", scheduler.check_push_notifications),
+        ("check_live_activity_transitions", scheduler.check_live_activity_transitions),
+    ):
+        result = BenchResult(f"scheduler {name}")
+        for _ in range(iterations):
+            start = time.perf_counter()
+            with track_queries() as stats:
+                asyncio.run(job())
+            result.timings_ms.append((time.perf_counter() - start) * 1000)
+            result.queries.append(stats.query_count)
+        results.append(result)
+    return results
+
+
+def report(results: list[BenchResult]) -> None:
+    print(f"\n{'benchmark':<36} {'n':>5} {'p50 ms':>9} {'p99 ms':>9} {'q/call':>7} {'q max':>6} {'errors':>7}")
+    for r in results:
+        if not r.timings_ms:
+            continue
+        print(
+            f"{r.name:<36} {len(r.timings_ms):>5} "
+            f"{_percentile(r.timings_ms, 50):>9.1f} {_percentile(r.timings_ms, 99):>9.1f} "
+            f"{statistics.mean(r.queries):>7.1f} {max(r.queries):>6} {r.errors:>7}"
+        )
+
+
+def _existing_data() -> loadgen.GeneratedData:
+    """Rebuild benchmark targets from previously generated rows."""
+    data = loadgen.GeneratedData()
+    with db.engine.begin() as conn:
+        data.user_ids = [r.id for r in conn.execute(sqlalchemy.text(
+            f"SELECT id FROM users WHERE email LIKE '%@{loadgen.LOADGEN_EMAIL_DOMAIN}' ORDER BY id"
+        ))]
+        for r in conn.execute(sqlalchemy.text(f"""
+            SELECT t.id, t.user_id, t.status, t.share_live_location, t.is_group_trip
+            FROM trips t JOIN users u ON u.id = t.user_id
+            WHERE u.email LIKE '%@{loadgen.LOADGEN_EMAIL_DOMAIN}'
+        """)):
+            if r.status == "active":
+                data.active_trip_ids.append(r.id)
+                if r.share_live_location:
+                    data.live_location_trips.append((r.id, r.user_id))
+            if r.is_group_trip:
+                data.group_trip_ids.append(r.id)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API endpoints and scheduler jobs")
+    loadgen.add_profile_arguments(parser)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint")
+    parser.add_argument("--scheduler-iterations", type=int, default=5, help="Runs per scheduler job")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse previously generated data")
+    parser.add_argument("--purge", action="store_true", help="Purge generated data before seeding")
+
+    args = parser.parse_args()
+
+    if db.engine.dialect.name != "postgresql":
+        print("bench_api requires PostgreSQL")
+        sys.exit(1)
+
+    # Per-request and per-notification logging is noisy at this volume
+    logging.disable(logging.INFO)
+
+    settings = get_settings()
+    settings.PUSH_BACKEND = "dummy"
+    settings.EMAIL_BACKEND = "console"
+
+    if args.purge:
+        print(f"Purged {loadgen.purge()} generated user(s)")
+
+    if args.skip_seed:
+        data = _existing_data()
+    else:
+        start = time.perf_counter()
+        data = loadgen.generate(loadgen.profile_from_args(args))
+        print(f"Seeded {sum(data.row_counts.values())} rows in {time.perf_counter() - start:.1f} s")
+
+    if not data.user_ids:
+        print("No generated users found - run without --skip-seed")
+        sys.exit(1)
+
+    print(
+        f"Dataset: {len(data.user_ids)} users, {len(data.active_trip_ids)} active trips, "
+        f"{len(data.group_trip_ids)} group trips"
+    )
+
+    results = bench_endpoints(data, args.requests)
+    results += bench_scheduler(args.scheduler_iterations)
+    report(results)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Benchmark cold start: time from spawning the interpreter to the first response.
+
+Each run starts a fresh Python process that imports src.api.server and
+serves one request by calling the ASGI app directly (no server, no network,
+no lifespan, so the scheduler isn't started). The default request,
+GET /api/v1/trips/ without credentials, goes through routing and auth and is
+rejected before touching the database, so the timing covers what a
+serverless cold start pays before it can answer. Runs are repeated with
+routers loaded eagerly and with LAZY_ROUTERS=true, and the median and max
+are reported.
+
+With --max-seconds the script exits non-zero when the median of the checked
+mode exceeds the budget, so CI can catch import-time regressions.
+
+Usage:
+    python -m src.scripts.bench_cold_start --runs 10
+    python -m src.scripts.bench_cold_start --path /health --mode lazy --max-seconds 1.5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Runs in the child: import the app and serve one request through it
+_CHILD = """
+import asyncio, json, sys, time
+from src.api.server import app
+imported = time.perf_counter()
+
+async def request(path):
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }
+    await app(scope, receive, send)
+    return next(m["status"] for m in messages if m["type"] == "http.response.start")
+
+status = asyncio.run(request(sys.argv[1]))
+print(json.dumps({"imported": imported, "status": status}))
+"""
+
+MODES = {"eager": "false", "lazy": "true"}
+
+
+def cold_start(path: str, lazy_routers: str) -> tuple[float, float, int]:
+    """One fresh process. Returns (seconds to app imported, seconds to first response, status)."""
+    env = dict(os.environ, LAZY_ROUTERS=lazy_routers)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, path], capture_output=True, text=True, env=env
+    )
+    finished = time.perf_counter()
+    if result.returncode != 0:
+        raise RuntimeError(f"Cold start failed:\n{result.stderr[-2000:]}")
+
+    # perf_counter is system-wide on Linux/macOS, so the child's marks are comparable;
+    # total time is measured here so interpreter startup and shutdown are included
+    marks = json.loads(result.stdout.strip().splitlines()[-1])
+    return marks["imported"] - started, finished - started, marks["status"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark cold start time to first response")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per mode")
+    parser.add_argument("--path", default="/api/v1/trips/", help="Path of the first request")
+    parser.add_argument(
+        "--mode", choices=[*MODES, "both"], default="both", help="Router loading mode(s) to run"
+    )
+    parser.add_argument(
+        "--max-seconds", type=float, default=None, help="Fail if a mode's median exceeds this"
+    )
+    args = parser.parse_args()
+
+    modes = list(MODES) if args.mode == "both" else [args.mode]
+    over_budget = False
+    print(f"Cold start to first response for GET {args.path} ({args.runs} runs per mode)\n")
+    print(f"  {'mode':<6} {'import p50':>11} {'total p50':>10} {'total max':>10}  status")
+    for mode in modes:
+        runs = [cold_start(args.path, MODES[mode]) for _ in range(args.runs)]
+        imports = [run[0] for run in runs]
+        totals = [run[1] for run in runs]
+        statuses = sorted({run[2] for run in runs})
+        median = statistics.median(totals)
+        print(
+            f"  {mode:<6} {statistics.median(imports) * 1000:9.0f}ms {median * 1000:8.0f}ms "
+            f"{max(totals) * 1000:8.0f}ms  {','.join(map(str, statuses))}"
+        )
+        if args.max_seconds is not None and median > args.max_seconds:
+            over_budget = True
+
+    if over_budget:
+        print(f"\nFAIL: median cold start exceeds the {args.max_seconds:.2f}s budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
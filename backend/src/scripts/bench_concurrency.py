@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+"""
+Benchmark I/O-heavy endpoints under concurrent clients.
+
+Seeds a dataset with src.scripts.loadgen (unless --skip-seed), then for each
+client count opens that many concurrent clients, each sending --requests
+requests back to back, and reports throughput and p50/p95 latency for:
+- GET /t/{token}/checkin             (magic-link check-in, notifies contacts)
+- GET /api/v1/friends/active-trips   (friends' active trips feed, geocodes check-ins)
+
+Requests go through the full ASGI stack in-process (httpx.ASGITransport, no
+network), and a response is complete once its background tasks have run, so
+notification fan-out is part of the timing. Push and email are forced to the
+dummy/console backends. Nominatim is replaced by a stub that answers after
+--geocode-ms, so the geocoding wait is realistic but doesn't depend on (or
+hammer) the real service.
+
+Sync endpoints run on FastAPI's 40-thread pool with the API pool
+(DB_POOL_SIZE + DB_MAX_OVERFLOW connections); async ones wait on the event
+loop with the async pool (ASYNC_DB_POOL_SIZE + ASYNC_DB_MAX_OVERFLOW).
+
+Requires PostgreSQL (the app's SQL is Postgres-specific).
+
+Usage:
+    python -m src.scripts.bench_concurrency --users 2000
+    python -m src.scripts.bench_concurrency --skip-seed --clients 50,200,1000 --requests 2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+
+import sqlalchemy
+
+from .. import database as db
+from ..config import get_settings
+from . import loadgen
+from .bench_api import _auth_headers, _existing_data, _percentile
+
+
+@dataclass
+class ConcurrencyResult:
+    name: str
+    clients: int
+    timings_ms: list[float] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    errors: int = 0
+
+
+def _simulate_geocoder(latency_ms: float) -> None:
+    """Answer reverse geocoding after a fixed delay instead of calling Nominatim."""
+    from ..api import checkin, friends
+    from ..services import geocoding
+
+    def reverse_geocode_sync(lat, lon):
+        time.sleep(latency_ms / 1000)
+        return "Benchmark Trailhead, CA"
+
+    async def reverse_geocode_precise(lat, lon):
+        await asyncio.sleep(latency_ms / 1000)
+        return "Benchmark Trailhead, CA"
+
+    for module in (geocoding, checkin, friends):
+        for name, stub in (("reverse_geocode_sync", reverse_geocode_sync),
+                           ("reverse_geocode_precise", reverse_geocode_precise)):
+            if hasattr(module, name):
+                setattr(module, name, stub)
+
+
+def _checkin_tokens(trip_ids: list[int]) -> list[str]:
+    if not trip_ids:
+        return []
+    with db.engine.begin() as conn:
+        return [r.checkin_token for r in conn.execute(
+            sqlalchemy.text("SELECT checkin_token FROM trips WHERE id = ANY(:ids) AND checkin_token IS NOT NULL"),
+            {"ids": trip_ids}
+        )]
+
+
+async def run_level(client, name: str, clients: int, requests: int, next_request) -> ConcurrencyResult:
+    """Run `clients` concurrent clients, each sending `requests` requests in sequence."""
+    result = ConcurrencyResult(name, clients)
+
+    async def run_client():
+        for _ in range(requests):
+            path, headers = next_request()
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                if response.status_code != 200:
+                    result.errors += 1
+            except Exception:
+                result.errors += 1
+            result.timings_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client() for _ in range(clients)))
+    result.wall_seconds = time.perf_counter() - start
+    return result
+
+
+async def bench(data: loadgen.GeneratedData, levels: list[int], requests: int) -> list[ConcurrencyResult]:
+    import httpx
+
+    from ..api.server import app
+
+    rng = random.Random(0)
+    tokens = _checkin_tokens(data.active_trip_ids)
+    headers_by_user = {user_id: _auth_headers(user_id) for user_id in data.user_ids}
+
+    def checkin_request():
+        return f"/t/{rng.choice(tokens)}/checkin", {}
+
+    def active_trips_request():
+        return "/api/v1/friends/active-trips", headers_by_user[rng.choice(data.user_ids)]
+
+    scenarios = [("GET /friends/active-trips", active_trips_request)]
+    if tokens:
+        scenarios.insert(0, ("GET /t/{token}/checkin", checkin_request))
+
+    results = []
+    # No lifespan: the scheduler is not started
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name, next_request in scenarios:
+                # Warm up pools and caches before timing
+                await run_level(client, name, 10, 1, next_request)
+                for clients in levels:
+                    results.append(await run_level(client, name, clients, requests, next_request))
+    finally:
+        await db.dispose_async_engine()
+    return results
+
+
+def report(results: list[ConcurrencyResult]) -> None:
+    print(f"\n{'benchmark':<30} {'clients':>7} {'n':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for r in results:
+        if not r.timings_ms:
+            continue
+        print(
+            f"{r.name:<30} {r.clients:>7} {len(r.timings_ms):>6} {len(r.timings_ms) / r.wall_seconds:>8.1f} "
+            f"{_percentile(r.timings_ms, 50):>9.1f} {_percentile(r.timings_ms, 95):>9.1f} {r.errors:>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark endpoints under concurrent clients")
+    loadgen.add_profile_arguments(parser)
+    parser.add_argument("--clients", default="50,200,1000", help="Comma-separated concurrent client counts")
+    parser.add_argument("--requests", type=int, default=2, help="Requests per client")
+    parser.add_argument("--geocode-ms", type=float, default=100.0, help="Simulated Nominatim latency")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse previously generated data")
+    parser.add_argument("--purge", action="store_true", help="Purge generated data before seeding")
+
+    args = parser.parse_args()
+    levels = [int(level) for level in args.clients.split(",")]
+
+    if db.engine.dialect.name != "postgresql":
+        print("bench_concurrency requires PostgreSQL")
+        sys.exit(1)
+
+    # Per-request and per-notification logging is noisy at this volume
+    logging.disable(logging.WARNING)
+
+    settings = get_settings()
+    settings.PUSH_BACKEND = "dummy"
+    settings.EMAIL_BACKEND = "console"
+    # Tokens repeat across requests; time full check-ins, not duplicates answered from memory
+    settings.MAGIC_LINK_DEDUPE_SECONDS = 0
+    _simulate_geocoder(args.geocode_ms)
+
+    if args.purge:
+        print(f"Purged {loadgen.purge()} generated user(s)")
+
+    if args.skip_seed:
+        data = _existing_data()
+    else:
+        start = time.perf_counter()
+        data = loadgen.generate(loadgen.profile_from_args(args))
+        print(f"Seeded {sum(data.row_counts.values())} rows in {time.perf_counter() - start:.1f} s")
+
+    if not data.user_ids:
+        print("No generated users found - run without --skip-seed")
+        sys.exit(1)
+
+    print(
+        f"Dataset: {len(data.user_ids)} users, {len(data.active_trip_ids)} active trips; "
+        f"pools: api {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}, "
+        f"api_async {settings.ASYNC_DB_POOL_SIZE}+{settings.ASYNC_DB_MAX_OVERFLOW}"
+    )
+
+    report(asyncio.run(bench(data, levels, args.requests)))
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+Measure bytes on the wire for the large mobile GET endpoints.
+
+Serves representative payloads (GET /trips/, /friends/active-trips and
+/activities/) through the same response middleware as the API
+(ConditionalGetMiddleware + GZipMiddleware with the configured threshold and
+level) and reports the body bytes a client downloads for:
+- identity: no compression (Accept-Encoding: identity)
+- gzip: Accept-Encoding: gzip
+- revalidated: a repeat request with If-None-Match (304, no body)
+plus the server-side cost of compressing each payload.
+
+No database is needed; payloads are synthetic and built like the real rows,
+with per-trip tokens, coordinates and text varied so compression ratios are
+not flattered by identical items.
+
+Usage:
+    python -m src.scripts.bench_response_size
+    python -m src.scripts.bench_response_size --sizes 1 10 100 --repeat 50
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import random
+import sys
+import time
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from starlette.middleware.gzip import GZipMiddleware
+
+from .. import config
+from ..api.activities import Activity
+from ..api.fast_json import render_json
+from ..api.friends import FriendActiveTrip
+from ..api.http_cache import ConditionalGetMiddleware
+from ..api.trips import TripResponse
+from .bench_serialization import _friend_trip, _trip
+
+settings = config.get_settings()
+
+_ACTIVITY_NAMES = [
+    "Hiking", "Biking", "Running", "Climbing", "Camping", "Backpacking", "Skiing", "Snowboarding",
+    "Kayaking", "Sailing", "Surfing", "Fishing", "Hunting", "Driving", "Flying", "Diving",
+    "Horseback Riding", "Mountaineering", "Other Activity",
+]
+
+
+_WORDS = ["trail", "water", "weather", "route", "gear", "layers", "light", "partner", "limits", "summit",
+          "storm", "map", "battery", "snacks", "helmet", "current", "wind", "sun", "rest", "signal"]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _activity(i: int) -> Activity:
+    rng = random.Random(i)
+    name = _ACTIVITY_NAMES[i % len(_ACTIVITY_NAMES)]
+    return Activity(
+        id=i + 1, name=name, icon="🥾", default_grace_minutes=rng.choice([15, 30, 45, 60, 90]),
+        colors={key: f"#{rng.randbytes(3).hex().upper()}" for key in ("accent", "primary", "secondary")},
+        messages={
+            "start": _sentence(rng, 4),
+            "checkin": _sentence(rng, 6),
+            "overdue": _sentence(rng, 20),
+            "checkout": _sentence(rng, 4),
+            "encouragement": [_sentence(rng, 4) for _ in range(3)],
+        },
+        safety_tips=[_sentence(rng, rng.randint(4, 8)) for _ in range(4)],
+        order=i + 1
+    )
+
+
+def _varied(model, i: int):
+    """Copy a bench_serialization item with the per-trip fields made distinct."""
+    rng = random.Random(i)
+    update = {
+        "title": f"{rng.choice(_ACTIVITY_NAMES)} near {rng.choice(['Tahoe', 'Shasta', 'Whitney', 'Yosemite'])} #{i}",
+        "start_lat": round(rng.uniform(32, 42), 6), "start_lon": round(rng.uniform(-124, -114), 6),
+        "eta": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z",
+    }
+    if isinstance(model, TripResponse):
+        update.update(checkin_token=rng.randbytes(16).hex(), checkout_token=rng.randbytes(16).hex(),
+                      notes=" ".join(rng.choice(["via", "ridge", "loop", "camp", "lake", "pass", "north", "fork"])
+                                     for _ in range(rng.randint(0, 12))) or None)
+    else:
+        update["checkin_locations"] = [
+            location.model_copy(update={"latitude": round(rng.uniform(32, 42), 6),
+                                        "longitude": round(rng.uniform(-124, -114), 6)})
+            for location in model.checkin_locations
+        ]
+    return model.model_copy(update=update)
+
+
+def _build_app(payloads: dict[str, bytes]) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE,
+                       compresslevel=settings.GZIP_COMPRESS_LEVEL)
+
+    for path, body in payloads.items():
+        app.add_api_route(path, _serve(body), methods=["GET"])
+    return app
+
+
+def _serve(body: bytes):
+    def endpoint():
+        return Response(content=body, media_type="application/json")
+    return endpoint
+
+
+def _downloaded(client: TestClient, path: str, **headers) -> tuple[int, int]:
+    response = client.get(path, headers=headers)
+    return response.status_code, response.num_bytes_downloaded
+
+
+def _compress_ms(body: bytes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        gzip.compress(body, compresslevel=settings.GZIP_COMPRESS_LEVEL)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure response bytes saved by gzip and ETags")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 20, 100],
+                        help="Trips per payload for the trip list endpoints")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs for the compression cost")
+    args = parser.parse_args()
+
+    trips = TypeAdapter(list[TripResponse])
+    friend_trips = TypeAdapter(list[FriendActiveTrip])
+    activities = TypeAdapter(list[Activity])
+
+    payloads = {"/activities/": render_json(activities, [_activity(i) for i in range(len(_ACTIVITY_NAMES))]).body}
+    for size in args.sizes:
+        payloads[f"/trips/ ({size})"] = render_json(trips, [_varied(_trip(i), i) for i in range(size)]).body
+        payloads[f"/friends/active-trips ({size})"] = render_json(
+            friend_trips, [_varied(_friend_trip(i), i) for i in range(size)]
+        ).body
+
+    app = _build_app({f"/{i}": body for i, body in enumerate(payloads.values())})
+    client = TestClient(app)
+
+    print(f"gzip minimum_size={settings.GZIP_MINIMUM_SIZE} compresslevel={settings.GZIP_COMPRESS_LEVEL}\n")
+    print(f"  {'payload':32} {'identity B':>11} {'gzip B':>9} {'saved':>7} {'304 B':>6} {'gzip ms':>8}")
+    total_identity = total_gzip = 0
+    for i, name in enumerate(payloads):
+        path = f"/{i}"
+        _, identity = _downloaded(client, path, **{"Accept-Encoding": "identity"})
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        gzipped = response.num_bytes_downloaded
+        status, revalidated = _downloaded(
+            client, path, **{"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]}
+        )
+        assert status == 304
+        total_identity += identity
+        total_gzip += gzipped
+        print(f"  {name:32} {identity:11} {gzipped:9} {1 - gzipped / identity:6.0%} {revalidated:6} "
+              f"{_compress_ms(payloads[name], args.repeat):8.3f}")
+    print(f"  {'total':32} {total_identity:11} {total_gzip:9} {1 - total_gzip / total_identity:6.0%}")
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Benchmark response serialization for the large list endpoints.
+
+Builds synthetic payloads of 10/100/1000 items for the list response models
+(TripResponse, FriendActiveTrip with check-in locations) and compares:
+- default: FastAPI's path for a returned model list (re-validate against
+  response_model, dump to Python, encode with the stdlib JSON encoder)
+- prerendered: src.api.fast_json (one pydantic-core dump_json of the models)
+
+No database is needed; only serialization is timed.
+
+Usage:
+    python -m src.scripts.bench_serialization
+    python -m src.scripts.bench_serialization --sizes 10 100 1000 10000 --repeat 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from pydantic import TypeAdapter
+
+from ..api.activities import Activity
+from ..api.fast_json import render_json
+from ..api.friends import CheckinLocation, FriendActiveTrip, FriendActiveTripOwner, LiveLocationData
+from ..api.trips import GroupSettings, TripResponse
+
+
+def _trip(i: int) -> TripResponse:
+    return TripResponse(
+        id=i, user_id=1, title=f"Trip {i}",
+        activity=Activity(
+            id=1, name="Hiking", icon="🥾", default_grace_minutes=30,
+            colors={"primary": "#2E7D32", "secondary": "#A5D6A7"},
+            messages={"start": "Have a great hike!", "overdue": ["Check in soon", "Are you OK?"]},
+            safety_tips=["Bring water", "Tell someone your route", "Check the weather"], order=1
+        ),
+        start="2026-06-01T08:00:00Z", eta="2026-06-01T16:00:00Z", grace_min=30,
+        location_text="Mount Tam", gen_lat=37.92, gen_lon=-122.59,
+        start_location_text="Trailhead", start_lat=37.9, start_lon=-122.6, has_separate_locations=True,
+        notes="Loop via Rock Spring", status="completed", completed_at="2026-06-01T15:10:00Z",
+        last_checkin="2026-06-01T12:00:00Z", created_at="2026-05-31T20:00:00Z",
+        contact1=10, contact2=11, contact3=None, friend_contact1=20,
+        checkin_token="c" * 32, checkout_token="o" * 32,
+        checkin_interval_min=30, notify_start_hour=8, notify_end_hour=22,
+        timezone="America/Los_Angeles", start_timezone=None, eta_timezone=None,
+        notify_self=False, share_live_location=True,
+        is_group_trip=i % 5 == 0, group_settings=GroupSettings() if i % 5 == 0 else None, participant_count=2
+    )
+
+
+def _friend_trip(i: int) -> FriendActiveTrip:
+    return FriendActiveTrip(
+        id=i, owner=FriendActiveTripOwner(user_id=2, first_name="Ada", last_name="Lovelace", profile_photo_url=None),
+        title=f"Trip {i}", activity_name="Hiking", activity_icon="🥾",
+        activity_colors={"primary": "#2E7D32", "secondary": "#A5D6A7"},
+        status="active", start="2026-06-01T08:00:00Z", eta="2026-06-01T16:00:00Z", grace_min=30,
+        location_text="Mount Tam", start_location_text="Trailhead", notes=None,
+        timezone="America/Los_Angeles", last_checkin_at="2026-06-01T12:00:00Z",
+        checkin_locations=[
+            CheckinLocation(timestamp=f"2026-06-01T{9 + n:02d}:00:00Z", latitude=37.9 + n / 100,
+                            longitude=-122.6, location_name="Somewhere on the trail")
+            for n in range(5)
+        ],
+        live_location=LiveLocationData(latitude=37.95, longitude=-122.58, timestamp="2026-06-01T12:30:00Z", speed=1.2),
+        destination_lat=37.92, destination_lon=-122.59, start_lat=37.9, start_lon=-122.6
+    )
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_model(name: str, model: type, factory, sizes: list[int], repeat: int) -> None:
+    response_model = list[model]
+    field = APIRoute("/", lambda: None, response_model=response_model).response_field
+    adapter = TypeAdapter(response_model)
+    loop = asyncio.new_event_loop()
+
+    def default(items):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=items, is_coroutine=False))
+        return JSONResponse(content).body
+
+    def prerendered(items):
+        return render_json(adapter, items).body
+
+    print(f"\n{name}")
+    print(f"  {'items':>6} {'default ms':>12} {'prerendered ms':>15} {'speedup':>9} {'bytes':>10}")
+    for size in sizes:
+        items = [factory(i) for i in range(size)]
+        assert json.loads(default(items)) == json.loads(prerendered(items))
+        default_ms = _time(lambda: default(items), repeat)
+        prerendered_ms = _time(lambda: prerendered(items), repeat)
+        print(f"  {size:6} {default_ms:12.3f} {prerendered_ms:15.3f} {default_ms / prerendered_ms:8.1f}x "
+              f"{len(prerendered(items)):10}")
+    loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint response serialization")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Payload sizes in items")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per size")
+    args = parser.parse_args()
+
+    bench_model("GET /trips/", TripResponse, _trip, args.sizes, args.repeat)
+    bench_model("GET /friends/active-trips", FriendActiveTrip, _friend_trip, args.sizes, args.repeat)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Benchmark statement preparation for the registered hot-path SQL.
+
+For every statement in src.services.statements (check-in, live location,
+active trip), compares:
+- inline: building sqlalchemy.text() from the SQL string on each call, as the
+  handlers did before, plus generating its cache key
+- registered: reusing the module-level statement (cache key memoized)
+
+Then executes the registered SELECT statements against the database with
+dummy parameters and reports how many executions hit the engine's compiled
+cache. Write statements are only measured offline.
+
+Usage:
+    python -m src.scripts.bench_statements
+    python -m src.scripts.bench_statements --iterations 50000 --executions 500
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+
+from .. import database as db
+from ..services import statements
+
+
+def _load_registry() -> dict[str, sqlalchemy.TextClause]:
+    # Importing the API modules registers their statements
+    from ..api import checkin, participants, trips  # noqa: F401
+
+    return statements.registered()
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def bench_preparation(registry: dict[str, sqlalchemy.TextClause], iterations: int) -> None:
+    print(f"\nStatement preparation ({iterations} calls each, per-call µs)")
+    print(f"  {'statement':40} {'inline':>10} {'registered':>12} {'saved':>10}")
+    total_inline = total_registered = 0.0
+    for name, statement in sorted(registry.items()):
+        sql = statement.text
+        inline = _per_call_us(lambda: sqlalchemy.text(sql)._generate_cache_key(), iterations)
+        registered = _per_call_us(lambda: statement._generate_cache_key(), iterations)
+        total_inline += inline
+        total_registered += registered
+        print(f"  {name:40} {inline:10.2f} {registered:12.2f} {inline - registered:10.2f}")
+    print(f"  {'total (all statements)':40} {total_inline:10.2f} {total_registered:12.2f} "
+          f"{total_inline - total_registered:10.2f}")
+
+
+def _dummy_params(statement: sqlalchemy.TextClause) -> dict:
+    params = {}
+    for key, bind in statement._bindparams.items():
+        python_type = None
+        try:
+            python_type = bind.type.python_type
+        except NotImplementedError:
+            pass
+        if python_type is list:
+            params[key] = []
+        else:
+            params[key] = "bench-missing" if python_type is str else 0
+    return params
+
+
+def bench_execution(registry: dict[str, sqlalchemy.TextClause], executions: int) -> None:
+    selects = {
+        name: statement for name, statement in sorted(registry.items())
+        if statement.text.lstrip().upper().startswith("SELECT")
+    }
+    hits = misses = 0
+
+    def count_cache(conn, cursor, statement, parameters, context, executemany):
+        nonlocal hits, misses
+        if context is None:
+            return
+        if context.cache_hit == CACHE_HIT:
+            hits += 1
+        else:
+            misses += 1
+
+    print(f"\nExecution of {len(selects)} registered SELECTs ({executions} runs each)")
+    event.listen(db.engine, "after_cursor_execute", count_cache)
+    try:
+        with db.engine.connect() as conn:
+            for name, statement in selects.items():
+                params = _dummy_params(statement)
+                start = time.perf_counter()
+                for _ in range(executions):
+                    conn.execute(statement, params).fetchall()
+                elapsed = (time.perf_counter() - start) / executions * 1000
+                print(f"  {name:40} {elapsed:8.3f} ms/call")
+            conn.rollback()
+    finally:
+        event.remove(db.engine, "after_cursor_execute", count_cache)
+
+    print(f"  Compiled cache: {hits} hits, {misses} misses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark registered statement preparation")
+    parser.add_argument("--iterations", type=int, default=20000, help="Preparation calls per statement")
+    parser.add_argument("--executions", type=int, default=200, help="Database executions per SELECT")
+    args = parser.parse_args()
+
+    registry = _load_registry()
+    print(f"{len(registry)} registered statements")
+    bench_preparation(registry, args.iterations)
+    bench_execution(registry, args.executions)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
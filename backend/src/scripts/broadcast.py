@@ -1,97 +1,423 @@
 #!/usr/bin/env python
 """
-Broadcast push notification to all users with registered devices.
+Broadcast push notification to users with registered iOS devices.
+
+Devices are read a page at a time (keyset pagination on devices.id) and sent
+over one shared APNs HTTP/2 client with bounded concurrency and an optional
+rate limit. Progress is checkpointed to a JSON file after every page, so an
+interrupted broadcast resumes where it stopped instead of re-sending.
 
 Usage:
     python -m src.scripts.broadcast "Title" "Body"
     python -m src.scripts.broadcast "Title" "Body" --dry-run
+    python -m src.scripts.broadcast "Title" "Body" --concurrency 100 --rate 500
+    python -m src.scripts.broadcast "Title" "Body" --tier plus --seen-within-days 30
+    python -m src.scripts.broadcast "Title" "Body" --resume
 """
 from __future__ import annotations
 
 import argparse
 import asyncio
+import hashlib
+import json
 import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
 
 import sqlalchemy
 
 from .. import database as db
-from ..services.notifications import send_push_to_user
+from ..config import settings
+from ..messaging.apns import get_push_sender
+from ..services.notifications import notifications_sent
 
+PAGE_SIZE = 1000
+DEFAULT_CONCURRENCY = 50
+# One APNs round trip, used by --dry-run to estimate duration
+ASSUMED_SEND_LATENCY_MS = 100
+RETRY_DELAYS = [1, 2, 4]  # Same backoff as send_push_to_user
+# APNs rejections meaning the token is dead and should be removed
+INVALID_TOKEN_REASONS = ("BadDeviceToken", "DeviceTokenNotForTopic", "Unregistered")
 
-async def broadcast(title: str, body: str, dry_run: bool = False) -> tuple[int, int, int]:
-    """
-    Send push notification to all users with registered iOS devices.
 
-    Returns: (total_users, successful, failed)
+@dataclass
+class Audience:
+    """Which devices receive the broadcast."""
+    env: str = field(default_factory=lambda: "sandbox" if settings.APNS_USE_SANDBOX else "production")
+    tier: str | None = None  # users.subscription_tier
+    seen_within_days: int | None = None  # devices.last_seen_at
+    user_ids: list[int] | None = None
+
+    def where(self) -> tuple[str, dict]:
+        """SQL conditions (devices aliased d, users u) and their parameters."""
+        conditions = ["d.platform = 'ios'", "d.env = :env"]
+        params: dict = {"env": self.env}
+        if self.tier:
+            conditions.append("u.subscription_tier = :tier")
+            params["tier"] = self.tier
+        if self.seen_within_days is not None:
+            conditions.append("d.last_seen_at >= :seen_since")
+            params["seen_since"] = datetime.utcnow() - timedelta(days=self.seen_within_days)
+        if self.user_ids:
+            conditions.append("d.user_id = ANY(:user_ids)")
+            params["user_ids"] = list(self.user_ids)
+        return " AND ".join(conditions), params
+
+
+@dataclass
+class BroadcastStats:
+    devices: int = 0  # Audience size when the broadcast (or resume) started
+    users: int = 0
+    sent: int = 0
+    failed: int = 0
+    removed: int = 0  # Dead tokens deleted from devices
+    elapsed_seconds: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed + self.removed
+
+
+@dataclass
+class Checkpoint:
+    """Resume point: every device with id <= last_device_id has been handled."""
+    fingerprint: str
+    last_device_id: int = 0
+    sent: int = 0
+    failed: int = 0
+    removed: int = 0
+    completed: bool = False
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(asdict(self)))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, fingerprint: str) -> Checkpoint:
+        data = json.loads(path.read_text())
+        if data.get("fingerprint") != fingerprint:
+            raise ValueError(f"Checkpoint {path} belongs to a different broadcast (title, body or audience changed)")
+        return cls(**data)
+
+
+class RateLimiter:
+    """Spaces send attempts to at most `rate` per second (no bursting)."""
+
+    def __init__(self, rate: float | None):
+        self.interval = 1 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def broadcast_fingerprint(title: str, body: str, audience: Audience) -> str:
+    """Stable id for a broadcast, used to name and validate its checkpoint."""
+    key = json.dumps({"title": title, "body": body, "audience": asdict(audience)}, sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def count_audience(audience: Audience, after_device_id: int = 0) -> tuple[int, int]:
+    """(devices, distinct users) matching the audience past a resume point."""
+    where, params = audience.where()
+    with db.engine.connect() as conn:
+        row = conn.execute(
+            sqlalchemy.text(f"""
+                SELECT COUNT(*) AS devices, COUNT(DISTINCT d.user_id) AS users
+                FROM devices d
+                JOIN users u ON u.id = d.user_id
+                WHERE {where} AND d.id > :after_id
+            """),
+            {**params, "after_id": after_device_id}
+        ).fetchone()
+    return row.devices, row.users
+
+
+def fetch_page(audience: Audience, after_device_id: int, limit: int = PAGE_SIZE) -> list:
+    """Next page of (id, user_id, token) in device id order."""
+    where, params = audience.where()
+    with db.engine.connect() as conn:
+        return conn.execute(
+            sqlalchemy.text(f"""
+                SELECT d.id, d.user_id, d.token
+                FROM devices d
+                JOIN users u ON u.id = d.user_id
+                WHERE {where} AND d.id > :after_id
+                ORDER BY d.id
+                LIMIT :limit
+            """),
+            {**params, "after_id": after_device_id, "limit": limit}
+        ).fetchall()
+
+
+def estimate_seconds(devices: int, concurrency: int, rate: float | None,
+                     latency_ms: float = ASSUMED_SEND_LATENCY_MS) -> float:
+    """Rough duration: concurrency-bound throughput, capped by the rate limit."""
+    throughput = concurrency / (latency_ms / 1000)
+    if rate:
+        throughput = min(throughput, rate)
+    return devices / throughput
+
+
+async def _send_device(sender, token: str, title: str, body: str, data: dict,
+                       limiter: RateLimiter) -> tuple[str, str | None]:
+    """Send to one device with retries.
+
+    Returns:
+        (outcome, error) where outcome is 'sent', 'failed' or 'invalid'
     """
-    # Get all unique user IDs with iOS devices
+    error = None
+    for attempt, delay in enumerate(RETRY_DELAYS):
+        await limiter.acquire()
+        try:
+            result = await sender.send(token, title, body, dict(data))
+        except Exception as e:
+            error = str(e)
+        else:
+            if result.ok:
+                return "sent", None
+            if result.status == 410 or (result.status == 400 and result.detail in INVALID_TOKEN_REASONS):
+                return "invalid", f"{result.detail} ({result.status})"
+            error = f"status={result.status} detail={result.detail}"
+            if 400 <= result.status < 500 and result.status != 429:
+                # Payload/auth problems won't succeed on retry
+                return "failed", error
+        if attempt < len(RETRY_DELAYS) - 1:
+            await asyncio.sleep(delay)
+    return "failed", f"All retries failed: {error}"
+
+
+def _record_page(results: list[tuple], title: str, body: str) -> None:
+    """Log a page of outcomes to notification_logs and delete dead tokens, in one transaction."""
+    now = datetime.utcnow()
+    logs = [
+        {
+            "user_id": device.user_id,
+            "title": title,
+            "body": body,
+            "status": "sent" if outcome == "sent" else "failed",
+            "device_token": device.token,
+            "error_message": error,
+            "created_at": now,
+        }
+        for device, outcome, error in results
+    ]
+    dead_tokens = [device.token for device, outcome, _ in results if outcome == "invalid"]
     with db.engine.begin() as conn:
-        result = conn.execute(
-            sqlalchemy.text(
-                "SELECT DISTINCT user_id FROM devices WHERE platform = 'ios'"
+        if logs:
+            conn.execute(
+                sqlalchemy.text("""
+                    INSERT INTO notification_logs
+                    (user_id, notification_type, title, body, status, device_token, error_message, created_at)
+                    VALUES (:user_id, 'push', :title, :body, :status, :device_token, :error_message, :created_at)
+                """),
+                logs
             )
-        ).fetchall()
+        if dead_tokens:
+            conn.execute(
+                sqlalchemy.text("DELETE FROM devices WHERE token = ANY(:tokens)"),
+                {"tokens": dead_tokens}
+            )
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
+
+
+async def broadcast(
+    title: str,
+    body: str,
+    audience: Audience | None = None,
+    dry_run: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: float | None = None,
+    checkpoint_path: Path | None = None,
+    resume: bool = False,
+    page_size: int = PAGE_SIZE,
+    sender=None,
+) -> BroadcastStats:
+    """
+    Send a push notification to every device in the audience.
+
+    Args:
+        audience: Device filters (defaults to every iOS device in the current APNs env)
+        concurrency: Maximum sends in flight
+        rate: Maximum send attempts per second (None for unlimited)
+        checkpoint_path: Progress file (defaults to broadcast-<fingerprint>.json)
+        resume: Continue from an existing checkpoint instead of refusing to start
+        sender: Push sender (defaults to get_push_sender())
+
+    Returns: BroadcastStats (cumulative across resumes)
+    """
+    audience = audience or Audience()
+    fingerprint = broadcast_fingerprint(title, body, audience)
+    checkpoint_path = checkpoint_path or Path(f"broadcast-{fingerprint}.json")
+
+    checkpoint = Checkpoint(fingerprint=fingerprint)
+    if checkpoint_path.exists() and not dry_run:
+        if not resume:
+            raise FileExistsError(
+                f"Checkpoint {checkpoint_path} exists; pass --resume to continue it or delete it to start over"
+            )
+        checkpoint = Checkpoint.load(checkpoint_path, fingerprint)
+        if checkpoint.completed:
+            print(f"Broadcast {fingerprint} already completed.")
+            return BroadcastStats(sent=checkpoint.sent, failed=checkpoint.failed, removed=checkpoint.removed)
+        print(f"Resuming broadcast {fingerprint} after device {checkpoint.last_device_id}.")
 
-    user_ids = [row[0] for row in result]
-    total = len(user_ids)
+    devices, users = count_audience(audience, checkpoint.last_device_id)
+    stats = BroadcastStats(
+        devices=devices, users=users,
+        sent=checkpoint.sent, failed=checkpoint.failed, removed=checkpoint.removed
+    )
 
-    if total == 0:
-        print("No users with registered iOS devices found.")
-        return 0, 0, 0
+    if devices == 0:
+        print("No matching devices found.")
+        return stats
 
-    print(f"Found {total} user(s) with registered devices.")
+    print(f"Audience: {devices} device(s) across {users} user(s) in {audience.env}.")
 
     if dry_run:
         print("\n[DRY RUN] Would send:")
         print(f"  Title: {title}")
         print(f"  Body: {body}")
-        print(f"  To: {total} user(s)")
-        return total, 0, 0
+        print(f"  To: {devices} device(s), {users} user(s)")
+        print(f"  Concurrency: {concurrency}, rate limit: {f'{rate:g}/s' if rate else 'none'}")
+        print(f"  Estimated duration: {_format_duration(estimate_seconds(devices, concurrency, rate))}"
+              f" (assuming {ASSUMED_SEND_LATENCY_MS}ms per send)")
+        return stats
 
     print(f"\nSending: {title}")
-    print(f"Message: {body}\n")
+    print(f"Message: {body}")
+    print(f"Checkpoint: {checkpoint_path}\n")
 
-    successful = 0
-    failed = 0
+    owns_sender = sender is None
+    sender = sender or get_push_sender()
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    data = {"notification_type": "general"}
+    started = time.monotonic()
+    processed_this_run = 0
 
-    for i, user_id in enumerate(user_ids, 1):
-        try:
-            print(f"[{i}/{total}] Sending to user {user_id}...", end=" ")
-            await send_push_to_user(user_id, title, body)
-            print("OK")
-            successful += 1
-        except Exception as e:
-            print(f"FAILED: {e}")
-            failed += 1
+    async def send_one(device):
+        async with semaphore:
+            outcome, error = await _send_device(sender, device.token, title, body, data, limiter)
+        notifications_sent.inc(
+            channel="push", type="general", outcome="unregistered" if outcome == "invalid" else outcome
+        )
+        return device, outcome, error
+
+    try:
+        while True:
+            page = fetch_page(audience, checkpoint.last_device_id, page_size)
+            if not page:
+                break
 
-    return total, successful, failed
+            results = await asyncio.gather(*(send_one(device) for device in page))
+            _record_page(results, title, body)
+
+            for _, outcome, _ in results:
+                if outcome == "sent":
+                    stats.sent += 1
+                elif outcome == "invalid":
+                    stats.removed += 1
+                else:
+                    stats.failed += 1
+            processed_this_run += len(page)
+
+            checkpoint.last_device_id = page[-1].id
+            checkpoint.sent, checkpoint.failed, checkpoint.removed = stats.sent, stats.failed, stats.removed
+            checkpoint.save(checkpoint_path)
+
+            elapsed = time.monotonic() - started
+            per_second = processed_this_run / elapsed if elapsed else 0.0
+            remaining = max(0, devices - processed_this_run)
+            eta = _format_duration(remaining / per_second) if per_second else "?"
+            print(f"[{processed_this_run}/{devices}] sent={stats.sent} failed={stats.failed} "
+                  f"removed={stats.removed} {per_second:.0f}/s ETA {eta}")
+    finally:
+        stats.elapsed_seconds = time.monotonic() - started
+        if owns_sender and hasattr(sender, "close"):
+            await sender.close()
+
+    checkpoint.completed = True
+    checkpoint.save(checkpoint_path)
+    return stats
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Broadcast push notification to all users"
+        description="Broadcast push notification to users with registered iOS devices"
     )
     parser.add_argument("title", help="Notification title")
     parser.add_argument("body", help="Notification body")
     parser.add_argument(
         "--dry-run",
         action="store_true",
-        help="Show what would be sent without actually sending"
+        help="Report audience size and estimated duration without sending"
     )
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum sends in flight")
+    parser.add_argument("--rate", type=float, default=None, help="Maximum sends per second (default: unlimited)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Devices read and checkpointed per page")
+    parser.add_argument("--checkpoint", type=Path, default=None,
+                        help="Progress file (default: broadcast-<fingerprint>.json in the working directory)")
+    parser.add_argument("--resume", action="store_true", help="Continue from an existing checkpoint")
+    parser.add_argument("--env", choices=["sandbox", "production"], default=None,
+                        help="APNs environment of target devices (default: from APNS_USE_SANDBOX)")
+    parser.add_argument("--tier", default=None, help="Only users on this subscription tier (e.g. free, plus)")
+    parser.add_argument("--seen-within-days", type=int, default=None,
+                        help="Only devices seen within this many days")
+    parser.add_argument("--user-ids", default=None, help="Comma-separated user ids to target")
 
     args = parser.parse_args()
 
-    total, successful, failed = asyncio.run(
-        broadcast(args.title, args.body, args.dry_run)
+    audience = Audience(
+        tier=args.tier,
+        seen_within_days=args.seen_within_days,
+        user_ids=[int(uid) for uid in args.user_ids.split(",")] if args.user_ids else None,
     )
+    if args.env:
+        audience.env = args.env
+
+    try:
+        stats = asyncio.run(
+            broadcast(
+                args.title, args.body, audience,
+                dry_run=args.dry_run,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                checkpoint_path=args.checkpoint,
+                resume=args.resume,
+                page_size=args.page_size,
+            )
+        )
+    except (FileExistsError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(2)
 
-    if not args.dry_run and total > 0:
-        print(f"\nSummary:")
-        print(f"  Total users: {total}")
-        print(f"  Successful:  {successful}")
-        print(f"  Failed:      {failed}")
+    if not args.dry_run and stats.processed > 0:
+        print("\nSummary:")
+        print(f"  Devices:    {stats.processed}")
+        print(f"  Successful: {stats.sent}")
+        print(f"  Failed:     {stats.failed}")
+        print(f"  Removed:    {stats.removed} (unregistered tokens)")
+        print(f"  Duration:   {_format_duration(stats.elapsed_seconds)}")
 
-    sys.exit(0 if failed == 0 else 1)
+    sys.exit(0 if stats.failed == 0 else 1)
 
 
 if __name__ == "__main__":
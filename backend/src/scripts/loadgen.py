@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+"""
+Generate synthetic load-test data: users, friendships, trips (solo and group),
+participants, events, live locations, Live Activity tokens and devices.
+
+Rows are written in bulk: COPY on PostgreSQL (psycopg2), multi-row INSERTs
+elsewhere (e.g. SQLite). Primary keys are assigned up front so related rows
+can be linked without RETURNING round trips; sequences are bumped afterwards.
+
+All generated users have emails ending in @loadgen.invalid so they can be
+purged without touching real data.
+
+Usage:
+    python -m src.scripts.loadgen --users 1000
+    python -m src.scripts.loadgen --users 10000 --trips-per-user 10 --events-per-trip 20
+    python -m src.scripts.loadgen --purge
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+import sqlalchemy
+
+from .. import database as db
+from ..config import get_settings
+
+LOADGEN_EMAIL_DOMAIN = "loadgen.invalid"
+
+# Rows per multi-row INSERT (keeps bind parameters under SQLite's limit)
+INSERT_CHUNK_ROWS = 500
+
+
+@dataclass
+class LoadProfile:
+    """Shape of the generated dataset."""
+    users: int = 1000
+    friends_per_user: int = 10
+    trips_per_user: int = 10
+    # Fraction of each user's trips in each live state; the rest are completed
+    active_trip_ratio: float = 0.05
+    overdue_trip_ratio: float = 0.01
+    planned_trip_ratio: float = 0.05
+    group_trip_ratio: float = 0.1
+    participants_per_group_trip: int = 3
+    safety_friends_per_trip: int = 2
+    events_per_trip: int = 5
+    live_locations_per_active_trip: int = 50
+    devices_per_user: int = 1
+    seed: int = 42
+
+
+@dataclass
+class GeneratedData:
+    """Ids of the generated rows, for driving benchmarks."""
+    user_ids: list[int] = field(default_factory=list)
+    active_trip_ids: list[int] = field(default_factory=list)
+    # (trip_id, owner_user_id) for active trips with live location sharing
+    live_location_trips: list[tuple[int, int]] = field(default_factory=list)
+    group_trip_ids: list[int] = field(default_factory=list)
+    row_counts: dict[str, int] = field(default_factory=dict)
+
+
+def _next_id(conn, table: str) -> int:
+    return (conn.execute(sqlalchemy.text(f"SELECT COALESCE(MAX(id), 0) FROM {table}")).scalar() or 0) + 1
+
+
+def _copy_value(value: Any) -> str:
+    """Render a value for COPY ... FORMAT text."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def bulk_insert(conn, table: str, columns: list[str], rows: list[tuple]) -> None:
+    """Insert many rows: COPY on PostgreSQL/psycopg2, multi-row INSERT otherwise."""
+    if not rows:
+        return
+
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(v) for v in row))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT text)",
+                buffer
+            )
+        finally:
+            cursor.close()
+        return
+
+    for start in range(0, len(rows), INSERT_CHUNK_ROWS):
+        chunk = rows[start:start + INSERT_CHUNK_ROWS]
+        params: dict[str, Any] = {}
+        values_sql = []
+        for i, row in enumerate(chunk):
+            names = []
+            for col, value in zip(columns, row):
+                name = f"{col}_{i}"
+                params[name] = value
+                names.append(f":{name}")
+            values_sql.append(f"({', '.join(names)})")
+        conn.execute(
+            sqlalchemy.text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join(values_sql)}"),
+            params
+        )
+
+
+def _sync_sequence(conn, table: str) -> None:
+    """Move a PostgreSQL serial sequence past explicitly assigned ids."""
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(sqlalchemy.text(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+    ))
+
+
+def generate(profile: LoadProfile, engine=None) -> GeneratedData:
+    """Generate a dataset matching `profile` and return the ids of what was created."""
+    engine = engine or db.engine
+    rng = random.Random(profile.seed)
+    now = datetime.utcnow()
+    data = GeneratedData()
+
+    with engine.begin() as conn:
+        activity_ids = [r.id for r in conn.execute(sqlalchemy.text("SELECT id FROM activities")).fetchall()]
+        if not activity_ids:
+            raise RuntimeError("No activities found - run migrations first")
+
+        user_id = _next_id(conn, "users")
+        contact_id = _next_id(conn, "contacts")
+        trip_id = _next_id(conn, "trips")
+        event_id = _next_id(conn, "events")
+        participant_id = _next_id(conn, "trip_participants")
+        safety_id = _next_id(conn, "trip_safety_contacts")
+        friendship_id = _next_id(conn, "friendships")
+        location_id = _next_id(conn, "live_locations")
+        device_id = _next_id(conn, "devices")
+        live_activity_id = _next_id(conn, "live_activity_tokens")
+        apns_env = "development" if get_settings().APNS_USE_SANDBOX else "production"
+        run_tag = f"{int(time.time())}{rng.randrange(1000):03d}"
+
+        # Users, one email contact each, and devices
+        users, contacts, devices = [], [], []
+        user_contact: dict[int, int] = {}
+        for i in range(profile.users):
+            uid = user_id + i
+            data.user_ids.append(uid)
+            users.append((
+                uid, f"user{run_tag}-{i}@{LOADGEN_EMAIL_DOMAIN}", f"Load{i}", "Tester",
+                rng.randint(18, 70), "plus" if rng.random() < 0.2 else "free",
+                rng.random() < 0.3
+            ))
+            contacts.append((contact_id + i, uid, f"Contact {i}", f"contact{run_tag}-{i}@{LOADGEN_EMAIL_DOMAIN}"))
+            user_contact[uid] = contact_id + i
+            for _ in range(profile.devices_per_user):
+                devices.append((device_id, uid, "ios", f"loadgen-{run_tag}-{device_id}",
+                                "com.homeboundapp.Homebound", "development", now, now))
+                device_id += 1
+
+        bulk_insert(conn, "users", ["id", "email", "first_name", "last_name", "age",
+                                    "subscription_tier", "friend_share_live_location"], users)
+        bulk_insert(conn, "contacts", ["id", "user_id", "name", "email"], contacts)
+        bulk_insert(conn, "devices", ["id", "user_id", "platform", "token", "bundle_id", "env",
+                                      "created_at", "last_seen_at"], devices)
+
+        # Friendships: each user befriends the next N users (wrapping), stored as (min, max)
+        friends: dict[int, list[int]] = {uid: [] for uid in data.user_ids}
+        friendships, seen = [], set()
+        n = len(data.user_ids)
+        for idx, uid in enumerate(data.user_ids):
+            for step in range(1, min(profile.friends_per_user, n - 1) + 1):
+                other = data.user_ids[(idx + step) % n]
+                pair = (min(uid, other), max(uid, other))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                friends[uid].append(other)
+                friends[other].append(uid)
+                friendships.append((friendship_id, pair[0], pair[1]))
+                friendship_id += 1
+        bulk_insert(conn, "friendships", ["id", "user_id_1", "user_id_2"], friendships)
+
+        # Trips with events, safety contacts, participants and live locations
+        trips, events, participants, safety, locations, live_activities = [], [], [], [], [], []
+        group_settings = json.dumps({"checkout_mode": "vote", "vote_threshold": 0.5})
+        for uid in data.user_ids:
+            for _ in range(profile.trips_per_user):
+                roll = rng.random()
+                if roll < profile.active_trip_ratio:
+                    status = "active"
+                    start = now - timedelta(hours=rng.uniform(0.5, 4))
+                    eta = now + timedelta(hours=rng.uniform(0.5, 6))
+                elif roll < profile.active_trip_ratio + profile.overdue_trip_ratio:
+                    status = "active"
+                    start = now - timedelta(hours=rng.uniform(3, 8))
+                    eta = now - timedelta(minutes=rng.uniform(1, 120))
+                elif roll < profile.active_trip_ratio + profile.overdue_trip_ratio + profile.planned_trip_ratio:
+                    status = "planned"
+                    start = now + timedelta(hours=rng.uniform(1, 72))
+                    eta = start + timedelta(hours=rng.uniform(1, 8))
+                else:
+                    status = "completed"
+                    start = now - timedelta(days=rng.uniform(1, 365))
+                    eta = start + timedelta(hours=rng.uniform(1, 8))
+
+                is_live = status == "active"
+                is_group = rng.random() < profile.group_trip_ratio and bool(friends[uid])
+                share_live = is_live and rng.random() < 0.5
+                lat, lon = rng.uniform(32, 48), rng.uniform(-123, -70)
+
+                trips.append((
+                    trip_id, uid, f"Trip {trip_id}", start, eta, rng.choice(activity_ids),
+                    rng.choice([15, 30, 45, 60]), "Trailhead", lat, lon, user_contact[uid],
+                    status, start - timedelta(hours=1), eta if status == "completed" else None,
+                    f"lgc{trip_id}", f"lgo{trip_id}", "UTC", rng.choice([15, 30, 60]),
+                    share_live, is_group, group_settings if is_group else None
+                ))
+
+                if is_live:
+                    data.active_trip_ids.append(trip_id)
+                    # iOS clients register a Live Activity token when a trip starts
+                    live_activities.append((live_activity_id, trip_id, uid, f"lgla{run_tag}{trip_id}",
+                                            "com.homeboundapp.Homebound", apns_env, start, start))
+                    live_activity_id += 1
+                    if share_live:
+                        data.live_location_trips.append((trip_id, uid))
+                if is_group:
+                    data.group_trip_ids.append(trip_id)
+
+                for k in range(profile.events_per_trip):
+                    events.append((event_id, uid, trip_id, "checkin" if k else "started",
+                                   start + timedelta(minutes=10 * k), lat, lon))
+                    event_id += 1
+
+                # Friends as safety contacts (drives friends' active-trip feeds)
+                for position, friend in enumerate(friends[uid][:profile.safety_friends_per_trip], start=1):
+                    safety.append((safety_id, trip_id, friend, position))
+                    safety_id += 1
+
+                if is_group:
+                    participants.append((participant_id, trip_id, uid, "owner", "accepted", start, uid, start))
+                    participant_id += 1
+                    for friend in friends[uid][:profile.participants_per_group_trip]:
+                        participants.append((participant_id, trip_id, friend, "participant", "accepted",
+                                             start, uid, start))
+                        participant_id += 1
+
+                if share_live:
+                    for k in range(profile.live_locations_per_active_trip):
+                        locations.append((
+                            location_id, trip_id, uid, lat + k * 1e-4, lon + k * 1e-4, 1500.0, 10.0, 1.2,
+                            now - timedelta(seconds=60 * (profile.live_locations_per_active_trip - k))
+                        ))
+                        location_id += 1
+
+                trip_id += 1
+
+        bulk_insert(conn, "trips", [
+            "id", "user_id", "title", "start", "eta", "activity", "grace_min", "location_text",
+            "gen_lat", "gen_lon", "contact1", "status", "created_at", "completed_at",
+            "checkin_token", "checkout_token", "timezone", "checkin_interval_min",
+            "share_live_location", "is_group_trip", "group_settings"
+        ], trips)
+        bulk_insert(conn, "events", ["id", "user_id", "trip_id", "what", "timestamp", "lat", "lon"], events)
+        bulk_insert(conn, "trip_safety_contacts", ["id", "trip_id", "friend_user_id", "position"], safety)
+        bulk_insert(conn, "trip_participants", ["id", "trip_id", "user_id", "role", "status",
+                                                "invited_at", "invited_by", "joined_at"], participants)
+        bulk_insert(conn, "live_locations", ["id", "trip_id", "user_id", "latitude", "longitude", "altitude",
+                                             "horizontal_accuracy", "speed", "timestamp"], locations)
+        bulk_insert(conn, "live_activity_tokens", ["id", "trip_id", "user_id", "token", "bundle_id", "env",
+                                                   "created_at", "updated_at"], live_activities)
+
+        for table in ("users", "contacts", "devices", "friendships", "trips", "events",
+                      "trip_safety_contacts", "trip_participants", "live_locations", "live_activity_tokens"):
+            _sync_sequence(conn, table)
+            # Fresh planner statistics so benchmarks see realistic plans
+            if conn.dialect.name == "postgresql":
+                conn.execute(sqlalchemy.text(f"ANALYZE {table}"))
+
+    data.row_counts = {
+        "users": len(users),
+        "contacts": len(contacts),
+        "devices": len(devices),
+        "friendships": len(friendships),
+        "trips": len(trips),
+        "events": len(events),
+        "trip_safety_contacts": len(safety),
+        "trip_participants": len(participants),
+        "live_locations": len(locations),
+        "live_activity_tokens": len(live_activities),
+    }
+    return data
+
+
+def purge(engine=None) -> int:
+    """Delete every generated user and everything linked to them.
+
+    Returns:
+        Number of users removed
+    """
+    engine = engine or db.engine
+    users = f"SELECT id FROM users WHERE email LIKE '%@{LOADGEN_EMAIL_DOMAIN}'"
+    trips = f"SELECT id FROM trips WHERE user_id IN ({users})"
+    statements = [
+        f"UPDATE trips SET last_checkin = NULL WHERE user_id IN ({users}) AND last_checkin IS NOT NULL",
+        f"DELETE FROM live_locations WHERE trip_id IN ({trips})",
+        f"DELETE FROM live_activity_tokens WHERE trip_id IN ({trips})",
+        f"DELETE FROM participant_trip_contacts WHERE trip_id IN ({trips})",
+        f"DELETE FROM checkout_votes WHERE trip_id IN ({trips})",
+        f"DELETE FROM trip_participants WHERE trip_id IN ({trips})",
+        f"DELETE FROM trip_safety_contacts WHERE trip_id IN ({trips})",
+        f"DELETE FROM update_requests WHERE trip_id IN ({trips})",
+        f"DELETE FROM events WHERE trip_id IN ({trips})",
+        f"DELETE FROM events WHERE user_id IN ({users})",
+        f"DELETE FROM trips WHERE user_id IN ({users})",
+        f"DELETE FROM contacts WHERE user_id IN ({users})",
+        f"DELETE FROM devices WHERE user_id IN ({users})",
+        f"DELETE FROM login_tokens WHERE user_id IN ({users})",
+        f"DELETE FROM notification_logs WHERE user_id IN ({users})",
+    ]
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(sqlalchemy.text(statement))
+        return conn.execute(sqlalchemy.text(
+            f"DELETE FROM users WHERE email LIKE '%@{LOADGEN_EMAIL_DOMAIN}'"
+        )).rowcount
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add LoadProfile options to an argument parser (shared with the benchmarks)."""
+    defaults = LoadProfile()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--friends-per-user", type=int, default=defaults.friends_per_user)
+    parser.add_argument("--trips-per-user", type=int, default=defaults.trips_per_user)
+    parser.add_argument("--active-trip-ratio", type=float, default=defaults.active_trip_ratio)
+    parser.add_argument("--overdue-trip-ratio", type=float, default=defaults.overdue_trip_ratio)
+    parser.add_argument("--group-trip-ratio", type=float, default=defaults.group_trip_ratio)
+    parser.add_argument("--participants-per-group-trip", type=int, default=defaults.participants_per_group_trip)
+    parser.add_argument("--events-per-trip", type=int, default=defaults.events_per_trip)
+    parser.add_argument("--live-locations-per-active-trip", type=int,
+                        default=defaults.live_locations_per_active_trip)
+    parser.add_argument("--devices-per-user", type=int, default=defaults.devices_per_user)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def profile_from_args(args: argparse.Namespace) -> LoadProfile:
+    return LoadProfile(
+        users=args.users,
+        friends_per_user=args.friends_per_user,
+        trips_per_user=args.trips_per_user,
+        active_trip_ratio=args.active_trip_ratio,
+        overdue_trip_ratio=args.overdue_trip_ratio,
+        group_trip_ratio=args.group_trip_ratio,
+        participants_per_group_trip=args.participants_per_group_trip,
+        events_per_trip=args.events_per_trip,
+        live_locations_per_active_trip=args.live_locations_per_active_trip,
+        devices_per_user=args.devices_per_user,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic load-test data")
+    add_profile_arguments(parser)
+    parser.add_argument("--purge", action="store_true", help="Delete previously generated data and exit")
+
+    args = parser.parse_args()
+
+    if args.purge:
+        removed = purge()
+        print(f"Purged {removed} generated user(s)")
+        sys.exit(0)
+
+    start = time.perf_counter()
+    data = generate(profile_from_args(args))
+    elapsed = time.perf_counter() - start
+
+    print(f"Generated in {elapsed:.1f} s:")
+    for table, count in data.row_counts.items():
+        print(f"  {table:<22} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Profile import time of the API entry point, per module and per package.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter (so
+nothing is already cached in sys.modules) and summarizes the report:
+- total import time
+- self time per top-level package (src modules are listed individually),
+  which shows where cold-start time goes
+- the slowest individual modules by self time
+- the src modules that first pulled in each heavy package (--why)
+
+Usage:
+    python -m src.scripts.profile_imports
+    python -m src.scripts.profile_imports --module src.api.trips --top 30
+    python -m src.scripts.profile_imports --why resend,apscheduler,cryptography.x509
+    LAZY_ROUTERS=true python -m src.scripts.profile_imports
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+from dataclasses import dataclass
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def run_importtime(module: str) -> list[ImportRecord]:
+    """Import `module` in a fresh interpreter and parse its -X importtime report.
+
+    Records are in the order Python reports them: each module follows the
+    modules it imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            records.append(ImportRecord(
+                module=match.group(4),
+                self_us=int(match.group(1)),
+                cumulative_us=int(match.group(2)),
+                depth=len(match.group(3)) // 2,
+            ))
+    return records
+
+
+def package_of(module: str) -> str:
+    """Group key: the top-level package, or the module itself for src code."""
+    parts = module.split(".")
+    return module if parts[0] == "src" else parts[0]
+
+
+def by_package(records: list[ImportRecord]) -> Counter:
+    totals: Counter = Counter()
+    for record in records:
+        totals[package_of(record.module)] += record.self_us
+    return totals
+
+
+def importers(records: list[ImportRecord], target: str) -> list[str]:
+    """The src modules whose imports first loaded `target` (a module or package prefix)."""
+    found = []
+    for index, record in enumerate(records):
+        if record.module != target and not record.module.startswith(target + "."):
+            continue
+        # Parents come later in the report at a smaller depth
+        depth = record.depth
+        for parent in records[index + 1:]:
+            if parent.depth < depth:
+                depth = parent.depth
+                if parent.module.startswith("src."):
+                    if parent.module not in found:
+                        found.append(parent.module)
+                    break
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile import time of the API entry point")
+    parser.add_argument(
+        "--module", default="src.api.server", help="Module to import (default: src.api.server)"
+    )
+    parser.add_argument("--top", type=int, default=20, help="Rows to show per table")
+    parser.add_argument(
+        "--why", default="", help="Comma-separated packages to trace to their src importers"
+    )
+    args = parser.parse_args()
+
+    records = run_importtime(args.module)
+    total_us = sum(record.self_us for record in records)
+    print(f"Import of {args.module}: {total_us / 1000:.1f} ms across {len(records)} modules")
+
+    print(f"\nSelf time by package (top {args.top})")
+    for package, self_us in by_package(records).most_common(args.top):
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    print(f"\nSlowest modules by self time (top {args.top})")
+    for record in sorted(records, key=lambda r: r.self_us, reverse=True)[:args.top]:
+        print(f"  {record.self_us / 1000:8.1f} ms  {record.module}")
+
+    for target in filter(None, (name.strip() for name in args.why.split(","))):
+        sources = importers(records, target)
+        via = f"imported via {', '.join(sources)}" if sources else "not imported"
+        print(f"\n{target}: {via}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,447 @@
+"""Account data export and deletion.
+
+Exports are streamed as NDJSON straight from a server-side cursor, so a
+heavy user's history never has to fit in memory. Deletion runs as a
+sequence of bounded batches, each in its own short transaction, so no lock
+is held across the whole account. Deletions can run inline or as a
+background job tracked in account_deletion_jobs.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import sqlalchemy
+
+from .. import database as db
+
+log = logging.getLogger(__name__)
+
+# Rows deleted per statement/transaction during account deletion
+DELETION_BATCH_SIZE = 500
+
+# Rows fetched per round trip when streaming an export
+EXPORT_CHUNK_SIZE = 500
+
+# A running job not updated for this long is assumed dead and picked up again
+DELETION_JOB_STALE_MINUTES = 15
+
+# Subquery for the ids of trips the user owns
+_USER_TRIPS = "SELECT id FROM trips WHERE user_id = :user_id"
+
+# Ordered deletion steps: (step name, table, WHERE clause selecting the rows).
+# Order satisfies foreign keys; each step is repeated in batches until empty.
+# Steps that could be written with OR are split so each one can use an index.
+DELETION_STEPS: list[tuple[str, str, str]] = [
+    # Sign-in and push first, so the account goes quiet while the rest runs
+    ("login_tokens", "login_tokens", "user_id = :user_id"),
+    ("devices", "devices", "user_id = :user_id"),
+    ("live_activity_tokens", "live_activity_tokens", "user_id = :user_id"),
+    ("trip_live_activity_tokens", "live_activity_tokens", f"trip_id IN ({_USER_TRIPS})"),
+    # Trip children
+    ("trip_live_locations", "live_locations", f"trip_id IN ({_USER_TRIPS})"),
+    ("live_locations", "live_locations", "user_id = :user_id"),
+    ("trip_live_location_tracks", "live_location_tracks", f"trip_id IN ({_USER_TRIPS})"),
+    ("live_location_tracks", "live_location_tracks", "user_id = :user_id"),
+    ("trip_participant_contacts", "participant_trip_contacts", f"trip_id IN ({_USER_TRIPS})"),
+    ("participant_contacts", "participant_trip_contacts", "participant_user_id = :user_id"),
+    ("trip_participants", "trip_participants", f"trip_id IN ({_USER_TRIPS})"),
+    ("participations", "trip_participants", "user_id = :user_id"),
+    ("trip_safety_contacts", "trip_safety_contacts", f"trip_id IN ({_USER_TRIPS})"),
+    ("trip_checkout_votes", "checkout_votes", f"trip_id IN ({_USER_TRIPS})"),
+    ("checkout_votes", "checkout_votes", "user_id = :user_id"),
+    ("trip_update_requests", "update_requests", f"trip_id IN ({_USER_TRIPS})"),
+    # Events (trips.last_checkin is cleared before this runs)
+    ("trip_events", "events", f"trip_id IN ({_USER_TRIPS})"),
+    ("events", "events", "user_id = :user_id"),
+    ("trips", "trips", "user_id = :user_id"),
+    # Contacts and groups
+    ("contact_group_members", "contact_group_members",
+     "group_id IN (SELECT id FROM contact_groups WHERE user_id = :user_id)"),
+    ("contact_groups", "contact_groups", "user_id = :user_id"),
+    ("contacts", "contacts", "user_id = :user_id"),
+    # Social graph and account records
+    ("friendships_1", "friendships", "user_id_1 = :user_id"),
+    ("friendships_2", "friendships", "user_id_2 = :user_id"),
+    ("friend_invites", "friend_invites", "inviter_id = :user_id OR accepted_by = :user_id"),
+    ("update_requests", "update_requests", "requester_user_id = :user_id OR owner_user_id = :user_id"),
+    ("subscriptions", "subscriptions", "user_id = :user_id"),
+    ("pinned_activities", "pinned_activities", "user_id = :user_id"),
+    ("notification_logs", "notification_logs", "user_id = :user_id"),
+]
+
+ProgressCallback = Callable[[str, int], None]
+
+
+# ==================== Deletion ====================
+
+def _delete_in_batches(
+    step: str,
+    table: str,
+    where: str,
+    user_id: int,
+    batch_size: int,
+    on_progress: ProgressCallback | None,
+) -> int:
+    """Delete rows matching `where` from `table`, one bounded transaction at a time."""
+    statement = sqlalchemy.text(f"""
+        DELETE FROM {table}
+        WHERE id IN (
+            SELECT id FROM {table}
+            WHERE {where}
+            LIMIT :batch_size
+        )
+    """)
+
+    total = 0
+    while True:
+        with db.current_engine().begin() as conn:
+            deleted = conn.execute(
+                statement, {"user_id": user_id, "batch_size": batch_size}
+            ).rowcount
+        total += deleted
+        if deleted and on_progress:
+            on_progress(step, deleted)
+        if deleted < batch_size:
+            return total
+
+
+def _clear_last_checkin_refs(user_id: int, batch_size: int) -> int:
+    """Null out trips.last_checkin pointing at events that are about to be deleted.
+
+    Covers the user's own trips and group trips whose last check-in was
+    made by this user as a participant.
+    """
+    statements = [
+        sqlalchemy.text("""
+            UPDATE trips SET last_checkin = NULL
+            WHERE id IN (
+                SELECT id FROM trips
+                WHERE user_id = :user_id AND last_checkin IS NOT NULL
+                LIMIT :batch_size
+            )
+        """),
+        sqlalchemy.text("""
+            UPDATE trips SET last_checkin = NULL
+            WHERE id IN (
+                SELECT t.id FROM trips t
+                JOIN events e ON e.id = t.last_checkin
+                WHERE e.user_id = :user_id
+                LIMIT :batch_size
+            )
+        """),
+    ]
+
+    total = 0
+    for statement in statements:
+        while True:
+            with db.current_engine().begin() as conn:
+                updated = conn.execute(
+                    statement, {"user_id": user_id, "batch_size": batch_size}
+                ).rowcount
+            total += updated
+            if updated < batch_size:
+                break
+    return total
+
+
+def delete_user_data(
+    user_id: int,
+    batch_size: int = DELETION_BATCH_SIZE,
+    on_progress: ProgressCallback | None = None,
+) -> dict[str, int]:
+    """Delete a user and everything they own in bounded batches.
+
+    Each batch commits on its own, so locks are only held for one batch.
+    The steps are idempotent: if a run is interrupted, running it again
+    picks up where it stopped.
+
+    Args:
+        user_id: The user to delete
+        batch_size: Maximum rows deleted per statement
+        on_progress: Called with (step, rows_deleted) after every batch
+
+    Returns:
+        Rows deleted per step (steps that deleted nothing are omitted)
+    """
+    counts: dict[str, int] = {}
+
+    for step, table, where in DELETION_STEPS:
+        if step == "trip_events":
+            _clear_last_checkin_refs(user_id, batch_size)
+        deleted = _delete_in_batches(step, table, where, user_id, batch_size, on_progress)
+        if deleted:
+            counts[step] = deleted
+
+    with db.current_engine().begin() as conn:
+        deleted = conn.execute(
+            sqlalchemy.text("DELETE FROM users WHERE id = :user_id"),
+            {"user_id": user_id}
+        ).rowcount
+    if deleted:
+        counts["users"] = deleted
+        if on_progress:
+            on_progress("users", deleted)
+
+    log.info(f"[AccountData] Deleted user {user_id}: {sum(counts.values())} rows across {len(counts)} steps")
+    return counts
+
+
+def create_deletion_job(user_id: int) -> dict[str, Any]:
+    """Queue a background deletion for a user, reusing an unfinished job if one exists."""
+    with db.current_engine().begin() as conn:
+        existing = conn.execute(
+            sqlalchemy.text("""
+                SELECT id, status, current_step, rows_deleted, error_message,
+                       created_at, updated_at, completed_at
+                FROM account_deletion_jobs
+                WHERE user_id = :user_id AND status IN ('pending', 'running')
+                ORDER BY id DESC
+                LIMIT 1
+            """),
+            {"user_id": user_id}
+        ).fetchone()
+        if existing:
+            return _job_to_dict(existing)
+
+        job = conn.execute(
+            sqlalchemy.text("""
+                INSERT INTO account_deletion_jobs (user_id, status)
+                VALUES (:user_id, 'pending')
+                RETURNING id, status, current_step, rows_deleted, error_message,
+                          created_at, updated_at, completed_at
+            """),
+            {"user_id": user_id}
+        ).fetchone()
+
+    log.info(f"[AccountData] Queued deletion job {job.id} for user {user_id}")
+    return _job_to_dict(job)
+
+
+def get_latest_deletion_job(user_id: int) -> dict[str, Any] | None:
+    """Get the most recent deletion job for a user."""
+    with db.current_engine().connect() as conn:
+        job = conn.execute(
+            sqlalchemy.text("""
+                SELECT id, status, current_step, rows_deleted, error_message,
+                       created_at, updated_at, completed_at
+                FROM account_deletion_jobs
+                WHERE user_id = :user_id
+                ORDER BY id DESC
+                LIMIT 1
+            """),
+            {"user_id": user_id}
+        ).fetchone()
+    return _job_to_dict(job) if job else None
+
+
+def _job_to_dict(job) -> dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "current_step": job.current_step,
+        "rows_deleted": job.rows_deleted,
+        "error_message": job.error_message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+
+def _claim_deletion_job():
+    """Claim the oldest pending (or abandoned running) job, or return None."""
+    stale_cutoff = datetime.now(UTC) - timedelta(minutes=DELETION_JOB_STALE_MINUTES)
+    with db.current_engine().begin() as conn:
+        return conn.execute(
+            sqlalchemy.text("""
+                UPDATE account_deletion_jobs
+                SET status = 'running', updated_at = :now
+                WHERE id = (
+                    SELECT id FROM account_deletion_jobs
+                    WHERE status = 'pending'
+                       OR (status = 'running' AND updated_at < :stale_cutoff)
+                    ORDER BY id
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, user_id
+            """),
+            {"now": datetime.now(UTC), "stale_cutoff": stale_cutoff}
+        ).fetchone()
+
+
+def run_deletion_job(job_id: int, user_id: int, batch_size: int = DELETION_BATCH_SIZE) -> bool:
+    """Run one claimed deletion job, recording progress after every batch.
+
+    Returns:
+        True if the account was fully deleted, False if the job failed
+    """
+    def record_progress(step: str, deleted: int) -> None:
+        with db.current_engine().begin() as conn:
+            conn.execute(
+                sqlalchemy.text("""
+                    UPDATE account_deletion_jobs
+                    SET current_step = :step,
+                        rows_deleted = rows_deleted + :deleted,
+                        updated_at = :now
+                    WHERE id = :job_id
+                """),
+                {"job_id": job_id, "step": step, "deleted": deleted, "now": datetime.now(UTC)}
+            )
+
+    try:
+        delete_user_data(user_id, batch_size=batch_size, on_progress=record_progress)
+    except Exception as e:
+        log.error(f"[AccountData] Deletion job {job_id} for user {user_id} failed: {e}", exc_info=True)
+        with db.current_engine().begin() as conn:
+            conn.execute(
+                sqlalchemy.text("""
+                    UPDATE account_deletion_jobs
+                    SET status = 'failed', error_message = :error, updated_at = :now
+                    WHERE id = :job_id
+                """),
+                {"job_id": job_id, "error": str(e), "now": datetime.now(UTC)}
+            )
+        return False
+
+    now = datetime.now(UTC)
+    with db.current_engine().begin() as conn:
+        conn.execute(
+            sqlalchemy.text("""
+                UPDATE account_deletion_jobs
+                SET status = 'completed', current_step = NULL,
+                    updated_at = :now, completed_at = :now
+                WHERE id = :job_id
+            """),
+            {"job_id": job_id, "now": now}
+        )
+    return True
+
+
+def process_deletion_jobs(max_jobs: int = 10) -> int:
+    """Claim and run queued deletion jobs. Returns the number of jobs run."""
+    processed = 0
+    while processed < max_jobs:
+        job = _claim_deletion_job()
+        if job is None:
+            break
+        run_deletion_job(job.id, job.user_id)
+        processed += 1
+    return processed
+
+
+# ==================== Export ====================
+
+def _safe_float(value) -> float | None:
+    """Safely convert a value to float, returning None if conversion fails."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+EXPORT_TRIPS_QUERY = """
+    SELECT t.id, t.title, t.start, t.eta, t.grace_min, t.location_text,
+           t.gen_lat, t.gen_lon, t.notes, t.status, t.completed_at, t.created_at,
+           a.name as activity_name, a.icon as activity_icon
+    FROM trips t
+    LEFT JOIN activities a ON t.activity = a.id
+    WHERE t.user_id = :user_id
+    ORDER BY t.created_at DESC, t.id DESC
+"""
+
+EXPORT_CONTACTS_QUERY = """
+    SELECT id, name, email
+    FROM contacts
+    WHERE user_id = :user_id
+    ORDER BY id DESC
+"""
+
+
+def format_export_profile(user) -> dict[str, Any]:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "age": user.age,
+        "created_at": str(user.created_at) if user.created_at else None
+    }
+
+
+def format_export_trip(t) -> dict[str, Any]:
+    return {
+        "id": t.id,
+        "title": t.title,
+        "activity": t.activity_name,
+        "activity_icon": t.activity_icon,
+        "start_at": str(t.start) if t.start else None,
+        "eta_at": str(t.eta) if t.eta else None,
+        "grace_minutes": t.grace_min,
+        "location_text": t.location_text,
+        "location_lat": _safe_float(t.gen_lat),
+        "location_lng": _safe_float(t.gen_lon),
+        "notes": t.notes,
+        "status": t.status,
+        "completed_at": str(t.completed_at) if t.completed_at else None,
+        "created_at": str(t.created_at) if t.created_at else None
+    }
+
+
+def format_export_contact(c) -> dict[str, Any]:
+    return {
+        "id": c.id,
+        "name": c.name,
+        "email": c.email
+    }
+
+
+def _ndjson_line(record_type: str, data: dict[str, Any]) -> bytes:
+    return (json.dumps({"type": record_type, "data": data}) + "\n").encode()
+
+
+def iter_user_export_ndjson(user_id: int, user=None) -> Iterator[bytes]:
+    """Stream a user's export as NDJSON, one record per line.
+
+    Lines are `{"type": ..., "data": ...}` with types profile, trip, contact
+    and finally summary. Trips and contacts are read through a server-side
+    cursor in chunks of EXPORT_CHUNK_SIZE.
+
+    Args:
+        user_id: The user to export
+        user: Already-loaded profile row, if the caller fetched it to check existence
+    """
+    with db.current_engine().connect() as conn:
+        if user is None:
+            user = conn.execute(
+                sqlalchemy.text("""
+                    SELECT id, email, first_name, last_name, age, created_at
+                    FROM users
+                    WHERE id = :user_id
+                """),
+                {"user_id": user_id}
+            ).fetchone()
+            if user is None:
+                return
+
+        yield _ndjson_line("export", {"exported_at": datetime.now(UTC).isoformat()})
+        yield _ndjson_line("profile", format_export_profile(user))
+
+        streaming = conn.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_SIZE)
+
+        total_trips = 0
+        for t in streaming.execute(sqlalchemy.text(EXPORT_TRIPS_QUERY), {"user_id": user_id}):
+            total_trips += 1
+            yield _ndjson_line("trip", format_export_trip(t))
+
+        total_contacts = 0
+        for c in streaming.execute(sqlalchemy.text(EXPORT_CONTACTS_QUERY), {"user_id": user_id}):
+            total_contacts += 1
+            yield _ndjson_line("contact", format_export_contact(c))
+
+        yield _ndjson_line("summary", {"total_trips": total_trips, "total_contacts": total_contacts})
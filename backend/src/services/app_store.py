@@ -22,10 +22,12 @@ import time
 from dataclasses import dataclass
 from typing import Any
 
-import httpx
-import jwt
-
 from src import config
+from src.services.lazy_imports import lazy_import
+
+# Only needed once a purchase is verified
+httpx = lazy_import("httpx")
+jwt = lazy_import("jwt")
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,150 @@
+"""Friendship adjacency lookups with a per-user friend-set cache.
+
+Friendships are stored once per pair with user_id_1 < user_id_2, so "friends
+of X" is the union of two indexed lookups (idx_friendships_user1 and
+idx_friendships_user2). An OR across both columns can't use either index.
+
+friend_ids() loads a user's whole friend set once and caches it in-process.
+It serves read paths (feeds, friend lists), where a set a few seconds old is
+harmless.
+
+non_friends() validates writes (friend contacts on a trip, group trip
+invitees) and never reads the cache: it checks every candidate id against
+the friendships table in one query, so a friendship removed on another
+worker can't still let a write through:
+
+    missing = friendships.non_friends(connection, user_id, body.friend_user_ids)
+    if missing:
+        raise HTTPException(400, f"User {missing[0]} is not in your friends list")
+
+Writers invalidate both users' cached sets once the transaction that created
+or removed a friendship has ended, not from inside it: until the commit, a
+concurrent request still reads (and may cache) the old set. invalidating()
+does this for the users a transaction adds to the set it yields (see
+accept_invite / remove_friend in api/friends.py):
+
+    with friendships.invalidating() as changed, db.engine.begin() as connection:
+        ...  # INSERT INTO / DELETE FROM friendships
+        changed.update((user_id, other_user_id))
+
+Whatever was cached by then is dropped, and a load that started earlier is
+not stored. The cache is per process: another worker can serve a stale set
+for up to FRIEND_CACHE_TTL_SECONDS (0 disables caching).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import ARRAY, Integer
+
+from .. import config
+from . import statements
+
+settings = config.get_settings()
+
+FRIEND_IDS_SQL = """
+    SELECT user_id_2 AS friend_id, created_at FROM friendships WHERE user_id_1 = :user_id
+    UNION ALL
+    SELECT user_id_1 AS friend_id, created_at FROM friendships WHERE user_id_2 = :user_id
+"""
+
+_FRIEND_IDS = statements.register(
+    "friendships.friend_ids",
+    f"SELECT friend_id FROM ({FRIEND_IDS_SQL}) f",
+    user_id=Integer,
+)
+
+_FRIENDS_AMONG = statements.register(
+    "friendships.friends_among",
+    """
+    SELECT user_id_2 AS friend_id FROM friendships
+    WHERE user_id_1 = :user_id AND user_id_2 = ANY(:candidate_ids)
+    UNION
+    SELECT user_id_1 AS friend_id FROM friendships
+    WHERE user_id_2 = :user_id AND user_id_1 = ANY(:candidate_ids)
+    """,
+    user_id=Integer,
+    candidate_ids=ARRAY(Integer),
+)
+
+# Friend sets by user id, with the monotonic time they were loaded
+_friend_cache: dict[int, tuple[frozenset[int], float]] = {}
+# Last invalidation per user: a set whose load started earlier is not stored
+_invalidated_at: dict[int, float] = {}
+_friend_cache_lock = threading.Lock()
+FRIEND_CACHE_MAX_ENTRIES = 10000
+
+
+def friend_ids(connection, user_id: int) -> frozenset[int]:
+    """All user ids that are friends with `user_id`."""
+    ttl = settings.FRIEND_CACHE_TTL_SECONDS
+    if ttl > 0:
+        cached = _friend_cache.get(user_id)
+        if cached is not None and time.monotonic() - cached[1] < ttl:
+            return cached[0]
+
+    loaded_at = time.monotonic()
+    friends = frozenset(row.friend_id for row in connection.execute(_FRIEND_IDS, {"user_id": user_id}))
+
+    if ttl > 0:
+        with _friend_cache_lock:
+            if len(_friend_cache) >= FRIEND_CACHE_MAX_ENTRIES:
+                _friend_cache.clear()
+                _invalidated_at.clear()
+            if _invalidated_at.get(user_id, 0.0) <= loaded_at:
+                _friend_cache[user_id] = (friends, loaded_at)
+    return friends
+
+
+def is_friend(connection, user_id: int, other_user_id: int) -> bool:
+    """Check if two users are friends."""
+    return other_user_id in friend_ids(connection, user_id)
+
+
+def non_friends(connection, user_id: int, candidate_ids: Iterable[int | None]) -> list[int]:
+    """The ids in `candidate_ids` (in order, None skipped) that aren't friends with `user_id`.
+
+    Reads the friendships table directly, not the cache, for validating writes.
+    """
+    candidates = [candidate for candidate in candidate_ids if candidate is not None]
+    if not candidates:
+        return []
+    friends = {
+        row.friend_id
+        for row in connection.execute(_FRIENDS_AMONG, {"user_id": user_id, "candidate_ids": list(set(candidates))})
+    }
+    return [candidate for candidate in candidates if candidate not in friends]
+
+
+def invalidate(*user_ids: int) -> None:
+    """Drop cached friend sets after a friendship involving these users changed."""
+    now = time.monotonic()
+    with _friend_cache_lock:
+        for user_id in user_ids:
+            _friend_cache.pop(user_id, None)
+            _invalidated_at[user_id] = now
+
+
+@contextmanager
+def invalidating() -> Iterator[set[int]]:
+    """Invalidate the users added to the yielded set once the block has exited.
+
+    Enter it before the transaction, so invalidation runs after the commit
+    (or rollback) instead of before the change is visible.
+    """
+    changed: set[int] = set()
+    try:
+        yield changed
+    finally:
+        if changed:
+            invalidate(*changed)
+
+
+def clear_friend_cache() -> None:
+    """Drop all cached friend sets. Useful for testing."""
+    with _friend_cache_lock:
+        _friend_cache.clear()
+        _invalidated_at.clear()
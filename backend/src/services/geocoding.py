@@ -3,7 +3,10 @@ from __future__ import annotations
 
 import logging
 
-import httpx
+from .lazy_imports import lazy_import
+
+# Only needed when coordinates are looked up
+httpx = lazy_import("httpx")
 
 log = logging.getLogger(__name__)
 
@@ -113,6 +116,95 @@ async def reverse_geocode(lat: float, lon: float) -> str | None:
         return None
 
 
+_USER_AGENT = "Homebound-App/1.0 (safety app for outdoor activities)"
+
+
+def _precise_params(lat: float, lon: float) -> dict:
+    return {
+        "lat": lat,
+        "lon": lon,
+        "format": "json",
+        "zoom": 18,  # Building level - maximum precision
+        "addressdetails": 1,
+    }
+
+
+def _precise_location_name(data: dict) -> str | None:
+    """Build "POI or street, city, state" from a zoom-18 Nominatim response."""
+    address = data.get("address", {})
+    components = []
+
+    # Priority 1: POI/Amenity name (parks, businesses, landmarks)
+    poi_keys = ["amenity", "tourism", "leisure", "shop", "building"]
+    poi_name = None
+    for key in poi_keys:
+        if key in address and address[key]:
+            # The POI name is often in the top-level "name" field
+            if data.get("name"):
+                poi_name = data["name"]
+                break
+
+    if poi_name:
+        components.append(poi_name)
+    else:
+        # Priority 2: Street address (house number + road)
+        road = address.get("road") or address.get("pedestrian") or address.get("path")
+        house_number = address.get("house_number")
+
+        if road:
+            if house_number:
+                components.append(f"{house_number} {road}")
+            else:
+                components.append(road)
+        else:
+            # Priority 3: Neighborhood/Suburb
+            neighborhood = address.get("neighbourhood") or address.get("suburb") or address.get("quarter")
+            if neighborhood:
+                components.append(neighborhood)
+
+    # Add city for context
+    city = (address.get("city") or address.get("town") or
+            address.get("village") or address.get("municipality"))
+    if city and (not components or city not in components[0]):
+        components.append(city)
+
+    # Add state abbreviation or name
+    state = address.get("state")
+    if state:
+        # Use common abbreviations for US states
+        state_abbrevs = {
+            "California": "CA", "New York": "NY", "Texas": "TX",
+            "Florida": "FL", "Washington": "WA", "Oregon": "OR",
+            "Colorado": "CO", "Arizona": "AZ", "Nevada": "NV",
+            "Utah": "UT", "Montana": "MT", "Idaho": "ID",
+            "Wyoming": "WY", "New Mexico": "NM", "Alaska": "AK",
+            "Hawaii": "HI", "Pennsylvania": "PA", "Illinois": "IL",
+            "Ohio": "OH", "Georgia": "GA", "North Carolina": "NC",
+            "Michigan": "MI", "New Jersey": "NJ", "Virginia": "VA",
+            "Massachusetts": "MA", "Tennessee": "TN", "Indiana": "IN",
+            "Missouri": "MO", "Maryland": "MD", "Wisconsin": "WI",
+            "Minnesota": "MN", "South Carolina": "SC", "Alabama": "AL",
+            "Louisiana": "LA", "Kentucky": "KY", "Oklahoma": "OK",
+            "Connecticut": "CT", "Iowa": "IA", "Mississippi": "MS",
+            "Arkansas": "AR", "Kansas": "KS", "Nebraska": "NE",
+            "West Virginia": "WV", "New Hampshire": "NH", "Maine": "ME",
+            "Rhode Island": "RI", "Delaware": "DE", "South Dakota": "SD",
+            "North Dakota": "ND", "Vermont": "VT", "District of Columbia": "DC",
+        }
+        state_abbrev = state_abbrevs.get(state, state)
+        components.append(state_abbrev)
+
+    if not components:
+        # Fallback: use display_name truncated
+        display_name = data.get("display_name", "")
+        if display_name:
+            parts = display_name.split(", ")[:3]
+            return ", ".join(parts)
+        return None
+
+    return ", ".join(components)
+
+
 def reverse_geocode_sync(lat: float, lon: float) -> str | None:
     """Synchronous version of reverse geocode for use in sync contexts.
 
@@ -129,16 +221,8 @@ def reverse_geocode_sync(lat: float, lon: float) -> str | None:
         with httpx.Client() as client:
             response = client.get(
                 NOMINATIM_URL,
-                params={
-                    "lat": lat,
-                    "lon": lon,
-                    "format": "json",
-                    "zoom": 18,  # Building level - maximum precision
-                    "addressdetails": 1,
-                },
-                headers={
-                    "User-Agent": "Homebound-App/1.0 (safety app for outdoor activities)"
-                },
+                params=_precise_params(lat, lon),
+                headers={"User-Agent": _USER_AGENT},
                 timeout=10.0
             )
 
@@ -147,82 +231,41 @@ def reverse_geocode_sync(lat: float, lon: float) -> str | None:
                 return None
 
             data = response.json()
+            return _precise_location_name(data) if data else None
 
-            if not data:
-                return None
+    except httpx.TimeoutException:
+        log.warning(f"Geocoding timeout for ({lat}, {lon})")
+        return None
+    except Exception as e:
+        log.warning(f"Geocoding error for ({lat}, {lon}): {e}")
+        return None
 
-            address = data.get("address", {})
-            components = []
 
-            # Priority 1: POI/Amenity name (parks, businesses, landmarks)
-            poi_keys = ["amenity", "tourism", "leisure", "shop", "building"]
-            poi_name = None
-            for key in poi_keys:
-                if key in address and address[key]:
-                    # The POI name is often in the top-level "name" field
-                    if data.get("name"):
-                        poi_name = data["name"]
-                        break
+async def reverse_geocode_precise(lat: float, lon: float) -> str | None:
+    """Async version of reverse_geocode_sync (same precise address), for async endpoints.
 
-            if poi_name:
-                components.append(poi_name)
-            else:
-                # Priority 2: Street address (house number + road)
-                road = address.get("road") or address.get("pedestrian") or address.get("path")
-                house_number = address.get("house_number")
-
-                if road:
-                    if house_number:
-                        components.append(f"{house_number} {road}")
-                    else:
-                        components.append(road)
-                else:
-                    # Priority 3: Neighborhood/Suburb
-                    neighborhood = address.get("neighbourhood") or address.get("suburb") or address.get("quarter")
-                    if neighborhood:
-                        components.append(neighborhood)
-
-            # Add city for context
-            city = (address.get("city") or address.get("town") or
-                    address.get("village") or address.get("municipality"))
-            if city and (not components or city not in components[0]):
-                components.append(city)
-
-            # Add state abbreviation or name
-            state = address.get("state")
-            if state:
-                # Use common abbreviations for US states
-                state_abbrevs = {
-                    "California": "CA", "New York": "NY", "Texas": "TX",
-                    "Florida": "FL", "Washington": "WA", "Oregon": "OR",
-                    "Colorado": "CO", "Arizona": "AZ", "Nevada": "NV",
-                    "Utah": "UT", "Montana": "MT", "Idaho": "ID",
-                    "Wyoming": "WY", "New Mexico": "NM", "Alaska": "AK",
-                    "Hawaii": "HI", "Pennsylvania": "PA", "Illinois": "IL",
-                    "Ohio": "OH", "Georgia": "GA", "North Carolina": "NC",
-                    "Michigan": "MI", "New Jersey": "NJ", "Virginia": "VA",
-                    "Massachusetts": "MA", "Tennessee": "TN", "Indiana": "IN",
-                    "Missouri": "MO", "Maryland": "MD", "Wisconsin": "WI",
-                    "Minnesota": "MN", "South Carolina": "SC", "Alabama": "AL",
-                    "Louisiana": "LA", "Kentucky": "KY", "Oklahoma": "OK",
-                    "Connecticut": "CT", "Iowa": "IA", "Mississippi": "MS",
-                    "Arkansas": "AR", "Kansas": "KS", "Nebraska": "NE",
-                    "West Virginia": "WV", "New Hampshire": "NH", "Maine": "ME",
-                    "Rhode Island": "RI", "Delaware": "DE", "South Dakota": "SD",
-                    "North Dakota": "ND", "Vermont": "VT", "District of Columbia": "DC",
-                }
-                state_abbrev = state_abbrevs.get(state, state)
-                components.append(state_abbrev)
+    Args:
+        lat: Latitude
+        lon: Longitude
 
-            if not components:
-                # Fallback: use display_name truncated
-                display_name = data.get("display_name", "")
-                if display_name:
-                    parts = display_name.split(", ")[:3]
-                    return ", ".join(parts)
+    Returns:
+        Human-readable location string or None
+    """
+    try:
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                NOMINATIM_URL,
+                params=_precise_params(lat, lon),
+                headers={"User-Agent": _USER_AGENT},
+                timeout=10.0
+            )
+
+            if response.status_code != 200:
+                log.warning(f"Nominatim returned {response.status_code}")
                 return None
 
-            return ", ".join(components)
+            data = response.json()
+            return _precise_location_name(data) if data else None
 
     except httpx.TimeoutException:
         log.warning(f"Geocoding timeout for ({lat}, {lon})")
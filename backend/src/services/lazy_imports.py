@@ -0,0 +1,47 @@
+"""Deferred imports for heavy optional-path dependencies.
+
+Several SDKs are only needed on a few code paths but cost tens of
+milliseconds to import (httpx pulls in its CLI's click and pygments,
+requests pulls in urllib3 and charset_normalizer, resend its HTTP stack).
+On a serverless cold start that time is paid before the first response.
+
+    httpx = lazy_import("httpx")
+
+binds a module object whose code runs on first attribute access
+(importlib.util.LazyLoader), so the import costs nothing until e.g.
+httpx.AsyncClient is used. The module is registered in sys.modules, so
+other modules importing it share the same object, and tests can still
+patch("src.services.geocoding.httpx.AsyncClient").
+
+python -m src.scripts.profile_imports shows what is still imported eagerly.
+"""
+from __future__ import annotations
+
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return module `name`, executing it on first attribute access.
+
+    Raises:
+        ModuleNotFoundError: If the module isn't installed (checked eagerly)
+    """
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
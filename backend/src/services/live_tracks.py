@@ -0,0 +1,246 @@
+"""Compact breadcrumb storage for live location history.
+
+Live location fixes land in live_locations, one row per fix. Those rows are
+the hot tail of a (trip, user) track: they hold the latest position read by
+friend and participant views, the rate limit check and the unique index
+that deduplicates batch uploads. Once a track's tail grows past
+TRACK_TAIL_POINTS + TRACK_CHUNK_POINTS rows, compact() moves everything but
+the newest TRACK_TAIL_POINTS rows into one live_location_tracks chunk:
+
+    path     Encoded polyline (Google's algorithm, 1e-5 degree precision)
+    offsets  Seconds since started_at per point, delta encoded the same way
+
+A walking chunk of 100 fixes 10 seconds apart packs into about 300 bytes
+instead of 100 wide rows, and the whole trip is kept rather than only the
+newest 100 fixes. Altitude, accuracy and speed are only kept for the tail.
+
+load_track() merges a track's chunks and tail in time order, so fixes that
+arrive late (an offline batch uploaded after newer fixes were compacted)
+still land in the right place.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import Integer
+
+from . import statements
+
+# Raw rows kept per (trip, user) after compaction
+TRACK_TAIL_POINTS = 20
+# Fixes packed into each chunk: compaction runs once the tail exceeds
+# TRACK_TAIL_POINTS + TRACK_CHUNK_POINTS rows
+TRACK_CHUNK_POINTS = 100
+# Polyline coordinate precision (5 decimal places, about 1.1 m)
+COORDINATE_FACTOR = 1e5
+
+
+@dataclass(frozen=True)
+class TrackPoint:
+    latitude: float
+    longitude: float
+    timestamp: datetime
+
+
+_TAIL_SIZE = statements.register(
+    "live_tracks.tail_size",
+    """
+    SELECT COUNT(*) FROM live_locations
+    WHERE trip_id = :trip_id AND user_id = :user_id
+    """,
+    trip_id=Integer,
+    user_id=Integer
+)
+
+# Two requests compacting the same track don't pack a fix twice: the second
+# DELETE waits on the rows the first one locked, and once the first commits it
+# re-checks them, finds them gone and leaves them out of its RETURNING
+_TAKE_COMPACTABLE = statements.register(
+    "live_tracks.take_compactable",
+    """
+    WITH moved AS (
+        DELETE FROM live_locations
+        WHERE id IN (
+            SELECT id FROM live_locations
+            WHERE trip_id = :trip_id AND user_id = :user_id
+            ORDER BY timestamp DESC
+            OFFSET :keep
+        )
+        RETURNING latitude, longitude, timestamp
+    )
+    SELECT latitude, longitude, timestamp FROM moved ORDER BY timestamp
+    """,
+    trip_id=Integer,
+    user_id=Integer,
+    keep=Integer
+)
+
+_INSERT_CHUNK = statements.register(
+    "live_tracks.insert_chunk",
+    """
+    INSERT INTO live_location_tracks
+    (trip_id, user_id, started_at, ended_at, point_count, path, offsets)
+    VALUES (:trip_id, :user_id, :started_at, :ended_at, :point_count, :path, :offsets)
+    """,
+    trip_id=Integer,
+    user_id=Integer,
+    point_count=Integer
+)
+
+_TRACK_CHUNKS = statements.register(
+    "live_tracks.chunks",
+    """
+    SELECT started_at, path, offsets FROM live_location_tracks
+    WHERE trip_id = :trip_id AND user_id = :user_id
+    ORDER BY started_at
+    """,
+    trip_id=Integer,
+    user_id=Integer
+)
+
+_TRACK_TAIL = statements.register(
+    "live_tracks.tail",
+    """
+    SELECT latitude, longitude, timestamp FROM live_locations
+    WHERE trip_id = :trip_id AND user_id = :user_id
+    ORDER BY timestamp
+    """,
+    trip_id=Integer,
+    user_id=Integer
+)
+
+
+# ==================== Encoding ====================
+
+def _encode_values(values: list[int]) -> str:
+    """Encode signed integer deltas with the polyline character scheme."""
+    out = []
+    for value in values:
+        value = ~(value << 1) if value < 0 else value << 1
+        while value >= 0x20:
+            out.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        out.append(chr(value + 63))
+    return "".join(out)
+
+
+def _decode_values(encoded: str) -> list[int]:
+    values = []
+    value = shift = 0
+    for char in encoded:
+        chunk = ord(char) - 63
+        value |= (chunk & 0x1F) << shift
+        shift += 5
+        if chunk < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    return values
+
+
+def _deltas(values: list[int]) -> list[int]:
+    return [value - previous for previous, value in zip([0, *values], values)]
+
+
+def _running_sum(deltas: list[int]) -> list[int]:
+    total = 0
+    values = []
+    for delta in deltas:
+        total += delta
+        values.append(total)
+    return values
+
+
+def encode_track(points: list[TrackPoint]) -> tuple[datetime, str, str]:
+    """Pack points (oldest first) into (started_at, path, offsets).
+
+    started_at is the first point's time truncated to the second; offsets are
+    whole seconds from it.
+    """
+    started_at = points[0].timestamp.replace(microsecond=0)
+    # Polyline deltas are per axis, interleaved latitude then longitude
+    latitudes = _deltas([round(point.latitude * COORDINATE_FACTOR) for point in points])
+    longitudes = _deltas([round(point.longitude * COORDINATE_FACTOR) for point in points])
+    path = _encode_values([delta for pair in zip(latitudes, longitudes) for delta in pair])
+    seconds = [int((point.timestamp - started_at).total_seconds()) for point in points]
+    return started_at, path, _encode_values(_deltas(seconds))
+
+
+def decode_track(started_at: datetime, path: str, offsets: str) -> list[TrackPoint]:
+    """Unpack a chunk produced by encode_track()."""
+    deltas = _decode_values(path)
+    latitudes = _running_sum(deltas[0::2])
+    longitudes = _running_sum(deltas[1::2])
+    seconds = _running_sum(_decode_values(offsets))
+    return [
+        TrackPoint(lat / COORDINATE_FACTOR, lon / COORDINATE_FACTOR, started_at + timedelta(seconds=offset))
+        for lat, lon, offset in zip(latitudes, longitudes, seconds)
+    ]
+
+
+# ==================== Storage ====================
+
+def compact_if_needed(connection, trip_id: int, user_id: int) -> int:
+    """Compact a track's tail into a chunk once it has grown past a full chunk.
+
+    Called after every insert into live_locations. Returns the number of
+    fixes moved into the chunk (0 if the tail was still short).
+    """
+    tail_size = connection.execute(_TAIL_SIZE, {"trip_id": trip_id, "user_id": user_id}).scalar_one()
+    if tail_size <= TRACK_TAIL_POINTS + TRACK_CHUNK_POINTS:
+        return 0
+    return compact(connection, trip_id, user_id)
+
+
+def compact(connection, trip_id: int, user_id: int) -> int:
+    """Move all but the newest TRACK_TAIL_POINTS fixes of a track into one chunk.
+
+    Returns the number of fixes moved.
+    """
+    rows = connection.execute(
+        _TAKE_COMPACTABLE,
+        {"trip_id": trip_id, "user_id": user_id, "keep": TRACK_TAIL_POINTS}
+    ).fetchall()
+    if not rows:
+        return 0
+
+    points = [TrackPoint(row.latitude, row.longitude, row.timestamp) for row in rows]
+    started_at, path, offsets = encode_track(points)
+    connection.execute(
+        _INSERT_CHUNK,
+        {
+            "trip_id": trip_id,
+            "user_id": user_id,
+            "started_at": started_at,
+            "ended_at": points[-1].timestamp,
+            "point_count": len(points),
+            "path": path,
+            "offsets": offsets,
+        }
+    )
+    return len(points)
+
+
+def load_track(connection, trip_id: int, user_id: int) -> list[TrackPoint]:
+    """The full breadcrumb trail of a user on a trip, oldest first.
+
+    Points are deduplicated by second, since chunks keep whole seconds.
+    """
+    params = {"trip_id": trip_id, "user_id": user_id}
+    points = []
+    for chunk in connection.execute(_TRACK_CHUNKS, params):
+        points.extend(decode_track(chunk.started_at, chunk.path, chunk.offsets))
+    points.extend(
+        TrackPoint(row.latitude, row.longitude, row.timestamp)
+        for row in connection.execute(_TRACK_TAIL, params)
+    )
+
+    points.sort(key=lambda point: point.timestamp)
+    track = []
+    last_second = None
+    for point in points:
+        second = point.timestamp.replace(microsecond=0)
+        if second != last_second:
+            track.append(point)
+            last_second = second
+    return track
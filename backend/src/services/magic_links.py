@@ -0,0 +1,192 @@
+"""Short-window idempotency for magic-link check-in and check-out.
+
+/t/{token}/checkin and /t/{token}/checkout are opened from emails and
+notification actions, so one intent often arrives as a burst: a double tap,
+a mail client or link scanner prefetching the URL, a retry after a slow
+response. Each real check-in inserts an event and fans out a Live Activity
+update, pushes, emails and geocoding; a repeated checkout finds the trip
+completed and answers 404 to the person who just got home.
+
+The response to a successful action is kept per (action, token) for
+MAGIC_LINK_DEDUPE_SECONDS (0 disables it). A duplicate within that window
+gets the same response without touching the database or scheduling any
+background work:
+
+    return await magic_links.run_once("checkin", token, lambda: _check_in(...))
+
+run_once() also makes concurrent duplicates on the same event loop wait for
+the request already in flight instead of running their own. Sync endpoints
+(checkout) use run_once_sync(), where duplicates on other threads wait the
+same way. Either way the response is kept only once the handler has
+returned, i.e. after its transaction committed, so a failed commit never
+leaves a "success" behind.
+
+The cache is per process: duplicates reaching another worker run normally,
+which for checkout means the usual 404 once the trip is completed.
+
+homebound_magic_link_duplicates_total counts the duplicates answered from
+the cache or an in-flight request.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .. import config
+from . import metrics
+
+settings = config.get_settings()
+
+magic_link_duplicates = metrics.counter(
+    "homebound_magic_link_duplicates_total", "Duplicate magic-link requests answered without re-running", ("action",)
+)
+
+# Responses by (action, token), with the monotonic time they were stored
+_recent: dict[tuple[str, str], tuple[Any, float]] = {}
+# Requests being handled, by (action, token)
+_in_flight: dict[tuple[str, str], asyncio.Future] = {}
+# Requests being handled by sync endpoints, by (action, token)
+_in_flight_sync: dict[tuple[str, str], _SyncCall] = {}
+_lock = threading.Lock()
+MAGIC_LINK_MAX_ENTRIES = 10000
+
+
+def recent_response(action: str, token: str) -> Any | None:
+    """The response to the same action and token within the window, if any."""
+    window = settings.MAGIC_LINK_DEDUPE_SECONDS
+    if window <= 0:
+        return None
+    with _lock:
+        cached = _recent.get((action, token))
+    if cached is None or time.monotonic() - cached[1] >= window:
+        return None
+    magic_link_duplicates.inc(action=action)
+    return cached[0]
+
+
+def remember(action: str, token: str, response: Any) -> None:
+    """Keep the response to a completed action for the window."""
+    if settings.MAGIC_LINK_DEDUPE_SECONDS <= 0:
+        return
+    with _lock:
+        if len(_recent) >= MAGIC_LINK_MAX_ENTRIES:
+            now = time.monotonic()
+            window = settings.MAGIC_LINK_DEDUPE_SECONDS
+            for key in [key for key, (_, stored_at) in _recent.items() if now - stored_at >= window]:
+                del _recent[key]
+            if len(_recent) >= MAGIC_LINK_MAX_ENTRIES:
+                _recent.clear()
+        _recent[(action, token)] = (response, time.monotonic())
+
+
+def forget(action: str, token: str | None) -> None:
+    """Drop a kept response, e.g. a check-in's once the trip is completed."""
+    if token is None:
+        return
+    with _lock:
+        _recent.pop((action, token), None)
+
+
+async def run_once(action: str, token: str, handler: Callable[[], Awaitable[Any]]) -> Any:
+    """Run `handler` unless the same action and token just ran or is running.
+
+    Returns:
+        The handler's response, or the one kept for a duplicate. A duplicate
+        of a request in flight gets its response or re-raises its error.
+    """
+    cached = recent_response(action, token)
+    if cached is not None:
+        return cached
+
+    key = (action, token)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        pending = _in_flight.get(key)
+        if pending is None or pending.get_loop() is not loop:
+            pending = None
+            future = _in_flight[key] = loop.create_future()
+    if pending is not None:
+        magic_link_duplicates.inc(action=action)
+        return await asyncio.shield(pending)
+
+    try:
+        response = await handler()
+    except Exception as e:
+        future.set_exception(e)
+        # Waiters re-raise it; retrieving it here stops an unawaited future from logging it
+        future.exception()
+        raise
+    else:
+        remember(action, token, response)
+        future.set_result(response)
+        return response
+    finally:
+        if not future.done():
+            future.cancel()
+        with _lock:
+            if _in_flight.get(key) is future:
+                del _in_flight[key]
+
+
+class _SyncCall:
+    """A sync request in flight, for duplicates on other threads to wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Any = None
+        self.error: Exception | None = None
+
+
+def run_once_sync(action: str, token: str, handler: Callable[[], Any]) -> Any:
+    """run_once() for sync endpoints, whose duplicates arrive on other threads.
+
+    Returns:
+        The handler's response, or the one kept for a duplicate. A duplicate
+        of a request in flight waits for its response or re-raises its error.
+    """
+    cached = recent_response(action, token)
+    if cached is not None:
+        return cached
+
+    key = (action, token)
+    with _lock:
+        call = _in_flight_sync.get(key)
+        if call is None:
+            # The request we just missed may have finished meanwhile; it kept its response first
+            finished = _recent.get(key)
+            if finished is not None and time.monotonic() - finished[1] < settings.MAGIC_LINK_DEDUPE_SECONDS:
+                magic_link_duplicates.inc(action=action)
+                return finished[0]
+            call = _in_flight_sync[key] = _SyncCall()
+            running = True
+        else:
+            running = False
+    if not running:
+        magic_link_duplicates.inc(action=action)
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.response
+
+    try:
+        call.response = handler()
+    except Exception as e:
+        call.error = e
+        raise
+    else:
+        remember(action, token, call.response)
+        return call.response
+    finally:
+        with _lock:
+            if _in_flight_sync.get(key) is call:
+                del _in_flight_sync[key]
+        call.done.set()
+
+
+def clear_recent_responses() -> None:
+    """Drop all kept responses. Useful for testing."""
+    with _lock:
+        _recent.clear()
@@ -12,10 +12,18 @@ import sqlalchemy
 from .. import database as db
 from ..config import get_settings
 from ..messaging.resend_backend import html_to_text
+from . import metrics
+from .refresh_coalescer import PendingRefresh, RefreshCoalescer, collapse_id as refresh_collapse_id
 
 settings = get_settings()
 log = logging.getLogger(__name__)
 
+# Delivery outcomes for /metrics (push outcomes are per device)
+notifications_sent = metrics.counter(
+    "homebound_notifications_total", "Notification delivery attempts by channel and outcome",
+    ("channel", "type", "outcome")
+)
+
 
 # ==================== Friend Push Notifications ====================
 # Friends receive push notifications instead of email
@@ -507,19 +515,38 @@ async def send_data_refresh_push(
     - Checkout vote cast
     - Trip completed by vote
 
+    Signals for the same user, sync type and trip within REFRESH_PUSH_COALESCE_SECONDS
+    are merged and sent as one push while the app's coalescer is running
+    (see services/refresh_coalescer.py).
+
     Args:
         user_id: The user to refresh data for
         sync_type: Type of sync needed (e.g., "friends", "trip", "trip_invitations")
         trip_id: Optional trip ID if related to a specific trip
     """
+    window = settings.REFRESH_PUSH_COALESCE_SECONDS
+    if window > 0 and refresh_coalescer.running:
+        if refresh_coalescer.signal(user_id, sync_type, trip_id, window):
+            log.info(f"Queued data refresh push to user {user_id}: sync={sync_type}, trip_id={trip_id}")
+        return
+
     data = {"sync": sync_type}
     if trip_id:
         data["trip_id"] = str(trip_id)
 
-    await send_background_push_to_user(user_id, data=data)
+    await send_background_push_to_user(user_id, data=data, collapse_id=refresh_collapse_id(sync_type))
     log.info(f"Sent data refresh push to user {user_id}: sync={sync_type}, trip_id={trip_id}")
 
 
+async def _send_coalesced_refresh(pending: PendingRefresh) -> None:
+    """Send one coalesced refresh push (a task on the coalescer's event loop)."""
+    await send_background_push_to_user(pending.user_id, data=pending.payload(), collapse_id=pending.collapse_id)
+    log.info(f"Sent data refresh push to user {pending.user_id}: {pending.payload()}")
+
+
+refresh_coalescer = RefreshCoalescer(send=_send_coalesced_refresh)
+
+
 def log_notification(
     user_id: int,
     notification_type: str,
@@ -541,7 +568,7 @@ def log_notification(
         error_message: Error details if status is 'failed' (optional)
     """
     try:
-        with db.engine.begin() as conn:
+        with db.current_engine().begin() as conn:
             conn.execute(
                 sqlalchemy.text("""
                     INSERT INTO notification_logs
@@ -663,15 +690,63 @@ async def send_email(
             from_email=from_email,
             high_priority=high_priority
         )
+        notifications_sent.inc(channel="email", type="email", outcome="sent" if success else "failed")
         if not success:
             log.error(f"Failed to send email to {email}")
     elif settings.EMAIL_BACKEND == "console":
+        notifications_sent.inc(channel="email", type="email", outcome="console")
         priority_note = " [HIGH PRIORITY]" if high_priority else ""
         log.info(f"[CONSOLE EMAIL]{priority_note} To: {email}\nFrom: {from_email or 'default'}\nSubject: {subject}\n{body}")
     else:
         log.warning(f"Unknown email backend: {settings.EMAIL_BACKEND}")
 
 
+# Lookups for the push senders. They run on a worker thread (asyncio.to_thread) so
+# callers on the server's event loop keep serving requests while the query runs.
+
+def _push_preferences(user_id: int):
+    with db.current_engine().begin() as conn:
+        return conn.execute(
+            sqlalchemy.text(
+                "SELECT notify_trip_reminders, notify_checkin_alerts FROM users WHERE id = :uid"
+            ),
+            {"uid": user_id}
+        ).fetchone()
+
+
+def _ios_devices(user_id: int, env: str) -> list:
+    with db.current_engine().begin() as conn:
+        return conn.execute(
+            sqlalchemy.text(
+                "SELECT token, env FROM devices WHERE user_id = :uid AND platform = 'ios' AND env = :env"
+            ),
+            {"uid": user_id, "env": env}
+        ).fetchall()
+
+
+def _live_activity_token(trip_id: int, log_missing: bool):
+    with db.current_engine().connect() as conn:
+        token_row = conn.execute(
+            sqlalchemy.text("""
+                SELECT token, env FROM live_activity_tokens
+                WHERE trip_id = :trip_id
+            """),
+            {"trip_id": trip_id}
+        ).fetchone()
+
+        # The first time a token is missing, log all tokens in database for debugging
+        if token_row is None and log_missing:
+            all_tokens = conn.execute(
+                sqlalchemy.text("SELECT trip_id, env FROM live_activity_tokens ORDER BY trip_id")
+            ).fetchall()
+            if all_tokens:
+                token_list = ", ".join([f"trip_{t.trip_id}({t.env})" for t in all_tokens])
+                log.info(f"[LiveActivity] Tokens in DB: [{token_list}]")
+            else:
+                log.info("[LiveActivity] No tokens in database")
+        return token_row
+
+
 async def send_push_to_user(
     user_id: int,
     title: str,
@@ -705,25 +780,21 @@ async def send_push_to_user(
 
     # Check user preferences (emergency notifications always sent for safety)
     if notification_type != "emergency":
-        with db.engine.begin() as conn:
-            prefs = conn.execute(
-                sqlalchemy.text(
-                    "SELECT notify_trip_reminders, notify_checkin_alerts FROM users WHERE id = :uid"
-                ),
-                {"uid": user_id}
-            ).fetchone()
-
-            if prefs:
-                if notification_type == "trip_reminder" and not prefs.notify_trip_reminders:
-                    log.info(f"[APNS] Skipping trip reminder for user {user_id} - disabled by preference")
-                    return
-                if notification_type == "checkin" and not prefs.notify_checkin_alerts:
-                    log.info(f"[APNS] Skipping check-in alert for user {user_id} - disabled by preference")
-                    return
+        prefs = await asyncio.to_thread(_push_preferences, user_id)
+        if prefs:
+            if notification_type == "trip_reminder" and not prefs.notify_trip_reminders:
+                log.info(f"[APNS] Skipping trip reminder for user {user_id} - disabled by preference")
+                notifications_sent.inc(channel="push", type=notification_type, outcome="skipped_preference")
+                return
+            if notification_type == "checkin" and not prefs.notify_checkin_alerts:
+                log.info(f"[APNS] Skipping check-in alert for user {user_id} - disabled by preference")
+                notifications_sent.inc(channel="push", type=notification_type, outcome="skipped_preference")
+                return
 
     if settings.PUSH_BACKEND == "dummy":
         log.info(f"[DUMMY PUSH] User: {user_id} - {title}: {body}")
-        log_notification(user_id, "push", title, body, "sent", error_message="dummy backend")
+        notifications_sent.inc(channel="push", type=notification_type, outcome="dummy")
+        await asyncio.to_thread(log_notification, user_id, "push", title, body, "sent", error_message="dummy backend")
         return
 
     if settings.PUSH_BACKEND != "apns":
@@ -732,16 +803,11 @@ async def send_push_to_user(
 
     # Query user's iOS devices matching current environment (sandbox vs production)
     current_env = "sandbox" if settings.APNS_USE_SANDBOX else "production"
-    with db.engine.begin() as conn:
-        devices = conn.execute(
-            sqlalchemy.text(
-                "SELECT token, env FROM devices WHERE user_id = :uid AND platform = 'ios' AND env = :env"
-            ),
-            {"uid": user_id, "env": current_env}
-        ).fetchall()
+    devices = await asyncio.to_thread(_ios_devices, user_id, current_env)
 
     if not devices:
         log.warning(f"[APNS] No iOS devices registered for user {user_id} in {current_env} environment - notification not sent: {title}")
+        notifications_sent.inc(channel="push", type=notification_type, outcome="no_devices")
         return
 
     # Send to each device with retry logic
@@ -757,23 +823,32 @@ async def send_push_to_user(
                 result = await sender.send(device.token, title, body, data, category)
                 if result.ok:
                     log.info(f"[APNS] Sent to user {user_id}: {title}")
-                    log_notification(user_id, "push", title, body, "sent", device_token=device.token)
+                    await asyncio.to_thread(
+                        log_notification, user_id, "push", title, body, "sent", device_token=device.token
+                    )
+                    notifications_sent.inc(channel="push", type=notification_type, outcome="sent")
                     success = True
                     break
                 elif result.status == 410:
                     # 410 Gone = device unregistered, mark for removal (don't retry)
                     log.info(f"[APNS] Device unregistered for user {user_id}, will remove token")
                     tokens_to_remove.append(device.token)
-                    log_notification(user_id, "push", title, body, "failed", device_token=device.token,
-                                   error_message="Device unregistered (410)")
+                    notifications_sent.inc(channel="push", type=notification_type, outcome="unregistered")
+                    await asyncio.to_thread(
+                        log_notification, user_id, "push", title, body, "failed", device_token=device.token,
+                        error_message="Device unregistered (410)"
+                    )
                     success = True  # Not a retry-able error
                     break
                 elif result.status == 400 and result.detail in ("BadDeviceToken", "DeviceTokenNotForTopic", "Unregistered"):
                     # 400 BadDeviceToken/DeviceTokenNotForTopic/Unregistered = invalid token, mark for removal
                     log.info(f"[APNS] Bad device token for user {user_id} ({result.detail}), will remove")
                     tokens_to_remove.append(device.token)
-                    log_notification(user_id, "push", title, body, "failed", device_token=device.token,
-                                   error_message=f"{result.detail} (400)")
+                    notifications_sent.inc(channel="push", type=notification_type, outcome="unregistered")
+                    await asyncio.to_thread(
+                        log_notification, user_id, "push", title, body, "failed", device_token=device.token,
+                        error_message=f"{result.detail} (400)"
+                    )
                     success = True  # Not a retry-able error
                     break
                 else:
@@ -792,12 +867,15 @@ async def send_push_to_user(
 
         # Log failure if all retries exhausted
         if not success and last_error:
-            log_notification(user_id, "push", title, body, "failed", device_token=device.token,
-                           error_message=f"All retries failed: {last_error}")
+            notifications_sent.inc(channel="push", type=notification_type, outcome="failed")
+            await asyncio.to_thread(
+                log_notification, user_id, "push", title, body, "failed", device_token=device.token,
+                error_message=f"All retries failed: {last_error}"
+            )
 
     # Remove unregistered device tokens
     if tokens_to_remove:
-        with db.engine.begin() as conn:
+        with db.current_engine().begin() as conn:
             for token in tokens_to_remove:
                 conn.execute(
                     sqlalchemy.text("DELETE FROM devices WHERE token = :token"),
@@ -806,7 +884,7 @@ async def send_push_to_user(
             log.info(f"[APNS] Removed {len(tokens_to_remove)} unregistered device(s) for user {user_id}")
 
 
-async def send_background_push_to_user(user_id: int, data: dict):
+async def send_background_push_to_user(user_id: int, data: dict, collapse_id: str | None = None):
     """Send a background push notification that wakes the app.
 
     Uses content-available: 1 to wake the app in the background so it can
@@ -815,6 +893,7 @@ async def send_background_push_to_user(user_id: int, data: dict):
     Args:
         user_id: The user to send the notification to
         data: Custom data payload to include (e.g., {"sync": "start_live_activity", "trip_id": 123})
+        collapse_id: Optional apns-collapse-id so APNs replaces an undelivered push with the same id
     """
     import asyncio
     from ..messaging.apns import get_push_sender
@@ -829,13 +908,7 @@ async def send_background_push_to_user(user_id: int, data: dict):
 
     # Query user's iOS devices matching current environment
     current_env = "sandbox" if settings.APNS_USE_SANDBOX else "production"
-    with db.engine.begin() as conn:
-        devices = conn.execute(
-            sqlalchemy.text(
-                "SELECT token, env FROM devices WHERE user_id = :uid AND platform = 'ios' AND env = :env"
-            ),
-            {"uid": user_id, "env": current_env}
-        ).fetchall()
+    devices = await asyncio.to_thread(_ios_devices, user_id, current_env)
 
     if not devices:
         log.warning(f"[APNS] No iOS devices for user {user_id} - background push not sent")
@@ -846,7 +919,7 @@ async def send_background_push_to_user(user_id: int, data: dict):
     for device in devices:
         try:
             if hasattr(sender, 'send_background'):
-                result = await sender.send_background(device.token, data)
+                result = await sender.send_background(device.token, data, collapse_id=collapse_id)
                 if result.ok:
                     log.info(f"[APNS] Background push sent to user {user_id}: {data}")
                 else:
@@ -900,25 +973,7 @@ async def send_live_activity_update(
 
     token_row = None
     for attempt in range(MAX_TOKEN_RETRIES):
-        with db.engine.connect() as conn:
-            token_row = conn.execute(
-                sqlalchemy.text("""
-                    SELECT token, env FROM live_activity_tokens
-                    WHERE trip_id = :trip_id
-                """),
-                {"trip_id": trip_id}
-            ).fetchone()
-
-            # On first attempt, log all tokens in database for debugging
-            if attempt == 0:
-                all_tokens = conn.execute(
-                    sqlalchemy.text("SELECT trip_id, env FROM live_activity_tokens ORDER BY trip_id")
-                ).fetchall()
-                if all_tokens:
-                    token_list = ", ".join([f"trip_{t.trip_id}({t.env})" for t in all_tokens])
-                    log.info(f"[LiveActivity] Tokens in DB: [{token_list}]")
-                else:
-                    log.info("[LiveActivity] No tokens in database")
+        token_row = await asyncio.to_thread(_live_activity_token, trip_id, attempt == 0)
 
         if token_row:
             log.info(f"[LiveActivity] Found token for trip {trip_id}: env={token_row.env}, prefix={token_row.token[:20]}...")
@@ -941,7 +996,7 @@ async def send_live_activity_update(
             "Cleaning up stale token - device will need to re-register."
         )
         # Auto-cleanup the mismatched token instead of leaving it stale
-        with db.engine.begin() as conn:
+        with db.current_engine().begin() as conn:
             conn.execute(
                 sqlalchemy.text("DELETE FROM live_activity_tokens WHERE trip_id = :trip_id"),
                 {"trip_id": trip_id}
@@ -1002,7 +1057,7 @@ async def send_live_activity_update(
             # Terminal errors - don't retry, handle token invalidation
             if result.status == 410 or result.detail in TERMINAL_ERRORS:
                 log.info(f"[LiveActivity] Removing invalid token for trip {trip_id} (error: {result.detail})")
-                with db.engine.begin() as conn:
+                with db.current_engine().begin() as conn:
                     conn.execute(
                         sqlalchemy.text("DELETE FROM live_activity_tokens WHERE trip_id = :trip_id"),
                         {"trip_id": trip_id}
@@ -0,0 +1,291 @@
+"""Per-request SQL instrumentation.
+
+Engine events attribute every statement to the request (or `track_queries()`
+block) currently running, via a context variable, and record:
+- number of statements executed
+- total time spent executing them
+- the slowest statement
+- time spent waiting for a pooled connection
+
+TimedQueuePool also keeps per-pool gauges of connections in use, idle and in
+overflow, a histogram of checkout waits, and counters for checkout timeouts
+and disconnect invalidations, labelled with the pool name ("api",
+"api_async", "scheduler").
+
+QueryMetricsMiddleware opens a tracking scope for every HTTP request, adds a
+Server-Timing header, logs a structured summary (a warning when a request
+exceeds the query/DB-time thresholds) and feeds the /metrics registry.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .. import config
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+settings = config.get_settings()
+
+# Longest statement text kept for the slowest query / budget reports
+STATEMENT_PREVIEW_CHARS = 300
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class QueryStats:
+    """SQL activity attributed to one request or tracking block."""
+    query_count: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+    record_statements: bool = False
+    statements: list[str] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.query_count += 1
+            self.db_seconds += elapsed
+            if elapsed >= self.slowest_seconds:
+                self.slowest_seconds = elapsed
+                self.slowest_statement = _preview(statement)
+            if self.record_statements:
+                self.statements.append(_preview(statement))
+
+    def record_pool_wait(self, elapsed: float) -> None:
+        with self._lock:
+            self.pool_wait_seconds += elapsed
+
+    def as_log_dict(self) -> dict:
+        return {
+            "queries": self.query_count,
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "pool_wait_ms": round(self.pool_wait_seconds * 1000, 2),
+            "slowest_ms": round(self.slowest_seconds * 1000, 2),
+            "slowest_statement": self.slowest_statement,
+        }
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _preview(statement: str) -> str:
+    return _WHITESPACE_RE.sub(" ", statement).strip()[:STATEMENT_PREVIEW_CHARS]
+
+
+def current_stats() -> QueryStats | None:
+    """Stats for the request or tracking block running in this context, if any."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    """Attribute SQL executed inside the block to a fresh QueryStats.
+
+    Args:
+        record_statements: Keep the text of every statement (for budget reports)
+    """
+    stats = QueryStats(record_statements=record_statements)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# Pool telemetry, labelled by pool name
+_pool_connections = metrics.gauge(
+    "homebound_db_pool_connections", "Pooled database connections by state (in_use, idle, overflow)",
+    ("pool", "state")
+)
+_pool_checkout_wait_seconds = metrics.histogram(
+    "homebound_db_pool_checkout_wait_seconds", "Time spent waiting to check out a pooled connection", ("pool",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+_pool_timeouts_total = metrics.counter(
+    "homebound_db_pool_timeouts_total", "Checkouts that gave up after pool_timeout", ("pool",)
+)
+_pool_disconnects_total = metrics.counter(
+    "homebound_db_pool_disconnects_total", "Statements that failed with a disconnect error (pool invalidated)",
+    ("pool",)
+)
+
+
+def pool_name(pool) -> str:
+    """Name a pool was created with (pool_logging_name), used as its metrics label."""
+    return getattr(pool, "_orig_logging_name", None) or "default"
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports checkout wait and pool usage.
+
+    Wait time is attributed to the current request (if any) and recorded in
+    the checkout-wait histogram; in-use/idle/overflow gauges are refreshed on
+    every checkout and checkin.
+    """
+
+    def _do_get(self):
+        name = pool_name(self)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            _pool_timeouts_total.inc(pool=name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _pool_checkout_wait_seconds.observe(elapsed, pool=name)
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.record_pool_wait(elapsed)
+            self._update_gauges(name)
+
+    def _do_return_conn(self, record):
+        try:
+            super()._do_return_conn(record)
+        finally:
+            self._update_gauges(pool_name(self))
+
+    def _update_gauges(self, name: str) -> None:
+        _pool_connections.set(self.checkedout(), pool=name, state="in_use")
+        _pool_connections.set(self.checkedin(), pool=name, state="idle")
+        _pool_connections.set(max(self.overflow(), 0), pool=name, state="overflow")
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """TimedQueuePool for asyncio engines (asyncpg, aiosqlite)."""
+
+
+def _handle_error(context):
+    # Without pre-ping, dead connections surface here; SQLAlchemy invalidates the
+    # connection and every older pooled one, so the next checkout reconnects
+    if context.is_disconnect and context.engine is not None:
+        _pool_disconnects_total.inc(pool=pool_name(context.engine.pool))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_stats.get() is not None:
+        context._query_metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    start = getattr(context, "_query_metrics_start", None)
+    if stats is None or start is None:
+        return
+    stats.record(statement, time.perf_counter() - start)
+
+
+def install(engine) -> None:
+    """Attach the statement timing and disconnect listeners to an engine."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# Prometheus metrics fed by the middleware
+_requests_total = metrics.counter(
+    "homebound_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+_request_seconds = metrics.histogram(
+    "homebound_http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+_queries_per_request = metrics.histogram(
+    "homebound_db_queries_per_request", "SQL statements executed per HTTP request", ("method", "route"),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200)
+)
+_db_seconds_total = metrics.counter(
+    "homebound_db_query_seconds_total", "Time spent executing SQL during HTTP requests", ("method", "route")
+)
+_pool_wait_seconds_total = metrics.counter(
+    "homebound_db_pool_wait_seconds_total", "Time HTTP requests spent waiting for a pooled connection",
+    ("method", "route")
+)
+
+
+def server_timing_header(stats: QueryStats, total_seconds: float) -> str:
+    """Build a Server-Timing header value for a finished request."""
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.query_count} queries", '
+        f"db-pool;dur={stats.pool_wait_seconds * 1000:.1f}, "
+        f"app;dur={total_seconds * 1000:.1f}"
+    )
+
+
+class QueryMetricsMiddleware:
+    """ASGI middleware recording SQL activity for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    server_timing_header(stats, time.perf_counter() - start).encode("latin-1")
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._record(scope, stats, status_code, time.perf_counter() - start)
+
+    @staticmethod
+    def _record(scope, stats: QueryStats, status_code: int, elapsed: float) -> None:
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or "unmatched"
+        method = scope.get("method", "GET")
+
+        _requests_total.inc(method=method, route=route_path, status=str(status_code))
+        _request_seconds.observe(elapsed, method=method, route=route_path)
+        _queries_per_request.observe(stats.query_count, method=method, route=route_path)
+        _db_seconds_total.inc(stats.db_seconds, method=method, route=route_path)
+        _pool_wait_seconds_total.inc(stats.pool_wait_seconds, method=method, route=route_path)
+
+        summary = {"method": method, "route": route_path, "status": status_code,
+                   "duration_ms": round(elapsed * 1000, 2), **stats.as_log_dict()}
+        if (stats.query_count > settings.SLOW_REQUEST_QUERY_THRESHOLD
+                or stats.db_seconds * 1000 > settings.SLOW_REQUEST_DB_MS_THRESHOLD):
+            log.warning(
+                f"[DB] {method} {route_path}: {stats.query_count} queries, "
+                f"{stats.db_seconds * 1000:.1f}ms in DB, slowest {stats.slowest_seconds * 1000:.1f}ms: "
+                f"{stats.slowest_statement}",
+                extra={"db_metrics": summary}
+            )
+        else:
+            log.debug(
+                f"[DB] {method} {route_path}: {stats.query_count} queries, {stats.db_seconds * 1000:.1f}ms in DB",
+                extra={"db_metrics": summary}
+            )
@@ -0,0 +1,274 @@
+"""Recipient planning for trip notifications.
+
+A trip event can concern many people: the owner's email contacts and friend
+safety contacts, the accepted participants of a group trip, and each
+participant's own email and friend contacts. The same person often turns
+up in several of those roles (a friend watching two participants, a
+participant the owner also picked as a safety contact, one address used by
+two contacts).
+
+plan_delivery() reads the whole audience of a trip in one query and returns
+a DeliveryPlan in which everyone is reached once:
+- Each app user gets at most one push, in their highest-ranked role
+  (participant before friend contact). That push respects the user's
+  notification preferences for its type.
+- App users who get a push aren't also emailed at their account address.
+  When the event's Audience has email_fallback, a friend contact with no
+  registered device is emailed instead of pushed.
+- Emails go out once per address. For personalized events (check-ins, whose
+  subject names the watched person) they go out once per (address, watched
+  person).
+- The acting user is never a recipient, and the trip owner only gets the
+  group push of events that include them (a participant's check-in, or a
+  participant completing the trip). Their own email copy is
+  plan.owner_email, set when the trip has notify_self.
+
+The senders (overdue alerts and trip-started pushes in services/scheduler.py,
+token check-ins and checkouts in api/checkin.py, participant check-ins in
+api/participants.py, starting, completing and extending a trip in
+api/trips.py) send exactly what the plan lists:
+
+    plan = recipients.plan_delivery(connection, trip_id, "participant_checkin", actor_id=user_id)
+    for friend_id in plan.friend_pushes:
+        ...
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+
+from sqlalchemy import Integer
+
+from . import statements
+
+log = logging.getLogger(__name__)
+
+# Audience roles, in the order a person's role is decided
+OWNER = "owner"
+PARTICIPANT = "participant"
+OWNER_CONTACT = "owner_contact"
+OWNER_FRIEND = "owner_friend"
+PARTICIPANT_CONTACT = "participant_contact"
+PARTICIPANT_FRIEND = "participant_friend"
+
+ALL_ROLES = frozenset({PARTICIPANT, OWNER_CONTACT, OWNER_FRIEND, PARTICIPANT_CONTACT, PARTICIPANT_FRIEND})
+_PUSH_ROLES = (OWNER, PARTICIPANT, OWNER_FRIEND, PARTICIPANT_FRIEND)
+
+# Push types users can turn off, and the users column that controls each
+# (the same preferences send_push_to_user checks)
+PUSH_PREFERENCES = {
+    "trip_reminder": "notify_trip_reminders",
+    "checkin": "notify_checkin_alerts",
+}
+
+
+@dataclass(frozen=True)
+class Audience:
+    """Who hears about one kind of trip event, and how."""
+    roles: frozenset[str]
+    participant_push_type: str  # notification_type of the participants' push
+    friend_push_type: str  # notification_type of the friend contacts' push
+    personalized_emails: bool  # One email per (address, watched person) instead of per address
+    email_fallback: bool  # Friend contacts without a registered device are emailed instead
+
+
+AUDIENCES = {
+    "overdue": Audience(
+        ALL_ROLES, "emergency", "emergency", personalized_emails=False, email_fallback=True
+    ),
+    # Participant email contacts are told when their participant joins (accept_invitation)
+    "trip_started": Audience(
+        ALL_ROLES - {PARTICIPANT_CONTACT}, "trip_reminder", "friend_trip",
+        personalized_emails=False, email_fallback=False
+    ),
+    # The owner's token check-in; participants see it through data refresh pushes (plan.participant_ids)
+    "checkin": Audience(
+        ALL_ROLES - {PARTICIPANT}, "friend_trip", "friend_trip",
+        personalized_emails=True, email_fallback=True
+    ),
+    # A participant's check-in, pushed to the rest of the group including the owner
+    "participant_checkin": Audience(
+        ALL_ROLES | {OWNER}, "general", "friend_trip",
+        personalized_emails=True, email_fallback=True
+    ),
+    # Completing the trip (checkout link or the app); the owner is told when a participant completes it
+    "checkout": Audience(
+        ALL_ROLES | {OWNER}, "general", "friend_trip",
+        personalized_emails=True, email_fallback=True
+    ),
+    # Completing a trip whose overdue alerts went out: the all clear reaches everyone the alert did
+    "overdue_resolved": Audience(
+        ALL_ROLES | {OWNER}, "general", "emergency",
+        personalized_emails=False, email_fallback=True
+    ),
+    # Extending the ETA; the rest of the group sees it through data refresh pushes (plan.participant_ids)
+    "extended": Audience(
+        ALL_ROLES - {PARTICIPANT}, "friend_trip", "friend_trip",
+        personalized_emails=True, email_fallback=True
+    ),
+}
+
+_ROLE_ORDER = f"""
+    CASE a.role
+        WHEN '{OWNER}' THEN 0 WHEN '{PARTICIPANT}' THEN 1 WHEN '{OWNER_CONTACT}' THEN 2
+        WHEN '{OWNER_FRIEND}' THEN 3 WHEN '{PARTICIPANT_CONTACT}' THEN 4 ELSE 5
+    END
+"""
+
+_AUDIENCE = statements.register(
+    "recipients.audience",
+    f"""
+    WITH trip AS (
+        SELECT id, user_id, contact1, contact2, contact3, notify_self FROM trips WHERE id = :trip_id
+    ),
+    participants AS (
+        SELECT tp.user_id FROM trip_participants tp JOIN trip ON tp.trip_id = trip.id
+        WHERE tp.status = 'accepted' AND tp.user_id != trip.user_id
+    ),
+    audience AS (
+        SELECT '{OWNER}' AS role, trip.user_id AS user_id, NULL::integer AS contact_id,
+               trip.user_id AS watched_user_id, 0 AS position
+        FROM trip
+        UNION ALL
+        SELECT '{OWNER_CONTACT}', NULL, c.id, trip.user_id,
+               CASE c.id WHEN trip.contact1 THEN 1 WHEN trip.contact2 THEN 2 ELSE 3 END
+        FROM trip JOIN contacts c ON c.id IN (trip.contact1, trip.contact2, trip.contact3)
+        UNION ALL
+        SELECT '{OWNER_FRIEND}', tsc.friend_user_id, NULL, trip.user_id, tsc.position
+        FROM trip JOIN trip_safety_contacts tsc ON tsc.trip_id = trip.id
+        WHERE tsc.friend_user_id IS NOT NULL
+        UNION ALL
+        SELECT '{PARTICIPANT}', p.user_id, NULL, p.user_id, 0 FROM participants p
+        UNION ALL
+        SELECT CASE WHEN ptc.friend_user_id IS NOT NULL THEN '{PARTICIPANT_FRIEND}' ELSE '{PARTICIPANT_CONTACT}' END,
+               ptc.friend_user_id,
+               CASE WHEN ptc.friend_user_id IS NULL THEN ptc.contact_id END,
+               ptc.participant_user_id, ptc.position
+        FROM participant_trip_contacts ptc JOIN participants p ON p.user_id = ptc.participant_user_id
+        WHERE ptc.trip_id = :trip_id
+    )
+    SELECT a.role, a.user_id, a.contact_id, a.watched_user_id,
+           COALESCE(c.name, TRIM(u.first_name || ' ' || u.last_name)) AS name,
+           COALESCE(c.email, u.email) AS email,
+           TRIM(w.first_name || ' ' || w.last_name) AS watched_user_name,
+           u.notify_trip_reminders, u.notify_checkin_alerts,
+           EXISTS (SELECT 1 FROM devices d WHERE d.user_id = a.user_id) AS has_device,
+           (SELECT notify_self FROM trip) AS notify_self
+    FROM audience a
+    LEFT JOIN contacts c ON c.id = a.contact_id
+    LEFT JOIN users u ON u.id = a.user_id
+    LEFT JOIN users w ON w.id = a.watched_user_id
+    ORDER BY {_ROLE_ORDER}, a.watched_user_id, a.position
+    """,
+    trip_id=Integer
+)
+
+
+@dataclass
+class DeliveryPlan:
+    """Recipients of one trip event, each reached once."""
+    event: str
+    owner_id: int | None = None
+    owner_name: str = "Someone"
+    owner_email: str | None = None  # The owner's own copy (notify_self)
+    # Dicts with id (contact id, or -user id for app users), name, email, watched_user_name
+    emails: list[dict] = field(default_factory=list)
+    participant_pushes: list[int] = field(default_factory=list)
+    friend_pushes: list[int] = field(default_factory=list)
+    # Every accepted participant except the owner (actor included), for data refresh pushes
+    participant_ids: list[int] = field(default_factory=list)
+    skipped_by_preference: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.emails or self.participant_pushes or self.friend_pushes)
+
+
+def _wants_push(row, push_type: str) -> bool:
+    column = PUSH_PREFERENCES.get(push_type)
+    if column is None:
+        return True
+    # No users row means no preferences were set; default is on
+    return getattr(row, column) is not False
+
+
+def plan_delivery(connection, trip_id: int, event: str, actor_id: int | None = None) -> DeliveryPlan:
+    """Resolve and deduplicate the recipients of `event` (a key of AUDIENCES).
+
+    Args:
+        actor_id: User whose action caused the event; they aren't notified of it
+    """
+    audience = AUDIENCES[event]
+    rows = connection.execute(_AUDIENCE, {"trip_id": trip_id}).fetchall()
+
+    plan = DeliveryPlan(event=event)
+    owner = next((row for row in rows if row.role == OWNER), None)
+    if owner is not None:
+        plan.owner_id = owner.user_id
+        plan.owner_name = owner.name or "A Homebound user"
+        plan.owner_email = owner.email if owner.notify_self else None
+
+    # The owner is only a recipient when the audience pushes them as one of the group
+    excluded = {actor_id} if OWNER in audience.roles else {plan.owner_id, actor_id}
+    excluded.discard(None)  # Email contacts have no user id
+    reached: set[int] = set()  # App users already given their one push (or skipped by preference)
+    pushed_addresses: set[str] = set()
+    email_rows = []
+
+    for row in rows:
+        if row.role == PARTICIPANT:
+            plan.participant_ids.append(row.user_id)
+        if row.role not in audience.roles:
+            continue
+
+        if row.role not in _PUSH_ROLES:
+            email_rows.append(row)
+            continue
+        if row.user_id in excluded or row.user_id in reached:
+            continue
+        is_group = row.role in (OWNER, PARTICIPANT)
+        if not is_group and audience.email_fallback and not row.has_device:
+            email_rows.append(row)
+            continue
+
+        reached.add(row.user_id)
+        push_type = audience.participant_push_type if is_group else audience.friend_push_type
+        if not _wants_push(row, push_type):
+            plan.skipped_by_preference += 1
+            continue
+        if row.email:
+            pushed_addresses.add(row.email.lower())
+        if is_group:
+            plan.participant_pushes.append(row.user_id)
+        else:
+            plan.friend_pushes.append(row.user_id)
+
+    sent: set = set()
+    for row in email_rows:
+        if not row.email or row.user_id in excluded:
+            continue
+        address = row.email.lower()
+        if address in pushed_addresses:
+            continue
+        key = (address, row.watched_user_id) if audience.personalized_emails else address
+        if key in sent:
+            continue
+        sent.add(key)
+
+        if row.watched_user_id == plan.owner_id:
+            watched_user_name = plan.owner_name
+        else:
+            watched_user_name = row.watched_user_name or "Participant"
+        plan.emails.append({
+            "id": row.contact_id if row.contact_id is not None else -row.user_id,
+            "name": row.name or "Friend",
+            "email": row.email,
+            "watched_user_name": watched_user_name,
+        })
+
+    log.info(
+        f"[Recipients] Trip {trip_id} {event}: {len(plan.emails)} emails, "
+        f"{len(plan.participant_pushes)} participant pushes, {len(plan.friend_pushes)} friend pushes, "
+        f"{plan.skipped_by_preference} skipped by preference"
+    )
+    return plan
@@ -0,0 +1,170 @@
+"""Coalescing for silent data-refresh pushes.
+
+A single action during a group trip (checkout vote, check-in, extend, cancel,
+accepted invitation) asks for a "trip" refresh push to every participant,
+and several actions often land within seconds. Each push costs a devices
+query, an APNs request and a background wake of the app, which then
+re-fetches the same data.
+
+RefreshCoalescer holds the first refresh signal for a (user, sync type,
+trip) for a short window and merges any signals that arrive meanwhile into
+it, then sends one push.
+
+The coalescer runs on the app's event loop: the lifespan start()s it, and
+stop() sends whatever is still pending at shutdown. Flushes are call_later
+callbacks on that loop and the pushes are tasks on it, so no thread or event
+loop is created per push. Signals from worker threads are handed to the loop
+thread-safely. A process that never started it, such as a serverless
+function that may be frozen as soon as its response is sent, has no loop
+that outlives the request; send_data_refresh_push() then sends at once.
+
+Pushes also set apns-collapse-id "refresh-<sync>", so APNs itself keeps only
+the newest undelivered refresh of a type for an offline device.
+
+homebound_refresh_push_signals_total counts signals requested,
+homebound_refresh_pushes_sent_total the pushes actually sent; the difference
+(homebound_refresh_pushes_coalesced_total) is the pushes saved.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+refresh_signals = metrics.counter(
+    "homebound_refresh_push_signals_total", "Data-refresh push signals requested", ("sync",)
+)
+refresh_pushes_sent = metrics.counter(
+    "homebound_refresh_pushes_sent_total", "Data-refresh pushes sent after coalescing", ("sync",)
+)
+refresh_pushes_coalesced = metrics.counter(
+    "homebound_refresh_pushes_coalesced_total", "Data-refresh signals merged into a pending push", ("sync",)
+)
+
+
+@dataclass
+class PendingRefresh:
+    """Refresh signals for one user, sync type and trip waiting to be sent as one push."""
+    user_id: int
+    sync_type: str
+    trip_id: int | None = None
+    signals: int = 0
+
+    @property
+    def collapse_id(self) -> str:
+        return collapse_id(self.sync_type)
+
+    def payload(self) -> dict:
+        data = {"sync": self.sync_type}
+        if self.trip_id:
+            data["trip_id"] = str(self.trip_id)
+        return data
+
+
+def collapse_id(sync_type: str) -> str:
+    """apns-collapse-id for refresh pushes of a sync type (APNs allows 64 bytes)."""
+    return f"refresh-{sync_type}"[:64]
+
+
+class RefreshCoalescer:
+    """Debounces refresh signals per (user, sync type, trip) and sends each batch once.
+
+    The window starts at the first signal and is not extended by later ones,
+    so a push is never delayed by more than `window` seconds.
+    """
+
+    def __init__(self, send: Callable[[PendingRefresh], Awaitable[None]]):
+        self._send = send
+        self._pending: dict[tuple[int, str, int | None], PendingRefresh] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._sending: set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        """Whether signals are being coalesced (otherwise callers send directly)."""
+        return self._loop is not None and not self._loop.is_closed()
+
+    def start(self) -> None:
+        """Coalesce on the running event loop until stop()."""
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        """Stop coalescing and send everything still pending."""
+        self._loop = None
+        await self.flush()
+
+    def signal(self, user_id: int, sync_type: str, trip_id: int | None, window: float) -> bool:
+        """Queue a refresh signal. Safe to call from any thread while running.
+
+        Returns:
+            True if this signal started a new pending push, False if it was
+            merged into one already waiting
+        """
+        loop = self._loop
+        if loop is None:
+            raise RuntimeError("RefreshCoalescer is not running")
+        refresh_signals.inc(sync=sync_type)
+        key = (user_id, sync_type, trip_id)
+        with self._lock:
+            pending = self._pending.get(key)
+            merged = pending is not None
+            if pending is None:
+                pending = self._pending[key] = PendingRefresh(user_id, sync_type, trip_id)
+            pending.signals += 1
+
+        if merged:
+            refresh_pushes_coalesced.inc(sync=sync_type)
+        elif _running_loop() is loop:
+            loop.call_later(window, self._flush, key)
+        else:
+            loop.call_soon_threadsafe(loop.call_later, window, self._flush, key)
+        return not merged
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    async def flush(self) -> None:
+        """Send every pending push now and wait for all sends (at shutdown, and in tests)."""
+        with self._lock:
+            keys = list(self._pending)
+        for key in keys:
+            self._flush(key)
+        if self._sending:
+            await asyncio.gather(*self._sending)
+
+    def _flush(self, key: tuple[int, str, int | None]) -> None:
+        with self._lock:
+            pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+
+        refresh_pushes_sent.inc(sync=pending.sync_type)
+        if pending.signals > 1:
+            log.info(
+                f"Coalesced {pending.signals} refresh signals into one push for user {pending.user_id}: "
+                f"sync={pending.sync_type}, trip_id={pending.trip_id}"
+            )
+        task = asyncio.get_running_loop().create_task(self._send_logged(pending))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send_logged(self, pending: PendingRefresh) -> None:
+        try:
+            await self._send(pending)
+        except Exception as e:
+            log.error(f"Failed to send coalesced refresh push to user {pending.user_id}: {e}")
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
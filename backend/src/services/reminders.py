@@ -0,0 +1,209 @@
+"""Check-in reminder scheduling.
+
+Trips and trip_participants carry a materialized next_reminder_at (naive
+UTC) with the owner's quiet hours already folded in, so the push scheduler
+claims due reminders with an indexed `next_reminder_at <= now` range scan
+instead of evaluating intervals and quiet hours per row.
+
+next_reminder_at is (re)computed whenever the reminder clock moves:
+trip create/start/activation (for accepted participants too), check-in,
+extend, settings changes, participant accept, and after each reminder the
+scheduler sends.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+
+import pytz
+import sqlalchemy
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHECKIN_REMINDER_INTERVAL = 30  # Minutes, used if the trip/participant doesn't specify
+
+
+def _user_tz(timezone: str | None):
+    if not timezone:
+        return pytz.UTC
+    try:
+        return pytz.timezone(timezone)
+    except pytz.UnknownTimeZoneError:
+        log.warning(f"[Reminders] Unknown timezone '{timezone}', using UTC")
+        return pytz.UTC
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(pytz.UTC).replace(tzinfo=None)
+    return value
+
+
+def _hour_is_active(hour: int, notify_start_hour: int, notify_end_hour: int) -> bool:
+    if notify_start_hour <= notify_end_hour:
+        return notify_start_hour <= hour < notify_end_hour
+    return hour >= notify_start_hour or hour < notify_end_hour
+
+
+def in_active_hours(
+    notify_start_hour: int | None,
+    notify_end_hour: int | None,
+    timezone: str | None,
+    at: datetime | None = None
+) -> bool:
+    """Whether reminders are allowed at `at` (default now) given optional quiet hours.
+
+    Active hours are [notify_start_hour, notify_end_hour) in the trip's
+    timezone; overnight ranges wrap.
+    """
+    if notify_start_hour is None or notify_end_hour is None:
+        return True
+
+    at_utc = _to_naive_utc(at) if at is not None else datetime.utcnow()
+    local = pytz.UTC.localize(at_utc).astimezone(_user_tz(timezone))
+    return _hour_is_active(local.hour, notify_start_hour, notify_end_hour)
+
+
+def fold_quiet_hours(
+    due: datetime,
+    notify_start_hour: int | None,
+    notify_end_hour: int | None,
+    timezone: str | None
+) -> datetime:
+    """Move a due time that falls in quiet hours to the next start of active hours.
+
+    Args:
+        due: Naive UTC (or aware) time the reminder would be due
+
+    Returns:
+        Naive UTC time, `due` itself when it's inside active hours
+    """
+    due = _to_naive_utc(due)
+    if in_active_hours(notify_start_hour, notify_end_hour, timezone, at=due):
+        return due
+
+    tz = _user_tz(timezone)
+    local = pytz.UTC.localize(due).astimezone(tz)
+    candidate = local.replace(tzinfo=None, hour=notify_start_hour, minute=0, second=0, microsecond=0)
+    if candidate <= local.replace(tzinfo=None):
+        candidate += timedelta(days=1)
+    # is_dst=None would raise for a start hour skipped/repeated by a DST change
+    return tz.localize(candidate, is_dst=False).astimezone(pytz.UTC).replace(tzinfo=None)
+
+
+def compute_next_reminder_at(
+    after: datetime,
+    interval_min: int | None,
+    notify_start_hour: int | None,
+    notify_end_hour: int | None,
+    timezone: str | None
+) -> datetime:
+    """When the next check-in reminder is due after the clock was reset at `after`.
+
+    One interval after `after`, pushed to the start of active hours when that
+    lands in quiet hours. Returns naive UTC.
+    """
+    due = _to_naive_utc(after) + timedelta(minutes=interval_min or DEFAULT_CHECKIN_REMINDER_INTERVAL)
+    return fold_quiet_hours(due, notify_start_hour, notify_end_hour, timezone)
+
+
+def reschedule_trip_reminder(connection, trip_id: int, after: datetime | None = None) -> datetime | None:
+    """Recompute the owner's next_reminder_at from the trip's current settings.
+
+    Runs on the caller's connection so it commits with the change that reset
+    the reminder clock or changed the settings.
+
+    Args:
+        after: When the reminder clock was reset (defaults to the last
+            reminder sent, or now if none was)
+
+    Returns:
+        The new next_reminder_at (None if the trip is gone)
+    """
+    trip = connection.execute(
+        sqlalchemy.text(
+            """
+            SELECT checkin_interval_min, notify_start_hour, notify_end_hour, timezone, last_checkin_reminder
+            FROM trips WHERE id = :trip_id
+            """
+        ),
+        {"trip_id": trip_id}
+    ).fetchone()
+    if trip is None:
+        return None
+
+    after = after or trip.last_checkin_reminder or datetime.utcnow()
+    next_reminder_at = compute_next_reminder_at(
+        after, trip.checkin_interval_min, trip.notify_start_hour, trip.notify_end_hour, trip.timezone
+    )
+    connection.execute(
+        sqlalchemy.text("UPDATE trips SET next_reminder_at = :next_reminder_at WHERE id = :trip_id"),
+        {"next_reminder_at": next_reminder_at, "trip_id": trip_id}
+    )
+    return next_reminder_at
+
+
+def reschedule_participant_reminder(connection, trip_id: int, user_id: int, after: datetime) -> datetime | None:
+    """Recompute a participant's next_reminder_at from their own settings and the trip timezone."""
+    participant = connection.execute(
+        sqlalchemy.text(
+            """
+            SELECT tp.id, tp.checkin_interval_min, tp.notify_start_hour, tp.notify_end_hour, t.timezone
+            FROM trip_participants tp
+            JOIN trips t ON t.id = tp.trip_id
+            WHERE tp.trip_id = :trip_id AND tp.user_id = :user_id
+            """
+        ),
+        {"trip_id": trip_id, "user_id": user_id}
+    ).fetchone()
+    if participant is None:
+        return None
+
+    next_reminder_at = compute_next_reminder_at(
+        after, participant.checkin_interval_min, participant.notify_start_hour,
+        participant.notify_end_hour, participant.timezone
+    )
+    connection.execute(
+        sqlalchemy.text("UPDATE trip_participants SET next_reminder_at = :next_reminder_at WHERE id = :id"),
+        {"next_reminder_at": next_reminder_at, "id": participant.id}
+    )
+    return next_reminder_at
+
+
+def reschedule_participant_reminders(connection, trip_ids: list[int], after: datetime) -> int:
+    """Restart the reminder clock of every accepted participant of `trip_ids` at `after`.
+
+    Called when planned trips activate: a participant who accepted before the
+    start has a next_reminder_at counted from the accept, which would already
+    be due by then.
+
+    Returns:
+        The number of participants rescheduled
+    """
+    if not trip_ids:
+        return 0
+    participants = connection.execute(
+        sqlalchemy.text(
+            """
+            SELECT tp.id, tp.checkin_interval_min, tp.notify_start_hour, tp.notify_end_hour, t.timezone
+            FROM trip_participants tp
+            JOIN trips t ON t.id = tp.trip_id
+            WHERE tp.trip_id = ANY(:trip_ids) AND tp.status = 'accepted' AND tp.role = 'participant'
+            """
+        ),
+        {"trip_ids": list(trip_ids)}
+    ).fetchall()
+    if participants:
+        connection.execute(
+            sqlalchemy.text("UPDATE trip_participants SET next_reminder_at = :next_reminder_at WHERE id = :id"),
+            [
+                {
+                    "id": p.id,
+                    "next_reminder_at": compute_next_reminder_at(
+                        after, p.checkin_interval_min, p.notify_start_hour, p.notify_end_hour, p.timezone
+                    )
+                }
+                for p in participants
+            ]
+        )
+    return len(participants)
@@ -0,0 +1,275 @@
+"""Retention policies for append-only tables.
+
+Each RetentionPolicy removes rows whose `column` is older than `max_age`.
+enforce() applies every policy and runs from one scheduler job
+(enforce_retention in services/scheduler.py).
+
+On Postgres, tables with a `partition` unit are range-partitioned on
+`column` by day or month (migration k1l2m3n4o5p6), with a DEFAULT partition
+for rows outside every range. For those tables enforce():
+  1. creates the partitions for the next PARTITIONS_AHEAD units, moving any
+     rows for that range out of the default partition first;
+  2. drops partitions that end at or before the cutoff, which frees their
+     space at once with no dead tuples to vacuum;
+  3. deletes what is left past the cutoff: rows in the partition that
+     straddles the cutoff and in the default partition.
+
+Attaching a partition locks the default partition and dropping one locks
+the parent, both ACCESS EXCLUSIVE, so steps 1 and 2 wait at most
+PARTITION_LOCK_TIMEOUT_MS for their lock. Behind a long reader they give up
+until the next run instead of queueing every write to the table behind them.
+(DETACH PARTITION CONCURRENTLY would avoid the drop's lock, but Postgres
+doesn't allow it on a table with a default partition.)
+
+Step 3 is also the whole job for unpartitioned tables (and on SQLite):
+expired rows are deleted DELETE_BATCH_SIZE at a time, one transaction per
+batch, so no sweep holds locks or builds a huge transaction.
+
+events is not covered: check-ins are the user's trip history, and
+trips.last_checkin references events.id, which a partitioned table can't
+provide (its primary key must include the partition column).
+"""
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+import sqlalchemy
+
+from .. import config
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+settings = config.get_settings()
+
+# Rows deleted per transaction by the chunked delete
+DELETE_BATCH_SIZE = 1000
+# Future partitions kept ready, so new rows never land in the default partition
+PARTITIONS_AHEAD = 3
+# Longest partition maintenance waits for a table lock (writes to the table queue behind it)
+PARTITION_LOCK_TIMEOUT_MS = 2000
+# SQLSTATE of a statement that gave up at lock_timeout
+LOCK_NOT_AVAILABLE = "55P03"
+
+rows_deleted = metrics.counter(
+    "homebound_retention_rows_deleted_total", "Expired rows removed by chunked deletes", ("table",)
+)
+partitions_dropped = metrics.counter(
+    "homebound_retention_partitions_dropped_total", "Expired partitions dropped", ("table",)
+)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    table: str
+    column: str
+    max_age: timedelta
+    partition: str | None = None  # "day" or "month" if range-partitioned on `column` (Postgres)
+    timezone_aware: bool = False  # `column` is timestamptz rather than naive UTC
+
+    def cutoff(self, now: datetime) -> datetime:
+        cutoff = now - self.max_age
+        return cutoff if self.timezone_aware else cutoff.replace(tzinfo=None)
+
+
+POLICIES: tuple[RetentionPolicy, ...] = (
+    RetentionPolicy(
+        "live_locations", "timestamp", timedelta(days=settings.LIVE_LOCATION_RETENTION_DAYS), partition="day"
+    ),
+    RetentionPolicy("live_location_tracks", "ended_at", timedelta(days=settings.LIVE_LOCATION_RETENTION_DAYS)),
+    RetentionPolicy(
+        "notification_logs", "created_at", timedelta(days=settings.NOTIFICATION_LOG_RETENTION_DAYS),
+        partition="month"
+    ),
+    # Webhook bookkeeping carries its own expiry
+    RetentionPolicy("processed_webhooks", "expires_at", timedelta(0), timezone_aware=True),
+    RetentionPolicy("pending_webhooks", "expires_at", timedelta(0), timezone_aware=True),
+)
+
+
+# ==================== Partitions ====================
+
+def partition_start(moment: datetime, unit: str) -> datetime:
+    """Start of the day or month partition containing `moment` (naive UTC)."""
+    moment = moment.replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1) if unit == "month" else moment
+
+
+def next_partition_start(start: datetime, unit: str) -> datetime:
+    if unit == "month":
+        return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start + timedelta(days=1)
+
+
+def partition_name(table: str, start: datetime, unit: str) -> str:
+    return f"{table}_p{start:%Y%m}" if unit == "month" else f"{table}_p{start:%Y%m%d}"
+
+
+def _is_partitioned(conn, table: str) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(
+        sqlalchemy.text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ).scalar()
+
+
+def _partition_starts(conn, policy: RetentionPolicy) -> dict[datetime, str]:
+    """Range partitions of a table by start, from their names (the default partition is skipped)."""
+    names = conn.execute(
+        sqlalchemy.text(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:table)
+            """
+        ),
+        {"table": policy.table}
+    ).scalars()
+
+    date_format = "%Y%m" if policy.partition == "month" else "%Y%m%d"
+    pattern = re.compile(rf"{re.escape(policy.table)}_p(\d+)")
+    starts = {}
+    for name in names:
+        match = pattern.fullmatch(name)
+        if match:
+            starts[datetime.strptime(match.group(1), date_format)] = name
+    return starts
+
+
+def _set_lock_timeout(conn) -> None:
+    conn.execute(sqlalchemy.text(f"SET LOCAL lock_timeout = {PARTITION_LOCK_TIMEOUT_MS}"))
+
+
+def _is_lock_timeout(e: sqlalchemy.exc.OperationalError) -> bool:
+    return getattr(e.orig, "pgcode", None) == LOCK_NOT_AVAILABLE
+
+
+def _create_partition(engine, policy: RetentionPolicy, start: datetime) -> None:
+    """Create and attach one range partition.
+
+    The partition is filled from the default partition before it is attached
+    (ATTACH fails while the default holds rows in its range), and attaching
+    only takes a SHARE UPDATE EXCLUSIVE lock on the parent.
+    """
+    table, column = policy.table, policy.column
+    end = next_partition_start(start, policy.partition)
+    name = partition_name(table, start, policy.partition)
+    with engine.begin() as conn:
+        _set_lock_timeout(conn)
+        conn.execute(sqlalchemy.text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+        conn.execute(
+            sqlalchemy.text(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {table}_default
+                    WHERE "{column}" >= :start AND "{column}" < :end
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """
+            ),
+            {"start": start, "end": end}
+        )
+        conn.execute(sqlalchemy.text(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        ))
+    log.info(f"[Retention] Created partition {name}")
+
+
+def maintain_partitions(engine, policy: RetentionPolicy, now: datetime) -> int:
+    """Create upcoming partitions and drop expired ones. Returns partitions dropped."""
+    with engine.connect() as conn:
+        existing = _partition_starts(conn, policy)
+
+    start = partition_start(now, policy.partition)
+    for _ in range(PARTITIONS_AHEAD + 1):
+        if start not in existing:
+            try:
+                _create_partition(engine, policy, start)
+            except sqlalchemy.exc.OperationalError as e:
+                if not _is_lock_timeout(e):
+                    raise
+                # Until then its rows go to the default partition
+                log.warning(f"[Retention] Skipped creating {policy.table} partitions: table is locked")
+                break
+        start = next_partition_start(start, policy.partition)
+
+    cutoff = policy.cutoff(now).replace(tzinfo=None)
+    dropped = 0
+    for start, name in sorted(existing.items()):
+        if next_partition_start(start, policy.partition) > cutoff:
+            break
+        try:
+            with engine.begin() as conn:
+                _set_lock_timeout(conn)
+                conn.execute(sqlalchemy.text(f"DROP TABLE {name}"))
+        except sqlalchemy.exc.OperationalError as e:
+            if not _is_lock_timeout(e):
+                raise
+            # Its rows are still removed by the chunked delete below; the drop is retried next run
+            log.warning(f"[Retention] Skipped dropping {name}: {policy.table} is locked")
+            break
+        partitions_dropped.inc(table=policy.table)
+        dropped += 1
+        log.info(f"[Retention] Dropped expired partition {name}")
+    return dropped
+
+
+# ==================== Enforcement ====================
+
+def delete_expired(engine, policy: RetentionPolicy, now: datetime, batch_size: int = DELETE_BATCH_SIZE) -> int:
+    """Delete rows past the policy's cutoff in batches. Returns rows deleted."""
+    statement = sqlalchemy.text(
+        f"""
+        DELETE FROM {policy.table}
+        WHERE id IN (
+            SELECT id FROM {policy.table}
+            WHERE "{policy.column}" < :cutoff
+            LIMIT :batch_size
+        )
+        """
+    )
+    params = {"cutoff": policy.cutoff(now), "batch_size": batch_size}
+
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            deleted = conn.execute(statement, params).rowcount
+        total += deleted
+        if deleted < batch_size:
+            break
+    if total:
+        rows_deleted.inc(total, table=policy.table)
+    return total
+
+
+def enforce_policy(engine, policy: RetentionPolicy, now: datetime | None = None) -> tuple[int, int]:
+    """Apply one policy. Returns (partitions dropped, rows deleted)."""
+    now = now or datetime.now(UTC)
+    dropped = 0
+    if policy.partition:
+        with engine.connect() as conn:
+            partitioned = _is_partitioned(conn, policy.table)
+        if partitioned:
+            dropped = maintain_partitions(engine, policy, now)
+    return dropped, delete_expired(engine, policy, now)
+
+
+def enforce(engine, now: datetime | None = None) -> dict[str, tuple[int, int]]:
+    """Apply every policy; a failing policy is logged and doesn't stop the rest.
+
+    Returns (partitions dropped, rows deleted) per table.
+    """
+    now = now or datetime.now(UTC)
+    results = {}
+    for policy in POLICIES:
+        try:
+            results[policy.table] = enforce_policy(engine, policy, now)
+        except Exception as e:
+            log.error(f"[Retention] Failed to enforce retention for {policy.table}: {e}", exc_info=True)
+    return results
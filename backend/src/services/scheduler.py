@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
-from collections import namedtuple
+import signal
 from datetime import datetime, timedelta
 from typing import Any
 
-import pytz
 import sqlalchemy
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
@@ -24,6 +25,15 @@ from .notifications import (
     send_data_refresh_push,
 )
 from .app_store import app_store_service
+from . import recipients, scheduler_leader, scheduler_metrics
+from .reminders import (
+    DEFAULT_CHECKIN_REMINDER_INTERVAL,
+    compute_next_reminder_at,
+    fold_quiet_hours,
+    in_active_hours,
+    reschedule_participant_reminders,
+)
+from .scheduler_metrics import record_deadline_lag, record_rows
 
 
 def parse_datetime_robust(dt_value: Any) -> datetime | None:
@@ -58,12 +68,26 @@ log = logging.getLogger(__name__)
 # Notification timing constants (in minutes)
 STARTING_SOON_MINUTES = 15  # Notify 15 min before scheduled start
 APPROACHING_ETA_MINUTES = 15  # Notify 15 min before ETA
-DEFAULT_CHECKIN_REMINDER_INTERVAL = 30  # Default reminder interval (used if trip doesn't specify)
 GRACE_WARNING_INTERVAL = 5  # Warn every 5 min during grace period
 
+# Seconds a push phase may hold a claimed row before another sweep can re-claim it
+PUSH_LEASE_SECONDS = 300
+
 # Global scheduler instance
 scheduler: AsyncIOScheduler | None = None
 
+# Whether this process holds the scheduler leader lease (see scheduler_leader.py)
+is_leader = False
+LEADER_HEARTBEAT_JOB_ID = "scheduler_leader_heartbeat"
+APPLE_KEY_REFRESH_JOB_ID = "refresh_apple_key_material"
+# Jobs every process runs whether or not it leads: the heartbeat, and warming this
+# process's own in-memory caches
+PER_PROCESS_JOB_IDS = frozenset({LEADER_HEARTBEAT_JOB_ID, APPLE_KEY_REFRESH_JOB_ID})
+
+# Apple key material refresh (Apple's keys are cached for 1 hour)
+APPLE_KEY_REFRESH_MINUTES = 30
+APPLE_KEY_WARMUP_DELAY_SECONDS = 10
+
 
 async def check_overdue_trips():
     """Check for overdue trips and send notifications.
@@ -76,23 +100,40 @@ async def check_overdue_trips():
 
         # Phase 1: Activate planned trips (isolated transaction)
         activated_ids = []
-        with db.engine.begin() as conn:
+        with db.scheduler_engine.begin() as conn:
             activated = conn.execute(
                 sqlalchemy.text("""
                     UPDATE trips
                     SET status = 'active'
                     WHERE status = 'planned' AND start < :now
-                    RETURNING id
+                    RETURNING id, checkin_interval_min, notify_start_hour, notify_end_hour, timezone
                 """),
                 {"now": now}
             ).fetchall()
             activated_ids = [t.id for t in activated]
 
+            # Start each activated trip's reminder clock, and its participants'
+            if activated:
+                conn.execute(
+                    sqlalchemy.text("UPDATE trips SET next_reminder_at = :next_reminder_at WHERE id = :id"),
+                    [
+                        {
+                            "id": t.id,
+                            "next_reminder_at": compute_next_reminder_at(
+                                now, t.checkin_interval_min, t.notify_start_hour, t.notify_end_hour, t.timezone
+                            )
+                        }
+                        for t in activated
+                    ]
+                )
+                reschedule_participant_reminders(conn, activated_ids, now)
+
+        record_rows("check_overdue", "activated", len(activated_ids))
         if activated_ids:
             log.info(f"[Scheduler] Activated {len(activated_ids)} planned trips: {activated_ids}")
 
         # Phase 2: Fetch all candidate trips (read-only)
-        with db.engine.connect() as conn:
+        with db.scheduler_engine.connect() as conn:
             overdue_trips = conn.execute(
                 sqlalchemy.text("""
                     SELECT t.id, t.user_id, t.title, t.eta, t.grace_min, t.location_text, t.status, t.timezone,
@@ -106,6 +147,7 @@ async def check_overdue_trips():
                 {"now": now}
             ).fetchall()
 
+        record_rows("check_overdue", "past_eta", len(overdue_trips))
         log.info(f"[Scheduler] Found {len(overdue_trips)} trips past ETA")
 
         # Phase 3: Process each trip in its own isolated transaction
@@ -130,34 +172,11 @@ async def _process_overdue_trip(trip, now: datetime):
         log.error(f"[Scheduler] Failed to parse ETA for trip {trip_id}: {trip.eta}")
         return
 
-    # Check if we've already marked this trip as overdue
-    with db.engine.connect() as conn:
-        existing_overdue = conn.execute(
-            sqlalchemy.text("""
-                SELECT id FROM events
-                WHERE trip_id = :trip_id AND what = 'overdue'
-                LIMIT 1
-            """),
-            {"trip_id": trip_id}
-        ).fetchone()
-
-    # Step 1: Mark as overdue if not already marked
-    if not existing_overdue:
-        log.info(f"Marking trip {trip_id} as overdue")
-
-        # Insert event and update status in isolated transaction
-        with db.engine.begin() as conn:
-            conn.execute(
-                sqlalchemy.text("""
-                    INSERT INTO events (user_id, trip_id, what, timestamp)
-                    VALUES (:user_id, :trip_id, 'overdue', :timestamp)
-                """),
-                {
-                    "user_id": trip.user_id,
-                    "trip_id": trip_id,
-                    "timestamp": datetime.utcnow()
-                }
-            )
+    # Step 1: Mark as overdue - the unique one-shot index decides which sweep does it
+    with db.scheduler_engine.begin() as conn:
+        marked_overdue = _record_one_shot_event(conn, trip.user_id, trip_id, "overdue")
+        if marked_overdue:
+            log.info(f"Marking trip {trip_id} as overdue")
             conn.execute(
                 sqlalchemy.text("""
                     UPDATE trips SET status = 'overdue'
@@ -166,6 +185,9 @@ async def _process_overdue_trip(trip, now: datetime):
                 {"trip_id": trip_id}
             )
 
+    if marked_overdue:
+        record_deadline_lag("overdue", eta_dt)
+
         # Send Live Activity update (outside transaction)
         await send_live_activity_update(
             trip_id=trip_id,
@@ -192,693 +214,570 @@ async def _process_overdue_trip(trip, now: datetime):
     log.info(f"[Scheduler] Trip {trip_id}: eta_dt={eta_dt}, grace_expired_time={grace_expired_time}, now={now}, grace_expired_check={now > grace_expired_time}")
 
     if now > grace_expired_time:
-        # Check if we've already notified
-        with db.engine.connect() as conn:
-            existing_notify = conn.execute(
-                sqlalchemy.text("""
-                    SELECT id FROM events
-                    WHERE trip_id = :trip_id AND what = 'notify'
-                    LIMIT 1
-                """),
-                {"trip_id": trip_id}
-            ).fetchone()
+        # Claim the notify transition before sending; a sweep that loses the race stops here
+        with db.scheduler_engine.begin() as conn:
+            claimed_notify = _record_one_shot_event(conn, trip.user_id, trip_id, "notify")
 
-        if existing_notify:
+        if not claimed_notify:
             log.info(f"[Scheduler] Trip {trip_id}: Already has notify event, skipping")
             return
 
-        log.info(f"[Scheduler] Trip {trip_id}: Grace period expired, no notify event yet - sending notifications")
-
-        # Fetch contacts and user info in read-only query
-        with db.engine.connect() as conn:
-            # Check if this is a group trip
-            is_group_trip_row = conn.execute(
-                sqlalchemy.text("SELECT is_group_trip FROM trips WHERE id = :trip_id"),
-                {"trip_id": trip_id}
-            ).fetchone()
-            is_group_trip = is_group_trip_row and is_group_trip_row.is_group_trip
+        log.info(f"[Scheduler] Trip {trip_id}: Grace period expired, claimed notify event - sending notifications")
+        try:
+            notified = await _send_overdue_alerts(trip, trip_id)
+        except Exception:
+            # Give the transition back so the next sweep retries the alerts
+            _delete_one_shot_event(trip_id, "notify")
+            raise
+
+        if notified:
+            record_deadline_lag("overdue_alert", grace_expired_time)
+        else:
+            _delete_one_shot_event(trip_id, "notify")
 
-            # Get trip owner's designated safety contacts (email contacts)
-            contacts = conn.execute(
+        # Update trip status in separate transaction
+        with db.scheduler_engine.begin() as conn:
+            conn.execute(
                 sqlalchemy.text("""
-                    SELECT c.name, c.email
-                    FROM contacts c
-                    JOIN trips t ON (
-                        c.id = t.contact1 OR
-                        c.id = t.contact2 OR
-                        c.id = t.contact3
-                    )
-                    WHERE t.id = :trip_id AND c.email IS NOT NULL
+                    UPDATE trips SET status = 'overdue_notified'
+                    WHERE id = :trip_id
                 """),
                 {"trip_id": trip_id}
-            ).fetchall()
-            contacts = list(contacts)
+            )
+        log.info(f"[Scheduler] Trip {trip_id}: Status updated to overdue_notified")
+    else:
+        log.info(f"[Scheduler] Trip {trip_id}: Grace period not yet expired")
 
-            # For group trips, also fetch contacts for all accepted participants
-            participant_user_ids = []
-            if is_group_trip:
-                # Get all accepted participants (excluding owner, already handled above)
-                participants = conn.execute(
-                    sqlalchemy.text("""
-                        SELECT user_id FROM trip_participants
-                        WHERE trip_id = :trip_id AND status = 'accepted' AND role = 'participant'
-                    """),
-                    {"trip_id": trip_id}
-                ).fetchall()
 
-                participant_user_ids = [p.user_id for p in participants]
-                log.info(f"[Scheduler] Trip {trip_id}: Group trip with {len(participant_user_ids)} participants")
-
-                # Get each participant's safety contacts for THIS trip
-                # These are the contacts they selected when joining (stored in participant_trip_contacts)
-                if participant_user_ids:
-                    # Debug: Check raw participant_trip_contacts count
-                    ptc_count = conn.execute(
-                        sqlalchemy.text("SELECT COUNT(*) FROM participant_trip_contacts WHERE trip_id = :trip_id"),
-                        {"trip_id": trip_id}
-                    ).scalar() or 0
-                    log.info(f"[Scheduler] Trip {trip_id}: Found {ptc_count} rows in participant_trip_contacts")
-
-                    # Get participant email contacts (from contacts table via contact_id)
-                    participant_email_contacts = conn.execute(
-                        sqlalchemy.text("""
-                            SELECT DISTINCT c.name, c.email
-                            FROM participant_trip_contacts ptc
-                            JOIN contacts c ON ptc.contact_id = c.id
-                            WHERE ptc.trip_id = :trip_id
-                              AND ptc.contact_id IS NOT NULL
-                              AND c.email IS NOT NULL
-                        """),
-                        {"trip_id": trip_id}
-                    ).fetchall()
-                    log.info(f"[Scheduler] Trip {trip_id}: Query returned {len(participant_email_contacts)} participant email contacts")
-
-                    # Get participant friend contacts' emails (from users table via friend_user_id)
-                    participant_friend_email_contacts = conn.execute(
-                        sqlalchemy.text("""
-                            SELECT DISTINCT
-                                   TRIM(friend.first_name || ' ' || friend.last_name) as name,
-                                   friend.email as email
-                            FROM participant_trip_contacts ptc
-                            JOIN users friend ON ptc.friend_user_id = friend.id
-                            WHERE ptc.trip_id = :trip_id
-                              AND ptc.friend_user_id IS NOT NULL
-                              AND friend.email IS NOT NULL
-                        """),
-                        {"trip_id": trip_id}
-                    ).fetchall()
-                    log.info(f"[Scheduler] Trip {trip_id}: Query returned {len(participant_friend_email_contacts)} participant friend email contacts")
-
-                    # Deduplicate by email (keep unique emails)
-                    existing_emails = {c.email.lower() for c in contacts}
-                    for pc in participant_email_contacts:
-                        if pc.email.lower() not in existing_emails:
-                            contacts.append(pc)
-                            existing_emails.add(pc.email.lower())
-
-                    for pfc in participant_friend_email_contacts:
-                        if pfc.email and pfc.email.lower() not in existing_emails:
-                            contacts.append(pfc)
-                            existing_emails.add(pfc.email.lower())
-
-                    log.info(f"[Scheduler] Trip {trip_id}: Added participant contacts (total unique: {len(contacts)})")
-
-            user = conn.execute(
-                sqlalchemy.text("SELECT first_name, last_name FROM users WHERE id = :user_id"),
-                {"user_id": trip.user_id}
-            ).fetchone()
-
-            # Get friend safety contacts for the trip
-            friend_contacts = conn.execute(
-                sqlalchemy.text("""
-                    SELECT tsc.friend_user_id
-                    FROM trip_safety_contacts tsc
-                    WHERE tsc.trip_id = :trip_id
-                    AND tsc.friend_user_id IS NOT NULL
-                """),
-                {"trip_id": trip_id}
-            ).fetchall()
-            friend_contacts = list(friend_contacts)
-
-            # For group trips, also notify all participants as friend contacts
-            # (they should know the group is overdue)
-            if is_group_trip and participant_user_ids:
-                existing_friend_ids = {f.friend_user_id for f in friend_contacts}
-                ParticipantAsFriend = namedtuple('ParticipantAsFriend', ['friend_user_id'])
-                for participant_id in participant_user_ids:
-                    if participant_id not in existing_friend_ids:
-                        friend_contacts.append(ParticipantAsFriend(participant_id))
-                        existing_friend_ids.add(participant_id)
-
-                # Also get participant's friend contacts (app users selected as safety contacts)
-                # These are stored in participant_trip_contacts.friend_user_id
-                participant_friend_contacts = conn.execute(
-                    sqlalchemy.text("""
-                        SELECT DISTINCT ptc.friend_user_id
-                        FROM participant_trip_contacts ptc
-                        WHERE ptc.trip_id = :trip_id
-                        AND ptc.friend_user_id IS NOT NULL
-                    """),
-                    {"trip_id": trip_id}
-                ).fetchall()
+def _record_one_shot_event(conn, user_id: int, trip_id: int, what: str) -> bool:
+    """Insert a once-per-trip event ('overdue' or 'notify').
+
+    Returns False if the trip already has one, i.e. another sweep performed
+    the transition. Backed by the uq_events_trip_one_shot partial index.
+    """
+    row = conn.execute(
+        sqlalchemy.text("""
+            INSERT INTO events (user_id, trip_id, what, timestamp)
+            VALUES (:user_id, :trip_id, :what, :timestamp)
+            ON CONFLICT (trip_id, what) WHERE what IN ('overdue', 'notify') DO NOTHING
+            RETURNING id
+        """),
+        {"user_id": user_id, "trip_id": trip_id, "what": what, "timestamp": datetime.utcnow()}
+    ).fetchone()
+    return row is not None
+
+
+def _delete_one_shot_event(trip_id: int, what: str):
+    """Undo a one-shot event claim whose transition didn't happen."""
+    with db.scheduler_engine.begin() as conn:
+        conn.execute(
+            sqlalchemy.text("DELETE FROM events WHERE trip_id = :trip_id AND what = :what"),
+            {"trip_id": trip_id, "what": what}
+        )
 
-                # Add to friend_contacts list (with deduplication)
-                for pfc in participant_friend_contacts:
-                    if pfc.friend_user_id not in existing_friend_ids:
-                        friend_contacts.append(ParticipantAsFriend(pfc.friend_user_id))
-                        existing_friend_ids.add(pfc.friend_user_id)
 
-                log.info(f"[Scheduler] Trip {trip_id}: Total friend contacts (including participants and their friends): {len(friend_contacts)}")
+async def _send_overdue_alerts(trip, trip_id: int) -> bool:
+    """Alert the trip's email and friend contacts that it's overdue.
 
-        log.info(f"[Scheduler] Trip {trip_id}: Found {len(contacts)} contacts with email")
+    Returns:
+        False if the trip has no contacts to alert
+    """
+    # Owner's and participants' contacts plus the participants themselves, each reached once
+    with db.scheduler_engine.connect() as conn:
+        plan = recipients.plan_delivery(conn, trip_id, "overdue")
+    contacts = plan.emails
+    friend_user_ids = plan.participant_pushes + plan.friend_pushes
+    user_name = plan.owner_name
+
+    custom_overdue_message = getattr(trip, 'custom_overdue_message', None)
+
+    # Send notifications (async, outside transaction)
+    if contacts:
+        log.info(f"[Scheduler] Sending overdue notifications for trip {trip_id} to {len(contacts)} contacts")
+        user_timezone = trip.timezone if hasattr(trip, 'timezone') else None
+        start_location = trip.start_location_text if trip.has_separate_locations else None
+        await send_overdue_notifications(
+            trip, contacts, user_name, user_timezone, start_location,
+            custom_message=custom_overdue_message
+        )
+        log.info(f"[Scheduler] Overdue notifications sent for trip {trip_id}")
 
-        user_name = f"{user.first_name} {user.last_name}".strip() if user else "Someone"
-        if not user_name:
-            user_name = "A Homebound user"
+    if friend_user_ids:
+        log.info(f"[Scheduler] Sending overdue push notifications to {len(friend_user_ids)} friend contacts for trip {trip_id}")
 
-        # Send notifications (async, outside transaction)
-        if contacts:
-            log.info(f"[Scheduler] Sending overdue notifications for trip {trip_id} to {len(contacts)} contacts")
-            user_timezone = trip.timezone if hasattr(trip, 'timezone') else None
-            start_location = trip.start_location_text if trip.has_separate_locations else None
-            custom_overdue_message = getattr(trip, 'custom_overdue_message', None)
-            await send_overdue_notifications(
-                trip, list(contacts), user_name, user_timezone, start_location,
+        # Fetch the latest live location for this trip's user to include in overdue alerts
+        last_location_coords = None
+        try:
+            with db.scheduler_engine.connect() as conn:
+                live_loc = conn.execute(
+                    sqlalchemy.text("""
+                        SELECT latitude, longitude
+                        FROM live_locations
+                        WHERE user_id = :user_id
+                        ORDER BY timestamp DESC
+                        LIMIT 1
+                    """),
+                    {"user_id": trip.user_id}
+                ).fetchone()
+                if live_loc:
+                    last_location_coords = (live_loc.latitude, live_loc.longitude)
+                    log.info(f"[Scheduler] Trip {trip_id}: Found last known location for overdue alert: {last_location_coords}")
+        except Exception as e:
+            log.warning(f"[Scheduler] Trip {trip_id}: Failed to fetch live location for overdue alert: {e}")
+
+        for friend_id in friend_user_ids:
+            await send_friend_overdue_push(
+                friend_user_id=friend_id,
+                user_name=user_name,
+                trip_title=trip.title,
+                trip_id=trip_id,
+                last_location_coords=last_location_coords,
+                destination_text=trip.location_text,
                 custom_message=custom_overdue_message
             )
-            log.info(f"[Scheduler] Overdue notifications sent for trip {trip_id}")
+        log.info(f"[Scheduler] Friend overdue notifications sent for trip {trip_id}")
 
-        if friend_contacts:
-            log.info(f"[Scheduler] Sending overdue push notifications to {len(friend_contacts)} friend contacts for trip {trip_id}")
+    if plan.is_empty:
+        log.warning(f"[Scheduler] Trip {trip_id}: No contacts (email or friend) found, skipping notification")
+        return False
+    return True
 
-            # Fetch the latest live location for this trip's user to include in overdue alerts
-            last_location_coords = None
-            try:
-                with db.engine.connect() as conn:
-                    live_loc = conn.execute(
-                        sqlalchemy.text("""
-                            SELECT latitude, longitude
-                            FROM live_locations
-                            WHERE user_id = :user_id
-                            ORDER BY timestamp DESC
-                            LIMIT 1
-                        """),
-                        {"user_id": trip.user_id}
-                    ).fetchone()
-                    if live_loc:
-                        last_location_coords = (live_loc.latitude, live_loc.longitude)
-                        log.info(f"[Scheduler] Trip {trip_id}: Found last known location for overdue alert: {last_location_coords}")
-            except Exception as e:
-                log.warning(f"[Scheduler] Trip {trip_id}: Failed to fetch live location for overdue alert: {e}")
-
-            for friend in friend_contacts:
-                await send_friend_overdue_push(
-                    friend_user_id=friend.friend_user_id,
-                    user_name=user_name,
-                    trip_title=trip.title,
-                    trip_id=trip_id,
-                    last_location_coords=last_location_coords,
-                    destination_text=trip.location_text,
-                    custom_message=custom_overdue_message
-                )
-            log.info(f"[Scheduler] Friend overdue notifications sent for trip {trip_id}")
 
-        # Update database in isolated transaction
-        if not contacts and not friend_contacts:
-            log.warning(f"[Scheduler] Trip {trip_id}: No contacts (email or friend) found, skipping notification")
-        else:
-            with db.engine.begin() as conn:
-                conn.execute(
-                    sqlalchemy.text("""
-                        INSERT INTO events (user_id, trip_id, what, timestamp)
-                        VALUES (:user_id, :trip_id, 'notify', :timestamp)
-                    """),
-                    {
-                        "user_id": trip.user_id,
-                        "trip_id": trip_id,
-                        "timestamp": datetime.utcnow()
-                    }
+def _claim_trips(conditions: str, params: dict, returning: str, now: datetime) -> tuple[list, datetime]:
+    """Claim due trips for a push phase in one short transaction.
+
+    Stamps matching rows with a push lease and commits, so the sends that
+    follow happen outside any transaction. Rows locked by another writer or
+    holding an unexpired lease are skipped.
+
+    Args:
+        conditions: WHERE conditions selecting due trips
+        params: Bind parameters for the conditions
+        returning: RETURNING column list (trips aliased as t)
+        now: Sweep time
+
+    Returns:
+        (claimed rows, lease value to hand back to _finish_trip_claim)
+    """
+    lease_until = now + timedelta(seconds=PUSH_LEASE_SECONDS)
+    with db.scheduler_engine.begin() as conn:
+        rows = conn.execute(
+            sqlalchemy.text(f"""
+                UPDATE trips t
+                SET push_lease_until = :lease_until
+                WHERE t.id IN (
+                    SELECT id FROM trips
+                    WHERE {conditions}
+                    AND (push_lease_until IS NULL OR push_lease_until < :now)
+                    FOR UPDATE SKIP LOCKED
                 )
+                RETURNING {returning}
+            """),
+            {**params, "now": now, "lease_until": lease_until}
+        ).fetchall()
+    return rows, lease_until
 
-        # Update trip status in separate transaction
-        with db.engine.begin() as conn:
-            conn.execute(
-                sqlalchemy.text("""
-                    UPDATE trips SET status = 'overdue_notified'
-                    WHERE id = :trip_id
-                """),
-                {"trip_id": trip_id}
-            )
-        log.info(f"[Scheduler] Trip {trip_id}: Status updated to overdue_notified")
-    else:
-        log.info(f"[Scheduler] Trip {trip_id}: Grace period not yet expired")
+
+def _finish_trip_claim(trip_id: int, lease_until: datetime, assignments: str = "", params: dict | None = None):
+    """Record a push outcome and release the trip's lease in one short transaction.
+
+    The update only applies while the lease is still ours; if it expired and
+    another sweep re-claimed the row, that sweep records the outcome.
+
+    Args:
+        assignments: SET clause recording the outcome (empty to just release)
+    """
+    set_clause = f"{assignments}, push_lease_until = NULL" if assignments else "push_lease_until = NULL"
+    with db.scheduler_engine.begin() as conn:
+        conn.execute(
+            sqlalchemy.text(f"UPDATE trips SET {set_clause} WHERE id = :id AND push_lease_until = :lease_until"),
+            {**(params or {}), "id": trip_id, "lease_until": lease_until}
+        )
+
+
+def _release_trip_claim(trip_id: int, lease_until: datetime):
+    """Release a lease without recording an outcome so the next sweep retries."""
+    try:
+        _finish_trip_claim(trip_id, lease_until)
+    except Exception as e:
+        # The lease expires on its own after PUSH_LEASE_SECONDS
+        log.error(f"[Push] Failed to release claim on trip {trip_id}: {e}")
+
+
+def _finish_participant_claim(participant_id: int, lease_until: datetime, assignments: str = "", params: dict | None = None):
+    """Record a participant push outcome and release its lease."""
+    set_clause = f"{assignments}, push_lease_until = NULL" if assignments else "push_lease_until = NULL"
+    with db.scheduler_engine.begin() as conn:
+        conn.execute(
+            sqlalchemy.text(f"""
+                UPDATE trip_participants SET {set_clause}
+                WHERE id = :id AND push_lease_until = :lease_until
+            """),
+            {**(params or {}), "id": participant_id, "lease_until": lease_until}
+        )
 
 
 async def check_push_notifications():
     """Check for and send push notifications to users.
 
-    Uses FOR UPDATE SKIP LOCKED to avoid lock contention with other scheduler jobs.
-    Each notification type is processed in its own transaction.
+    Each notification type is a claim-then-send phase: a short transaction
+    claims due rows with a lease (FOR UPDATE SKIP LOCKED), pushes are sent
+    outside any transaction, and a second short transaction per row records
+    the outcome and releases the lease. Row locks are never held across
+    APNs calls, so check-ins, extends and completes aren't blocked.
     """
     try:
         now = datetime.utcnow()
 
-        # 1. Trip Starting Soon - SELECT and UPDATE in same transaction with SKIP LOCKED
-        with db.engine.begin() as conn:
-            starting_soon = conn.execute(
-                sqlalchemy.text("""
-                    SELECT id, user_id, title, start
-                    FROM trips
-                    WHERE status = 'planned'
-                    AND notified_starting_soon = false
-                    AND start > :now
-                    AND start <= :soon
-                    FOR UPDATE SKIP LOCKED
-                """),
-                {"now": now, "soon": now + timedelta(minutes=STARTING_SOON_MINUTES)}
-            ).fetchall()
+        # 1. Trip Starting Soon
+        starting_soon, lease = _claim_trips(
+            """status = 'planned'
+               AND notified_starting_soon = false
+               AND start > :now
+               AND start <= :soon""",
+            {"soon": now + timedelta(minutes=STARTING_SOON_MINUTES)},
+            "t.id, t.user_id, t.title, t.start",
+            now
+        )
+        record_rows("check_push_notifications", "starting_soon", len(starting_soon))
 
-            for trip in starting_soon:
-                try:
-                    await send_push_to_user(
-                        trip.user_id,
-                        "Trip Starting Soon",
-                        f"Your trip '{trip.title}' is starting soon!",
-                        notification_type="trip_reminder"
-                    )
-                    conn.execute(
-                        sqlalchemy.text("UPDATE trips SET notified_starting_soon = true WHERE id = :id"),
-                        {"id": trip.id}
-                    )
-                    log.info(f"[Push] Sent 'starting soon' notification for trip {trip.id}")
-                except Exception as e:
-                    log.error(f"[Push] Error sending 'starting soon' for trip {trip.id}: {e}")
+        for trip in starting_soon:
+            try:
+                await send_push_to_user(
+                    trip.user_id,
+                    "Trip Starting Soon",
+                    f"Your trip '{trip.title}' is starting soon!",
+                    notification_type="trip_reminder"
+                )
+                _finish_trip_claim(trip.id, lease, "notified_starting_soon = true")
+                log.info(f"[Push] Sent 'starting soon' notification for trip {trip.id}")
+            except Exception as e:
+                log.error(f"[Push] Error sending 'starting soon' for trip {trip.id}: {e}")
+                _release_trip_claim(trip.id, lease)
 
         # 2. Trip Started
-        with db.engine.begin() as conn:
-            just_started = conn.execute(
-                sqlalchemy.text("""
-                    SELECT t.id, t.user_id, t.title, t.is_group_trip, t.location_text, t.eta,
-                           t.timezone, t.has_separate_locations, t.start_location_text, t.notify_self,
-                           t.contact1, t.contact2, t.contact3, t.custom_start_message,
-                           a.name as activity_name
-                    FROM trips t
-                    JOIN activities a ON t.activity = a.id
-                    WHERE t.status = 'active'
-                    AND t.notified_trip_started = false
-                    FOR UPDATE SKIP LOCKED
-                """)
-            ).fetchall()
-
-            for trip in just_started:
-                try:
-                    # Send visible notification to trip owner
-                    await send_push_to_user(
-                        trip.user_id,
-                        "Trip Started",
-                        f"Your trip '{trip.title}' has started. Stay safe!",
-                        data={"sync": "start_live_activity", "trip_id": trip.id},
-                        notification_type="trip_reminder"
-                    )
-                    # Send background push to wake app and start Live Activity
-                    # Uses apns-push-type: background with content-available: 1
-                    await send_background_push_to_user(
-                        trip.user_id,
-                        data={"sync": "start_live_activity", "trip_id": trip.id}
-                    )
-
-                    # Get user name for notifications
-                    user = conn.execute(
-                        sqlalchemy.text("SELECT first_name, last_name, email FROM users WHERE id = :user_id"),
-                        {"user_id": trip.user_id}
-                    ).fetchone()
-                    user_name = f"{user.first_name} {user.last_name}".strip() if user else "Someone"
-                    if not user_name:
-                        user_name = "A Homebound user"
-                    owner_email = user.email if user and trip.notify_self else None
-
-                    # Get owner's email contacts - they watch the owner
-                    owner_contacts = conn.execute(
-                        sqlalchemy.text("""
-                            SELECT c.id, c.name, c.email
-                            FROM contacts c
-                            WHERE c.id IN (:c1, :c2, :c3) AND c.email IS NOT NULL
-                        """),
-                        {"c1": trip.contact1 or -1, "c2": trip.contact2 or -1, "c3": trip.contact3 or -1}
-                    ).fetchall()
-                    # Bug 1 fix: Add watched_user_name for owner's contacts
-                    contacts_for_email = [
-                        {**dict(c._mapping), "watched_user_name": user_name}
-                        for c in owner_contacts
-                    ]
-
-                    # Get owner's friend contacts
-                    owner_friend_contacts = conn.execute(
-                        sqlalchemy.text("""
-                            SELECT friend_user_id FROM trip_safety_contacts
-                            WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                        """),
-                        {"trip_id": trip.id}
-                    ).fetchall()
-                    friend_user_ids = [f.friend_user_id for f in owner_friend_contacts]
-
-                    # For group trips, send push notifications to participants and their friend contacts
-                    # NOTE: Participant EMAIL contacts are NOT fetched here. The participant join flow
-                    # (participants.py accept_invitation) handles notifying participant contacts when
-                    # they join the trip. This prevents duplicate emails when a participant joins
-                    # after the trip has already started.
-                    if trip.is_group_trip:
-                        # Get participant friend contacts for push notifications
-                        participant_friend_contacts = conn.execute(
-                            sqlalchemy.text("""
-                                SELECT DISTINCT friend_user_id FROM participant_trip_contacts
-                                WHERE trip_id = :trip_id AND friend_user_id IS NOT NULL
-                            """),
-                            {"trip_id": trip.id}
-                        ).fetchall()
+        just_started, lease = _claim_trips(
+            """status = 'active'
+               AND notified_trip_started = false""",
+            {},
+            """t.id, t.user_id, t.title, t.is_group_trip, t.location_text, t.eta,
+               t.timezone, t.has_separate_locations, t.start_location_text, t.notify_self,
+               t.contact1, t.contact2, t.contact3, t.custom_start_message,
+               (SELECT a.name FROM activities a WHERE a.id = t.activity) AS activity_name""",
+            now
+        )
+        record_rows("check_push_notifications", "trip_started", len(just_started))
 
-                        existing_friend_ids = set(friend_user_ids)
-                        for pfc in participant_friend_contacts:
-                            if pfc.friend_user_id not in existing_friend_ids:
-                                friend_user_ids.append(pfc.friend_user_id)
-                                existing_friend_ids.add(pfc.friend_user_id)
+        for trip in just_started:
+            try:
+                # Send visible notification to trip owner
+                await send_push_to_user(
+                    trip.user_id,
+                    "Trip Started",
+                    f"Your trip '{trip.title}' has started. Stay safe!",
+                    data={"sync": "start_live_activity", "trip_id": trip.id},
+                    notification_type="trip_reminder"
+                )
+                # Send background push to wake app and start Live Activity
+                # Uses apns-push-type: background with content-available: 1
+                await send_background_push_to_user(
+                    trip.user_id,
+                    data={"sync": "start_live_activity", "trip_id": trip.id}
+                )
 
-                        # Get all accepted participants to send them push notifications
-                        participants = conn.execute(
-                            sqlalchemy.text("""
-                                SELECT user_id FROM trip_participants
-                                WHERE trip_id = :trip_id AND status = 'accepted' AND user_id != :owner_id
-                            """),
-                            {"trip_id": trip.id, "owner_id": trip.user_id}
-                        ).fetchall()
-
-                        # Send push notifications to all participants
-                        for participant in participants:
-                            await send_push_to_user(
-                                participant.user_id,
-                                "Trip Started",
-                                f"The group trip '{trip.title}' has started. Stay safe!",
-                                data={"sync": "start_live_activity", "trip_id": trip.id},
-                                notification_type="trip_reminder"
-                            )
-                            await send_background_push_to_user(
-                                participant.user_id,
-                                data={"sync": "start_live_activity", "trip_id": trip.id}
-                            )
-                        log.info(f"[Push] Sent 'trip started' push to {len(participants)} participants for trip {trip.id}")
-
-                    # Send trip starting emails to all contacts (owner + participants)
-                    if contacts_for_email or owner_email:
-                        trip_data = {"title": trip.title, "location_text": trip.location_text, "eta": trip.eta}
-                        start_location = trip.start_location_text if trip.has_separate_locations else None
-                        custom_start_message = getattr(trip, 'custom_start_message', None)
-                        await send_trip_starting_now_emails(
-                            trip=trip_data,
-                            contacts=contacts_for_email,
-                            user_name=user_name,
-                            activity_name=trip.activity_name,
-                            user_timezone=trip.timezone,
-                            start_location=start_location,
-                            owner_email=owner_email,
-                            custom_message=custom_start_message
+                # Recipients are read in a short read-only transaction; sends happen after it.
+                # Participant EMAIL contacts aren't included: the participant join flow
+                # (participants.py accept_invitation) notifies them when the participant joins,
+                # which avoids duplicates when someone joins after the trip has started.
+                with db.scheduler_engine.connect() as conn:
+                    plan = recipients.plan_delivery(conn, trip.id, "trip_started")
+
+                user_name = plan.owner_name
+                owner_email = plan.owner_email
+                custom_start_message = getattr(trip, 'custom_start_message', None)
+                contacts_for_email = plan.emails
+                friend_user_ids = plan.friend_pushes
+
+                if trip.is_group_trip:
+                    # Visible push to participants who want trip reminders, background push to all
+                    for participant_id in plan.participant_pushes:
+                        await send_push_to_user(
+                            participant_id,
+                            "Trip Started",
+                            f"The group trip '{trip.title}' has started. Stay safe!",
+                            data={"sync": "start_live_activity", "trip_id": trip.id},
+                            notification_type="trip_reminder"
                         )
-                        log.info(f"[Push] Sent trip starting emails to {len(contacts_for_email)} contacts for trip {trip.id}")
-
-                    # Send friend trip starting pushes
-                    for friend_id in friend_user_ids:
-                        await send_friend_trip_starting_push(
-                            friend_user_id=friend_id,
-                            user_name=user_name,
-                            trip_title=trip.title,
-                            custom_message=custom_start_message
+                    for participant_id in plan.participant_ids:
+                        await send_background_push_to_user(
+                            participant_id,
+                            data={"sync": "start_live_activity", "trip_id": trip.id}
                         )
-                    if friend_user_ids:
-                        log.info(f"[Push] Sent friend trip starting push to {len(friend_user_ids)} friends for trip {trip.id}")
-
-                    conn.execute(
-                        sqlalchemy.text("UPDATE trips SET notified_trip_started = true WHERE id = :id"),
-                        {"id": trip.id}
-                    )
-                    log.info(f"[Push] Sent 'trip started' notification for trip {trip.id}")
-                except Exception as e:
-                    log.error(f"[Push] Error sending 'trip started' for trip {trip.id}: {e}")
-
-        # 3. Approaching ETA
-        with db.engine.begin() as conn:
-            approaching_eta = conn.execute(
-                sqlalchemy.text("""
-                    SELECT id, user_id, title, eta, checkout_token
-                    FROM trips
-                    WHERE status = 'active'
-                    AND notified_approaching_eta = false
-                    AND eta > :now
-                    AND eta <= :soon
-                    FOR UPDATE SKIP LOCKED
-                """),
-                {"now": now, "soon": now + timedelta(minutes=APPROACHING_ETA_MINUTES)}
-            ).fetchall()
-
-            for trip in approaching_eta:
-                try:
-                    await send_push_to_user(
-                        trip.user_id,
-                        "Almost Time",
-                        f"You're expected back from '{trip.title}' in a couple minutes!",
-                        data={"trip_id": trip.id, "checkout_token": trip.checkout_token},
-                        notification_type="emergency",
-                        category="CHECKOUT_ONLY"
+                    log.info(f"[Push] Sent 'trip started' push to {len(plan.participant_ids)} participants for trip {trip.id}")
+
+                # Send trip starting emails to all contacts (owner + participants)
+                if contacts_for_email or owner_email:
+                    trip_data = {"title": trip.title, "location_text": trip.location_text, "eta": trip.eta}
+                    start_location = trip.start_location_text if trip.has_separate_locations else None
+                    await send_trip_starting_now_emails(
+                        trip=trip_data,
+                        contacts=contacts_for_email,
+                        user_name=user_name,
+                        activity_name=trip.activity_name,
+                        user_timezone=trip.timezone,
+                        start_location=start_location,
+                        owner_email=owner_email,
+                        custom_message=custom_start_message
                     )
-                    conn.execute(
-                        sqlalchemy.text("UPDATE trips SET notified_approaching_eta = true WHERE id = :id"),
-                        {"id": trip.id}
+                    log.info(f"[Push] Sent trip starting emails to {len(contacts_for_email)} contacts for trip {trip.id}")
+
+                # Send friend trip starting pushes
+                for friend_id in friend_user_ids:
+                    await send_friend_trip_starting_push(
+                        friend_user_id=friend_id,
+                        user_name=user_name,
+                        trip_title=trip.title,
+                        custom_message=custom_start_message
                     )
-                    log.info(f"[Push] Sent 'approaching ETA' notification for trip {trip.id}")
-                except Exception as e:
-                    log.error(f"[Push] Error sending 'approaching ETA' for trip {trip.id}: {e}")
+                if friend_user_ids:
+                    log.info(f"[Push] Sent friend trip starting push to {len(friend_user_ids)} friends for trip {trip.id}")
 
-        # 4. ETA Reached
-        with db.engine.begin() as conn:
-            eta_reached = conn.execute(
-                sqlalchemy.text("""
-                    SELECT id, user_id, title, eta, grace_min, checkout_token
-                    FROM trips
-                    WHERE status IN ('active', 'overdue')
-                    AND notified_eta_reached = false
-                    AND eta <= :now
-                    FOR UPDATE SKIP LOCKED
-                """),
-                {"now": now}
-            ).fetchall()
+                _finish_trip_claim(trip.id, lease, "notified_trip_started = true")
+                log.info(f"[Push] Sent 'trip started' notification for trip {trip.id}")
+            except Exception as e:
+                log.error(f"[Push] Error sending 'trip started' for trip {trip.id}: {e}")
+                _release_trip_claim(trip.id, lease)
 
-            for trip in eta_reached:
-                try:
-                    await send_push_to_user(
-                        trip.user_id,
-                        "Time to Check Out",
-                        f"Your expected return time has passed. Check out or extend your trip '{trip.title}'.",
-                        data={"trip_id": trip.id, "checkout_token": trip.checkout_token},
-                        notification_type="emergency",
-                        category="CHECKOUT_ONLY"
-                    )
-                    conn.execute(
-                        sqlalchemy.text("UPDATE trips SET notified_eta_reached = true WHERE id = :id"),
-                        {"id": trip.id}
-                    )
-                    log.info(f"[Push] Sent 'ETA reached' notification for trip {trip.id}")
-                except Exception as e:
-                    log.error(f"[Push] Error sending 'ETA reached' for trip {trip.id}: {e}")
+        # 3. Approaching ETA
+        approaching_eta, lease = _claim_trips(
+            """status = 'active'
+               AND notified_approaching_eta = false
+               AND eta > :now
+               AND eta <= :soon""",
+            {"soon": now + timedelta(minutes=APPROACHING_ETA_MINUTES)},
+            "t.id, t.user_id, t.title, t.eta, t.checkout_token",
+            now
+        )
+        record_rows("check_push_notifications", "approaching_eta", len(approaching_eta))
 
-        # 5. Check-in Reminders (Trip Owner)
-        with db.engine.begin() as conn:
-            need_checkin_reminder = conn.execute(
-                sqlalchemy.text("""
-                    SELECT id, user_id, title, last_checkin_reminder,
-                           COALESCE(checkin_interval_min, :default_interval) as interval_min,
-                           notify_start_hour, notify_end_hour, timezone,
-                           checkin_token, checkout_token, is_group_trip
-                    FROM trips
-                    WHERE status = 'active'
-                    FOR UPDATE SKIP LOCKED
-                """),
-                {"default_interval": DEFAULT_CHECKIN_REMINDER_INTERVAL}
-            ).fetchall()
+        for trip in approaching_eta:
+            try:
+                await send_push_to_user(
+                    trip.user_id,
+                    "Almost Time",
+                    f"You're expected back from '{trip.title}' in a couple minutes!",
+                    data={"trip_id": trip.id, "checkout_token": trip.checkout_token},
+                    notification_type="emergency",
+                    category="CHECKOUT_ONLY"
+                )
+                _finish_trip_claim(trip.id, lease, "notified_approaching_eta = true")
+                log.info(f"[Push] Sent 'approaching ETA' notification for trip {trip.id}")
+            except Exception as e:
+                log.error(f"[Push] Error sending 'approaching ETA' for trip {trip.id}: {e}")
+                _release_trip_claim(trip.id, lease)
 
-            for trip in need_checkin_reminder:
-                try:
-                    interval_min = trip.interval_min
-                    cutoff = now - timedelta(minutes=interval_min)
+        # 4. ETA Reached
+        eta_reached, lease = _claim_trips(
+            """status IN ('active', 'overdue')
+               AND notified_eta_reached = false
+               AND eta <= :now""",
+            {},
+            "t.id, t.user_id, t.title, t.eta, t.grace_min, t.checkout_token",
+            now
+        )
+        record_rows("check_push_notifications", "eta_reached", len(eta_reached))
 
-                    # Parse last_checkin_reminder (may be string from DB)
-                    last_reminder = parse_datetime_robust(trip.last_checkin_reminder)
-                    if last_reminder is not None and last_reminder > cutoff:
-                        continue
+        for trip in eta_reached:
+            try:
+                await send_push_to_user(
+                    trip.user_id,
+                    "Time to Check Out",
+                    f"Your expected return time has passed. Check out or extend your trip '{trip.title}'.",
+                    data={"trip_id": trip.id, "checkout_token": trip.checkout_token},
+                    notification_type="emergency",
+                    category="CHECKOUT_ONLY"
+                )
+                _finish_trip_claim(trip.id, lease, "notified_eta_reached = true")
+                log.info(f"[Push] Sent 'ETA reached' notification for trip {trip.id}")
+            except Exception as e:
+                log.error(f"[Push] Error sending 'ETA reached' for trip {trip.id}: {e}")
+                _release_trip_claim(trip.id, lease)
+
+        # 5. Check-in Reminders (Trip Owner) - range scan on the precomputed next_reminder_at
+        # (ix_trips_next_reminder_at). Every path that activates a trip sets it.
+        need_checkin_reminder, lease = _claim_trips(
+            "status = 'active' AND next_reminder_at <= :now",
+            {"default_interval": DEFAULT_CHECKIN_REMINDER_INTERVAL},
+            """t.id, t.user_id, t.title, t.last_checkin_reminder, t.next_reminder_at,
+               COALESCE(t.checkin_interval_min, :default_interval) as interval_min,
+               t.notify_start_hour, t.notify_end_hour, t.timezone,
+               t.checkin_token, t.checkout_token, t.is_group_trip""",
+            now
+        )
+        record_rows("check_push_notifications", "checkin_reminder", len(need_checkin_reminder))
 
-                    # Check quiet hours
-                    if trip.notify_start_hour is not None and trip.notify_end_hour is not None:
-                        user_tz = pytz.timezone(trip.timezone) if trip.timezone else pytz.UTC
-                        user_now = datetime.now(user_tz)
-                        current_hour = user_now.hour
+        for trip in need_checkin_reminder:
+            try:
+                interval_min = trip.interval_min
 
-                        if trip.notify_start_hour <= trip.notify_end_hour:
-                            in_active_hours = trip.notify_start_hour <= current_hour < trip.notify_end_hour
-                        else:
-                            in_active_hours = current_hour >= trip.notify_start_hour or current_hour < trip.notify_end_hour
+                due_at = parse_datetime_robust(trip.next_reminder_at)
+                next_reminder_at = compute_next_reminder_at(
+                    now, interval_min, trip.notify_start_hour, trip.notify_end_hour, trip.timezone
+                )
 
-                        if not in_active_hours:
-                            continue
+                # Quiet hours are folded into next_reminder_at; this catches settings
+                # changed since it was computed
+                if not in_active_hours(trip.notify_start_hour, trip.notify_end_hour, trip.timezone, at=now):
+                    _finish_trip_claim(
+                        trip.id, lease, "next_reminder_at = :next_reminder_at",
+                        {"next_reminder_at": fold_quiet_hours(now, trip.notify_start_hour, trip.notify_end_hour, trip.timezone)}
+                    )
+                    continue
 
-                    if last_reminder is None:
-                        conn.execute(
-                            sqlalchemy.text("UPDATE trips SET last_checkin_reminder = :now WHERE id = :id"),
-                            {"now": now, "id": trip.id}
-                        )
-                    else:
-                        await send_push_to_user(
-                            trip.user_id,
-                            "Check-in Reminder",
-                            "Hope your trip is going well! Don't forget to check in!",
-                            data={"trip_id": trip.id, "checkin_token": trip.checkin_token, "checkout_token": trip.checkout_token},
-                            notification_type="checkin",
-                            category="CHECKIN_REMINDER"
-                        )
-                        conn.execute(
-                            sqlalchemy.text("UPDATE trips SET last_checkin_reminder = :now WHERE id = :id"),
-                            {"now": now, "id": trip.id}
-                        )
-                        log.info(f"[Push] Sent check-in reminder for trip {trip.id}")
-                except Exception as e:
-                    log.error(f"[Push] Error sending check-in reminder for trip {trip.id}: {e}")
+                await send_push_to_user(
+                    trip.user_id,
+                    "Check-in Reminder",
+                    "Hope your trip is going well! Don't forget to check in!",
+                    data={"trip_id": trip.id, "checkin_token": trip.checkin_token, "checkout_token": trip.checkout_token},
+                    notification_type="checkin",
+                    category="CHECKIN_REMINDER"
+                )
+                _finish_trip_claim(
+                    trip.id, lease, "last_checkin_reminder = :now, next_reminder_at = :next_reminder_at",
+                    {"now": now, "next_reminder_at": next_reminder_at}
+                )
+                record_deadline_lag("checkin_reminder", due_at)
+                log.info(f"[Push] Sent check-in reminder for trip {trip.id}")
+            except Exception as e:
+                log.error(f"[Push] Error sending check-in reminder for trip {trip.id}: {e}")
+                _release_trip_claim(trip.id, lease)
 
         # 5b. Check-in Reminders for Group Trip Participants (using their individual settings)
         # This requires the participant notification settings migration to be applied
         try:
-            with db.engine.begin() as conn:
-                # Get all participants in active group trips with their individual settings
+            lease = now + timedelta(seconds=PUSH_LEASE_SECONDS)
+            with db.scheduler_engine.begin() as conn:
+                # Claim participants in active group trips whose next reminder is due
                 participant_reminders = conn.execute(
                     sqlalchemy.text("""
-                        SELECT tp.trip_id, tp.user_id, tp.last_checkin_reminder,
-                               COALESCE(tp.checkin_interval_min, :default_interval) as interval_min,
-                               tp.notify_start_hour, tp.notify_end_hour,
-                               t.title, t.checkin_token, t.checkout_token, t.timezone
-                        FROM trip_participants tp
-                        JOIN trips t ON tp.trip_id = t.id
-                        WHERE t.status = 'active'
-                        AND t.is_group_trip = true
-                        AND tp.status = 'accepted'
-                        AND tp.role = 'participant'
-                        FOR UPDATE OF tp SKIP LOCKED
+                        UPDATE trip_participants tp
+                        SET push_lease_until = :lease_until
+                        FROM trips t
+                        WHERE t.id = tp.trip_id
+                        AND tp.id IN (
+                            SELECT p.id
+                            FROM trip_participants p
+                            JOIN trips pt ON p.trip_id = pt.id
+                            WHERE pt.status = 'active'
+                            AND pt.is_group_trip = true
+                            AND p.status = 'accepted'
+                            AND p.role = 'participant'
+                            AND p.next_reminder_at <= :now
+                            AND (p.push_lease_until IS NULL OR p.push_lease_until < :now)
+                            FOR UPDATE OF p SKIP LOCKED
+                        )
+                        RETURNING tp.id, tp.trip_id, tp.user_id, tp.last_checkin_reminder, tp.next_reminder_at,
+                                  COALESCE(tp.checkin_interval_min, :default_interval) as interval_min,
+                                  tp.notify_start_hour, tp.notify_end_hour,
+                                  t.title, t.checkin_token, t.checkout_token, t.timezone
                     """),
-                    {"default_interval": DEFAULT_CHECKIN_REMINDER_INTERVAL}
+                    {"now": now, "lease_until": lease, "default_interval": DEFAULT_CHECKIN_REMINDER_INTERVAL}
                 ).fetchall()
-
-                for participant in participant_reminders:
-                    try:
-                        interval_min = participant.interval_min
-                        cutoff = now - timedelta(minutes=interval_min)
-
-                        # Parse last_checkin_reminder
-                        last_reminder = parse_datetime_robust(participant.last_checkin_reminder)
-                        if last_reminder is not None and last_reminder > cutoff:
-                            continue
-
-                        # Check quiet hours using participant's settings
-                        if participant.notify_start_hour is not None and participant.notify_end_hour is not None:
-                            user_tz = pytz.timezone(participant.timezone) if participant.timezone else pytz.UTC
-                            user_now = datetime.now(user_tz)
-                            current_hour = user_now.hour
-
-                            if participant.notify_start_hour <= participant.notify_end_hour:
-                                in_active_hours = participant.notify_start_hour <= current_hour < participant.notify_end_hour
-                            else:
-                                in_active_hours = current_hour >= participant.notify_start_hour or current_hour < participant.notify_end_hour
-
-                            if not in_active_hours:
-                                continue
-
-                        if last_reminder is None:
-                            # Initialize last reminder timestamp
-                            conn.execute(
-                                sqlalchemy.text("""
-                                    UPDATE trip_participants
-                                    SET last_checkin_reminder = :now
-                                    WHERE trip_id = :trip_id AND user_id = :user_id
-                                """),
-                                {"now": now, "trip_id": participant.trip_id, "user_id": participant.user_id}
-                            )
-                        else:
-                            await send_push_to_user(
-                                participant.user_id,
-                                "Check-in Reminder",
-                                f"Hope your trip '{participant.title}' is going well! Don't forget to check in!",
-                                data={
-                                    "trip_id": participant.trip_id,
-                                    "checkin_token": participant.checkin_token,
-                                    "checkout_token": participant.checkout_token
-                                },
-                                notification_type="checkin",
-                                category="CHECKIN_REMINDER"
-                            )
-                            conn.execute(
-                                sqlalchemy.text("""
-                                    UPDATE trip_participants
-                                    SET last_checkin_reminder = :now
-                                    WHERE trip_id = :trip_id AND user_id = :user_id
-                                """),
-                                {"now": now, "trip_id": participant.trip_id, "user_id": participant.user_id}
-                            )
-                            log.info(f"[Push] Sent check-in reminder for participant {participant.user_id} on trip {participant.trip_id}")
-                    except Exception as e:
-                        log.error(f"[Push] Error sending check-in reminder for participant {participant.user_id}: {e}")
         except sqlalchemy.exc.ProgrammingError as e:
             # Migration not yet applied - columns don't exist yet, skip participant reminders
             if "does not exist" in str(e):
                 log.debug("[Push] Participant notification columns not yet available, skipping participant reminders")
+                participant_reminders = []
             else:
                 raise
+        record_rows("check_push_notifications", "participant_checkin_reminder", len(participant_reminders))
 
-        # 6. Grace Period Warnings (only for 'overdue' status - 'overdue_notified' means contacts were already alerted)
-        with db.engine.begin() as conn:
-            in_grace_period = conn.execute(
-                sqlalchemy.text("""
-                    SELECT id, user_id, title, eta, grace_min, last_grace_warning, checkout_token, status
-                    FROM trips
-                    WHERE status = 'overdue'
-                    AND (last_grace_warning IS NULL OR last_grace_warning <= :cutoff)
-                    FOR UPDATE SKIP LOCKED
-                """),
-                {"cutoff": now - timedelta(minutes=GRACE_WARNING_INTERVAL)}
-            ).fetchall()
+        for participant in participant_reminders:
+            try:
+                interval_min = participant.interval_min
+
+                due_at = parse_datetime_robust(participant.next_reminder_at)
+                quiet_hours = (participant.notify_start_hour, participant.notify_end_hour, participant.timezone)
+                next_reminder_at = compute_next_reminder_at(now, interval_min, *quiet_hours)
+
+                # Check quiet hours using participant's settings
+                if not in_active_hours(*quiet_hours, at=now):
+                    _finish_participant_claim(
+                        participant.id, lease, "next_reminder_at = :next_reminder_at",
+                        {"next_reminder_at": fold_quiet_hours(now, *quiet_hours)}
+                    )
+                    continue
 
-            for trip in in_grace_period:
+                await send_push_to_user(
+                    participant.user_id,
+                    "Check-in Reminder",
+                    f"Hope your trip '{participant.title}' is going well! Don't forget to check in!",
+                    data={
+                        "trip_id": participant.trip_id,
+                        "checkin_token": participant.checkin_token,
+                        "checkout_token": participant.checkout_token
+                    },
+                    notification_type="checkin",
+                    category="CHECKIN_REMINDER"
+                )
+                _finish_participant_claim(
+                    participant.id, lease, "last_checkin_reminder = :now, next_reminder_at = :next_reminder_at",
+                    {"now": now, "next_reminder_at": next_reminder_at}
+                )
+                record_deadline_lag("checkin_reminder", due_at)
+                log.info(f"[Push] Sent check-in reminder for participant {participant.user_id} on trip {participant.trip_id}")
+            except Exception as e:
+                log.error(f"[Push] Error sending check-in reminder for participant {participant.user_id}: {e}")
                 try:
-                    eta_dt = parse_datetime_robust(trip.eta)
-                    if eta_dt is None:
-                        log.warning(f"[Push] Failed to parse ETA for trip {trip.id}, skipping grace warning")
-                        continue
+                    _finish_participant_claim(participant.id, lease)
+                except Exception as release_error:
+                    log.error(f"[Push] Failed to release claim on participant {participant.id}: {release_error}")
 
-                    grace_expires = eta_dt + timedelta(minutes=trip.grace_min)
-                    remaining = (grace_expires - now).total_seconds() / 60
+        # 6. Grace Period Warnings (only for 'overdue' status - 'overdue_notified' means contacts were already alerted)
+        in_grace_period, lease = _claim_trips(
+            """status = 'overdue'
+               AND (last_grace_warning IS NULL OR last_grace_warning <= :cutoff)""",
+            {"cutoff": now - timedelta(minutes=GRACE_WARNING_INTERVAL)},
+            "t.id, t.user_id, t.title, t.eta, t.grace_min, t.last_grace_warning, t.checkout_token, t.status",
+            now
+        )
+        record_rows("check_push_notifications", "grace_warning", len(in_grace_period))
 
-                    if remaining > 0:
-                        message = f"You're overdue! {int(remaining)} minutes left before contacts are notified."
-                    else:
-                        message = "Your contacts have been notified. Check out now to let them know you're safe!"
+        for trip in in_grace_period:
+            try:
+                eta_dt = parse_datetime_robust(trip.eta)
+                if eta_dt is None:
+                    log.warning(f"[Push] Failed to parse ETA for trip {trip.id}, skipping grace warning")
+                    _finish_trip_claim(trip.id, lease)
+                    continue
 
-                    await send_push_to_user(
-                        trip.user_id,
-                        "Urgent: Check In Now",
-                        message,
-                        data={"trip_id": trip.id, "checkout_token": trip.checkout_token},
-                        notification_type="emergency",
-                        category="CHECKOUT_ONLY"
-                    )
-                    conn.execute(
-                        sqlalchemy.text("UPDATE trips SET last_grace_warning = :now WHERE id = :id"),
-                        {"now": now, "id": trip.id}
-                    )
-                    log.info(f"[Push] Sent grace warning for trip {trip.id}")
-                except Exception as e:
-                    log.error(f"[Push] Error sending grace warning for trip {trip.id}: {e}")
+                grace_expires = eta_dt + timedelta(minutes=trip.grace_min)
+                remaining = (grace_expires - now).total_seconds() / 60
+
+                if remaining > 0:
+                    message = f"You're overdue! {int(remaining)} minutes left before contacts are notified."
+                else:
+                    message = "Your contacts have been notified. Check out now to let them know you're safe!"
+
+                await send_push_to_user(
+                    trip.user_id,
+                    "Urgent: Check In Now",
+                    message,
+                    data={"trip_id": trip.id, "checkout_token": trip.checkout_token},
+                    notification_type="emergency",
+                    category="CHECKOUT_ONLY"
+                )
+                _finish_trip_claim(trip.id, lease, "last_grace_warning = :now", {"now": now})
+                # First warning is due at ETA, then every GRACE_WARNING_INTERVAL
+                last_warning = parse_datetime_robust(trip.last_grace_warning)
+                warning_due = eta_dt
+                if last_warning is not None:
+                    warning_due = max(eta_dt, last_warning + timedelta(minutes=GRACE_WARNING_INTERVAL))
+                record_deadline_lag("grace_warning", warning_due)
+                log.info(f"[Push] Sent grace warning for trip {trip.id}")
+            except Exception as e:
+                log.error(f"[Push] Error sending grace warning for trip {trip.id}: {e}")
+                _release_trip_claim(trip.id, lease)
 
     except Exception as e:
         log.error(f"Error checking push notifications: {e}", exc_info=True)
@@ -895,7 +794,7 @@ async def check_live_activity_transitions():
         now = datetime.utcnow()
 
         # First, fetch all trips that need processing (read-only transaction)
-        with db.engine.connect() as conn:
+        with db.scheduler_engine.connect() as conn:
             # Find active trips at or past ETA that haven't been notified yet
             # This catches ANY trip past ETA regardless of when it passed
             # (previously used a 15-second window which caused 30s+ delays)
@@ -919,6 +818,8 @@ async def check_live_activity_transitions():
                     AND notified_grace_transition = false
                 """)
             ).fetchall()
+            record_rows("check_live_activity_transitions", "eta_transition", len(approaching_eta))
+            record_rows("check_live_activity_transitions", "grace_transition", len(overdue_trips))
 
         # Process each ETA transition trip in its own transaction
         for trip in approaching_eta:
@@ -935,7 +836,7 @@ async def check_live_activity_transitions():
                 # Get check-in count from events (optional, default to 0)
                 checkin_count = 0
                 try:
-                    with db.engine.connect() as conn:
+                    with db.scheduler_engine.connect() as conn:
                         count_row = conn.execute(
                             sqlalchemy.text("SELECT COUNT(*) FROM timeline_events WHERE trip_id = :trip_id AND event_type = 'checkin'"),
                             {"trip_id": trip.id}
@@ -967,7 +868,7 @@ async def check_live_activity_transitions():
                 )
 
                 # Mark as notified in its own transaction
-                with db.engine.begin() as conn:
+                with db.scheduler_engine.begin() as conn:
                     conn.execute(
                         sqlalchemy.text("UPDATE trips SET notified_eta_transition = true WHERE id = :id"),
                         {"id": trip.id}
@@ -999,7 +900,7 @@ async def check_live_activity_transitions():
                     # Get check-in count
                     checkin_count = 0
                     try:
-                        with db.engine.connect() as conn:
+                        with db.scheduler_engine.connect() as conn:
                             count_row = conn.execute(
                                 sqlalchemy.text("SELECT COUNT(*) FROM timeline_events WHERE trip_id = :trip_id AND event_type = 'checkin'"),
                                 {"trip_id": trip.id}
@@ -1031,7 +932,7 @@ async def check_live_activity_transitions():
                     )
 
                     # Mark as notified in its own transaction
-                    with db.engine.begin() as conn:
+                    with db.scheduler_engine.begin() as conn:
                         conn.execute(
                             sqlalchemy.text("UPDATE trips SET notified_grace_transition = true WHERE id = :id"),
                             {"id": trip.id}
@@ -1050,7 +951,7 @@ async def clean_expired_tokens():
     try:
         now = datetime.utcnow()
 
-        with db.engine.begin() as conn:
+        with db.scheduler_engine.begin() as conn:
             result = conn.execute(
                 sqlalchemy.text("""
                     DELETE FROM login_tokens
@@ -1078,7 +979,7 @@ async def clean_stale_live_activity_tokens():
     try:
         cutoff = datetime.utcnow() - timedelta(days=30)
 
-        with db.engine.begin() as conn:
+        with db.scheduler_engine.begin() as conn:
             result = conn.execute(
                 sqlalchemy.text("""
                     DELETE FROM live_activity_tokens
@@ -1095,60 +996,67 @@ async def clean_stale_live_activity_tokens():
         log.error(f"Error cleaning stale Live Activity tokens: {e}", exc_info=True)
 
 
-async def clean_old_live_locations():
-    """Clean up old live location records.
+def _purge_finished_trip_locations() -> int:
+    """Delete live locations of trips completed or cancelled over 24 hours ago.
+
+    Provides privacy while allowing brief post-trip review; the age limit
+    itself is a retention policy. Returns rows deleted.
+    """
+    completed_trip_cutoff = datetime.utcnow() - timedelta(hours=24)
+    finished_trips = """
+        SELECT id FROM trips
+        WHERE status IN ('completed', 'cancelled')
+        AND completed_at IS NOT NULL
+        AND completed_at < :completed_cutoff
+    """
+    with db.scheduler_engine.begin() as conn:
+        deleted = 0
+        for table in ("live_locations", "live_location_tracks"):
+            deleted += conn.execute(
+                sqlalchemy.text(f"DELETE FROM {table} WHERE trip_id IN ({finished_trips})"),
+                {"completed_cutoff": completed_trip_cutoff}
+            ).rowcount
+    return deleted
+
 
-    The live_locations table can grow indefinitely from active trips sharing
-    their location. This job prevents unbounded table growth by removing
-    stale location data that's no longer useful for monitoring.
+async def enforce_retention():
+    """Apply data retention policies (see services/retention.py).
 
-    Cleanup rules:
-    1. Delete ALL location records older than 7 days (hard limit)
-    2. Delete location records for completed trips after 24 hours
-       (provides privacy while allowing brief post-trip review)
+    Drops expired partitions and deletes expired rows in batches, then
+    removes live locations of finished trips. Runs in a worker thread since
+    deletes can take a while.
     """
+    from . import retention
+
     try:
-        now = datetime.utcnow()
-        hard_cutoff = now - timedelta(days=7)
-        completed_trip_cutoff = now - timedelta(hours=24)
+        results = await asyncio.to_thread(retention.enforce, db.scheduler_engine)
+        for table, (partitions, rows) in results.items():
+            if partitions or rows:
+                log.info(f"[Scheduler] Retention for {table}: dropped {partitions} partitions, deleted {rows} rows")
+
+        deleted_finished = await asyncio.to_thread(_purge_finished_trip_locations)
+        if deleted_finished:
+            log.info(f"[Scheduler] Cleaned {deleted_finished} live location records from completed trips (>24h old)")
+    except Exception as e:
+        log.error(f"Error enforcing data retention: {e}", exc_info=True)
 
-        with db.engine.begin() as conn:
-            # Rule 1: Delete records older than 7 days (regardless of trip status)
-            result1 = conn.execute(
-                sqlalchemy.text("""
-                    DELETE FROM live_locations
-                    WHERE timestamp < :cutoff
-                """),
-                {"cutoff": hard_cutoff}
-            )
-            deleted_old = result1.rowcount
 
-            # Rule 2: Delete records for completed trips older than 24 hours
-            # This ensures location data is cleaned up promptly after trip completion
-            result2 = conn.execute(
-                sqlalchemy.text("""
-                    DELETE FROM live_locations
-                    WHERE trip_id IN (
-                        SELECT id FROM trips
-                        WHERE status IN ('completed', 'cancelled')
-                        AND completed_at IS NOT NULL
-                        AND completed_at < :completed_cutoff
-                    )
-                """),
-                {"completed_cutoff": completed_trip_cutoff}
-            )
-            deleted_completed = result2.rowcount
-
-            total_deleted = deleted_old + deleted_completed
-            if total_deleted > 0:
-                log.info(
-                    f"[Scheduler] Cleaned live location records: "
-                    f"{deleted_old} older than 7 days, "
-                    f"{deleted_completed} from completed trips (>24h old)"
-                )
+async def process_account_deletions():
+    """Run queued background account deletions.
+
+    Deletion is batched and blocking, so it runs in a worker thread to keep
+    the event loop (shared with the API) responsive.
+    """
+    import asyncio
+
+    from .account_data import process_deletion_jobs
 
+    try:
+        processed = await asyncio.to_thread(process_deletion_jobs)
+        if processed:
+            log.info(f"[Scheduler] Processed {processed} account deletion job(s)")
     except Exception as e:
-        log.error(f"Error cleaning old live locations: {e}", exc_info=True)
+        log.error(f"Error processing account deletions: {e}", exc_info=True)
 
 
 async def sync_subscription_status():
@@ -1171,7 +1079,7 @@ async def sync_subscription_status():
         log.info(f"[Scheduler] Starting subscription sync at {now}")
 
         # Get all subscriptions that are still supposed to be active
-        with db.engine.connect() as conn:
+        with db.scheduler_engine.connect() as conn:
             active_subscriptions = conn.execute(
                 sqlalchemy.text("""
                     SELECT s.id, s.user_id, s.original_transaction_id, s.product_id,
@@ -1248,7 +1156,7 @@ async def sync_subscription_status():
                     )
                     new_tier = "plus" if is_still_active else "free"
 
-                    with db.engine.begin() as conn:
+                    with db.scheduler_engine.begin() as conn:
                         # Update subscription record
                         conn.execute(
                             sqlalchemy.text("""
@@ -1297,6 +1205,41 @@ async def sync_subscription_status():
         log.error(f"Error syncing subscription status: {e}", exc_info=True)
 
 
+async def refresh_apple_key_material():
+    """Refresh Apple's Sign In public keys and App Store root certificates.
+
+    Keeps both caches warm so `/auth/apple` sign-ins and App Store webhooks
+    never fetch key material on the request path.
+    """
+    import asyncio
+
+    from src.api.apple_auth import refresh_apple_public_keys
+    from src.api.subscriptions import get_apple_root_certificates
+
+    try:
+        refreshed = await asyncio.to_thread(refresh_apple_public_keys)
+        root_certs = await get_apple_root_certificates(force_refresh=True)
+        log.info(
+            f"[Scheduler] Apple key material refreshed: jwks={'ok' if refreshed else 'stale'}, "
+            f"root_certs={len(root_certs)}"
+        )
+    except Exception as e:
+        log.error(f"Error refreshing Apple key material: {e}", exc_info=True)
+
+
+async def keep_apple_key_material_warm():
+    """Refresh Apple key material on the scheduler's cadence, without the scheduler.
+
+    For web processes that leave the scheduler to a separate worker
+    (RUN_SCHEDULER_IN_WEB=false): the caches are per process, so each one
+    warms its own. Runs until cancelled.
+    """
+    await asyncio.sleep(APPLE_KEY_WARMUP_DELAY_SECONDS)
+    while True:
+        await refresh_apple_key_material()
+        await asyncio.sleep(APPLE_KEY_REFRESH_MINUTES * 60)
+
+
 def _parse_apple_renewal_info(apple_response: dict) -> dict | None:
     """Parse Apple's subscription status response.
 
@@ -1356,6 +1299,16 @@ def _parse_apple_renewal_info(apple_response: dict) -> dict | None:
         return None
 
 
+def _on_scheduler_pool(job):
+    """Run `job` with shared helpers connecting through the scheduler pool (db.scheduler_pool)."""
+    @functools.wraps(job)
+    async def run():
+        with db.scheduler_pool():
+            return await job()
+
+    return run
+
+
 def init_scheduler() -> AsyncIOScheduler:
     """Initialize and configure the scheduler."""
     global scheduler
@@ -1364,13 +1317,24 @@ def init_scheduler() -> AsyncIOScheduler:
         return scheduler
 
     scheduler = AsyncIOScheduler(timezone=settings.TIMEZONE)
+    scheduler_metrics.attach(scheduler)
 
     # Stagger job start times to reduce lock contention
     now = datetime.utcnow()
 
+    # Renew (or contend for) the leader lease; every other job only runs on the leader
+    scheduler.add_job(
+        _on_scheduler_pool(leader_heartbeat),
+        IntervalTrigger(seconds=scheduler_leader.renew_interval_seconds()),
+        id=LEADER_HEARTBEAT_JOB_ID,
+        name="Scheduler leader heartbeat",
+        replace_existing=True,
+        max_instances=1,
+    )
+
     # Check for overdue trips every 30 seconds - starts immediately
     scheduler.add_job(
-        check_overdue_trips,
+        _on_scheduler_pool(check_overdue_trips),
         IntervalTrigger(seconds=30),
         id="check_overdue",
         name="Check for overdue trips",
@@ -1381,7 +1345,7 @@ def init_scheduler() -> AsyncIOScheduler:
 
     # Clean expired tokens every 10 minutes
     scheduler.add_job(
-        clean_expired_tokens,
+        _on_scheduler_pool(clean_expired_tokens),
         IntervalTrigger(minutes=10),
         id="clean_tokens",
         name="Clean expired tokens",
@@ -1391,7 +1355,7 @@ def init_scheduler() -> AsyncIOScheduler:
 
     # Clean stale Live Activity tokens daily (tokens older than 30 days)
     scheduler.add_job(
-        clean_stale_live_activity_tokens,
+        _on_scheduler_pool(clean_stale_live_activity_tokens),
         IntervalTrigger(hours=24),
         id="clean_live_activity_tokens",
         name="Clean stale Live Activity tokens",
@@ -1399,12 +1363,24 @@ def init_scheduler() -> AsyncIOScheduler:
         max_instances=1,
     )
 
-    # Clean old live location records daily (older than 7 days)
+    # Enforce data retention hourly: keeps future partitions ready, drops expired
+    # ones and deletes expired rows (live locations, notification logs, webhooks)
     scheduler.add_job(
-        clean_old_live_locations,
-        IntervalTrigger(hours=24),
-        id="clean_live_locations",
-        name="Clean old live location records",
+        _on_scheduler_pool(enforce_retention),
+        IntervalTrigger(hours=1),
+        id="enforce_retention",
+        name="Enforce data retention",
+        replace_existing=True,
+        max_instances=1,
+        next_run_time=now + timedelta(seconds=30),
+    )
+
+    # Run queued background account deletions every minute
+    scheduler.add_job(
+        _on_scheduler_pool(process_account_deletions),
+        IntervalTrigger(minutes=1),
+        id="process_account_deletions",
+        name="Process background account deletions",
         replace_existing=True,
         max_instances=1,
     )
@@ -1412,7 +1388,7 @@ def init_scheduler() -> AsyncIOScheduler:
     # Sync subscription status with Apple every 6 hours
     # This catches cancellations, refunds, and expirations that the app didn't report
     scheduler.add_job(
-        sync_subscription_status,
+        _on_scheduler_pool(sync_subscription_status),
         IntervalTrigger(hours=6),
         id="sync_subscription_status",
         name="Sync subscription status with Apple",
@@ -1420,9 +1396,22 @@ def init_scheduler() -> AsyncIOScheduler:
         max_instances=1,
     )
 
+    # Refresh Apple JWKS and root certificates every 30 minutes (Apple's
+    # keys are cached for 1 hour) - warm the caches shortly after startup.
+    # Runs on standbys too: the caches belong to this process
+    scheduler.add_job(
+        _on_scheduler_pool(refresh_apple_key_material),
+        IntervalTrigger(minutes=APPLE_KEY_REFRESH_MINUTES),
+        id=APPLE_KEY_REFRESH_JOB_ID,
+        name="Refresh Apple key material",
+        replace_existing=True,
+        max_instances=1,
+        next_run_time=now + timedelta(seconds=APPLE_KEY_WARMUP_DELAY_SECONDS),
+    )
+
     # Check for push notifications every 60 seconds - stagger by 15s
     scheduler.add_job(
-        check_push_notifications,
+        _on_scheduler_pool(check_push_notifications),
         IntervalTrigger(seconds=60),
         id="check_push_notifications",
         name="Check for push notifications",
@@ -1433,7 +1422,7 @@ def init_scheduler() -> AsyncIOScheduler:
 
     # Check for Live Activity countdown transitions every 15 seconds
     scheduler.add_job(
-        check_live_activity_transitions,
+        _on_scheduler_pool(check_live_activity_transitions),
         IntervalTrigger(seconds=15),
         id="check_live_activity_transitions",
         name="Check Live Activity countdown transitions",
@@ -1445,20 +1434,100 @@ def init_scheduler() -> AsyncIOScheduler:
     return scheduler
 
 
+def _set_work_jobs_paused(paused: bool):
+    """Pause or resume every job except the per-process ones (PER_PROCESS_JOB_IDS).
+
+    Only jobs that aren't already in the requested state are touched, so
+    resuming doesn't reset the staggered first run times.
+    """
+    if scheduler is None:
+        return
+    for job in scheduler.get_jobs():
+        if job.id in PER_PROCESS_JOB_IDS:
+            continue
+        job_paused = job.next_run_time is None
+        if paused and not job_paused:
+            job.pause()
+        elif not paused and job_paused:
+            job.resume()
+
+
+def _sync_leadership() -> bool:
+    """Renew or contend for the leader lease and pause/resume jobs when leadership changes."""
+    global is_leader
+    try:
+        leader = scheduler_leader.try_acquire()
+    except Exception as e:
+        # Can't prove we still hold the lease - stand by until the database is reachable again
+        log.error(f"[Scheduler] Leader lease renewal failed, standing by: {e}")
+        leader = False
+
+    if leader != is_leader:
+        is_leader = leader
+        _set_work_jobs_paused(not leader)
+        if leader:
+            log.info(f"[Scheduler] {scheduler_leader.HOLDER_ID} is now the scheduler leader")
+        else:
+            log.warning(f"[Scheduler] {scheduler_leader.HOLDER_ID} lost scheduler leadership, jobs paused")
+    scheduler_leader.is_leader_gauge.set(1 if leader else 0)
+    return leader
+
+
+async def leader_heartbeat():
+    """Keep the leader lease alive, or take it over once the previous leader's expires."""
+    _sync_leadership()
+
+
 def start_scheduler():
-    """Start the scheduler."""
+    """Start the scheduler.
+
+    Any number of processes may call this; only the one holding the leader
+    lease runs jobs, the rest keep them paused until they take over.
+    """
     global scheduler
     if scheduler is None:
         scheduler = init_scheduler()
 
     if not scheduler.running:
         scheduler.start()
-        log.info("Scheduler started")
+        _sync_leadership()
+        _set_work_jobs_paused(not is_leader)
+        log.info(f"Scheduler started ({'leader' if is_leader else 'standby'})")
 
 
 def stop_scheduler():
-    """Stop the scheduler."""
-    global scheduler
+    """Stop the scheduler and hand off leadership."""
+    global scheduler, is_leader
     if scheduler and scheduler.running:
         scheduler.shutdown()
         log.info("Scheduler stopped")
+
+    if is_leader:
+        is_leader = False
+        scheduler_leader.is_leader_gauge.set(0)
+        try:
+            scheduler_leader.release()
+        except Exception as e:
+            # The lease expires on its own after SCHEDULER_LEADER_LEASE_SECONDS
+            log.error(f"[Scheduler] Failed to release leader lease: {e}")
+
+
+async def run_worker():
+    """Run the scheduler until SIGINT/SIGTERM."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    start_scheduler()
+    try:
+        await stop.wait()
+    finally:
+        stop_scheduler()
+
+
+if __name__ == "__main__":
+    # Standalone worker: python -m src.services.scheduler
+    # Pair with RUN_SCHEDULER_IN_WEB=false so web processes only serve requests
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
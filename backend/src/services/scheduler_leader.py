@@ -0,0 +1,106 @@
+"""Scheduler leader election.
+
+Every process that starts the scheduler competes for a single lease row in
+scheduler_leases. The holder renews it on a heartbeat and runs the jobs;
+the others keep their jobs paused and take over once the lease expires
+(crashed or stopped leader). Expiry uses the database clock, so hosts
+don't need synchronized clocks.
+
+A leader that loses its lease mid-run finishes that run; the row-level
+claims (SKIP LOCKED, push leases, notify events) keep an overlapping run
+from double-sending.
+
+The lease SQL is Postgres-only. On the SQLite development database there is
+no election: the single local process always leads.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import uuid
+
+import sqlalchemy
+
+from .. import database as db
+from ..config import get_settings
+from . import metrics
+
+settings = get_settings()
+log = logging.getLogger(__name__)
+
+LEADER_LEASE_NAME = "scheduler"
+
+# Identifies this process on the lease row
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+is_leader_gauge = metrics.gauge(
+    "homebound_scheduler_is_leader", "1 when this process holds the scheduler lease"
+)
+
+
+def _elects_leader() -> bool:
+    return db.scheduler_engine.dialect.name == "postgresql"
+
+
+def renew_interval_seconds() -> float:
+    """How often the leader renews: a third of the lease, so two renewals can fail before it lapses."""
+    return max(1.0, settings.SCHEDULER_LEADER_LEASE_SECONDS / 3)
+
+
+def try_acquire(holder: str = HOLDER_ID, lease_seconds: int | None = None, name: str = LEADER_LEASE_NAME) -> bool:
+    """Take the lease if it's free or expired, or renew it if `holder` already has it.
+
+    Returns:
+        True if `holder` holds the lease afterwards
+    """
+    if not _elects_leader():
+        return True
+
+    lease_seconds = lease_seconds or settings.SCHEDULER_LEADER_LEASE_SECONDS
+    with db.scheduler_engine.begin() as conn:
+        row = conn.execute(
+            sqlalchemy.text("""
+                INSERT INTO scheduler_leases (name, holder, acquired_at, expires_at)
+                VALUES (:name, :holder, timezone('utc', now()),
+                        timezone('utc', now()) + make_interval(secs => :lease_seconds))
+                ON CONFLICT (name) DO UPDATE
+                SET holder = EXCLUDED.holder,
+                    acquired_at = CASE WHEN scheduler_leases.holder = EXCLUDED.holder
+                                       THEN scheduler_leases.acquired_at
+                                       ELSE EXCLUDED.acquired_at END,
+                    expires_at = EXCLUDED.expires_at
+                WHERE scheduler_leases.holder = EXCLUDED.holder
+                   OR scheduler_leases.expires_at < timezone('utc', now())
+                RETURNING holder
+            """),
+            {"name": name, "holder": holder, "lease_seconds": lease_seconds}
+        ).fetchone()
+    return row is not None
+
+
+def release(holder: str = HOLDER_ID, name: str = LEADER_LEASE_NAME) -> None:
+    """Give up the lease so a standby can take over without waiting for expiry."""
+    if not _elects_leader():
+        return
+
+    with db.scheduler_engine.begin() as conn:
+        conn.execute(
+            sqlalchemy.text("DELETE FROM scheduler_leases WHERE name = :name AND holder = :holder"),
+            {"name": name, "holder": holder}
+        )
+
+
+def current_leader(name: str = LEADER_LEASE_NAME) -> str | None:
+    """Holder of the unexpired lease, if any."""
+    if not _elects_leader():
+        return HOLDER_ID
+
+    with db.scheduler_engine.connect() as conn:
+        return conn.execute(
+            sqlalchemy.text("""
+                SELECT holder FROM scheduler_leases
+                WHERE name = :name AND expires_at >= timezone('utc', now())
+            """),
+            {"name": name}
+        ).scalar()
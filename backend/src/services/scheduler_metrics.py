@@ -0,0 +1,109 @@
+"""Scheduler job metrics exported on /metrics.
+
+- per-job run duration and start delay (APScheduler event listeners)
+- runs by outcome, including runs skipped because the previous run was
+  still going (max_instances) and runs missed past their misfire grace time
+- rows picked up per job phase
+- deadline lag: how long after a notification was due it actually went out
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import UTC, datetime
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+)
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+# Deadline lag buckets in seconds: the overdue job runs every 30s and the push
+# job every 60s, so healthy lag sits under a minute or two
+DEADLINE_LAG_BUCKETS = (1, 5, 15, 30, 60, 90, 120, 300, 600, 1800, 3600)
+
+job_duration = metrics.histogram(
+    "homebound_scheduler_job_duration_seconds", "Scheduler job run time", ("job",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+job_start_delay = metrics.histogram(
+    "homebound_scheduler_job_start_delay_seconds", "Delay between a job's scheduled and actual start", ("job",),
+    buckets=(0.01, 0.1, 0.5, 1, 5, 15, 30, 60, 120)
+)
+job_runs = metrics.counter(
+    "homebound_scheduler_job_runs_total",
+    "Scheduler job runs by outcome (success, error, skipped_max_instances, missed)",
+    ("job", "outcome")
+)
+job_last_success = metrics.gauge(
+    "homebound_scheduler_job_last_success_timestamp_seconds", "Unix time of the last successful run", ("job",)
+)
+rows_processed = metrics.counter(
+    "homebound_scheduler_rows_total", "Rows picked up by each scheduler job phase", ("job", "phase")
+)
+deadline_lag = metrics.histogram(
+    "homebound_scheduler_deadline_lag_seconds",
+    "Time between when a notification was due and when it was sent", ("kind",),
+    buckets=DEADLINE_LAG_BUCKETS
+)
+
+# job_id -> perf_counter at submission (max_instances=1, so one run per job)
+_running_since: dict[str, float] = {}
+
+
+def record_rows(job: str, phase: str, count: int) -> None:
+    """Count rows a job phase picked up for processing."""
+    if count:
+        rows_processed.inc(count, job=job, phase=phase)
+
+
+def record_deadline_lag(kind: str, due_at: datetime, sent_at: datetime | None = None) -> None:
+    """Record how late a notification went out relative to when it was due.
+
+    Args:
+        kind: overdue, overdue_alert, grace_warning or checkin_reminder
+        due_at: When the notification was due (naive UTC or aware)
+        sent_at: When it went out (defaults to now)
+    """
+    if due_at.tzinfo is not None:
+        due_at = due_at.astimezone(UTC).replace(tzinfo=None)
+    sent_at = sent_at or datetime.utcnow()
+    deadline_lag.observe(max(0.0, (sent_at - due_at).total_seconds()), kind=kind)
+
+
+def _on_job_event(event) -> None:
+    job_id = event.job_id
+    if event.code == EVENT_JOB_SUBMITTED:
+        _running_since[job_id] = time.perf_counter()
+        for scheduled in getattr(event, "scheduled_run_times", None) or []:
+            delay = (datetime.now(UTC) - scheduled.astimezone(UTC)).total_seconds()
+            job_start_delay.observe(max(0.0, delay), job=job_id)
+    elif event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+        started = _running_since.pop(job_id, None)
+        if started is not None:
+            job_duration.observe(time.perf_counter() - started, job=job_id)
+        if event.code == EVENT_JOB_EXECUTED:
+            job_runs.inc(job=job_id, outcome="success")
+            job_last_success.set(time.time(), job=job_id)
+        else:
+            job_runs.inc(job=job_id, outcome="error")
+    elif event.code == EVENT_JOB_MAX_INSTANCES:
+        job_runs.inc(job=job_id, outcome="skipped_max_instances")
+        log.warning(f"[Scheduler] Job {job_id} skipped: previous run still in progress")
+    elif event.code == EVENT_JOB_MISSED:
+        job_runs.inc(job=job_id, outcome="missed")
+        log.warning(f"[Scheduler] Job {job_id} missed its run at {event.scheduled_run_time}")
+
+
+def attach(scheduler) -> None:
+    """Record run metrics for every job on an APScheduler scheduler."""
+    scheduler.add_listener(
+        _on_job_event,
+        EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED
+    )
@@ -0,0 +1,67 @@
+"""Registry of module-level SQL statements for hot request paths.
+
+Building ``sqlalchemy.text(...)`` inside a handler re-parses the SQL for
+bind parameters and regenerates the statement's cache key on every call
+(roughly 25µs per statement). A statement registered here is built once at
+import: its bind parameters carry types and its cache key is memoized, so
+executing it goes straight to the engine's compiled cache
+(DB_QUERY_CACHE_SIZE).
+
+Usage:
+    _TRIP_BY_TOKEN = statements.register(
+        "checkin.trip_by_token",
+        "SELECT id FROM trips WHERE checkin_token = :token",
+        token=String,
+    )
+    connection.execute(_TRIP_BY_TOKEN, {"token": token})
+
+Names are "<module>.<purpose>" and must be unique; src/scripts/bench_statements.py
+reports the per-call overhead saved for every registered statement.
+
+On the sync engines (psycopg2) statements are sent as plain queries; psycopg2
+has no server-side prepared statements. The async engine (asyncpg) prepares
+every statement. On the Supabase transaction-mode pooler (port 6543), where
+each transaction may get a different server connection, database.py turns off
+asyncpg's statement caches and gives each prepared statement a unique name
+(prepared_statement_name_func), so statements are prepared per execution and
+never collide with another client's on a shared server connection.
+"""
+from __future__ import annotations
+
+import sqlalchemy
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.types import TypeEngine
+
+_registry: dict[str, TextClause] = {}
+
+
+def register(name: str, sql: str, **types: type[TypeEngine] | TypeEngine) -> TextClause:
+    """Build a text() statement once and register it under `name`.
+
+    Args:
+        name: Unique "<module>.<purpose>" identifier
+        sql: Statement text with :named bind parameters
+        **types: SQL types for bind parameters (untyped ones are inferred per call)
+
+    Raises:
+        ValueError: If `name` is already registered
+    """
+    if name in _registry:
+        raise ValueError(f"Statement {name!r} is already registered")
+    statement = sqlalchemy.text(sql)
+    if types:
+        statement = statement.bindparams(
+            *(sqlalchemy.bindparam(key, type_=type_) for key, type_ in types.items())
+        )
+    _registry[name] = statement
+    return statement
+
+
+def get(name: str) -> TextClause:
+    """Look up a registered statement by name."""
+    return _registry[name]
+
+
+def registered() -> dict[str, TextClause]:
+    """All registered statements by name."""
+    return dict(_registry)
@@ -0,0 +1,36 @@
+"""Run async endpoints from synchronous tests.
+
+Usage:
+    from tests.aio import run_async
+
+    response = run_async(checkin_with_token(token, background_tasks))
+
+Each call runs on its own event loop, and the async engine bound to that
+loop (see database.async_engine) is disposed before the loop closes.
+"""
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from src import database as db
+
+T = TypeVar("T")
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run `coro` to completion and return its result (or raise its exception)."""
+    async def main() -> T:
+        try:
+            return await coro
+        finally:
+            await db.dispose_async_engine()
+
+    return asyncio.run(main())
+
+
+def run_task(func, *args, **kwargs):
+    """Run a background task function as Starlette would, awaiting it if it's async."""
+    result = func(*args, **kwargs)
+    if asyncio.iscoroutine(result):
+        return run_async(result)
+    return result
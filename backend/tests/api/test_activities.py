@@ -1,8 +1,12 @@
+from fastapi import Request, Response
+
+from src.api import http_cache
 from src.api.activities import Activity, get_activities, get_activity
 
 
 def test_get_all() -> None:
-    activities = get_activities()
+    response = Response()
+    activities = get_activities(Request({"type": "http", "headers": []}), response)
 
     assert isinstance(activities, list)
     assert all(isinstance(activity, Activity) for activity in activities)
@@ -15,6 +19,8 @@ def test_get_all() -> None:
     assert "Driving" in names
     assert "Camping" in names
     assert "Climbing" in names
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["cache-control"] == http_cache.CACHE_CONTROL
 
 
 def test_get_one():
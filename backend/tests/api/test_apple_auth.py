@@ -102,6 +102,46 @@ class TestFetchApplePublicKeys:
 
             assert exc_info.value.status_code == 503
 
+    def test_fetch_keys_serves_stale_while_refreshing(self):
+        """Test that near-expiry keys are served immediately and refreshed in the background."""
+        from src.api import apple_auth
+
+        with patch("src.api.apple_auth.requests.get") as mock_get:
+            mock_response = MagicMock()
+            mock_response.json.return_value = MOCK_APPLE_JWKS
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value = mock_response
+
+            _fetch_apple_public_keys()
+            # Age the cache past the refresh-ahead threshold
+            apple_auth._apple_keys_cache_time = time.time() - apple_auth._apple_keys_cache_ttl
+
+            with patch("src.api.apple_auth._schedule_background_refresh") as mock_schedule:
+                keys = _fetch_apple_public_keys()
+
+            assert keys == MOCK_APPLE_JWKS
+            mock_schedule.assert_called_once()
+            # No blocking fetch on the request path
+            assert mock_get.call_count == 1
+
+    def test_refresh_failure_keeps_cached_keys(self):
+        """Test that a failed background refresh leaves the cached keys in place."""
+        import requests
+
+        from src.api.apple_auth import refresh_apple_public_keys
+
+        with patch("src.api.apple_auth.requests.get") as mock_get:
+            mock_response = MagicMock()
+            mock_response.json.return_value = MOCK_APPLE_JWKS
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value = mock_response
+            _fetch_apple_public_keys()
+
+            mock_get.side_effect = requests.RequestException("Network error")
+            assert refresh_apple_public_keys() is False
+
+            assert _fetch_apple_public_keys() == MOCK_APPLE_JWKS
+
 
 class TestGetApplePublicKey:
     """Tests for _get_apple_public_key function."""
@@ -1,13 +1,27 @@
 """Tests for checkin API endpoints"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
 import pytest
 import sqlalchemy
 from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import event
 
 from src import database as db
 from src.api.checkin import CheckinResponse, checkin_with_token, checkout_with_token
+from src.services import magic_links, recipients
+from tests.aio import run_async, run_task
+
+
+@pytest.fixture(autouse=True)
+def fresh_magic_links():
+    """Test trips reuse their tokens, so no test may see another's kept responses"""
+    magic_links.clear_recent_responses()
+    yield
+    magic_links.clear_recent_responses()
 
 
 def setup_test_trip_with_tokens():
@@ -175,7 +189,7 @@ def test_checkin_with_valid_token():
 
     # Check in
     background_tasks = BackgroundTasks()
-    response = checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+    response = run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
 
     assert isinstance(response, CheckinResponse)
     assert response.ok is True
@@ -210,11 +224,67 @@ def test_checkin_with_valid_token():
     cleanup_test_data(user_id)
 
 
+def test_checkin_schedules_next_reminder():
+    """Test that checking in resets the reminder clock and precomputes next_reminder_at"""
+    user_id, trip_id, checkin_token, _ = setup_test_trip_with_tokens()
+
+    with db.engine.begin() as connection:
+        connection.execute(
+            sqlalchemy.text("UPDATE trips SET checkin_interval_min = 45, timezone = 'UTC' WHERE id = :trip_id"),
+            {"trip_id": trip_id}
+        )
+
+    run_async(checkin_with_token(checkin_token, BackgroundTasks(), lat=None, lon=None))
+
+    with db.engine.begin() as connection:
+        trip = connection.execute(
+            sqlalchemy.text("SELECT last_checkin_reminder, next_reminder_at FROM trips WHERE id = :trip_id"),
+            {"trip_id": trip_id}
+        ).fetchone()
+
+    assert trip.next_reminder_at - trip.last_checkin_reminder == timedelta(minutes=45)
+
+    cleanup_test_data(user_id)
+
+
+def test_checkin_defers_next_reminder_out_of_quiet_hours():
+    """Test that a next reminder landing in quiet hours moves to the start of active hours"""
+    user_id, trip_id, checkin_token, _ = setup_test_trip_with_tokens()
+
+    # Active for one hour, half a day from now
+    start_hour = (datetime.now(UTC).hour + 12) % 24
+    with db.engine.begin() as connection:
+        connection.execute(
+            sqlalchemy.text(
+                """
+                UPDATE trips SET checkin_interval_min = 45, timezone = 'UTC',
+                                 notify_start_hour = :start_hour, notify_end_hour = :end_hour
+                WHERE id = :trip_id
+                """
+            ),
+            {"start_hour": start_hour, "end_hour": (start_hour + 1) % 24, "trip_id": trip_id}
+        )
+
+    run_async(checkin_with_token(checkin_token, BackgroundTasks(), lat=None, lon=None))
+
+    with db.engine.begin() as connection:
+        trip = connection.execute(
+            sqlalchemy.text("SELECT last_checkin_reminder, next_reminder_at FROM trips WHERE id = :trip_id"),
+            {"trip_id": trip_id}
+        ).fetchone()
+
+    assert trip.next_reminder_at.hour == start_hour
+    assert trip.next_reminder_at.minute == 0
+    assert trip.next_reminder_at > trip.last_checkin_reminder + timedelta(minutes=45)
+
+    cleanup_test_data(user_id)
+
+
 def test_checkin_with_invalid_token():
     """Test checking in with an invalid token"""
     background_tasks = BackgroundTasks()
     with pytest.raises(HTTPException) as exc_info:
-        checkin_with_token("invalid_token_12345", background_tasks, lat=None, lon=None)
+        run_async(checkin_with_token("invalid_token_12345", background_tasks, lat=None, lon=None))
 
     assert exc_info.value.status_code == 404
     assert "invalid" in exc_info.value.detail.lower()
@@ -282,25 +352,27 @@ def test_checkin_after_checkout():
 
     # Try to check in after checkout
     with pytest.raises(HTTPException) as exc_info:
-        checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+        run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
 
     assert exc_info.value.status_code == 404
 
     cleanup_test_data(user_id)
 
 
-def test_multiple_checkins():
+def test_multiple_checkins(monkeypatch):
     """Test multiple check-ins on the same trip"""
+    # Clicks further apart than the dedupe window
+    monkeypatch.setattr(magic_links.settings, "MAGIC_LINK_DEDUPE_SECONDS", 0)
     user_id, trip_id, checkin_token, _ = setup_test_trip_with_tokens()
 
     background_tasks = BackgroundTasks()
 
     # First check-in
-    response1 = checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+    response1 = run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
     assert response1.ok is True
 
     # Second check-in
-    response2 = checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+    response2 = run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
     assert response2.ok is True
 
     # Verify multiple events were created
@@ -320,8 +392,10 @@ def test_multiple_checkins():
     cleanup_test_data(user_id)
 
 
-def test_checkout_already_completed_trip():
+def test_checkout_already_completed_trip(monkeypatch):
     """Test checking out a trip that's already completed"""
+    # Clicks further apart than the dedupe window
+    monkeypatch.setattr(magic_links.settings, "MAGIC_LINK_DEDUPE_SECONDS", 0)
     user_id, _, _, checkout_token = setup_test_trip_with_tokens()
 
     # First checkout
@@ -337,6 +411,143 @@ def test_checkout_already_completed_trip():
     cleanup_test_data(user_id)
 
 
+def _event_count(trip_id, what):
+    with db.engine.begin() as connection:
+        return connection.execute(
+            sqlalchemy.text("SELECT COUNT(*) FROM events WHERE trip_id = :trip_id AND what = :what"),
+            {"trip_id": trip_id, "what": what}
+        ).scalar()
+
+
+def test_duplicate_checkin_click_returns_first_response():
+    """A repeated check-in click within the window checks in and notifies once"""
+    user_id, trip_id, checkin_token, _ = setup_test_trip_with_tokens()
+
+    first_tasks = BackgroundTasks()
+    first = run_async(checkin_with_token(checkin_token, first_tasks, lat=None, lon=None))
+    duplicate_tasks = BackgroundTasks()
+    duplicate = run_async(checkin_with_token(checkin_token, duplicate_tasks, lat=None, lon=None))
+
+    assert duplicate == first
+    assert first_tasks.tasks
+    assert duplicate_tasks.tasks == []
+    assert _event_count(trip_id, "checkin") == 1
+
+    cleanup_test_data(user_id)
+
+
+def test_concurrent_duplicate_checkins_share_one_request():
+    """Duplicate check-ins arriving together wait for the first instead of running"""
+    user_id, trip_id, checkin_token, _ = setup_test_trip_with_tokens()
+    task_lists = [BackgroundTasks() for _ in range(3)]
+
+    async def click_all():
+        return await asyncio.gather(*(
+            checkin_with_token(checkin_token, tasks, lat=None, lon=None) for tasks in task_lists
+        ))
+
+    responses = run_async(click_all())
+
+    assert all(response.ok for response in responses)
+    assert len([tasks for tasks in task_lists if tasks.tasks]) == 1
+    assert _event_count(trip_id, "checkin") == 1
+
+    cleanup_test_data(user_id)
+
+
+def test_duplicate_checkout_click_returns_first_response():
+    """A repeated checkout click within the window answers like the first, not 404"""
+    user_id, trip_id, _, checkout_token = setup_test_trip_with_tokens()
+
+    first = checkout_with_token(checkout_token, BackgroundTasks())
+    duplicate_tasks = BackgroundTasks()
+    duplicate = checkout_with_token(checkout_token, duplicate_tasks)
+
+    assert duplicate == first
+    assert "safe" in duplicate.message
+    assert duplicate_tasks.tasks == []
+    assert _event_count(trip_id, "complete") == 1
+
+    cleanup_test_data(user_id)
+
+
+def test_concurrent_duplicate_checkouts_share_one_request():
+    """Duplicate checkouts on other threads wait for the first instead of answering 404"""
+    user_id, trip_id, _, checkout_token = setup_test_trip_with_tokens()
+    task_lists = [BackgroundTasks() for _ in range(3)]
+    barrier = threading.Barrier(len(task_lists))
+
+    def click(tasks):
+        barrier.wait()
+        return checkout_with_token(checkout_token, tasks)
+
+    with ThreadPoolExecutor(len(task_lists)) as pool:
+        responses = list(pool.map(click, task_lists))
+
+    assert all(response.ok for response in responses)
+    assert len([tasks for tasks in task_lists if tasks.tasks]) == 1
+    assert _event_count(trip_id, "complete") == 1
+
+    cleanup_test_data(user_id)
+
+
+def test_checkout_that_fails_to_commit_is_not_kept():
+    """A checkout whose commit fails is retried by the next click, not answered from the cache"""
+    user_id, trip_id, _, checkout_token = setup_test_trip_with_tokens()
+
+    def fail_commit(conn):
+        raise RuntimeError("commit failed")
+
+    event.listen(db.engine, "commit", fail_commit)
+    try:
+        with pytest.raises(RuntimeError):
+            checkout_with_token(checkout_token, BackgroundTasks())
+    finally:
+        event.remove(db.engine, "commit", fail_commit)
+
+    assert magic_links.recent_response("checkout", checkout_token) is None
+    assert _event_count(trip_id, "complete") == 0
+
+    retry_tasks = BackgroundTasks()
+    assert checkout_with_token(checkout_token, retry_tasks).ok
+    assert retry_tasks.tasks
+    assert _event_count(trip_id, "complete") == 1
+
+    cleanup_test_data(user_id)
+
+def test_failed_checkin_is_not_kept():
+    """Only successful responses are reused; an invalid link is looked up every time"""
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            run_async(checkin_with_token("invalid_token_12345", BackgroundTasks(), lat=None, lon=None))
+        assert exc_info.value.status_code == 404
+
+    assert magic_links.recent_response("checkin", "invalid_token_12345") is None
+
+
+def test_trip_tokens_are_unique():
+    """A check-in or checkout token can only ever reach one trip"""
+    user_id, trip_id, checkin_token, checkout_token = setup_test_trip_with_tokens()
+
+    for column, token in (("checkin_token", checkin_token), ("checkout_token", checkout_token)):
+        with pytest.raises(sqlalchemy.exc.IntegrityError):
+            with db.engine.begin() as connection:
+                connection.execute(
+                    sqlalchemy.text(
+                        f"""
+                        INSERT INTO trips (user_id, title, activity, start, eta, grace_min, location_text,
+                                           gen_lat, gen_lon, status, created_at, {column})
+                        SELECT user_id, 'Copy', activity, start, eta, grace_min, location_text,
+                               gen_lat, gen_lon, 'active', created_at, :token
+                        FROM trips WHERE id = :trip_id
+                        """
+                    ),
+                    {"token": token, "trip_id": trip_id}
+                )
+
+    cleanup_test_data(user_id)
+
+
 # ============================================================================
 # Live Activity Update Tests
 # ============================================================================
@@ -471,13 +682,13 @@ def test_checkin_triggers_live_activity_update():
         mock_la_update.return_value = None
 
         background_tasks = BackgroundTasks()
-        response = checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+        response = run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
 
         assert response.ok is True
 
         # Execute background tasks manually
         for task in background_tasks.tasks:
-            task.func(*task.args, **task.kwargs)
+            run_task(task.func, *task.args, **task.kwargs)
 
         # Verify send_live_activity_update was called
         mock_la_update.assert_called_once()
@@ -507,7 +718,7 @@ def test_checkout_triggers_live_activity_end():
 
         # Execute background tasks manually
         for task in background_tasks.tasks:
-            task.func(*task.args, **task.kwargs)
+            run_task(task.func, *task.args, **task.kwargs)
 
         # Verify send_live_activity_update was called
         mock_la_update.assert_called_once()
@@ -523,8 +734,10 @@ def test_checkout_triggers_live_activity_end():
     cleanup_test_data(user_id)
 
 
-def test_checkin_increments_count_in_live_activity():
+def test_checkin_increments_count_in_live_activity(monkeypatch):
     """Test that multiple check-ins increment the count in Live Activity updates"""
+    # Clicks further apart than the dedupe window
+    monkeypatch.setattr(magic_links.settings, "MAGIC_LINK_DEDUPE_SECONDS", 0)
     user_id, trip_id, checkin_token, _ = setup_test_trip_with_tokens()
 
     call_counts = []
@@ -534,27 +747,27 @@ def test_checkin_increments_count_in_live_activity():
 
         # First check-in
         background_tasks1 = BackgroundTasks()
-        checkin_with_token(checkin_token, background_tasks1, lat=None, lon=None)
+        run_async(checkin_with_token(checkin_token, background_tasks1, lat=None, lon=None))
         for task in background_tasks1.tasks:
-            task.func(*task.args, **task.kwargs)
+            run_task(task.func, *task.args, **task.kwargs)
         call_counts.append(mock_la_update.call_args.kwargs["checkin_count"])
 
         mock_la_update.reset_mock()
 
         # Second check-in
         background_tasks2 = BackgroundTasks()
-        checkin_with_token(checkin_token, background_tasks2, lat=None, lon=None)
+        run_async(checkin_with_token(checkin_token, background_tasks2, lat=None, lon=None))
         for task in background_tasks2.tasks:
-            task.func(*task.args, **task.kwargs)
+            run_task(task.func, *task.args, **task.kwargs)
         call_counts.append(mock_la_update.call_args.kwargs["checkin_count"])
 
         mock_la_update.reset_mock()
 
         # Third check-in
         background_tasks3 = BackgroundTasks()
-        checkin_with_token(checkin_token, background_tasks3, lat=None, lon=None)
+        run_async(checkin_with_token(checkin_token, background_tasks3, lat=None, lon=None))
         for task in background_tasks3.tasks:
-            task.func(*task.args, **task.kwargs)
+            run_task(task.func, *task.args, **task.kwargs)
         call_counts.append(mock_la_update.call_args.kwargs["checkin_count"])
 
     # Verify counts increment
@@ -571,13 +784,13 @@ def test_checkin_from_overdue_sends_active_status():
         mock_la_update.return_value = None
 
         background_tasks = BackgroundTasks()
-        response = checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+        response = run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
 
         assert response.ok is True
 
         # Execute background tasks
         for task in background_tasks.tasks:
-            task.func(*task.args, **task.kwargs)
+            run_task(task.func, *task.args, **task.kwargs)
 
         # Verify Live Activity update was sent with active status
         mock_la_update.assert_called_once()
@@ -602,7 +815,7 @@ def test_checkout_from_overdue_sends_end_event():
 
         # Execute background tasks
         for task in background_tasks.tasks:
-            task.func(*task.args, **task.kwargs)
+            run_task(task.func, *task.args, **task.kwargs)
 
         # Verify end event was sent
         mock_la_update.assert_called_once()
@@ -613,6 +826,24 @@ def test_checkout_from_overdue_sends_end_event():
     cleanup_test_data(user_id)
 
 
+@pytest.mark.parametrize(
+    "setup, event", [(setup_test_trip_with_tokens, "checkout"), (setup_test_trip_overdue, "overdue_resolved")]
+)
+def test_checkout_plans_all_recipients_once(setup, event):
+    """Emails and pushes for a checkout all come from one delivery plan"""
+    user_id, trip_id, _, checkout_token = setup()
+
+    with patch("src.api.checkin.recipients.plan_delivery", wraps=recipients.plan_delivery) as plan_delivery:
+        response = checkout_with_token(checkout_token, BackgroundTasks())
+
+    assert response.ok is True
+    plan_delivery.assert_called_once()
+    assert plan_delivery.call_args.args[1:] == (trip_id, event)
+    assert plan_delivery.call_args.kwargs == {"actor_id": user_id}
+
+    cleanup_test_data(user_id)
+
+
 def test_checkin_includes_eta_in_live_activity():
     """Test that check-in includes ETA in Live Activity update"""
     user_id, trip_id, checkin_token, _ = setup_test_trip_with_tokens()
@@ -621,11 +852,11 @@ def test_checkin_includes_eta_in_live_activity():
         mock_la_update.return_value = None
 
         background_tasks = BackgroundTasks()
-        checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+        run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
 
         # Execute background tasks
         for task in background_tasks.tasks:
-            task.func(*task.args, **task.kwargs)
+            run_task(task.func, *task.args, **task.kwargs)
 
         # Verify eta is included
         call_kwargs = mock_la_update.call_args.kwargs
@@ -644,18 +875,18 @@ def test_checkin_with_coordinates_still_sends_live_activity():
         mock_la_update.return_value = None
 
         # Mock reverse geocoding
-        with patch("src.api.checkin.reverse_geocode_sync", return_value="Mountain Peak, CA"):
+        with patch("src.api.checkin.reverse_geocode_precise", return_value="Mountain Peak, CA"):
             background_tasks = BackgroundTasks()
-            response = checkin_with_token(
+            response = run_async(checkin_with_token(
                 checkin_token, background_tasks,
                 lat=37.7749, lon=-122.4194
-            )
+            ))
 
             assert response.ok is True
 
             # Execute background tasks
             for task in background_tasks.tasks:
-                task.func(*task.args, **task.kwargs)
+                run_task(task.func, *task.args, **task.kwargs)
 
             # Verify Live Activity update was still sent
             mock_la_update.assert_called_once()
@@ -675,11 +906,11 @@ def test_live_activity_update_called_before_other_notifications():
                 mock_email.return_value = None
 
                 background_tasks = BackgroundTasks()
-                checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+                run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
 
                 # Execute all background tasks
                 for task in background_tasks.tasks:
-                    task.func(*task.args, **task.kwargs)
+                    run_task(task.func, *task.args, **task.kwargs)
 
                 # Verify Live Activity update was called
                 mock_la_update.assert_called_once()
@@ -819,7 +1050,7 @@ def test_checkin_to_planned_trip_fails():
 
     background_tasks = BackgroundTasks()
     with pytest.raises(HTTPException) as exc_info:
-        checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+        run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
 
     # Should return 404 because the trip query filters by status IN ('active', 'overdue', 'overdue_notified')
     assert exc_info.value.status_code == 404
@@ -860,7 +1091,7 @@ def test_checkin_to_completed_trip_fails():
 
     # Now try to checkin - should fail
     with pytest.raises(HTTPException) as exc_info:
-        checkin_with_token(checkin_token, BackgroundTasks(), lat=None, lon=None)
+        run_async(checkin_with_token(checkin_token, BackgroundTasks(), lat=None, lon=None))
 
     assert exc_info.value.status_code == 404
     assert "invalid" in exc_info.value.detail.lower()
@@ -874,7 +1105,7 @@ def test_checkin_token_invalid_after_checkout():
 
     # First, checkin works
     background_tasks = BackgroundTasks()
-    response = checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+    response = run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
     assert response.ok is True
 
     # Checkout
@@ -883,7 +1114,7 @@ def test_checkin_token_invalid_after_checkout():
 
     # After checkout, checkin should fail
     with pytest.raises(HTTPException) as exc_info:
-        checkin_with_token(checkin_token, BackgroundTasks(), lat=None, lon=None)
+        run_async(checkin_with_token(checkin_token, BackgroundTasks(), lat=None, lon=None))
 
     assert exc_info.value.status_code == 404
 
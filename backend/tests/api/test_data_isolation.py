@@ -27,6 +27,7 @@ from src.api.contacts import (
     get_contact,
     get_contacts,
 )
+from tests.aio import run_async
 
 
 def cleanup_user(email: str):
@@ -413,7 +414,7 @@ def test_create_trip_with_other_users_contact_fails():
     background_tasks = BackgroundTasks()
 
     with pytest.raises(HTTPException) as exc_info:
-        create_trip(body=trip_data, background_tasks=background_tasks, user_id=user_b_id)
+        run_async(create_trip(body=trip_data, background_tasks=background_tasks, user_id=user_b_id))
 
     assert exc_info.value.status_code == 404
     assert "contact" in exc_info.value.detail.lower()
@@ -449,7 +450,7 @@ def test_create_trip_requires_own_contact():
     )
 
     background_tasks = BackgroundTasks()
-    result = create_trip(body=trip_data, background_tasks=background_tasks, user_id=user_id)
+    result = run_async(create_trip(body=trip_data, background_tasks=background_tasks, user_id=user_id))
 
     assert isinstance(result, TripResponse)
     assert result.title == "My Trip"
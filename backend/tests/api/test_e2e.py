@@ -10,6 +10,7 @@ from src import database as db
 from src.api.contacts import ContactCreate, create_contact, get_contacts
 from src.api.profile import ProfileUpdate, delete_account, get_profile, update_profile
 from src.api.trips import TripCreate, create_trip, get_trip
+from tests.aio import run_async
 
 
 def test_e2e_complete_user_journey():
@@ -114,7 +115,7 @@ def test_e2e_complete_user_journey():
         gen_lon=-122.4194
     )
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.title == "Test Journey Trip"
 
     # Step 5: Verify all data exists before deletion
@@ -349,7 +350,7 @@ def test_e2e_contact_management_workflow():
     # Step 5: Create a trip using these contacts
     now = datetime.utcnow()
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(
+    trip = run_async(create_trip(
         TripCreate(
             title="Contact Test Trip",
             activity="Other Activity",
@@ -362,7 +363,7 @@ def test_e2e_contact_management_workflow():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
     assert trip.id is not None
 
     # Clean up
@@ -445,7 +446,7 @@ def test_e2e_trip_lifecycle():
     # Step 3: Create trip
     now = datetime.utcnow()
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(
+    trip = run_async(create_trip(
         TripCreate(
             title="Lifecycle Test Trip",
             activity="Hiking",
@@ -460,7 +461,7 @@ def test_e2e_trip_lifecycle():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Step 3: Verify trip was created
     assert trip.id is not None
@@ -0,0 +1,74 @@
+"""Tests for pre-rendered JSON list responses"""
+import fastapi.routing
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from src.api.fast_json import PrerenderedJSONRoute, prerendered_json
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    tags: list[str] = []
+
+
+router = APIRouter(route_class=PrerenderedJSONRoute)
+
+
+@router.get("/items", response_model=list[Item])
+@prerendered_json
+def list_items(count: int = 2):
+    return [Item(id=i, name=f"item {i}", tags=["a"]) for i in range(count)]
+
+
+@router.get("/default-items", response_model=list[Item])
+def list_items_default():
+    return [Item(id=1, name="default")]
+
+
+@router.get("/async-items", response_model=list[Item])
+@prerendered_json
+async def list_items_async():
+    return [Item(id=1, name="async")]
+
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app, raise_server_exceptions=False)
+
+
+def test_prerendered_endpoint_returns_same_json():
+    response = client.get("/items", params={"count": 3})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [{"id": i, "name": f"item {i}", "tags": ["a"]} for i in range(3)]
+
+
+def test_endpoint_function_still_returns_models():
+    items = list_items(count=1)
+
+    assert items == [Item(id=0, name="item 0", tags=["a"])]
+
+
+def test_prerendered_endpoint_skips_fastapi_serialization(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("serialize_response should not run")
+
+    monkeypatch.setattr(fastapi.routing, "serialize_response", fail)
+
+    assert client.get("/items").status_code == 200
+    # Unmarked routes on the same router keep FastAPI's validate-and-encode path
+    assert client.get("/default-items").status_code == 500
+
+
+def test_async_endpoints_are_prerendered():
+    assert client.get("/async-items").json() == [{"id": 1, "name": "async", "tags": []}]
+
+
+def test_response_model_still_documented():
+    schema = app.openapi()["paths"]["/items"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+    assert schema["type"] == "array"
+    assert schema["items"]["$ref"].endswith("/Item")
@@ -18,6 +18,8 @@ from src.api.friends import (
     get_friend,
     remove_friend,
 )
+from tests.aio import run_async
+from tests.query_budget import assert_max_queries
 
 
 def _create_test_user(connection, email: str, first_name: str = "Test", last_name: str = "User") -> int:
@@ -881,6 +883,35 @@ def test_friends_list_ordered_by_friendship_date():
             _cleanup_user(connection, friend3_id)
 
 
+def test_friends_list_query_count_does_not_grow_with_friends():
+    """Test that listing friends runs a fixed number of queries (no N+1)."""
+    with db.engine.begin() as connection:
+        user_id = _create_test_user(connection, "budget@test.com", "Budget", "Main")
+        friend_ids = [
+            _create_test_user(connection, f"budget{i}@test.com", f"Friend{i}", "Budget")
+            for i in range(4)
+        ]
+
+    try:
+        invite = create_invite(user_id=user_id)
+        accept_invite(invite.token, BackgroundTasks(), user_id=friend_ids[0])
+
+        with assert_max_queries(6) as one_friend:
+            assert len(get_friends(user_id=user_id)) == 1
+
+        for friend_id in friend_ids[1:]:
+            invite = create_invite(user_id=user_id)
+            accept_invite(invite.token, BackgroundTasks(), user_id=friend_id)
+
+        with assert_max_queries(one_friend.query_count):
+            assert len(get_friends(user_id=user_id)) == 4
+    finally:
+        with db.engine.begin() as connection:
+            _cleanup_user(connection, user_id)
+            for friend_id in friend_ids:
+                _cleanup_user(connection, friend_id)
+
+
 # ==================== Request Update Tests ====================
 
 from src.api.friends import request_trip_update, get_friend_active_trips
@@ -1112,7 +1143,7 @@ def test_get_active_friend_trips_basic():
             _add_friend_to_trip(connection, trip_id, friend_id)
 
         # Get active trips as friend
-        trips = get_friend_active_trips(user_id=friend_id)
+        trips = run_async(get_friend_active_trips(user_id=friend_id))
 
         assert len(trips) >= 1
         trip = next((t for t in trips if t.id == trip_id), None)
@@ -1163,7 +1194,7 @@ def test_get_active_friend_trips_with_checkin_locations():
             )
 
         # Get active trips as friend
-        trips = get_friend_active_trips(user_id=friend_id)
+        trips = run_async(get_friend_active_trips(user_id=friend_id))
 
         trip = next((t for t in trips if t.id == trip_id), None)
         assert trip is not None
@@ -1187,7 +1218,7 @@ def test_get_active_friend_trips_no_trips():
         user_id = _create_test_user(connection, "noactivetrips@test.com", "NoActive", "Trips")
 
     try:
-        trips = get_friend_active_trips(user_id=user_id)
+        trips = run_async(get_friend_active_trips(user_id=user_id))
         assert trips == []
     finally:
         with db.engine.begin() as connection:
@@ -1220,7 +1251,7 @@ def test_get_active_friend_trips_only_active_status():
             _add_friend_to_trip(connection, completed_trip_id, friend_id)
 
         # Get active trips - should see active and planned, but not completed
-        trips = get_friend_active_trips(user_id=friend_id)
+        trips = run_async(get_friend_active_trips(user_id=friend_id))
 
         trip_ids = [t.id for t in trips]
         assert active_trip_id in trip_ids
@@ -1236,3 +1267,103 @@ def test_get_active_friend_trips_only_active_status():
                 _cleanup_trip(connection, completed_trip_id)
             _cleanup_user(connection, owner_id)
             _cleanup_user(connection, friend_id)
+
+
+# ==================== Live Location Track Tests ====================
+
+from src.api.friends import get_friend_trip_track
+from src.services import live_tracks
+
+
+def test_friend_trip_track_returns_full_trail():
+    """Test that a friend safety contact gets the owner's whole trail, compacted part included."""
+    with db.engine.begin() as connection:
+        owner_id = _create_test_user(connection, "trackowner@test.com", "Track", "Owner")
+        friend_id = _create_test_user(connection, "trackfriend@test.com", "Track", "Friend")
+
+    trip_id = None
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(
+                sqlalchemy.text("UPDATE users SET friend_share_live_location = true WHERE id = :id"),
+                {"id": owner_id}
+            )
+            trip_id = _create_trip_for_user(connection, owner_id, "Tracked Hike")
+            connection.execute(
+                sqlalchemy.text("UPDATE trips SET share_live_location = true WHERE id = :id"),
+                {"id": trip_id}
+            )
+            _add_friend_to_trip(connection, trip_id, friend_id)
+
+            start = datetime.utcnow() - timedelta(hours=1)
+            for i in range(150):
+                connection.execute(
+                    sqlalchemy.text(
+                        """
+                        INSERT INTO live_locations (trip_id, user_id, latitude, longitude, timestamp)
+                        VALUES (:trip_id, :user_id, :lat, :lon, :ts)
+                        """
+                    ),
+                    {"trip_id": trip_id, "user_id": owner_id, "lat": 37.7 + i * 0.0001,
+                     "lon": -122.4, "ts": start + timedelta(seconds=10 * i)}
+                )
+            assert live_tracks.compact(connection, trip_id, owner_id) == 150 - live_tracks.TRACK_TAIL_POINTS
+
+        track = get_friend_trip_track(trip_id, user_id=friend_id)
+
+        assert track.user_id == owner_id
+        assert track.point_count == 150
+        points = live_tracks.decode_track(datetime.fromisoformat(track.started_at), track.path, track.offsets)
+        assert points[0].latitude == pytest.approx(37.7)
+        assert points[-1].latitude == pytest.approx(37.7149)
+        assert (points[-1].timestamp - points[0].timestamp).total_seconds() == 1490
+    finally:
+        with db.engine.begin() as connection:
+            if trip_id:
+                _cleanup_trip(connection, trip_id)
+            _cleanup_user(connection, owner_id)
+            _cleanup_user(connection, friend_id)
+
+
+def test_friend_trip_track_requires_live_location_sharing():
+    """Test that the trail is hidden unless the owner shares live location with friends."""
+    with db.engine.begin() as connection:
+        owner_id = _create_test_user(connection, "tracknoshare@test.com", "NoShare", "Owner")
+        friend_id = _create_test_user(connection, "tracknosharefriend@test.com", "NoShare", "Friend")
+        stranger_id = _create_test_user(connection, "trackstranger@test.com", "Track", "Stranger")
+
+    trip_id = None
+    try:
+        with db.engine.begin() as connection:
+            trip_id = _create_trip_for_user(connection, owner_id, "Private Hike")
+            connection.execute(
+                sqlalchemy.text("UPDATE trips SET share_live_location = true WHERE id = :id"),
+                {"id": trip_id}
+            )
+            _add_friend_to_trip(connection, trip_id, friend_id)
+
+        # Owner hasn't enabled friend_share_live_location
+        with pytest.raises(HTTPException) as exc_info:
+            get_friend_trip_track(trip_id, user_id=friend_id)
+        assert exc_info.value.status_code == 403
+
+        with db.engine.begin() as connection:
+            connection.execute(
+                sqlalchemy.text("UPDATE users SET friend_share_live_location = true WHERE id = :id"),
+                {"id": owner_id}
+            )
+
+        track = get_friend_trip_track(trip_id, user_id=friend_id)
+        assert track.point_count == 0
+        assert track.started_at is None
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_friend_trip_track(trip_id, user_id=stranger_id)
+        assert exc_info.value.status_code == 403
+    finally:
+        with db.engine.begin() as connection:
+            if trip_id:
+                _cleanup_trip(connection, trip_id)
+            _cleanup_user(connection, owner_id)
+            _cleanup_user(connection, friend_id)
+            _cleanup_user(connection, stranger_id)
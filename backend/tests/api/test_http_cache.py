@@ -0,0 +1,136 @@
+"""Tests for ETag / If-None-Match support and response compression"""
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from starlette.middleware.gzip import GZipMiddleware
+
+from src.api.activities import get_activities
+from src.api.http_cache import ConditionalGetMiddleware, etag_matches, strong_etag, version_etag
+from src.api.server import app as api_app
+from tests.query_budget import assert_max_queries
+
+app = FastAPI()
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+
+@app.get("/items")
+def list_items(count: int = 2):
+    return [{"id": i, "name": f"item {i}"} for i in range(count)]
+
+
+@app.post("/items")
+def create_item():
+    return {"id": 1}
+
+
+@app.get("/missing")
+def missing():
+    return Response(content=b'{"detail": "nope"}', status_code=404, media_type="application/json")
+
+
+@app.get("/versioned")
+def versioned():
+    return Response(content=b"[]", media_type="application/json", headers={"ETag": 'W/"v1"'})
+
+
+@app.get("/text")
+def text():
+    return PlainTextResponse("hello")
+
+
+client = TestClient(app)
+
+
+def test_etag_matches_uses_weak_comparison():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"xyz", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"xyz"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert version_etag("v1") == 'W/"v1"'
+
+
+def test_json_get_gets_strong_etag_of_body():
+    response = client.get("/items")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == strong_etag(response.content)
+    assert response.headers["cache-control"] == "private, no-cache"
+
+
+def test_matching_if_none_match_returns_304_without_body():
+    etag = client.get("/items").headers["etag"]
+
+    response = client.get("/items", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "content-type" not in response.headers
+
+
+def test_changed_content_returns_200_with_new_etag():
+    etag = client.get("/items").headers["etag"]
+
+    response = client.get("/items", params={"count": 3}, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()) == 3
+
+
+def test_non_get_error_and_non_json_responses_pass_through():
+    assert "etag" not in client.post("/items").headers
+    assert "etag" not in client.get("/missing").headers
+    assert "etag" not in client.get("/text").headers
+
+
+def test_existing_etag_is_left_to_the_endpoint():
+    response = client.get("/versioned", headers={"If-None-Match": 'W/"other"'})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == 'W/"v1"'
+
+
+def test_gzip_applies_above_minimum_size_with_identity_etag():
+    small = client.get("/items", headers={"Accept-Encoding": "gzip"})
+    large = client.get("/items", params={"count": 100}, headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/items", params={"count": 100}, headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.num_bytes_downloaded < identity.num_bytes_downloaded
+    # ETag identifies the JSON, whatever the transfer encoding
+    assert large.headers["etag"] == identity.headers["etag"]
+    assert client.get(
+        "/items", params={"count": 100},
+        headers={"Accept-Encoding": "gzip", "If-None-Match": identity.headers["etag"]}
+    ).status_code == 304
+
+
+def test_activities_route_returns_304_for_current_version():
+    api_client = TestClient(api_app)
+    first = api_client.get("/api/v1/activities/")
+
+    assert first.status_code == 200
+    assert first.headers["etag"].startswith('W/"')
+
+    second = api_client.get("/api/v1/activities/", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_activities_not_modified_skips_loading_rows():
+    etag = TestClient(api_app).get("/api/v1/activities/").headers["etag"]
+    request = MagicMock(headers={"if-none-match": etag})
+
+    with assert_max_queries(1):
+        response = get_activities(request, Response())
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
@@ -0,0 +1,62 @@
+"""Tests for deferred router registration"""
+import importlib
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.lazy_routers import LazyRouterMiddleware, RouterRegistry, RouterSpec
+from src.api.server import ROUTERS
+from src.api.server import app as api_app
+
+
+def _lazy_app():
+    app = FastAPI()
+    registry = RouterRegistry(app, ROUTERS)
+    app.add_middleware(LazyRouterMiddleware, registry=registry)
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    return app, registry
+
+
+def test_spec_matches_prefix_on_segment_boundary():
+    spec = RouterSpec("/api/v1/trips", "src.api.trips")
+    assert spec.matches("/api/v1/trips")
+    assert spec.matches("/api/v1/trips/12/participants")
+    assert not spec.matches("/api/v1/trips-archive")
+    assert not spec.matches("/api/v1/friends")
+
+
+def test_routers_load_on_first_request_under_prefix():
+    app, registry = _lazy_app()
+    client = TestClient(app)
+
+    assert client.get("/health").status_code == 200
+    assert len(registry.pending) == len(ROUTERS)
+
+    # Unauthenticated, but routed: the trips routers were included
+    response = client.get("/api/v1/trips/")
+    assert response.status_code == 401
+    pending_modules = {spec.module for spec in registry.pending}
+    assert "src.api.trips" not in pending_modules
+    assert "src.api.participants" not in pending_modules
+    assert "src.api.friends" in pending_modules
+
+
+def test_openapi_loads_every_router():
+    app, registry = _lazy_app()
+    schema = TestClient(app).get("/openapi.json").json()
+
+    assert registry.pending == []
+    assert set(schema["paths"]) == set(api_app.openapi()["paths"]) - {"/"}
+
+
+def test_router_table_prefixes_cover_their_routes():
+    # A route outside its spec's prefix would 404 until something else loaded its module
+    for spec in ROUTERS:
+        module = importlib.import_module(spec.module)
+        for attribute in spec.attributes:
+            for route in getattr(module, attribute).routes:
+                assert spec.matches(route.path), f"{spec.module} {route.path} not under {spec.prefix}"
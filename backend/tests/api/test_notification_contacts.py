@@ -11,6 +11,7 @@ from fastapi import BackgroundTasks
 
 from src import database as db
 from src.api.trips import _get_all_trip_email_contacts
+from tests.aio import run_async, run_task
 
 
 # ==================== Test Helpers ====================
@@ -547,12 +548,12 @@ def test_owner_checkin_contacts_have_watched_user_name():
         background_tasks = MagicMock(spec=BackgroundTasks)
 
         # Owner checks in via token
-        result = checkin_with_token(
+        result = run_async(checkin_with_token(
             token=checkin_token,
             background_tasks=background_tasks,
             lat=37.7749,
             lon=-122.4194
-        )
+        ))
 
         assert result.ok is True, "Token check-in should succeed"
 
@@ -1200,12 +1201,12 @@ def test_owner_token_checkin_notifies_all_contacts():
         background_tasks = MagicMock(spec=BackgroundTasks)
 
         # Owner checks in via token
-        result = checkin_with_token(
+        result = run_async(checkin_with_token(
             token=checkin_token,
             background_tasks=background_tasks,
             lat=37.7749,
             lon=-122.4194
-        )
+        ))
 
         assert result.ok is True, "Token check-in should succeed"
 
@@ -2500,14 +2501,14 @@ def test_actual_checkin_endpoints_produce_matching_contacts():
                 with patch("src.api.checkin.send_push_to_user"):
                     with patch("src.api.checkin.send_friend_checkin_push"):
                         with patch("src.api.checkin.send_data_refresh_push"):
-                            with patch("src.api.checkin.reverse_geocode_sync", return_value=None):
+                            with patch("src.api.checkin.reverse_geocode_precise", return_value=None):
                                 background_tasks = MagicMock(spec=BackgroundTasks)
-                                checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+                                run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
 
                                 # Execute background tasks
                                 for call in background_tasks.add_task.call_args_list:
                                     task_func = call[0][0]
-                                    task_func()
+                                    run_task(task_func)
 
         # Test participant check-in via authenticated endpoint
         with patch("src.api.participants.send_checkin_update_emails", side_effect=capture_participant_contacts):
@@ -2520,7 +2521,7 @@ def test_actual_checkin_endpoints_produce_matching_contacts():
 
                             for call in background_tasks2.add_task.call_args_list:
                                 task_func = call[0][0]
-                                task_func()
+                                run_task(task_func)
 
         # Compare captured contacts
         assert captured_contacts["owner"] is not None, "Owner check-in should have captured contacts"
@@ -1,5 +1,6 @@
 """Tests for group trip participants API endpoints"""
 from datetime import UTC, datetime, timedelta
+from threading import Barrier, Thread
 from unittest.mock import MagicMock
 
 import pytest
@@ -24,9 +25,24 @@ from src.api.participants import (
     leave_trip,
     participant_checkin,
     remove_participant,
+    remove_vote,
     vote_checkout,
 )
-from src.api.trips import TripCreate, TripResponse, create_trip, get_trips, get_active_trip
+from src.api.trips import (
+    TripCreate,
+    TripResponse,
+    create_trip,
+    get_active_trip,
+    get_my_trip_contacts,
+    get_trip,
+    get_trip_detail,
+    get_trip_timeline,
+    get_trips,
+    start_trip,
+)
+from src.services.scheduler import check_overdue_trips
+from tests.aio import run_async
+from tests.query_budget import assert_max_queries
 
 
 # ==================== Test Helpers ====================
@@ -351,7 +367,7 @@ def test_accept_invitation():
             safety_contact_ids=[contact_id],
             checkin_interval_min=30
         )
-        result = accept_invitation(trip_id, request, background_tasks, user_id=friend_id)
+        result = run_async(accept_invitation(trip_id, request, background_tasks, user_id=friend_id))
 
         assert result["ok"] is True
         assert "accepted" in result["message"].lower() or "joined" in result["message"].lower()
@@ -440,7 +456,7 @@ def test_accept_without_invitation_fails():
         )
 
         with pytest.raises(HTTPException) as exc_info:
-            accept_invitation(trip_id, request, background_tasks, user_id=stranger_id)
+            run_async(accept_invitation(trip_id, request, background_tasks, user_id=stranger_id))
 
         assert exc_info.value.status_code in [403, 404]
 
@@ -694,7 +710,7 @@ def test_vote_checkout_anyone_mode():
 
     try:
         background_tasks = MagicMock(spec=BackgroundTasks)
-        result = vote_checkout(trip_id, background_tasks, user_id=friend_id)
+        result = run_async(vote_checkout(trip_id, background_tasks, user_id=friend_id))
 
         assert isinstance(result, CheckoutVoteResponse)
         assert result.ok is True
@@ -769,12 +785,12 @@ def test_vote_checkout_vote_mode():
         background_tasks = MagicMock(spec=BackgroundTasks)
 
         # First vote - should not complete (1/3 < 50%)
-        result1 = vote_checkout(trip_id, background_tasks, user_id=friend1_id)
+        result1 = run_async(vote_checkout(trip_id, background_tasks, user_id=friend1_id))
         assert result1.trip_completed is False
         assert result1.votes_cast == 1
 
         # Second vote - should complete (2/3 >= 50%)
-        result2 = vote_checkout(trip_id, background_tasks, user_id=friend2_id)
+        result2 = run_async(vote_checkout(trip_id, background_tasks, user_id=friend2_id))
         assert result2.trip_completed is True
 
     finally:
@@ -835,11 +851,11 @@ def test_vote_checkout_owner_only_mode():
 
         # Non-owner vote should fail
         with pytest.raises(HTTPException) as exc_info:
-            vote_checkout(trip_id, background_tasks, user_id=friend_id)
+            run_async(vote_checkout(trip_id, background_tasks, user_id=friend_id))
         assert exc_info.value.status_code == 403
 
         # Owner vote should succeed
-        result = vote_checkout(trip_id, background_tasks, user_id=owner_id)
+        result = run_async(vote_checkout(trip_id, background_tasks, user_id=owner_id))
         assert result.trip_completed is True
 
     finally:
@@ -868,10 +884,10 @@ def test_vote_idempotent_after_completion():
         background_tasks = MagicMock(spec=BackgroundTasks)
 
         # First vote completes trip
-        vote_checkout(trip_id, background_tasks, user_id=friend_id)
+        run_async(vote_checkout(trip_id, background_tasks, user_id=friend_id))
 
         # Second vote should still return success (idempotent)
-        result = vote_checkout(trip_id, background_tasks, user_id=owner_id)
+        result = run_async(vote_checkout(trip_id, background_tasks, user_id=owner_id))
         assert result.ok is True
         assert result.trip_completed is True
 
@@ -879,6 +895,113 @@ def test_vote_idempotent_after_completion():
         _cleanup_test_data(owner_id, friend_id)
 
 
+def _add_accepted_participants(connection, trip_id: int, owner_id: int, user_ids: list[int]):
+    for user_id in user_ids:
+        connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO trip_participants (trip_id, user_id, role, status, joined_at, invited_by)
+                VALUES (:trip_id, :user_id, 'participant', 'accepted', :now, :owner_id)
+                """
+            ),
+            {"trip_id": trip_id, "user_id": user_id, "now": datetime.now(UTC).isoformat(), "owner_id": owner_id}
+        )
+
+
+def _vote_counters(trip_id: int):
+    with db.engine.begin() as connection:
+        return connection.execute(
+            sqlalchemy.text("SELECT status, accepted_count, votes_cast FROM trips WHERE id = :trip_id"),
+            {"trip_id": trip_id}
+        ).fetchone()
+
+
+def test_vote_counters_follow_participants_and_votes():
+    """Test that the trip's accepted_count and votes_cast track participant and vote changes."""
+    with db.engine.begin() as connection:
+        owner_id = _create_test_user(connection, "owner18@test.com", "Owner", "User")
+        friend1_id = _create_test_user(connection, "friend18a@test.com", "Friend1", "User")
+        friend2_id = _create_test_user(connection, "friend18b@test.com", "Friend2", "User")
+        trip_id = _create_test_trip(connection, owner_id, is_group_trip=True)
+        connection.execute(
+            sqlalchemy.text("UPDATE trips SET group_settings = :settings WHERE id = :trip_id"),
+            {"settings": '{"checkout_mode": "vote", "vote_threshold": 1.0}', "trip_id": trip_id}
+        )
+        _add_accepted_participants(connection, trip_id, owner_id, [friend1_id, friend2_id])
+
+    try:
+        background_tasks = MagicMock(spec=BackgroundTasks)
+        assert _vote_counters(trip_id).accepted_count == 3
+
+        result = run_async(vote_checkout(trip_id, background_tasks, user_id=friend1_id))
+        assert (result.votes_cast, result.votes_needed) == (1, 3)
+
+        # Voting twice doesn't count twice
+        result = run_async(vote_checkout(trip_id, background_tasks, user_id=friend1_id))
+        assert result.votes_cast == 1
+
+        # Leaving drops the participant and their vote
+        leave_trip(trip_id, background_tasks, user_id=friend1_id)
+        counters = _vote_counters(trip_id)
+        assert (counters.accepted_count, counters.votes_cast) == (2, 0)
+
+        run_async(vote_checkout(trip_id, background_tasks, user_id=friend2_id))
+        result = remove_vote(trip_id, background_tasks, user_id=friend2_id)
+        assert (result.votes_cast, result.votes_needed, result.user_has_voted) == (0, 2, False)
+
+        # Quorum is checked against the remaining participants
+        run_async(vote_checkout(trip_id, background_tasks, user_id=friend2_id))
+        result = run_async(vote_checkout(trip_id, background_tasks, user_id=owner_id))
+        assert result.trip_completed is True
+        assert result.votes_cast == 2
+        counters = _vote_counters(trip_id)
+        assert (counters.status, counters.votes_cast) == ('completed', 0)
+
+    finally:
+        _cleanup_test_data(owner_id, friend1_id, friend2_id)
+
+
+def test_concurrent_votes_complete_trip_once():
+    """Test that simultaneous votes reaching quorum complete the trip exactly once."""
+    voter_count = 6
+    with db.engine.begin() as connection:
+        owner_id = _create_test_user(connection, "owner19@test.com", "Owner", "User")
+        voter_ids = [
+            _create_test_user(connection, f"friend19{i}@test.com", "Friend", "User")
+            for i in range(voter_count)
+        ]
+        trip_id = _create_test_trip(connection, owner_id, is_group_trip=True)
+        connection.execute(
+            sqlalchemy.text("UPDATE trips SET group_settings = :settings WHERE id = :trip_id"),
+            {"settings": '{"checkout_mode": "vote", "vote_threshold": 0.5}', "trip_id": trip_id}
+        )
+        _add_accepted_participants(connection, trip_id, owner_id, voter_ids)
+
+    try:
+        barrier = Barrier(voter_count)
+        results = []
+
+        def vote(voter_id):
+            barrier.wait()
+            results.append(run_async(vote_checkout(trip_id, MagicMock(spec=BackgroundTasks), user_id=voter_id)))
+
+        threads = [Thread(target=vote, args=(voter_id,)) for voter_id in voter_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 7 accepted * 50% -> 4 votes needed; every voter gets a successful response
+        assert len(results) == voter_count
+        assert sum(1 for r in results if r.message == "Trip completed!") == 1
+        counters = _vote_counters(trip_id)
+        assert counters.status == 'completed'
+        assert counters.votes_cast == 0
+
+    finally:
+        _cleanup_test_data(owner_id, *voter_ids)
+
+
 # ==================== Pending Invitations Tests ====================
 
 def test_get_pending_invitations():
@@ -1305,7 +1428,7 @@ def test_accept_invitation_with_safety_contacts():
             notify_start_hour=8,
             notify_end_hour=22
         )
-        result = accept_invitation(trip_id, request, background_tasks, user_id=friend_id)
+        result = run_async(accept_invitation(trip_id, request, background_tasks, user_id=friend_id))
 
         assert result["ok"] is True
 
@@ -1368,7 +1491,7 @@ def test_accept_invitation_requires_contacts():
         )
 
         with pytest.raises(HTTPException) as exc_info:
-            accept_invitation(trip_id, request, background_tasks, user_id=friend_id)
+            run_async(accept_invitation(trip_id, request, background_tasks, user_id=friend_id))
         assert exc_info.value.status_code == 400
         assert "safety contact" in exc_info.value.detail.lower()
 
@@ -1421,7 +1544,7 @@ def test_accept_invitation_max_three_contacts():
         )
 
         with pytest.raises(HTTPException) as exc_info:
-            accept_invitation(trip_id, request, background_tasks, user_id=friend_id)
+            run_async(accept_invitation(trip_id, request, background_tasks, user_id=friend_id))
         assert exc_info.value.status_code == 400
         assert "3" in exc_info.value.detail  # Should mention max 3 contacts
 
@@ -1472,7 +1595,7 @@ def test_accept_invitation_contacts_must_belong_to_user():
         )
 
         with pytest.raises(HTTPException) as exc_info:
-            accept_invitation(trip_id, request, background_tasks, user_id=friend_id)
+            run_async(accept_invitation(trip_id, request, background_tasks, user_id=friend_id))
         assert exc_info.value.status_code == 400
         assert "do not belong to you" in exc_info.value.detail.lower()
 
@@ -1480,6 +1603,73 @@ def test_accept_invitation_contacts_must_belong_to_user():
         _cleanup_test_data(owner_id, friend_id)
 
 
+@pytest.mark.parametrize("activate", ["start_trip", "scheduler"])
+def test_accepting_planned_trip_does_not_make_reminder_due_at_start(activate):
+    """A participant who accepted long before the start isn't reminded the moment the trip activates."""
+    with db.engine.begin() as connection:
+        owner_id = _create_test_user(connection, f"owner_planned_{activate}@test.com", "Owner", "User")
+        friend_id = _create_test_user(connection, f"friend_planned_{activate}@test.com", "Friend", "User")
+        _create_friendship(connection, owner_id, friend_id)
+        trip_id = _create_test_trip(connection, owner_id, is_group_trip=True)
+        connection.execute(
+            sqlalchemy.text("UPDATE trips SET status = 'planned', start = :start WHERE id = :trip_id"),
+            {"trip_id": trip_id, "start": datetime.now(UTC) + timedelta(days=1)}
+        )
+        connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO trip_participants (trip_id, user_id, role, status, invited_at, invited_by)
+                VALUES (:trip_id, :user_id, 'participant', 'invited', :now, :owner_id)
+                """
+            ),
+            {"trip_id": trip_id, "user_id": friend_id, "now": datetime.utcnow(), "owner_id": owner_id}
+        )
+        contact_id = connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO contacts (user_id, name, email) VALUES (:user_id, 'Contact', :email) RETURNING id"
+            ),
+            {"user_id": friend_id, "email": f"contact_planned_{activate}@test.com"}
+        ).scalar()
+
+    try:
+        request = AcceptInvitationRequest(safety_contact_ids=[contact_id], checkin_interval_min=30)
+        run_async(accept_invitation(trip_id, request, MagicMock(spec=BackgroundTasks), user_id=friend_id))
+
+        # A day passes: the clock started at accept is long due, and the trip's start has arrived
+        with db.engine.begin() as connection:
+            connection.execute(
+                sqlalchemy.text(
+                    "UPDATE trip_participants SET next_reminder_at = :due WHERE trip_id = :trip_id AND user_id = :user_id"
+                ),
+                {"trip_id": trip_id, "user_id": friend_id, "due": datetime.utcnow() - timedelta(hours=23)}
+            )
+            connection.execute(
+                sqlalchemy.text("UPDATE trips SET start = :start WHERE id = :trip_id"),
+                {"trip_id": trip_id, "start": datetime.now(UTC) - timedelta(minutes=1)}
+            )
+
+        if activate == "start_trip":
+            start_trip(trip_id, MagicMock(spec=BackgroundTasks), user_id=owner_id)
+        else:
+            run_async(check_overdue_trips())
+
+        with db.engine.begin() as connection:
+            trip_status = connection.execute(
+                sqlalchemy.text("SELECT status FROM trips WHERE id = :trip_id"), {"trip_id": trip_id}
+            ).scalar()
+            next_reminder_at = connection.execute(
+                sqlalchemy.text(
+                    "SELECT next_reminder_at FROM trip_participants WHERE trip_id = :trip_id AND user_id = :user_id"
+                ),
+                {"trip_id": trip_id, "user_id": friend_id}
+            ).scalar()
+        assert trip_status == "active"
+        assert next_reminder_at > datetime.utcnow() + timedelta(minutes=25)
+
+    finally:
+        _cleanup_test_data(owner_id, friend_id)
+
+
 # ==================== Get Trips / Get Active Trip with Participants Tests ====================
 
 def test_get_trips_includes_trips_as_participant():
@@ -1604,3 +1794,152 @@ def test_get_active_trip_excludes_invited_participant():
 
     finally:
         _cleanup_test_data(owner_id, friend_id)
+
+
+# ==================== Trip Detail Tests ====================
+
+def _create_group_trip_with_participant(owner_email: str, friend_email: str) -> tuple[int, int, int]:
+    """Create an owner, an accepted participant with a location, and a group trip."""
+    with db.engine.begin() as connection:
+        owner_id = _create_test_user(connection, owner_email, "Owner", "User")
+        friend_id = _create_test_user(connection, friend_email, "Friend", "User")
+        _create_friendship(connection, owner_id, friend_id)
+        trip_id = _create_test_trip(connection, owner_id, is_group_trip=True)
+
+        now = datetime.now(UTC)
+        connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO trip_participants (trip_id, user_id, role, status, joined_at, invited_by, last_checkin_at, last_lat, last_lon)
+                VALUES (:trip_id, :user_id, 'participant', 'accepted', :now, :owner_id, :now, 37.7749, -122.4194)
+                """
+            ),
+            {"trip_id": trip_id, "user_id": friend_id, "now": now.isoformat(), "owner_id": owner_id}
+        )
+        connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO events (user_id, trip_id, what, timestamp)
+                VALUES (:user_id, :trip_id, 'checkin', :now)
+                """
+            ),
+            {"user_id": friend_id, "trip_id": trip_id, "now": now.isoformat()}
+        )
+    return owner_id, friend_id, trip_id
+
+
+def test_trip_detail_matches_individual_endpoints():
+    """The composite payload carries the same sections as the separate endpoints."""
+    owner_id, friend_id, trip_id = _create_group_trip_with_participant("owner40@test.com", "friend40@test.com")
+
+    try:
+        detail = get_trip_detail(trip_id, user_id=owner_id)
+
+        assert detail.trip == get_trip(trip_id, user_id=owner_id)
+        assert detail.timeline == get_trip_timeline(trip_id, user_id=owner_id)
+        assert detail.participants == get_participants(trip_id, user_id=owner_id)
+        assert detail.locations == get_participant_locations(trip_id, user_id=owner_id)
+        assert detail.my_contacts == get_my_trip_contacts(trip_id, user_id=owner_id).contacts
+        assert set(detail.versions) == {"trip", "timeline", "participants", "locations", "my_contacts"}
+        assert detail.unchanged == []
+
+    finally:
+        _cleanup_test_data(owner_id, friend_id)
+
+
+def test_trip_detail_checks_access_once_and_batches_queries():
+    """A participant can open the trip; the whole payload stays within a fixed query budget."""
+    owner_id, friend_id, trip_id = _create_group_trip_with_participant("owner41@test.com", "friend41@test.com")
+
+    try:
+        with assert_max_queries(7):
+            detail = get_trip_detail(trip_id, user_id=friend_id)
+
+        assert detail.trip.id == trip_id
+        assert len(detail.participants.participants) == 2
+        assert any(loc.user_id == friend_id for loc in detail.locations)
+
+    finally:
+        _cleanup_test_data(owner_id, friend_id)
+
+
+def test_trip_detail_denies_non_participants():
+    """Users who are neither owner nor accepted participant get a 404."""
+    with db.engine.begin() as connection:
+        owner_id = _create_test_user(connection, "owner42@test.com", "Owner", "User")
+        stranger_id = _create_test_user(connection, "stranger42@test.com", "Stranger", "User")
+        trip_id = _create_test_trip(connection, owner_id, is_group_trip=True)
+        connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO trip_participants (trip_id, user_id, role, status, invited_at, invited_by)
+                VALUES (:trip_id, :user_id, 'participant', 'invited', :now, :owner_id)
+                """
+            ),
+            {"trip_id": trip_id, "user_id": stranger_id, "now": datetime.now(UTC).isoformat(), "owner_id": owner_id}
+        )
+
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            get_trip_detail(trip_id, user_id=stranger_id)
+        assert exc_info.value.status_code == 404
+
+    finally:
+        _cleanup_test_data(owner_id, stranger_id)
+
+
+def test_trip_detail_include_selects_sections():
+    """include= limits the payload; unknown section names are rejected."""
+    owner_id, friend_id, trip_id = _create_group_trip_with_participant("owner43@test.com", "friend43@test.com")
+
+    try:
+        detail = get_trip_detail(trip_id, include="timeline, locations", user_id=owner_id)
+
+        assert set(detail.versions) == {"timeline", "locations"}
+        assert detail.trip is None
+        assert detail.participants is None
+        assert detail.timeline is not None
+        assert detail.locations is not None
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_trip_detail(trip_id, include="timeline,weather", user_id=owner_id)
+        assert exc_info.value.status_code == 400
+
+    finally:
+        _cleanup_test_data(owner_id, friend_id)
+
+
+def test_trip_detail_versions_skip_unchanged_sections():
+    """Sections whose version the client already has are omitted until they change."""
+    owner_id, friend_id, trip_id = _create_group_trip_with_participant("owner44@test.com", "friend44@test.com")
+
+    try:
+        first = get_trip_detail(trip_id, user_id=owner_id)
+        known = ",".join(f"{name}:{version}" for name, version in first.versions.items())
+
+        again = get_trip_detail(trip_id, versions=known, user_id=owner_id)
+        assert again.version == first.version
+        assert set(again.unchanged) == set(first.versions)
+        assert again.trip is None
+        assert again.timeline is None
+
+        # A new timeline event only invalidates the timeline section
+        with db.engine.begin() as connection:
+            connection.execute(
+                sqlalchemy.text(
+                    """
+                    INSERT INTO events (user_id, trip_id, what, timestamp)
+                    VALUES (:user_id, :trip_id, 'checkin', :now)
+                    """
+                ),
+                {"user_id": owner_id, "trip_id": trip_id, "now": datetime.now(UTC).isoformat()}
+            )
+
+        changed = get_trip_detail(trip_id, versions=known, user_id=owner_id)
+        assert changed.version != first.version
+        assert "timeline" not in changed.unchanged
+        assert len(changed.timeline) == 2
+        assert changed.trip is None
+
+    finally:
+        _cleanup_test_data(owner_id, friend_id)
@@ -1,4 +1,7 @@
 """Tests for profile API endpoints"""
+import json
+from datetime import datetime, timedelta
+
 import pytest
 import sqlalchemy
 from fastapi import HTTPException
@@ -10,10 +13,13 @@ from src.api.profile import (
     ProfileUpdateResponse,
     delete_account,
     export_user_data,
+    export_user_data_stream,
+    get_account_deletion_status,
     get_profile,
     patch_profile,
     update_profile,
 )
+from src.services import account_data
 
 
 def test_get_profile():
@@ -1870,3 +1876,198 @@ def test_get_friend_visibility_nonexistent_user():
         get_friend_visibility(user_id=999999)
     assert exc_info.value.status_code == 404
     assert "not found" in exc_info.value.detail.lower()
+
+
+# ==================== Batched Deletion and Streaming Export ====================
+
+def _create_heavy_user(email: str, trips: int = 3, events_per_trip: int = 4) -> int:
+    """Create a Homebound+ user with contacts, trips, events and a device."""
+    now = datetime.utcnow()
+    with db.engine.begin() as connection:
+        existing = connection.execute(
+            sqlalchemy.text("SELECT id FROM users WHERE email = :email"),
+            {"email": email}
+        ).fetchone()
+        if existing:
+            account_data.delete_user_data(existing.id)
+
+        user_id = connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO users (email, first_name, last_name, age, subscription_tier)
+                VALUES (:email, 'Heavy', 'User', 35, 'plus')
+                RETURNING id
+                """
+            ),
+            {"email": email}
+        ).fetchone()[0]
+
+        contact_id = connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO contacts (user_id, name, email)
+                VALUES (:user_id, 'Contact', 'contact@example.com')
+                RETURNING id
+                """
+            ),
+            {"user_id": user_id}
+        ).fetchone()[0]
+
+        activity_id = connection.execute(
+            sqlalchemy.text("SELECT id FROM activities LIMIT 1")
+        ).fetchone()[0]
+
+        for i in range(trips):
+            trip_id = connection.execute(
+                sqlalchemy.text(
+                    """
+                    INSERT INTO trips (user_id, title, activity, start, eta, grace_min, location_text,
+                                       gen_lat, gen_lon, contact1, status)
+                    VALUES (:user_id, :title, :activity, :start, :eta, 30, 'Somewhere',
+                            0.0, 0.0, :contact1, 'completed')
+                    RETURNING id
+                    """
+                ),
+                {
+                    "user_id": user_id,
+                    "title": f"Trip {i}",
+                    "activity": activity_id,
+                    "start": now - timedelta(days=i + 1),
+                    "eta": now - timedelta(days=i),
+                    "contact1": contact_id
+                }
+            ).fetchone()[0]
+
+            last_event_id = None
+            for _ in range(events_per_trip):
+                last_event_id = connection.execute(
+                    sqlalchemy.text(
+                        """
+                        INSERT INTO events (user_id, trip_id, what, timestamp)
+                        VALUES (:user_id, :trip_id, 'checkin', :timestamp)
+                        RETURNING id
+                        """
+                    ),
+                    {"user_id": user_id, "trip_id": trip_id, "timestamp": now}
+                ).fetchone()[0]
+
+            # last_checkin references an event, which must not block deletion
+            connection.execute(
+                sqlalchemy.text("UPDATE trips SET last_checkin = :event_id WHERE id = :trip_id"),
+                {"event_id": last_event_id, "trip_id": trip_id}
+            )
+
+        connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO devices (user_id, platform, token, bundle_id, env, created_at, last_seen_at)
+                VALUES (:user_id, 'ios', :token, 'com.homeboundapp.Homebound', 'development', :now, :now)
+                """
+            ),
+            {"user_id": user_id, "token": f"heavy-device-{user_id}", "now": now}
+        )
+
+    return user_id
+
+
+def _count_user_rows(user_id: int) -> int:
+    with db.engine.begin() as connection:
+        return connection.execute(
+            sqlalchemy.text(
+                """
+                SELECT (SELECT COUNT(*) FROM users WHERE id = :user_id)
+                     + (SELECT COUNT(*) FROM trips WHERE user_id = :user_id)
+                     + (SELECT COUNT(*) FROM events WHERE user_id = :user_id)
+                     + (SELECT COUNT(*) FROM contacts WHERE user_id = :user_id)
+                     + (SELECT COUNT(*) FROM devices WHERE user_id = :user_id)
+                """
+            ),
+            {"user_id": user_id}
+        ).fetchone()[0]
+
+
+def test_delete_user_data_in_small_batches():
+    """Test batched deletion removes everything even when batches are tiny."""
+    user_id = _create_heavy_user("batched-delete@homeboundapp.com")
+    progress = []
+
+    counts = account_data.delete_user_data(
+        user_id,
+        batch_size=2,
+        on_progress=lambda step, deleted: progress.append((step, deleted))
+    )
+
+    assert _count_user_rows(user_id) == 0
+    assert counts["trip_events"] == 12
+    assert counts["trips"] == 3
+    assert counts["users"] == 1
+    # Every batch respected the batch size
+    assert all(deleted <= 2 for _, deleted in progress)
+
+
+def test_delete_account_background_job():
+    """Test background deletion is queued, processed and reports progress."""
+    user_id = _create_heavy_user("background-delete@homeboundapp.com")
+
+    result = delete_account(background=True, user_id=user_id)
+    assert result["ok"] is True
+    assert result["status"] == "pending"
+
+    # Queuing again reuses the unfinished job
+    again = delete_account(background=True, user_id=user_id)
+    assert again["job_id"] == result["job_id"]
+
+    # Nothing deleted until the job runs
+    assert _count_user_rows(user_id) > 0
+
+    assert account_data.process_deletion_jobs() >= 1
+
+    status = get_account_deletion_status(user_id=user_id)
+    assert status["job_id"] == result["job_id"]
+    assert status["status"] == "completed"
+    assert status["rows_deleted"] > 0
+    assert status["completed_at"] is not None
+    assert _count_user_rows(user_id) == 0
+
+    with db.engine.begin() as connection:
+        connection.execute(
+            sqlalchemy.text("DELETE FROM account_deletion_jobs WHERE user_id = :user_id"),
+            {"user_id": user_id}
+        )
+
+
+def test_get_account_deletion_status_none():
+    """Test deletion status returns 404 when no deletion was requested."""
+    with pytest.raises(HTTPException) as exc_info:
+        get_account_deletion_status(user_id=999999)
+    assert exc_info.value.status_code == 404
+
+
+def test_export_user_data_stream():
+    """Test NDJSON export streams the same records as the JSON export."""
+    user_id = _create_heavy_user("stream-export@homeboundapp.com", trips=3, events_per_trip=1)
+
+    try:
+        response = export_user_data_stream(user_id=user_id)
+        assert response.media_type == "application/x-ndjson"
+
+        records = [
+            json.loads(line)
+            for line in account_data.iter_user_export_ndjson(user_id)
+        ]
+        types = [r["type"] for r in records]
+        assert types == ["export", "profile", "trip", "trip", "trip", "contact", "summary"]
+        assert records[1]["data"]["id"] == user_id
+        assert records[-1]["data"] == {"total_trips": 3, "total_contacts": 1}
+
+        export = export_user_data(user_id=user_id)
+        assert [r["data"] for r in records if r["type"] == "trip"] == export["trips"]
+    finally:
+        account_data.delete_user_data(user_id)
+
+
+def test_export_user_data_stream_nonexistent_user():
+    """Test streaming export returns 404 for a missing user."""
+    with pytest.raises(HTTPException) as exc_info:
+        export_user_data_stream(user_id=999999)
+    assert exc_info.value.status_code in (403, 404)
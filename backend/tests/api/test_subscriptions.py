@@ -966,6 +966,51 @@ def test_decode_jws_invalid_format():
         decode_jws_payload("not.a.valid.jws.format", verify=False)
 
 
+def test_decode_jws_caches_signing_certificate():
+    """Test that a verified JWS reuses the parsed x5c certificate on repeat calls."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+    from cryptography.x509.oid import NameOID
+
+    from src.api import subscriptions
+
+    # Self-signed P-256 certificate standing in for Apple's signing cert
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Test Signer")])
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(datetime.now(UTC) - timedelta(days=1))
+        .not_valid_after(datetime.now(UTC) + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_b64 = base64.b64encode(cert.public_bytes(serialization.Encoding.DER)).decode()
+
+    header = {"alg": "ES256", "x5c": [cert_b64]}
+    header_b64 = base64.urlsafe_b64encode(json.dumps(header).encode()).decode().rstrip("=")
+    payload_b64 = base64.urlsafe_b64encode(json.dumps({"ok": 1}).encode()).decode().rstrip("=")
+    der_sig = key.sign(f"{header_b64}.{payload_b64}".encode(), ec.ECDSA(hashes.SHA256()))
+    r, s = decode_dss_signature(der_sig)
+    raw_sig = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+    signature_b64 = base64.urlsafe_b64encode(raw_sig).decode().rstrip("=")
+    jws = f"{header_b64}.{payload_b64}.{signature_b64}"
+
+    subscriptions.clear_apple_certificate_cache()
+    with patch("src.api.subscriptions.x509.load_der_x509_certificate",
+               wraps=x509.load_der_x509_certificate) as mock_load:
+        assert decode_jws_payload(jws, verify=True) == {"ok": 1}
+        assert decode_jws_payload(jws, verify=True) == {"ok": 1}
+
+    assert mock_load.call_count == 1
+    assert len(subscriptions._x5c_cert_cache) == 1
+    subscriptions.clear_apple_certificate_cache()
+
+
 @patch('src.api.subscriptions.decode_jws_payload', side_effect=mock_decode_jws)
 def test_handle_notification_subscribed(mock_decode):
     """Test handling SUBSCRIBED notification."""
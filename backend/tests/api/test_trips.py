@@ -5,8 +5,12 @@ from unittest.mock import MagicMock
 import pytest
 import sqlalchemy
 from fastapi import BackgroundTasks, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
 
 from src import database as db
+from src.api.auth_endpoints import create_jwt_pair
+from src.api.server import app
 from src.api.trips import (
     TimelineEvent,
     TripCreate,
@@ -23,6 +27,8 @@ from src.api.trips import (
     start_trip,
     update_trip,
 )
+from tests.aio import run_async
+from tests.query_budget import assert_max_queries
 
 
 def setup_test_user_and_contact(premium: bool = False):
@@ -145,7 +151,7 @@ def test_create_trip():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert isinstance(trip, TripResponse)
     assert trip.title == "Hiking Trip"
@@ -181,7 +187,7 @@ def test_create_trip_invalid_activity():
 
     background_tasks = MagicMock(spec=BackgroundTasks)
     with pytest.raises(HTTPException) as exc_info:
-        create_trip(trip_data, background_tasks, user_id=user_id)
+        run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert exc_info.value.status_code == 404
     assert "activity" in exc_info.value.detail.lower()
@@ -207,7 +213,7 @@ def test_create_trip_invalid_contact():
 
     background_tasks = MagicMock(spec=BackgroundTasks)
     with pytest.raises(HTTPException) as exc_info:
-        create_trip(trip_data, background_tasks, user_id=user_id)
+        run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert exc_info.value.status_code == 404
     assert "contact" in exc_info.value.detail.lower()
@@ -223,7 +229,7 @@ def test_get_trips():
     now = datetime.now(UTC)
     background_tasks = MagicMock(spec=BackgroundTasks)
 
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip 1",
             activity="Hiking",
@@ -237,9 +243,9 @@ def test_get_trips():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip 2",
             activity="Biking",
@@ -253,7 +259,7 @@ def test_get_trips():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Get all trips
     trips = get_trips(user_id=user_id)
@@ -267,6 +273,72 @@ def test_get_trips():
     cleanup_test_data(user_id)
 
 
+def test_get_trips_query_count_does_not_grow_with_trips():
+    """Test that listing trips runs a fixed number of queries (no N+1)"""
+    user_id, contact_id = setup_test_user_and_contact()
+    now = datetime.now(UTC)
+    background_tasks = MagicMock(spec=BackgroundTasks)
+
+    def add_trip(title):
+        run_async(create_trip(
+            TripCreate(
+                title=title,
+                activity="Hiking",
+                start=now,
+                eta=now + timedelta(hours=2),
+                grace_min=30,
+                location_text="Trail",
+                gen_lat=37.7749,
+                gen_lon=-122.4194,
+                contact1=contact_id
+            ),
+            background_tasks,
+            user_id=user_id
+        ))
+
+    add_trip("Trip 1")
+    with assert_max_queries(2) as one_trip:
+        assert len(get_trips(user_id=user_id)) == 1
+
+    for i in range(2, 6):
+        add_trip(f"Trip {i}")
+    with assert_max_queries(one_trip.query_count):
+        assert len(get_trips(user_id=user_id)) == 5
+
+    cleanup_test_data(user_id)
+
+
+def test_get_trips_route_serves_prerendered_json():
+    """The HTTP route returns the same JSON FastAPI's default serialization would"""
+    user_id, contact_id = setup_test_user_and_contact()
+    now = datetime.now(UTC)
+    run_async(create_trip(
+        TripCreate(
+            title="Prerendered",
+            activity="Hiking",
+            start=now,
+            eta=now + timedelta(hours=2),
+            grace_min=30,
+            location_text="Trail",
+            gen_lat=37.7749,
+            gen_lon=-122.4194,
+            contact1=contact_id
+        ),
+        MagicMock(spec=BackgroundTasks),
+        user_id=user_id
+    ))
+
+    try:
+        access, _ = create_jwt_pair(user_id, "test@homeboundapp.com")
+        response = TestClient(app).get("/api/v1/trips/", headers={"Authorization": f"Bearer {access}"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == jsonable_encoder(get_trips(user_id=user_id))
+    finally:
+        cleanup_test_data(user_id)
+
+
 def test_get_active_trip():
     """Test retrieving the active trip"""
     user_id, contact_id = setup_test_user_and_contact()
@@ -286,7 +358,7 @@ def test_get_active_trip():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    create_trip(trip_data, background_tasks, user_id=user_id)
+    run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Get active trip
     active = get_active_trip(user_id=user_id)
@@ -316,7 +388,7 @@ def test_get_trip():
     # Create trip
     now = datetime.now(UTC)
     background_tasks = MagicMock(spec=BackgroundTasks)
-    created = create_trip(
+    created = run_async(create_trip(
         TripCreate(
             title="Specific Trip",
             activity="Camping",
@@ -330,7 +402,7 @@ def test_get_trip():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Get the trip
     trip = get_trip(created.id, user_id=user_id)
@@ -358,7 +430,7 @@ def test_complete_trip():
     # Create trip
     now = datetime.now(UTC)
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(
+    trip = run_async(create_trip(
         TripCreate(
             title="Complete Me",
             activity="Driving",
@@ -372,7 +444,7 @@ def test_complete_trip():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Complete the trip
     complete_bg_tasks = MagicMock(spec=BackgroundTasks)
@@ -394,7 +466,7 @@ def test_complete_already_completed_trip():
     # Create and complete trip
     now = datetime.now(UTC)
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(
+    trip = run_async(create_trip(
         TripCreate(
             title="Already Complete",
             activity="Flying",
@@ -408,7 +480,7 @@ def test_complete_already_completed_trip():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     complete_bg_tasks = MagicMock(spec=BackgroundTasks)
     complete_trip(trip.id, complete_bg_tasks, user_id=user_id)
@@ -430,7 +502,7 @@ def test_delete_trip():
     # Create trip
     now = datetime.now(UTC)
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(
+    trip = run_async(create_trip(
         TripCreate(
             title="Delete Me",
             activity="Climbing",
@@ -444,7 +516,7 @@ def test_delete_trip():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Delete the trip
     result = delete_trip(trip.id, background_tasks, user_id=user_id)
@@ -475,7 +547,7 @@ def test_get_trip_timeline():
     # Create trip
     now = datetime.now(UTC)
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(
+    trip = run_async(create_trip(
         TripCreate(
             title="Timeline Trip",
             activity="Sailing",
@@ -489,7 +561,7 @@ def test_get_trip_timeline():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Add some events
     with db.engine.begin() as connection:
@@ -550,7 +622,7 @@ def create_planned_trip(user_id: int, contact_id: int, title: str = "Planned Tri
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.status == "planned"  # Verify it's planned
     return trip
 
@@ -673,7 +745,7 @@ def test_update_active_trip_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.status == "active"
 
     # Try to update
@@ -706,7 +778,7 @@ def test_update_completed_trip_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     complete_bg_tasks = MagicMock(spec=BackgroundTasks)
     complete_trip(trip.id, complete_bg_tasks, user_id=user_id)
 
@@ -859,7 +931,7 @@ def test_create_trip_with_notification_settings():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.checkin_interval_min == 60
     assert trip.notify_start_hour == 8
@@ -886,7 +958,7 @@ def test_create_trip_default_notification_settings():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Default interval is 30, quiet hours are null (no restriction)
     assert trip.checkin_interval_min == 30
@@ -914,7 +986,7 @@ def test_create_trip_custom_checkin_interval():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.checkin_interval_min == 15
     assert trip.notify_start_hour is None
@@ -942,7 +1014,7 @@ def test_create_trip_quiet_hours_only():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.checkin_interval_min == 30  # Default
     assert trip.notify_start_hour == 7
@@ -1018,7 +1090,7 @@ def test_get_trip_includes_notification_settings():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    created = create_trip(trip_data, background_tasks, user_id=user_id)
+    created = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Fetch the trip
     fetched = get_trip(created.id, user_id=user_id)
@@ -1038,7 +1110,7 @@ def test_get_trips_includes_notification_settings():
     background_tasks = MagicMock(spec=BackgroundTasks)
 
     # Create trip with custom settings
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip 1",
             activity="Hiking",
@@ -1054,10 +1126,10 @@ def test_get_trips_includes_notification_settings():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Create trip with default settings
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip 2",
             activity="Biking",
@@ -1070,7 +1142,7 @@ def test_get_trips_includes_notification_settings():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     trips = get_trips(user_id=user_id)
 
@@ -1108,7 +1180,7 @@ def test_get_active_trip_includes_notification_settings():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    create_trip(trip_data, background_tasks, user_id=user_id)
+    run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     active = get_active_trip(user_id=user_id)
 
@@ -1140,7 +1212,7 @@ def test_create_trip_with_overnight_notification_hours():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.notify_start_hour == 22
     assert trip.notify_end_hour == 8
@@ -1167,7 +1239,7 @@ def test_create_trip_with_short_interval():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.checkin_interval_min == 15
 
@@ -1192,7 +1264,7 @@ def test_create_trip_with_long_interval():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.checkin_interval_min == 120
 
@@ -1219,7 +1291,7 @@ def test_update_trip_clear_notification_hours():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.notify_start_hour == 8
     assert trip.notify_end_hour == 20
@@ -1260,7 +1332,7 @@ def test_update_trip_notification_hours_to_overnight():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Update to overnight hours
     update_data = TripUpdate(
@@ -1299,7 +1371,7 @@ def test_create_trip_with_single_location():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.location_text == "Mountain Trail"
     assert trip.gen_lat == 37.7749
@@ -1334,7 +1406,7 @@ def test_create_trip_with_separate_start_and_destination():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Verify destination
     assert trip.location_text == "Los Angeles, CA"
@@ -1372,7 +1444,7 @@ def test_create_trip_separate_locations_without_flag():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Start location should be null when flag is false
     assert trip.has_separate_locations is False
@@ -1405,7 +1477,7 @@ def test_get_trip_includes_start_location():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    created = create_trip(trip_data, background_tasks, user_id=user_id)
+    created = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Fetch the trip
     fetched = get_trip(created.id, user_id=user_id)
@@ -1427,7 +1499,7 @@ def test_get_trips_includes_start_location():
     background_tasks = MagicMock(spec=BackgroundTasks)
 
     # Create trip with separate locations
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip With Start",
             activity="Driving",
@@ -1445,10 +1517,10 @@ def test_get_trips_includes_start_location():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Create trip with single location
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip Without Start",
             activity="Hiking",
@@ -1463,7 +1535,7 @@ def test_get_trips_includes_start_location():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     trips = get_trips(user_id=user_id)
 
@@ -1502,7 +1574,7 @@ def test_get_active_trip_includes_start_location():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    create_trip(trip_data, background_tasks, user_id=user_id)
+    run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     active = get_active_trip(user_id=user_id)
 
@@ -1535,7 +1607,7 @@ def test_update_trip_add_start_location():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.has_separate_locations is False
 
     # Update to add start location
@@ -1579,7 +1651,7 @@ def test_update_trip_change_start_location():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Update start location
     update_data = TripUpdate(
@@ -1623,7 +1695,7 @@ def test_update_trip_remove_start_location():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.has_separate_locations is True
 
     # Update to switch back to single location
@@ -1658,7 +1730,7 @@ def test_create_trip_start_location_default_false():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.has_separate_locations is False
 
@@ -1687,7 +1759,7 @@ def test_create_trip_both_locations_with_coordinates():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Verify all coordinates are stored correctly
     assert trip.gen_lat == 40.7128
@@ -1721,7 +1793,7 @@ def test_update_trip_both_locations():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Update both locations
     update_data = TripUpdate(
@@ -1770,7 +1842,7 @@ def test_create_trip_with_timezones():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.timezone == "America/New_York"
     assert trip.start_timezone == "America/New_York"
@@ -1798,7 +1870,7 @@ def test_create_trip_without_timezones():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.timezone is None
     assert trip.start_timezone is None
@@ -1827,7 +1899,7 @@ def test_create_trip_with_only_start_timezone():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.start_timezone == "America/Chicago"
     assert trip.eta_timezone is None
@@ -1855,7 +1927,7 @@ def test_create_trip_with_only_eta_timezone():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.start_timezone is None
     assert trip.eta_timezone == "America/Denver"
@@ -1884,7 +1956,7 @@ def test_create_trip_same_timezone_for_both():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.start_timezone == "America/Los_Angeles"
     assert trip.eta_timezone == "America/Los_Angeles"
@@ -1913,7 +1985,7 @@ def test_get_trip_includes_timezones():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    created = create_trip(trip_data, background_tasks, user_id=user_id)
+    created = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Fetch the trip
     fetched = get_trip(created.id, user_id=user_id)
@@ -1933,7 +2005,7 @@ def test_get_trips_includes_timezones():
     background_tasks = MagicMock(spec=BackgroundTasks)
 
     # Create trip with timezones
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip With Timezones",
             activity="Driving",
@@ -1949,10 +2021,10 @@ def test_get_trips_includes_timezones():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Create trip without timezones
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip Without Timezones",
             activity="Hiking",
@@ -1966,7 +2038,7 @@ def test_get_trips_includes_timezones():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     trips = get_trips(user_id=user_id)
 
@@ -2003,7 +2075,7 @@ def test_get_active_trip_includes_timezones():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    create_trip(trip_data, background_tasks, user_id=user_id)
+    run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     active = get_active_trip(user_id=user_id)
 
@@ -2034,7 +2106,7 @@ def test_update_trip_add_timezones():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.start_timezone is None
     assert trip.eta_timezone is None
 
@@ -2073,7 +2145,7 @@ def test_update_trip_change_timezones():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Update timezones
     update_data = TripUpdate(
@@ -2110,7 +2182,7 @@ def test_update_trip_timezone_partial():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Update only start_timezone
     update_data = TripUpdate(
@@ -2146,7 +2218,7 @@ def test_create_trip_with_international_timezones():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.start_timezone == "America/New_York"
     assert trip.eta_timezone == "Asia/Tokyo"
@@ -2175,7 +2247,7 @@ def test_create_trip_with_utc_timezone():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.timezone == "UTC"
     assert trip.start_timezone == "UTC"
@@ -2209,7 +2281,7 @@ def test_create_trip_timezone_with_locations():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Verify locations
     assert trip.has_separate_locations is True
@@ -2246,7 +2318,7 @@ def test_create_trip_with_notify_self_enabled():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.notify_self is True
 
@@ -2272,7 +2344,7 @@ def test_create_trip_notify_self_defaults_to_false():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.notify_self is False
 
@@ -2298,7 +2370,7 @@ def test_create_trip_with_notify_self_disabled():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.notify_self is False
 
@@ -2323,7 +2395,7 @@ def test_get_trip_includes_notify_self():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    created = create_trip(trip_data, background_tasks, user_id=user_id)
+    created = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Fetch the trip
     fetched = get_trip(created.id, user_id=user_id)
@@ -2341,7 +2413,7 @@ def test_get_trips_includes_notify_self():
     background_tasks = MagicMock(spec=BackgroundTasks)
 
     # Create trip with notify_self enabled
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip With Notify Self",
             activity="Hiking",
@@ -2355,10 +2427,10 @@ def test_get_trips_includes_notify_self():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Create trip with notify_self disabled
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip Without Notify Self",
             activity="Biking",
@@ -2372,7 +2444,7 @@ def test_get_trips_includes_notify_self():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     trips = get_trips(user_id=user_id)
 
@@ -2403,7 +2475,7 @@ def test_get_active_trip_includes_notify_self():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    create_trip(trip_data, background_tasks, user_id=user_id)
+    run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     active = get_active_trip(user_id=user_id)
 
@@ -2449,7 +2521,7 @@ def test_update_trip_disable_notify_self():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.status == "planned"
     assert trip.notify_self is True
 
@@ -2481,7 +2553,7 @@ def test_update_trip_notify_self_unchanged():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.notify_self is True
 
     # Update other field without touching notify_self
@@ -2523,7 +2595,7 @@ def test_create_trip_notify_self_with_all_features():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Verify notify_self
     assert trip.notify_self is True
@@ -2563,7 +2635,7 @@ def test_start_trip_early_updates_start_time():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Verify trip was created as planned (future start time)
     assert trip.status == "planned"
@@ -2612,7 +2684,7 @@ def test_trip_duration_non_negative_after_early_start():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.status == "planned"
 
     # Start trip early
@@ -2659,7 +2731,7 @@ def test_start_trip_already_active_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.status == "active"
 
     # Try to start already active trip - should fail
@@ -2691,7 +2763,7 @@ def test_start_trip_completed_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     complete_trip(trip.id, background_tasks, user_id=user_id)
 
     # Verify it's completed
@@ -2746,7 +2818,7 @@ def test_start_trip_other_users_trip_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.status == "planned"
 
     # Try to start as other user - should fail
@@ -2803,7 +2875,7 @@ def test_extend_trip_basic():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.status == "active"
 
     # Extend by 30 minutes
@@ -2854,7 +2926,7 @@ def test_extend_trip_updates_overdue_to_active():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Manually set status to overdue for testing
     with db.engine.begin() as connection:
@@ -2918,7 +2990,7 @@ def test_extend_trip_planned_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.status == "planned"
 
     # Try to extend planned trip - should fail
@@ -2949,7 +3021,7 @@ def test_extend_trip_completed_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     complete_trip(trip.id, background_tasks, user_id=user_id)
 
     # Try to extend completed trip - should fail
@@ -2999,7 +3071,7 @@ def test_extend_trip_other_users_trip_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Try to extend as other user - should fail
     with pytest.raises(HTTPException) as exc_info:
@@ -3049,7 +3121,7 @@ def test_extend_trip_multiple_times():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Extend 3 times: 30 + 60 + 30 = 120 minutes total (using allowed values)
     extend_trip(trip.id, 30, background_tasks, user_id=user_id)
@@ -3102,7 +3174,7 @@ def test_complete_trip_planned_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.status == "planned"
 
     # Try to complete planned trip - should fail
@@ -3133,7 +3205,7 @@ def test_complete_trip_already_completed_fails():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     complete_trip(trip.id, background_tasks, user_id=user_id)
 
     # Try to complete again - should fail
@@ -3367,7 +3439,7 @@ def test_create_trip_with_friend_contact():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.contact1 == contact_id
     assert trip.friend_contact1 == friend_id
@@ -3401,7 +3473,7 @@ def test_create_trip_friend_as_primary_contact():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.contact1 == contact_id
     assert trip.friend_contact1 == friend_id
@@ -3449,7 +3521,7 @@ def test_create_trip_with_invalid_friend_contact():
     background_tasks = MagicMock(spec=BackgroundTasks)
 
     with pytest.raises(HTTPException) as exc_info:
-        create_trip(trip_data, background_tasks, user_id=user_id)
+        run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert exc_info.value.status_code == 404
     assert "not in your friends list" in exc_info.value.detail.lower()
@@ -3546,7 +3618,7 @@ def test_create_trip_with_multiple_friend_contacts():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.contact1 == contact_id
     assert trip.friend_contact1 == friend_ids[0]
@@ -3585,7 +3657,7 @@ def test_create_trip_with_both_email_and_friend_contacts():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.contact1 == contact_id
     assert trip.friend_contact1 == friend_id
@@ -3612,7 +3684,7 @@ def test_get_trip_includes_friend_contacts():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    created = create_trip(trip_data, background_tasks, user_id=user_id)
+    created = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Fetch the trip
     fetched = get_trip(created.id, user_id=user_id)
@@ -3633,7 +3705,7 @@ def test_get_trips_includes_friend_contacts():
     background_tasks = MagicMock(spec=BackgroundTasks)
 
     # Create trip with friend contact
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip With Friend",
             activity="Hiking",
@@ -3648,10 +3720,10 @@ def test_get_trips_includes_friend_contacts():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     # Create trip without friend contact
-    create_trip(
+    run_async(create_trip(
         TripCreate(
             title="Trip Without Friend",
             activity="Biking",
@@ -3665,7 +3737,7 @@ def test_get_trips_includes_friend_contacts():
         ),
         background_tasks,
         user_id=user_id
-    )
+    ))
 
     trips = get_trips(user_id=user_id)
 
@@ -3696,7 +3768,7 @@ def test_get_active_trip_includes_friend_contacts():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    create_trip(trip_data, background_tasks, user_id=user_id)
+    run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     active = get_active_trip(user_id=user_id)
 
@@ -3725,7 +3797,7 @@ def test_update_trip_add_friend_contact():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     assert trip.friend_contact1 is None
 
     # Update to add friend contact
@@ -3764,7 +3836,7 @@ def test_update_trip_invalid_friend_contact():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Try to update with non-friend - should fail
     update_data = TripUpdate(friend_contact1=non_friend_id)
@@ -3801,7 +3873,7 @@ def test_create_trip_no_contacts_fails():
     background_tasks = MagicMock(spec=BackgroundTasks)
 
     with pytest.raises(HTTPException) as exc_info:
-        create_trip(trip_data, background_tasks, user_id=user_id)
+        run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert exc_info.value.status_code == 400
     assert "emergency contact" in exc_info.value.detail.lower()
@@ -3828,7 +3900,7 @@ def test_trip_safety_contacts_junction_table():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Verify junction table has the friend contact
     with db.engine.begin() as connection:
@@ -3879,7 +3951,7 @@ def test_trip_delete_cascades_to_safety_contacts():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     trip_id = trip.id
 
     # Verify junction table entries exist
@@ -3923,7 +3995,7 @@ def test_friend_contact_defaults_to_none():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.friend_contact1 is None
     assert trip.friend_contact2 is None
@@ -3934,7 +4006,13 @@ def test_friend_contact_defaults_to_none():
 
 # ==================== Live Location Tests ====================
 
-from src.api.trips import update_live_location, LiveLocationUpdate
+from src.api.trips import (
+    LiveLocationBatch,
+    LiveLocationFix,
+    LiveLocationUpdate,
+    update_live_location,
+    upload_live_locations,
+)
 
 
 def test_update_live_location_success():
@@ -3956,7 +4034,7 @@ def test_update_live_location_success():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     trip_id = trip.id
 
     try:
@@ -4008,7 +4086,7 @@ def test_update_live_location_disabled():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     trip_id = trip.id
 
     try:
@@ -4043,7 +4121,7 @@ def test_update_live_location_inactive_trip():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     trip_id = trip.id
 
     try:
@@ -4091,7 +4169,7 @@ def test_update_live_location_wrong_user():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     trip_id = trip.id
 
     try:
@@ -4128,6 +4206,124 @@ def test_update_live_location_trip_not_found():
         cleanup_test_data(user_id)
 
 
+def _create_live_location_trip(user_id: int, contact_id: int, share_live_location: bool = True) -> int:
+    now = datetime.now(UTC)
+    trip = run_async(create_trip(
+        TripCreate(
+            title="Offline Batch Test",
+            activity="Hiking",
+            start=now - timedelta(hours=2),
+            eta=now + timedelta(hours=2),
+            grace_min=30,
+            location_text="Backcountry",
+            contact1=contact_id,
+            share_live_location=share_live_location,
+            gen_lat=37.7749,
+            gen_lon=-122.4194
+        ),
+        MagicMock(spec=BackgroundTasks),
+        user_id=user_id
+    ))
+    return trip.id
+
+
+def test_upload_live_locations_stores_buffered_fixes():
+    """Buffered fixes are stored with device timestamps in one insert"""
+    user_id, contact_id = setup_test_user_and_contact()
+    trip_id = _create_live_location_trip(user_id, contact_id)
+    start = datetime.now(UTC) - timedelta(minutes=90)
+
+    try:
+        fixes = [
+            LiveLocationFix(latitude=37.0 + i / 100, longitude=-122.0, speed=1.0,
+                            timestamp=start + timedelta(minutes=i))
+            for i in range(50)
+        ]
+        # Out of order, with a repeated timestamp
+        batch = LiveLocationBatch(fixes=list(reversed(fixes)) + [fixes[10]])
+
+        with assert_max_queries(3):
+            result = upload_live_locations(trip_id, batch, user_id=user_id)
+
+        assert result.ok is True
+        assert (result.received, result.inserted, result.duplicates) == (51, 50, 1)
+
+        with db.engine.begin() as connection:
+            rows = connection.execute(
+                sqlalchemy.text(
+                    "SELECT latitude, timestamp FROM live_locations WHERE trip_id = :trip_id ORDER BY timestamp"
+                ),
+                {"trip_id": trip_id}
+            ).fetchall()
+        assert len(rows) == 50
+        assert rows[0].timestamp == start.replace(tzinfo=None)
+        # Latest position is the newest fix
+        assert rows[-1].latitude == 37.49
+    finally:
+        cleanup_test_data(user_id)
+
+
+def test_upload_live_locations_retry_is_idempotent():
+    """Re-sending a batch whose response was lost stores nothing twice"""
+    user_id, contact_id = setup_test_user_and_contact()
+    trip_id = _create_live_location_trip(user_id, contact_id)
+    start = datetime.now(UTC) - timedelta(minutes=10)
+
+    try:
+        batch = LiveLocationBatch(fixes=[
+            LiveLocationFix(latitude=37.0, longitude=-122.0, timestamp=start + timedelta(seconds=i * 30))
+            for i in range(5)
+        ])
+        upload_live_locations(trip_id, batch, user_id=user_id)
+        retry = upload_live_locations(trip_id, batch, user_id=user_id)
+
+        assert (retry.inserted, retry.duplicates) == (0, 5)
+    finally:
+        cleanup_test_data(user_id)
+
+
+def test_upload_live_locations_rejects_future_timestamps():
+    """Fixes stamped well ahead of the server clock are rejected"""
+    user_id, contact_id = setup_test_user_and_contact()
+    trip_id = _create_live_location_trip(user_id, contact_id)
+
+    try:
+        batch = LiveLocationBatch(fixes=[
+            LiveLocationFix(latitude=37.0, longitude=-122.0, timestamp=datetime.now(UTC) + timedelta(hours=1))
+        ])
+        with pytest.raises(HTTPException) as exc_info:
+            upload_live_locations(trip_id, batch, user_id=user_id)
+        assert exc_info.value.status_code == 400
+    finally:
+        cleanup_test_data(user_id)
+
+
+def test_upload_live_locations_requires_sharing_enabled():
+    """Batch uploads use the same access checks as single updates"""
+    user_id, contact_id = setup_test_user_and_contact()
+    trip_id = _create_live_location_trip(user_id, contact_id, share_live_location=False)
+
+    try:
+        batch = LiveLocationBatch(fixes=[
+            LiveLocationFix(latitude=37.0, longitude=-122.0, timestamp=datetime.now(UTC))
+        ])
+        with pytest.raises(HTTPException) as exc_info:
+            upload_live_locations(trip_id, batch, user_id=user_id)
+        assert exc_info.value.status_code == 403
+    finally:
+        cleanup_test_data(user_id)
+
+
+def test_live_location_batch_size_is_bounded():
+    """Empty and oversized batches fail validation"""
+    fix = LiveLocationFix(latitude=37.0, longitude=-122.0, timestamp=datetime.now(UTC))
+
+    with pytest.raises(ValueError):
+        LiveLocationBatch(fixes=[])
+    with pytest.raises(ValueError):
+        LiveLocationBatch(fixes=[fix] * 1001)
+
+
 def test_share_live_location_in_trip_response():
     """Test that share_live_location field is included in trip response."""
     user_id, contact_id = setup_test_user_and_contact()
@@ -4147,7 +4343,7 @@ def test_share_live_location_in_trip_response():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert hasattr(trip, 'share_live_location')
     assert trip.share_live_location is True
@@ -4174,7 +4370,7 @@ def test_share_live_location_defaults_to_false():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     assert trip.share_live_location is False
 
@@ -4200,7 +4396,7 @@ def test_update_live_location_rate_limited():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
     trip_id = trip.id
 
     try:
@@ -4250,7 +4446,7 @@ def test_create_group_trip_requires_plus_subscription():
 
     try:
         with pytest.raises(HTTPException) as exc_info:
-            create_trip(trip_data, background_tasks, user_id=user_id)
+            run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
         assert exc_info.value.status_code == 403
         assert "group trips" in exc_info.value.detail.lower() or "homebound+" in exc_info.value.detail.lower()
@@ -4281,7 +4477,7 @@ def test_create_group_trip_allowed_for_plus_user():
     background_tasks = MagicMock(spec=BackgroundTasks)
 
     try:
-        trip = create_trip(trip_data, background_tasks, user_id=user_id)
+        trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
         assert trip.is_group_trip is True
         assert trip.id is not None
 
@@ -4311,7 +4507,7 @@ def test_get_my_contacts_owner():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     # Get my contacts
     result = get_my_trip_contacts(trip.id, user_id=user_id)
@@ -4696,7 +4892,7 @@ def test_extend_trip_returns_new_eta_in_response():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     try:
         # Extend by 30 minutes
@@ -4749,7 +4945,7 @@ def test_extend_trip_new_eta_matches_database():
     )
 
     background_tasks = MagicMock(spec=BackgroundTasks)
-    trip = create_trip(trip_data, background_tasks, user_id=user_id)
+    trip = run_async(create_trip(trip_data, background_tasks, user_id=user_id))
 
     try:
         # Extend by 60 minutes (using allowed extension value)
@@ -5,7 +5,6 @@ Tests for:
 - Concurrent trip extend operations (no duplicate extends)
 - Concurrent checkin operations
 """
-import asyncio
 import concurrent.futures
 from datetime import UTC, datetime, timedelta
 from threading import Thread, Barrier
@@ -24,15 +23,7 @@ from src.api.auth_endpoints import (
     verify_magic_code,
 )
 from src.api.trips import extend_trip
-
-
-def run_async(coro):
-    """Helper to run async functions in sync tests"""
-    loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+from tests.aio import run_async
 
 
 def cleanup_user(email: str):
@@ -381,9 +372,14 @@ def test_concurrent_extend_trip_race():
     cleanup_user(test_email)
 
 
-def test_concurrent_checkin_operations():
+def test_concurrent_checkin_operations(monkeypatch):
     """Test that concurrent check-in operations are handled correctly"""
     from src.api.checkin import checkin_with_token
+    from src.services import magic_links
+
+    # Each check-in runs on its own thread and event loop; keep the per-process dedupe
+    # out of it so every one reaches the database
+    monkeypatch.setattr(magic_links.settings, "MAGIC_LINK_DEDUPE_SECONDS", 0)
 
     test_email = "concurrent-checkin@racetest.example.com"
     cleanup_user(test_email)
@@ -444,7 +440,7 @@ def test_concurrent_checkin_operations():
     def attempt_checkin():
         try:
             background_tasks = BackgroundTasks()
-            result = checkin_with_token(checkin_token, background_tasks, lat=None, lon=None)
+            result = run_async(checkin_with_token(checkin_token, background_tasks, lat=None, lon=None))
             results.append(("success", result))
         except Exception as e:
             results.append(("error", str(e)))
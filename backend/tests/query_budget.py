@@ -0,0 +1,28 @@
+"""Query-count budgets for endpoint tests.
+
+Usage:
+    from tests.query_budget import assert_max_queries
+
+    with assert_max_queries(3):
+        get_trips(user_id=user_id)
+
+Fails with the list of executed statements when the block runs more SQL
+statements than the budget, which catches N+1 regressions.
+"""
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from src.services.query_metrics import QueryStats, track_queries
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[QueryStats]:
+    """Assert the block executes at most `budget` SQL statements."""
+    with track_queries(record_statements=True) as stats:
+        yield stats
+
+    if stats.query_count > budget:
+        listing = "\n".join(f"  {i}. {statement}" for i, statement in enumerate(stats.statements, start=1))
+        raise AssertionError(
+            f"Query budget exceeded: {stats.query_count} statements executed, budget is {budget}\n{listing}"
+        )
@@ -0,0 +1,210 @@
+"""Tests for the broadcast push CLI engine"""
+import asyncio
+import time
+
+import pytest
+import sqlalchemy
+
+from src import database as db
+from src.messaging.apns import PushResult
+from src.scripts import broadcast as broadcast_module
+from src.scripts.broadcast import Audience, RateLimiter, broadcast, estimate_seconds
+
+# Devices live in their own APNs env so other tests' devices aren't in the audience
+TEST_ENV = "broadcast-test"
+TEST_EMAIL_DOMAIN = "@broadcast-test.invalid"
+
+
+class FakeSender:
+    """Records sends; tokens starting with 'dead' are rejected as unregistered."""
+
+    def __init__(self, fail_after: int | None = None):
+        self.sent_tokens: list[str] = []
+        self.fail_after = fail_after
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, device_token, title, body, data=None, category=None):
+        if self.fail_after is not None and len(self.sent_tokens) >= self.fail_after:
+            raise asyncio.CancelledError()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        self.sent_tokens.append(device_token)
+        if device_token.startswith("dead"):
+            return PushResult(ok=False, status=410, detail="Unregistered")
+        return PushResult(ok=True, status=200, detail="apns-id")
+
+
+def _cleanup():
+    with db.engine.begin() as conn:
+        for table in ("notification_logs", "devices"):
+            conn.execute(
+                sqlalchemy.text(f"""
+                    DELETE FROM {table}
+                    WHERE user_id IN (SELECT id FROM users WHERE email LIKE :pattern)
+                """),
+                {"pattern": f"%{TEST_EMAIL_DOMAIN}"}
+            )
+        conn.execute(
+            sqlalchemy.text("DELETE FROM users WHERE email LIKE :pattern"),
+            {"pattern": f"%{TEST_EMAIL_DOMAIN}"}
+        )
+
+
+@pytest.fixture
+def audience_devices():
+    """Three users with five test-env devices between them, one of them dead."""
+    _cleanup()
+    tokens = []
+    with db.engine.begin() as conn:
+        for i in range(3):
+            user_id = conn.execute(
+                sqlalchemy.text("""
+                    INSERT INTO users (email, first_name, last_name, age, subscription_tier)
+                    VALUES (:email, 'Broadcast', 'Test', 30, :tier)
+                    RETURNING id
+                """),
+                {"email": f"user{i}{TEST_EMAIL_DOMAIN}", "tier": "plus" if i == 0 else "free"}
+            ).scalar()
+            for j in range(2 if i < 2 else 1):
+                token = f"dead-{i}-{j}" if (i, j) == (1, 1) else f"token-{i}-{j}"
+                conn.execute(
+                    sqlalchemy.text("""
+                        INSERT INTO devices (user_id, platform, token, bundle_id, env, created_at, last_seen_at)
+                        VALUES (:user_id, 'ios', :token, 'com.test', :env, NOW(), NOW())
+                    """),
+                    {"user_id": user_id, "token": token, "env": TEST_ENV}
+                )
+                tokens.append(token)
+    yield tokens
+    _cleanup()
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delays(monkeypatch):
+    monkeypatch.setattr(broadcast_module, "RETRY_DELAYS", [0, 0, 0])
+
+
+def _remaining_tokens():
+    with db.engine.connect() as conn:
+        return {
+            row.token for row in conn.execute(
+                sqlalchemy.text("SELECT token FROM devices WHERE env = :env"), {"env": TEST_ENV}
+            )
+        }
+
+
+@pytest.mark.asyncio
+async def test_broadcast_sends_to_every_device_and_removes_dead_tokens(audience_devices, tmp_path):
+    sender = FakeSender()
+    checkpoint = tmp_path / "checkpoint.json"
+
+    stats = await broadcast(
+        "Title", "Body", Audience(env=TEST_ENV),
+        concurrency=2, page_size=2, checkpoint_path=checkpoint, sender=sender
+    )
+
+    assert sorted(sender.sent_tokens) == sorted(audience_devices)
+    assert (stats.devices, stats.users) == (5, 3)
+    assert (stats.sent, stats.failed, stats.removed) == (4, 0, 1)
+    assert sender.max_in_flight <= 2
+    assert "dead-1-1" not in _remaining_tokens()
+    assert '"completed": true' in checkpoint.read_text()
+
+    with db.engine.connect() as conn:
+        logged = conn.execute(
+            sqlalchemy.text("""
+                SELECT status, COUNT(*) FROM notification_logs
+                WHERE device_token = ANY(:tokens) AND title = 'Title'
+                GROUP BY status
+            """),
+            {"tokens": audience_devices}
+        ).fetchall()
+    assert dict(logged) == {"sent": 4, "failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_interrupted_broadcast_resumes_without_resending(audience_devices, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    audience = Audience(env=TEST_ENV)
+
+    # Interrupted during the second page: only the first page is checkpointed
+    first_sender = FakeSender(fail_after=2)
+    with pytest.raises(asyncio.CancelledError):
+        await broadcast("Title", "Body", audience, page_size=2, checkpoint_path=checkpoint, sender=first_sender)
+
+    # Starting again without --resume refuses to clobber the checkpoint
+    with pytest.raises(FileExistsError):
+        await broadcast("Title", "Body", audience, page_size=2, checkpoint_path=checkpoint, sender=FakeSender())
+
+    second_sender = FakeSender()
+    stats = await broadcast(
+        "Title", "Body", audience, page_size=2, checkpoint_path=checkpoint, resume=True, sender=second_sender
+    )
+
+    first_page = audience_devices[:2]
+    assert set(second_sender.sent_tokens).isdisjoint(first_page)
+    assert set(first_page) | set(second_sender.sent_tokens) == set(audience_devices)
+    # Totals are cumulative across the resume
+    assert stats.processed == 5
+
+
+@pytest.mark.asyncio
+async def test_resume_rejects_checkpoint_of_different_broadcast(audience_devices, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    await broadcast("Title", "Body", Audience(env=TEST_ENV), checkpoint_path=checkpoint, sender=FakeSender())
+
+    with pytest.raises(ValueError):
+        await broadcast(
+            "Other title", "Body", Audience(env=TEST_ENV), checkpoint_path=checkpoint, resume=True, sender=FakeSender()
+        )
+
+
+@pytest.mark.asyncio
+async def test_audience_filters(audience_devices, tmp_path):
+    sender = FakeSender()
+
+    stats = await broadcast(
+        "Title", "Body", Audience(env=TEST_ENV, tier="plus"),
+        checkpoint_path=tmp_path / "plus.json", sender=sender
+    )
+
+    assert sorted(sender.sent_tokens) == ["token-0-0", "token-0-1"]
+    assert stats.users == 1
+
+
+@pytest.mark.asyncio
+async def test_dry_run_reports_audience_without_sending(audience_devices, tmp_path, capsys):
+    sender = FakeSender()
+    checkpoint = tmp_path / "dry.json"
+
+    stats = await broadcast(
+        "Title", "Body", Audience(env=TEST_ENV), dry_run=True,
+        concurrency=10, rate=2, checkpoint_path=checkpoint, sender=sender
+    )
+
+    assert sender.sent_tokens == []
+    assert (stats.devices, stats.users) == (5, 3)
+    assert not checkpoint.exists()
+    output = capsys.readouterr().out
+    assert "5 device(s), 3 user(s)" in output
+    assert "Estimated duration: 0m02s" in output
+
+
+def test_estimate_is_capped_by_rate_limit():
+    # 50 in flight at 100ms each is 500/s unless the rate limit is lower
+    assert estimate_seconds(100_000, 50, None) == 200
+    assert estimate_seconds(100_000, 50, 100) == 1000
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_attempts():
+    limiter = RateLimiter(100)
+
+    started = time.monotonic()
+    for _ in range(5):
+        await limiter.acquire()
+
+    assert time.monotonic() - started >= 0.04
@@ -0,0 +1,167 @@
+"""Tests for friendship adjacency lookups and the friend-set cache"""
+from datetime import datetime
+
+import pytest
+import sqlalchemy
+
+from src import database as db
+from src.api.friends import _create_friendship, remove_friend
+from src.services import friendships
+from tests.query_budget import assert_max_queries
+
+
+def _create_user(connection, email: str) -> int:
+    connection.execute(sqlalchemy.text("DELETE FROM users WHERE email = :email"), {"email": email})
+    return connection.execute(
+        sqlalchemy.text(
+            """
+            INSERT INTO users (email, first_name, last_name, age, created_at, subscription_tier)
+            VALUES (:email, 'Friend', 'Graph', 30, :created_at, 'free')
+            RETURNING id
+            """
+        ),
+        {"email": email, "created_at": datetime.utcnow()}
+    ).scalar_one()
+
+
+@pytest.fixture
+def users():
+    friendships.clear_friend_cache()
+    with db.engine.begin() as connection:
+        ids = [_create_user(connection, f"friendgraph{i}@homeboundapp.com") for i in range(4)]
+    yield ids
+    friendships.clear_friend_cache()
+    with db.engine.begin() as connection:
+        connection.execute(
+            sqlalchemy.text("DELETE FROM friendships WHERE user_id_1 = ANY(:ids) OR user_id_2 = ANY(:ids)"),
+            {"ids": ids}
+        )
+        connection.execute(sqlalchemy.text("DELETE FROM users WHERE id = ANY(:ids)"), {"ids": ids})
+
+
+def test_friend_ids_covers_both_sides_of_the_pair(users):
+    lower, me, higher = sorted(users[:3])
+    stranger = users[3]
+    with db.engine.begin() as connection:
+        _create_friendship(connection, me, lower)
+        _create_friendship(connection, me, higher)
+
+    with db.engine.begin() as connection:
+        assert friendships.friend_ids(connection, me) == {lower, higher}
+        assert friendships.friend_ids(connection, lower) == {me}
+        assert friendships.is_friend(connection, higher, me)
+        assert not friendships.is_friend(connection, me, stranger)
+
+
+def test_non_friends_checks_many_ids_with_one_query(users):
+    me, friend, other, stranger = users
+    with db.engine.begin() as connection:
+        _create_friendship(connection, me, friend)
+        _create_friendship(connection, me, other)
+
+    with db.engine.begin() as connection:
+        with assert_max_queries(1):
+            assert friendships.non_friends(connection, me, [friend, None, stranger, other, 999999999]) == [
+                stranger, 999999999
+            ]
+        assert friendships.non_friends(connection, me, [friend, other]) == []
+        with assert_max_queries(0):
+            assert friendships.non_friends(connection, me, [None]) == []
+
+
+def test_non_friends_ignores_cached_friend_set(users):
+    """Write-path validation sees a friendship removed behind the cache's back"""
+    me, friend, _, _ = users
+    with db.engine.begin() as connection:
+        _create_friendship(connection, me, friend)
+
+    with db.engine.begin() as connection:
+        assert friendships.is_friend(connection, me, friend)
+        connection.execute(
+            sqlalchemy.text("DELETE FROM friendships WHERE user_id_1 = :id1 AND user_id_2 = :id2"),
+            {"id1": min(me, friend), "id2": max(me, friend)}
+        )
+        # Read paths keep the cached set; validation doesn't
+        assert friendships.is_friend(connection, me, friend)
+        assert friendships.non_friends(connection, me, [friend]) == [friend]
+
+
+def test_friend_set_is_cached_until_invalidated(users):
+    me, friend, other, _ = users
+    with db.engine.begin() as connection:
+        _create_friendship(connection, me, friend)
+
+    with db.engine.begin() as connection:
+        friendships.friend_ids(connection, me)
+        with assert_max_queries(0):
+            assert friendships.friend_ids(connection, me) == {friend}
+
+        # Written behind the cache's back: not visible until invalidated
+        connection.execute(
+            sqlalchemy.text("INSERT INTO friendships (user_id_1, user_id_2) VALUES (:id1, :id2)"),
+            {"id1": min(me, other), "id2": max(me, other)}
+        )
+        assert friendships.friend_ids(connection, me) == {friend}
+        friendships.invalidate(me)
+        assert friendships.friend_ids(connection, me) == {friend, other}
+
+
+def test_create_and_remove_friendship_invalidate_both_users(users):
+    me, friend, _, _ = users
+    with db.engine.begin() as connection:
+        assert friendships.friend_ids(connection, me) == frozenset()
+        assert friendships.friend_ids(connection, friend) == frozenset()
+
+    with friendships.invalidating() as changed, db.engine.begin() as connection:
+        _create_friendship(connection, me, friend)
+        changed.update((me, friend))
+
+    with db.engine.begin() as connection:
+        assert friendships.is_friend(connection, me, friend)
+        assert friendships.is_friend(connection, friend, me)
+
+    remove_friend(friend, user_id=me)
+
+    with db.engine.begin() as connection:
+        assert not friendships.is_friend(connection, me, friend)
+        assert not friendships.is_friend(connection, friend, me)
+
+
+def test_rolled_back_friendship_is_not_left_in_cache(users):
+    me, friend, _, _ = users
+    with pytest.raises(RuntimeError):
+        with friendships.invalidating() as changed, db.engine.begin() as connection:
+            _create_friendship(connection, me, friend)
+            changed.update((me, friend))
+            # Read inside the writing transaction sees the uncommitted row
+            assert friendships.is_friend(connection, me, friend)
+            raise RuntimeError("abort")
+
+    with db.engine.begin() as connection:
+        assert not friendships.is_friend(connection, me, friend)
+
+
+def test_set_cached_before_commit_is_dropped_after_it(users):
+    """A concurrent read between the write and its commit doesn't outlive the commit"""
+    me, friend, _, _ = users
+    with friendships.invalidating() as changed, db.engine.begin() as connection:
+        _create_friendship(connection, me, friend)
+        changed.update((me, friend))
+        # Another request, on its own connection, still sees (and caches) the old set
+        with db.engine.begin() as other:
+            assert friendships.friend_ids(other, me) == frozenset()
+
+    with db.engine.begin() as connection:
+        assert friendships.is_friend(connection, me, friend)
+
+
+def test_zero_ttl_disables_cache(users, monkeypatch):
+    me, _, _, _ = users
+    monkeypatch.setattr(friendships.settings, "FRIEND_CACHE_TTL_SECONDS", 0)
+
+    with db.engine.begin() as connection:
+        friendships.friend_ids(connection, me)
+        with assert_max_queries(1) as stats:
+            friendships.friend_ids(connection, me)
+
+    assert stats.query_count == 1
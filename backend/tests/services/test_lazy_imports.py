@@ -0,0 +1,26 @@
+"""Tests for deferred module imports"""
+import sys
+
+import pytest
+
+from src.services.lazy_imports import lazy_import
+
+
+def test_module_executes_on_first_attribute_access():
+    sys.modules.pop("colorsys", None)
+    module = lazy_import("colorsys")
+
+    assert sys.modules["colorsys"] is module
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert lazy_import("colorsys") is module
+
+
+def test_already_imported_module_is_returned_as_is():
+    import json
+
+    assert lazy_import("json") is json
+
+
+def test_missing_module_raises_eagerly():
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import("homebound_no_such_module")
@@ -0,0 +1,176 @@
+"""Tests for compact live location track storage"""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy
+
+from src import database as db
+from src.services import live_tracks
+from src.services.live_tracks import TrackPoint
+
+
+def test_encode_track_matches_polyline_reference():
+    points = [
+        TrackPoint(38.5, -120.2, datetime(2026, 1, 1, 12, 0, 0, 250000)),
+        TrackPoint(40.7, -120.95, datetime(2026, 1, 1, 12, 0, 10, 900000)),
+        TrackPoint(43.252, -126.453, datetime(2026, 1, 1, 12, 1, 0)),
+    ]
+
+    started_at, path, offsets = live_tracks.encode_track(points)
+
+    # Reference string from Google's encoded polyline algorithm documentation
+    assert path == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert started_at == datetime(2026, 1, 1, 12, 0, 0)
+    assert [
+        (point.latitude, point.longitude, point.timestamp)
+        for point in live_tracks.decode_track(started_at, path, offsets)
+    ] == [
+        (38.5, -120.2, datetime(2026, 1, 1, 12, 0, 0)),
+        (40.7, -120.95, datetime(2026, 1, 1, 12, 0, 10)),
+        (43.252, -126.453, datetime(2026, 1, 1, 12, 1, 0)),
+    ]
+
+
+def test_encoded_walk_is_compact():
+    start = datetime(2026, 1, 1)
+    points = [
+        TrackPoint(37.7749 + i * 0.00012, -122.4194 - i * 0.00007, start + timedelta(seconds=10 * i))
+        for i in range(100)
+    ]
+
+    _, path, offsets = live_tracks.encode_track(points)
+
+    assert len(path) + len(offsets) < 500
+
+
+@pytest.fixture
+def track():
+    now = datetime.utcnow()
+    with db.engine.begin() as connection:
+        connection.execute(sqlalchemy.text("DELETE FROM users WHERE email = 'livetracks@homeboundapp.com'"))
+        user_id = connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO users (email, first_name, last_name, age, created_at, subscription_tier)
+                VALUES ('livetracks@homeboundapp.com', 'Live', 'Tracks', 30, :now, 'free')
+                RETURNING id
+                """
+            ),
+            {"now": now}
+        ).scalar_one()
+        trip_id = connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO trips (user_id, title, activity, start, eta, grace_min, location_text,
+                                   gen_lat, gen_lon, status, created_at, share_live_location)
+                VALUES (:user_id, 'Track', (SELECT id FROM activities LIMIT 1), :now, :eta, 30, 'Trail',
+                        37.7, -122.4, 'active', :now, true)
+                RETURNING id
+                """
+            ),
+            {"user_id": user_id, "now": now, "eta": now + timedelta(hours=2)}
+        ).scalar_one()
+    yield trip_id, user_id
+    with db.engine.begin() as connection:
+        # Trip children cascade
+        connection.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :id"), {"id": trip_id})
+        connection.execute(sqlalchemy.text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+
+
+def _insert_fixes(connection, trip_id: int, user_id: int, start: datetime, count: int):
+    for i in range(count):
+        connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO live_locations (trip_id, user_id, latitude, longitude, timestamp)
+                VALUES (:trip_id, :user_id, :lat, -122.4, :ts)
+                """
+            ),
+            {"trip_id": trip_id, "user_id": user_id, "lat": 37.7 + i * 0.0001, "ts": start + timedelta(seconds=10 * i)}
+        )
+
+
+def _count(connection, table: str, trip_id: int) -> int:
+    return connection.execute(
+        sqlalchemy.text(f"SELECT COUNT(*) FROM {table} WHERE trip_id = :trip_id"), {"trip_id": trip_id}
+    ).scalar_one()
+
+
+def test_compact_if_needed_waits_for_a_full_chunk(track):
+    trip_id, user_id = track
+    full = live_tracks.TRACK_TAIL_POINTS + live_tracks.TRACK_CHUNK_POINTS
+    start = datetime.utcnow() - timedelta(hours=2)
+
+    with db.engine.begin() as connection:
+        _insert_fixes(connection, trip_id, user_id, start, full)
+        assert live_tracks.compact_if_needed(connection, trip_id, user_id) == 0
+
+        _insert_fixes(connection, trip_id, user_id, start + timedelta(seconds=10 * full), 1)
+        assert live_tracks.compact_if_needed(connection, trip_id, user_id) == live_tracks.TRACK_CHUNK_POINTS + 1
+
+        assert _count(connection, "live_locations", trip_id) == live_tracks.TRACK_TAIL_POINTS
+        assert _count(connection, "live_location_tracks", trip_id) == 1
+
+
+def test_concurrent_compactions_pack_each_fix_once(track):
+    """A compaction racing another one waits for it and then finds nothing left to move"""
+    trip_id, user_id = track
+    start = datetime.utcnow() - timedelta(hours=2)
+    with db.engine.begin() as connection:
+        _insert_fixes(connection, trip_id, user_id, start, 60)
+
+    racing = []
+    with db.engine.connect() as first:
+        first.begin()
+        assert live_tracks.compact(first, trip_id, user_id) == 60 - live_tracks.TRACK_TAIL_POINTS
+
+        def compact_second():
+            with db.engine.begin() as second:
+                racing.append(live_tracks.compact(second, trip_id, user_id))
+
+        thread = threading.Thread(target=compact_second)
+        thread.start()
+        thread.join(0.5)
+        # Blocked on the rows the first compaction deleted
+        assert thread.is_alive()
+        first.commit()
+        thread.join(10)
+
+    assert racing == [0]
+    with db.engine.begin() as connection:
+        assert _count(connection, "live_location_tracks", trip_id) == 1
+        assert _count(connection, "live_locations", trip_id) == live_tracks.TRACK_TAIL_POINTS
+
+
+def test_load_track_merges_chunks_tail_and_late_fixes(track):
+    trip_id, user_id = track
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(hours=2)
+
+    with db.engine.begin() as connection:
+        # Fixes from 10 to 20 minutes in, compacted
+        _insert_fixes(connection, trip_id, user_id, start + timedelta(minutes=10), 60)
+        live_tracks.compact(connection, trip_id, user_id)
+        # An offline batch from the first 10 minutes arrives afterwards
+        _insert_fixes(connection, trip_id, user_id, start, 60)
+        live_tracks.compact(connection, trip_id, user_id)
+
+        points = live_tracks.load_track(connection, trip_id, user_id)
+
+    assert len(points) == 120
+    assert points == sorted(points, key=lambda point: point.timestamp)
+    assert points[0].timestamp == start
+    assert points[-1].timestamp - points[0].timestamp == timedelta(seconds=1190)
+
+
+def test_load_track_drops_fixes_repeated_across_chunk_and_tail(track):
+    trip_id, user_id = track
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+
+    with db.engine.begin() as connection:
+        _insert_fixes(connection, trip_id, user_id, start, 50)
+        live_tracks.compact(connection, trip_id, user_id)
+        # A retried upload re-sends fixes that were already compacted
+        _insert_fixes(connection, trip_id, user_id, start, 5)
+
+        assert len(live_tracks.load_track(connection, trip_id, user_id)) == 50
@@ -0,0 +1,243 @@
+"""Tests for per-request SQL instrumentation and the metrics registry"""
+import pytest
+import sqlalchemy
+from fastapi.testclient import TestClient
+
+from src import database as db
+from src.api import metrics as metrics_api
+from src.api.server import app
+from src.services import metrics
+from src.services import query_metrics
+from src.services.query_metrics import current_stats, server_timing_header, track_queries
+from tests.aio import run_async
+from tests.query_budget import assert_max_queries
+
+client = TestClient(app)
+
+
+def test_track_queries_counts_and_times_statements():
+    """Statements inside the block are attributed to its stats"""
+    with track_queries(record_statements=True) as stats:
+        with db.engine.begin() as conn:
+            conn.execute(sqlalchemy.text("SELECT 1"))
+            conn.execute(sqlalchemy.text("SELECT pg_sleep(0.02)"))
+
+    assert stats.query_count == 2
+    assert stats.db_seconds >= 0.02
+    assert stats.slowest_seconds >= 0.02
+    assert "pg_sleep" in stats.slowest_statement
+    assert stats.statements == ["SELECT 1", "SELECT pg_sleep(0.02)"]
+    assert stats.pool_wait_seconds >= 0
+
+
+def test_queries_outside_tracking_are_not_attributed():
+    """SQL run outside any request or block is ignored"""
+    with track_queries() as stats:
+        pass
+
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("SELECT 1"))
+
+    assert current_stats() is None
+    assert stats.query_count == 0
+
+
+def test_assert_max_queries_passes_within_budget():
+    with assert_max_queries(1) as stats:
+        with db.engine.begin() as conn:
+            conn.execute(sqlalchemy.text("SELECT 1"))
+    assert stats.query_count == 1
+
+
+def test_assert_max_queries_reports_statements_over_budget():
+    with pytest.raises(AssertionError) as exc_info:
+        with assert_max_queries(1):
+            with db.engine.begin() as conn:
+                conn.execute(sqlalchemy.text("SELECT 1"))
+                conn.execute(sqlalchemy.text("SELECT 2"))
+
+    message = str(exc_info.value)
+    assert "2 statements executed, budget is 1" in message
+    assert "SELECT 2" in message
+
+
+def _pool_gauge(pool: str, state: str) -> float:
+    return metrics.gauge("homebound_db_pool_connections", "", ("pool", "state")).value(pool=pool, state=state)
+
+
+def _test_engine(name: str, **kwargs):
+    engine = sqlalchemy.create_engine(
+        db.engine.url, poolclass=query_metrics.TimedQueuePool, pool_logging_name=name, **kwargs
+    )
+    query_metrics.install(engine)
+    return engine
+
+
+def test_api_and_scheduler_use_separate_pools():
+    assert db.scheduler_engine.pool is not db.engine.pool
+    assert query_metrics.pool_name(db.engine.pool) == "api"
+    assert query_metrics.pool_name(db.scheduler_engine.pool) == "scheduler"
+
+
+def test_scheduler_jobs_route_shared_helpers_to_scheduler_pool():
+    """Helpers a job reaches, even through asyncio.to_thread, connect to the scheduler pool"""
+    import asyncio
+
+    from src.services.scheduler import _on_scheduler_pool
+
+    def helper_pool():
+        return query_metrics.pool_name(db.current_engine().pool)
+
+    async def job():
+        return await asyncio.to_thread(helper_pool)
+
+    assert run_async(_on_scheduler_pool(job)()) == "scheduler"
+    assert helper_pool() == "api"
+
+
+def test_async_engine_queries_are_tracked_per_loop():
+    """Async endpoints get their own pool per event loop, and their statements count too"""
+    async def query():
+        engine = db.async_engine()
+        assert db.async_engine() is engine
+        async with engine.connect() as conn:
+            await conn.execute(sqlalchemy.text("SELECT 1"))
+        return query_metrics.pool_name(engine.sync_engine.pool)
+
+    with track_queries() as stats:
+        assert run_async(query()) == "api_async"
+        assert run_async(query()) == "api_async"
+
+    assert stats.query_count == 2
+
+
+def test_pool_gauges_track_checkouts():
+    """In-use and idle gauges follow checkout and checkin; waits land in the histogram"""
+    wait_histogram = metrics.histogram("homebound_db_pool_checkout_wait_seconds", "", ("pool",))
+    waits_before = wait_histogram.count(pool="api")
+
+    with db.engine.connect() as conn:
+        conn.execute(sqlalchemy.text("SELECT 1"))
+        in_use = _pool_gauge("api", "in_use")
+        assert in_use >= 1
+
+    assert _pool_gauge("api", "in_use") == in_use - 1
+    assert _pool_gauge("api", "idle") >= 1
+    assert wait_histogram.count(pool="api") > waits_before
+
+
+def test_pool_timeout_is_counted():
+    engine = _test_engine("test_timeout", pool_size=1, max_overflow=0, pool_timeout=0.05)
+    timeouts = metrics.counter("homebound_db_pool_timeouts_total", "", ("pool",))
+    try:
+        with engine.connect():
+            with pytest.raises(sqlalchemy.exc.TimeoutError):
+                engine.connect()
+        assert timeouts.value(pool="test_timeout") == 1
+    finally:
+        engine.dispose()
+
+
+def test_disconnect_without_pre_ping_invalidates_and_is_counted():
+    """With pre-ping off, a dead connection fails once, is counted, and the pool reconnects"""
+    engine = _test_engine("test_disconnect", pool_size=1, max_overflow=0, pool_pre_ping=False)
+    disconnects = metrics.counter("homebound_db_pool_disconnects_total", "", ("pool",))
+    try:
+        with engine.connect() as conn:
+            backend_pid = conn.execute(sqlalchemy.text("SELECT pg_backend_pid()")).scalar()
+        with db.engine.begin() as admin:
+            admin.execute(sqlalchemy.text("SELECT pg_terminate_backend(:pid)"), {"pid": backend_pid})
+
+        with pytest.raises(sqlalchemy.exc.OperationalError):
+            with engine.connect() as conn:
+                conn.execute(sqlalchemy.text("SELECT 1"))
+        assert disconnects.value(pool="test_disconnect") == 1
+
+        with engine.connect() as conn:
+            assert conn.execute(sqlalchemy.text("SELECT 1")).scalar() == 1
+    finally:
+        engine.dispose()
+
+
+def test_server_timing_header_format():
+    with track_queries() as stats:
+        pass
+    stats.record("SELECT 1", 0.0125)
+
+    header = server_timing_header(stats, 0.05)
+
+    assert header == 'db;dur=12.5;desc="1 queries", db-pool;dur=0.0, app;dur=50.0'
+
+
+def test_middleware_adds_server_timing_header():
+    response = client.get("/api/v1/stats/global")
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert 'desc="2 queries"' in timing
+    assert "db-pool;dur=" in timing
+    assert "app;dur=" in timing
+
+
+def test_middleware_records_route_metrics():
+    counter = metrics.counter(
+        "homebound_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+    )
+    before = counter.value(method="GET", route="/api/v1/stats/global", status="200")
+
+    client.get("/api/v1/stats/global")
+
+    assert counter.value(method="GET", route="/api/v1/stats/global", status="200") == before + 1
+    body = client.get("/metrics").text
+    assert 'homebound_db_queries_per_request_bucket{method="GET",route="/api/v1/stats/global",le="2"}' in body
+
+
+def test_metrics_endpoint_open_in_dev_mode():
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE homebound_http_requests_total counter" in response.text
+
+
+def test_metrics_endpoint_requires_token_in_production(monkeypatch):
+    monkeypatch.setattr(metrics_api.settings, "DEV_MODE", False)
+
+    monkeypatch.setattr(metrics_api.settings, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(metrics_api.settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_latency_seconds", "Test histogram", ("job",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, job="a")
+    histogram.observe(0.5, job="a")
+    histogram.observe(5.0, job="a")
+
+    lines = histogram.render()
+
+    assert 'test_latency_seconds_bucket{job="a",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{job="a",le="1"} 2' in lines
+    assert 'test_latency_seconds_bucket{job="a",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_sum{job="a"} 5.55' in lines
+    assert 'test_latency_seconds_count{job="a"} 3' in lines
+
+
+def test_metric_labels_must_match():
+    counter = metrics.Counter("test_events_total", "Test counter", ("kind",))
+
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_registering_same_metric_returns_existing():
+    first = metrics.counter("test_registry_total", "Test counter", ("kind",))
+    second = metrics.counter("test_registry_total", "Test counter", ("kind",))
+
+    assert first is second
+    with pytest.raises(ValueError):
+        metrics.gauge("test_registry_total", "Conflicting gauge")
@@ -0,0 +1,219 @@
+"""Tests for trip notification recipient planning"""
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy
+
+from src import database as db
+from src.services import recipients
+from tests.query_budget import assert_max_queries
+
+NAMES = ["owner", "alice", "bob", "friend", "offline"]
+
+
+def _create_user(connection, name: str) -> int:
+    email = f"recipients_{name}@homeboundapp.com"
+    connection.execute(sqlalchemy.text("DELETE FROM users WHERE email = :email"), {"email": email})
+    return connection.execute(
+        sqlalchemy.text(
+            """
+            INSERT INTO users (email, first_name, last_name, age, created_at, subscription_tier)
+            VALUES (:email, :first_name, 'Planner', 30, :created_at, 'free')
+            RETURNING id
+            """
+        ),
+        {"email": email, "first_name": name.title(), "created_at": datetime.utcnow()}
+    ).scalar_one()
+
+
+def _create_contact(connection, user_id: int, name: str, email: str) -> int:
+    return connection.execute(
+        sqlalchemy.text("INSERT INTO contacts (user_id, name, email) VALUES (:user_id, :name, :email) RETURNING id"),
+        {"user_id": user_id, "name": name, "email": email}
+    ).scalar_one()
+
+
+def _execute(connection, sql: str, **params):
+    connection.execute(sqlalchemy.text(sql), params)
+
+
+@pytest.fixture
+def group_trip():
+    """A group trip whose audience overlaps across roles.
+
+    - alice and bob are accepted participants; alice has trip reminders off
+    - bob is also one of the owner's friend safety contacts
+    - friend (has a device) watches both the owner and alice
+    - offline (no device) watches bob
+    - the owner's email contact and alice's email contact share an address
+    """
+    with db.engine.begin() as connection:
+        users = {name: _create_user(connection, name) for name in NAMES}
+        owner = users["owner"]
+        _execute(connection, "UPDATE users SET notify_trip_reminders = false WHERE id = :id", id=users["alice"])
+        for name in ("owner", "alice", "bob", "friend"):
+            _execute(
+                connection,
+                """
+                INSERT INTO devices (user_id, platform, token, bundle_id, env)
+                VALUES (:user_id, 'ios', :token, 'com.homeboundapp.test', 'sandbox')
+                """,
+                user_id=users[name], token=f"recipients-{name}"
+            )
+
+        owner_contact = _create_contact(connection, owner, "Mom", "family@example.com")
+        alice_contact = _create_contact(connection, users["alice"], "Alice's Mom", "Family@example.com")
+        trip_id = connection.execute(
+            sqlalchemy.text(
+                """
+                INSERT INTO trips (user_id, activity, title, status, start, eta, grace_min, location_text,
+                                   gen_lat, gen_lon, contact1, created_at, is_group_trip, notify_self)
+                VALUES (:user_id, (SELECT id FROM activities LIMIT 1), 'Planner Trip', 'active', :start, :eta,
+                        30, 'Trailhead', 37.7749, -122.4194, :contact1, NOW(), true, true)
+                RETURNING id
+                """
+            ),
+            {
+                "user_id": owner, "contact1": owner_contact,
+                "start": datetime.utcnow() - timedelta(hours=1), "eta": datetime.utcnow() + timedelta(hours=1)
+            }
+        ).scalar_one()
+
+        _execute(
+            connection,
+            "INSERT INTO trip_participants (trip_id, user_id, role, status) VALUES (:trip_id, :user_id, 'owner', 'accepted')",
+            trip_id=trip_id, user_id=owner
+        )
+        for name in ("alice", "bob"):
+            _execute(
+                connection,
+                """
+                INSERT INTO trip_participants (trip_id, user_id, role, status, invited_by)
+                VALUES (:trip_id, :user_id, 'participant', 'accepted', :owner)
+                """,
+                trip_id=trip_id, user_id=users[name], owner=owner
+            )
+        for position, name in enumerate(("friend", "bob"), start=1):
+            _execute(
+                connection,
+                "INSERT INTO trip_safety_contacts (trip_id, friend_user_id, position) VALUES (:trip_id, :friend, :position)",
+                trip_id=trip_id, friend=users[name], position=position
+            )
+        for participant, contact_id, friend, position in [
+            ("alice", alice_contact, None, 1),
+            ("alice", None, users["friend"], 2),
+            ("bob", None, users["offline"], 1),
+        ]:
+            _execute(
+                connection,
+                """
+                INSERT INTO participant_trip_contacts (trip_id, participant_user_id, contact_id, friend_user_id, position)
+                VALUES (:trip_id, :participant, :contact_id, :friend, :position)
+                """,
+                trip_id=trip_id, participant=users[participant], contact_id=contact_id, friend=friend, position=position
+            )
+
+    yield {"trip_id": trip_id, "owner_contact": owner_contact, "alice_contact": alice_contact, **users}
+
+    with db.engine.begin() as connection:
+        ids = list(users.values())
+        for table in ("participant_trip_contacts", "trip_safety_contacts", "trip_participants"):
+            _execute(connection, f"DELETE FROM {table} WHERE trip_id = :trip_id", trip_id=trip_id)
+        _execute(connection, "DELETE FROM trips WHERE id = :trip_id", trip_id=trip_id)
+        _execute(connection, "DELETE FROM contacts WHERE user_id = ANY(:ids)", ids=ids)
+        _execute(connection, "DELETE FROM devices WHERE user_id = ANY(:ids)", ids=ids)
+        _execute(connection, "DELETE FROM users WHERE id = ANY(:ids)", ids=ids)
+
+
+def _plan(trip_id: int, event: str, actor_id: int | None = None) -> recipients.DeliveryPlan:
+    with db.engine.connect() as connection:
+        return recipients.plan_delivery(connection, trip_id, event, actor_id=actor_id)
+
+
+def test_audience_is_read_with_one_query(group_trip):
+    with db.engine.connect() as connection:
+        with assert_max_queries(1):
+            recipients.plan_delivery(connection, group_trip["trip_id"], "overdue")
+
+
+def test_overdue_reaches_everyone_once(group_trip):
+    plan = _plan(group_trip["trip_id"], "overdue")
+
+    # bob is pushed as a participant, not again as the owner's friend contact
+    assert plan.participant_pushes == [group_trip["alice"], group_trip["bob"]]
+    # friend watches two people but gets one push; offline has no device and is emailed
+    assert plan.friend_pushes == [group_trip["friend"]]
+    assert [c["email"] for c in plan.emails] == [
+        "family@example.com", "recipients_offline@homeboundapp.com"
+    ]
+    assert plan.emails[1]["id"] == -group_trip["offline"]
+    assert plan.emails[1]["watched_user_name"] == "Bob Planner"
+    assert plan.owner_name == "Owner Planner"
+    assert plan.owner_email == "recipients_owner@homeboundapp.com"
+    assert plan.participant_ids == [group_trip["alice"], group_trip["bob"]]
+    assert not plan.is_empty
+
+
+def test_trip_started_respects_push_preferences(group_trip):
+    plan = _plan(group_trip["trip_id"], "trip_started")
+
+    # alice turned trip reminders off; she still gets the background push via participant_ids
+    assert plan.participant_pushes == [group_trip["bob"]]
+    assert plan.skipped_by_preference == 1
+    assert plan.participant_ids == [group_trip["alice"], group_trip["bob"]]
+    # No fallback emails and no participant email contacts for trip start
+    assert plan.friend_pushes == [group_trip["friend"], group_trip["offline"]]
+    assert [c["email"] for c in plan.emails] == ["family@example.com"]
+
+
+def test_checkin_emails_are_personalized_per_watched_user(group_trip):
+    plan = _plan(group_trip["trip_id"], "checkin")
+
+    # The shared address watches two people, so it gets one email about each
+    assert [(c["id"], c["watched_user_name"]) for c in plan.emails if c["email"].lower() == "family@example.com"] == [
+        (group_trip["owner_contact"], "Owner Planner"),
+        (group_trip["alice_contact"], "Alice Planner"),
+    ]
+    assert plan.participant_pushes == []
+    # bob gets a friend push as the owner's safety contact
+    assert plan.friend_pushes == [group_trip["friend"], group_trip["bob"]]
+
+
+def test_participant_checkin_skips_the_actor_and_pushes_the_owner(group_trip):
+    plan = _plan(group_trip["trip_id"], "participant_checkin", actor_id=group_trip["bob"])
+
+    assert plan.participant_pushes == [group_trip["owner"], group_trip["alice"]]
+    assert plan.friend_pushes == [group_trip["friend"]]
+    assert group_trip["bob"] not in plan.friend_pushes
+    assert "recipients_offline@homeboundapp.com" in [c["email"] for c in plan.emails]
+
+
+def test_missing_trip_plans_nothing():
+    plan = _plan(999999999, "overdue")
+    assert plan.is_empty
+    assert plan.owner_id is None
+
+
+def test_overdue_resolved_reaches_everyone_the_alert_did(group_trip):
+    overdue = _plan(group_trip["trip_id"], "overdue")
+    resolved = _plan(group_trip["trip_id"], "overdue_resolved", actor_id=group_trip["owner"])
+
+    assert resolved.participant_pushes == overdue.participant_pushes
+    assert resolved.friend_pushes == overdue.friend_pushes
+    assert [c["email"] for c in resolved.emails] == [c["email"] for c in overdue.emails]
+
+
+def test_checkout_by_a_participant_pushes_the_owner(group_trip):
+    plan = _plan(group_trip["trip_id"], "checkout", actor_id=group_trip["bob"])
+
+    assert plan.participant_pushes == [group_trip["owner"], group_trip["alice"]]
+    assert plan.friend_pushes == [group_trip["friend"]]
+    assert "recipients_offline@homeboundapp.com" in [c["email"] for c in plan.emails]
+
+
+def test_extended_leaves_participants_to_refresh_pushes(group_trip):
+    plan = _plan(group_trip["trip_id"], "extended", actor_id=group_trip["owner"])
+
+    assert plan.participant_pushes == []
+    assert plan.participant_ids == [group_trip["alice"], group_trip["bob"]]
+    assert plan.friend_pushes == [group_trip["friend"], group_trip["bob"]]
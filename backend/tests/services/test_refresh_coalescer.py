@@ -0,0 +1,168 @@
+"""Tests for data-refresh push coalescing"""
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.services import notifications
+from src.services.refresh_coalescer import RefreshCoalescer, refresh_pushes_coalesced
+
+
+def _recorder() -> tuple[list, RefreshCoalescer]:
+    sent = []
+
+    async def send(pending):
+        sent.append(pending)
+
+    return sent, RefreshCoalescer(send=send)
+
+
+def test_signals_for_same_user_sync_type_and_trip_merge_into_one_push():
+    sent, coalescer = _recorder()
+    coalesced_before = refresh_pushes_coalesced.value(sync="trip")
+
+    async def run():
+        coalescer.start()
+        assert coalescer.signal(1, "trip", 10, window=60) is True
+        assert coalescer.signal(1, "trip", 10, window=60) is False
+        assert coalescer.signal(1, "trip", 10, window=60) is False
+        await coalescer.stop()
+
+    asyncio.run(run())
+
+    assert len(sent) == 1
+    assert sent[0].signals == 3
+    assert sent[0].collapse_id == "refresh-trip"
+    assert sent[0].payload() == {"sync": "trip", "trip_id": "10"}
+    assert refresh_pushes_coalesced.value(sync="trip") - coalesced_before == 2
+
+
+def test_users_sync_types_and_trips_are_sent_separately():
+    sent, coalescer = _recorder()
+
+    async def run():
+        coalescer.start()
+        coalescer.signal(1, "trip", 10, window=60)
+        coalescer.signal(1, "trip", 11, window=60)
+        coalescer.signal(2, "trip", 10, window=60)
+        coalescer.signal(1, "friends", None, window=60)
+        await coalescer.stop()
+
+    asyncio.run(run())
+
+    assert sorted((p.user_id, p.sync_type, p.trip_id or 0) for p in sent) == [
+        (1, "friends", 0), (1, "trip", 10), (1, "trip", 11), (2, "trip", 10)
+    ]
+    assert next(p for p in sent if p.sync_type == "friends").payload() == {"sync": "friends"}
+
+
+def test_pending_push_is_sent_on_the_loop_when_window_elapses():
+    sent, coalescer = _recorder()
+
+    async def run():
+        coalescer.start()
+        coalescer.signal(1, "trip", 10, window=0.05)
+        coalescer.signal(1, "trip", 10, window=0.05)
+        assert coalescer.pending_count() == 1
+
+        for _ in range(200):
+            if sent:
+                break
+            await asyncio.sleep(0.01)
+        assert len(sent) == 1
+        assert coalescer.pending_count() == 0
+
+        # A signal after the flush starts a new push
+        assert coalescer.signal(1, "trip", 10, window=60) is True
+        await coalescer.stop()
+
+    threads_before = threading.active_count()
+    asyncio.run(run())
+
+    assert len(sent) == 2
+    assert threading.active_count() == threads_before
+
+
+def test_signals_from_worker_threads_are_scheduled_on_the_loop():
+    sent, coalescer = _recorder()
+
+    async def run():
+        coalescer.start()
+        # Sync endpoints' background tasks signal from the threadpool
+        await asyncio.gather(*(
+            asyncio.to_thread(coalescer.signal, user_id, "trip", 10, 0.05) for user_id in (1, 2, 3)
+        ))
+        for _ in range(200):
+            if len(sent) == 3:
+                break
+            await asyncio.sleep(0.01)
+        await coalescer.stop()
+
+    asyncio.run(run())
+
+    assert sorted(p.user_id for p in sent) == [1, 2, 3]
+
+
+def test_signal_requires_a_running_coalescer():
+    _, coalescer = _recorder()
+
+    assert coalescer.running is False
+    with pytest.raises(RuntimeError):
+        coalescer.signal(1, "trip", 10, window=60)
+
+
+def test_send_failure_is_logged_not_raised():
+    async def fail(pending):
+        raise RuntimeError("APNs down")
+
+    coalescer = RefreshCoalescer(send=fail)
+
+    async def run():
+        coalescer.start()
+        coalescer.signal(1, "trip", 10, window=60)
+        await coalescer.stop()
+
+    asyncio.run(run())
+
+    assert coalescer.pending_count() == 0
+
+
+def test_send_data_refresh_push_coalesces_with_collapse_id(monkeypatch):
+    monkeypatch.setattr(notifications.settings, "REFRESH_PUSH_COALESCE_SECONDS", 60)
+    mock_push = AsyncMock()
+
+    async def run():
+        notifications.refresh_coalescer.start()
+        try:
+            for _ in range(3):
+                await notifications.send_data_refresh_push(501, "trip", 77)
+            mock_push.assert_not_called()
+        finally:
+            await notifications.refresh_coalescer.stop()
+
+    with patch("src.services.notifications.send_background_push_to_user", mock_push):
+        asyncio.run(run())
+
+    mock_push.assert_awaited_once_with(501, data={"sync": "trip", "trip_id": "77"}, collapse_id="refresh-trip")
+
+
+def test_send_data_refresh_push_sends_immediately_when_coalescer_not_running(monkeypatch):
+    # e.g. a serverless function, which never runs the lifespan that starts it
+    monkeypatch.setattr(notifications.settings, "REFRESH_PUSH_COALESCE_SECONDS", 60)
+    mock_push = AsyncMock()
+
+    with patch("src.services.notifications.send_background_push_to_user", mock_push):
+        asyncio.run(notifications.send_data_refresh_push(503, "trip", 78))
+
+    mock_push.assert_awaited_once_with(503, data={"sync": "trip", "trip_id": "78"}, collapse_id="refresh-trip")
+
+
+def test_send_data_refresh_push_without_window_sends_immediately(monkeypatch):
+    monkeypatch.setattr(notifications.settings, "REFRESH_PUSH_COALESCE_SECONDS", 0)
+    mock_push = AsyncMock()
+
+    with patch("src.services.notifications.send_background_push_to_user", mock_push):
+        asyncio.run(notifications.send_data_refresh_push(502, "friends"))
+
+    mock_push.assert_awaited_once_with(502, data={"sync": "friends"}, collapse_id="refresh-friends")
@@ -0,0 +1,67 @@
+"""Tests for check-in reminder scheduling (next_reminder_at computation)"""
+from datetime import UTC, datetime
+
+from src.services.reminders import compute_next_reminder_at, fold_quiet_hours, in_active_hours
+
+
+def test_next_reminder_is_one_interval_later_without_quiet_hours():
+    after = datetime(2026, 6, 1, 3, 10)
+
+    assert compute_next_reminder_at(after, 45, None, None, "UTC") == datetime(2026, 6, 1, 3, 55)
+
+
+def test_next_reminder_uses_default_interval():
+    after = datetime(2026, 6, 1, 12, 0)
+
+    assert compute_next_reminder_at(after, None, None, None, None) == datetime(2026, 6, 1, 12, 30)
+
+
+def test_next_reminder_accepts_aware_datetimes():
+    after = datetime(2026, 6, 1, 12, 0, tzinfo=UTC)
+
+    result = compute_next_reminder_at(after, 30, None, None, "UTC")
+
+    assert result == datetime(2026, 6, 1, 12, 30)
+    assert result.tzinfo is None
+
+
+def test_reminder_due_in_quiet_hours_moves_to_start_of_active_hours():
+    # Active 8-20 UTC; due at 21:30 -> 08:00 next day
+    after = datetime(2026, 6, 1, 21, 0)
+
+    assert compute_next_reminder_at(after, 30, 8, 20, "UTC") == datetime(2026, 6, 2, 8, 0)
+
+
+def test_reminder_due_before_active_hours_moves_to_same_day_start():
+    after = datetime(2026, 6, 1, 5, 0)
+
+    assert compute_next_reminder_at(after, 30, 8, 20, "UTC") == datetime(2026, 6, 1, 8, 0)
+
+
+def test_overnight_active_hours_wrap():
+    # Active 22-02: 01:00 is active, 03:00 waits for 22:00
+    assert in_active_hours(22, 2, "UTC", at=datetime(2026, 6, 1, 1, 0))
+    assert not in_active_hours(22, 2, "UTC", at=datetime(2026, 6, 1, 3, 0))
+    assert fold_quiet_hours(datetime(2026, 6, 1, 3, 0), 22, 2, "UTC") == datetime(2026, 6, 1, 22, 0)
+
+
+def test_quiet_hours_evaluated_in_trip_timezone():
+    # 15:00 UTC is 08:00 in Los Angeles (PDT): inside 7-21 local
+    assert in_active_hours(7, 21, "America/Los_Angeles", at=datetime(2026, 6, 1, 15, 0))
+
+    # 05:00 UTC is 22:00 PDT the previous evening -> next 07:00 PDT is 14:00 UTC
+    folded = fold_quiet_hours(datetime(2026, 6, 1, 5, 0), 7, 21, "America/Los_Angeles")
+    assert folded == datetime(2026, 6, 1, 14, 0)
+
+
+def test_equal_start_and_end_never_loops():
+    # No active window: the fold still moves strictly forward, one day at a time
+    due = datetime(2026, 6, 1, 10, 0)
+
+    folded = fold_quiet_hours(due, 9, 9, "UTC")
+
+    assert folded == datetime(2026, 6, 2, 9, 0)
+
+
+def test_unknown_timezone_falls_back_to_utc():
+    assert compute_next_reminder_at(datetime(2026, 6, 1, 21, 0), 30, 8, 20, "Not/AZone") == datetime(2026, 6, 2, 8, 0)
@@ -0,0 +1,156 @@
+"""Tests for table retention policies"""
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import sqlalchemy
+
+from src import database as db
+from src.services import retention
+from src.services.retention import RetentionPolicy
+
+SCRATCH_TABLE = "retention_test_log"
+SCRATCH_POLICY = RetentionPolicy(SCRATCH_TABLE, "ts", timedelta(days=2), partition="day")
+
+
+@pytest.fixture
+def scratch_table():
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}"))
+        conn.execute(sqlalchemy.text(
+            f"CREATE TABLE {SCRATCH_TABLE} (id SERIAL, ts TIMESTAMP NOT NULL, PRIMARY KEY (id, ts)) "
+            "PARTITION BY RANGE (ts)"
+        ))
+        conn.execute(sqlalchemy.text(f"CREATE TABLE {SCRATCH_TABLE}_default PARTITION OF {SCRATCH_TABLE} DEFAULT"))
+    yield
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}"))
+
+
+def _scratch_rows() -> list[tuple[str, datetime]]:
+    with db.engine.begin() as conn:
+        return [
+            (row.partition, row.ts)
+            for row in conn.execute(sqlalchemy.text(
+                f"SELECT tableoid::regclass::text AS partition, ts FROM {SCRATCH_TABLE} ORDER BY ts"
+            ))
+        ]
+
+
+def test_partitions_are_created_ahead_and_dropped_when_expired(scratch_table):
+    with db.engine.begin() as conn:
+        for day in (5, 9, 10, 12):
+            conn.execute(
+                sqlalchemy.text(f"INSERT INTO {SCRATCH_TABLE} (ts) VALUES (:ts)"),
+                {"ts": datetime(2026, 3, day, 8)}
+            )
+
+    now = datetime(2026, 3, 10, 12, tzinfo=UTC)
+    assert retention.enforce_policy(db.engine, SCRATCH_POLICY, now) == (0, 1)
+
+    # Today and the next PARTITIONS_AHEAD days exist; their rows left the default partition
+    with db.engine.begin() as conn:
+        assert sorted(retention._partition_starts(conn, SCRATCH_POLICY)) == [
+            datetime(2026, 3, 10) + timedelta(days=offset) for offset in range(retention.PARTITIONS_AHEAD + 1)
+        ]
+    assert _scratch_rows() == [
+        (f"{SCRATCH_TABLE}_default", datetime(2026, 3, 9, 8)),
+        (f"{SCRATCH_TABLE}_p20260310", datetime(2026, 3, 10, 8)),
+        (f"{SCRATCH_TABLE}_p20260312", datetime(2026, 3, 12, 8)),
+    ]
+
+    # Cutoff 2026-03-11 12:00: the 03-10 partition is dropped whole, the 03-09 row deleted
+    later = datetime(2026, 3, 13, 12, tzinfo=UTC)
+    assert retention.enforce_policy(db.engine, SCRATCH_POLICY, later) == (1, 1)
+
+    with db.engine.begin() as conn:
+        starts = retention._partition_starts(conn, SCRATCH_POLICY)
+    assert min(starts) == datetime(2026, 3, 11)
+    assert max(starts) == datetime(2026, 3, 16)
+    assert _scratch_rows() == [(f"{SCRATCH_TABLE}_p20260312", datetime(2026, 3, 12, 8))]
+
+
+def test_partition_maintenance_skipped_while_table_is_locked(scratch_table, monkeypatch):
+    monkeypatch.setattr(retention, "PARTITION_LOCK_TIMEOUT_MS", 100)
+    retention.enforce_policy(db.engine, SCRATCH_POLICY, datetime(2026, 3, 10, 12, tzinfo=UTC))
+    later = datetime(2026, 3, 13, 12, tzinfo=UTC)
+
+    # A long reader holds off the ACCESS EXCLUSIVE locks of the 03-14..16 attaches and the 03-10 drop
+    with db.engine.connect() as reader:
+        reader.execute(sqlalchemy.text(f"LOCK TABLE {SCRATCH_TABLE} IN ACCESS SHARE MODE"))
+        started = time.monotonic()
+        assert retention.enforce_policy(db.engine, SCRATCH_POLICY, later) == (0, 0)
+        assert time.monotonic() - started < 5
+        reader.rollback()
+
+    with db.engine.begin() as conn:
+        starts = retention._partition_starts(conn, SCRATCH_POLICY)
+    assert datetime(2026, 3, 10) in starts
+    assert datetime(2026, 3, 16) not in starts
+
+    # The next run catches up
+    assert retention.enforce_policy(db.engine, SCRATCH_POLICY, later) == (1, 0)
+    with db.engine.begin() as conn:
+        starts = retention._partition_starts(conn, SCRATCH_POLICY)
+    assert min(starts) == datetime(2026, 3, 11)
+    assert max(starts) == datetime(2026, 3, 16)
+
+
+def test_expired_rows_are_deleted_in_batches():
+    now = datetime.now(UTC)
+    expired = [f"retention-expired-{uuid.uuid4()}" for _ in range(5)]
+    fresh = f"retention-fresh-{uuid.uuid4()}"
+    with db.engine.begin() as conn:
+        for notification_uuid, expires_at in [*((u, now - timedelta(hours=1)) for u in expired),
+                                              (fresh, now + timedelta(days=1))]:
+            conn.execute(
+                sqlalchemy.text(
+                    """
+                    INSERT INTO processed_webhooks (notification_uuid, notification_type, expires_at)
+                    VALUES (:uuid, 'TEST', :expires_at)
+                    """
+                ),
+                {"uuid": notification_uuid, "expires_at": expires_at}
+            )
+
+    policy = next(p for p in retention.POLICIES if p.table == "processed_webhooks")
+    try:
+        assert retention.delete_expired(db.engine, policy, now, batch_size=2) >= len(expired)
+
+        with db.engine.begin() as conn:
+            remaining = conn.execute(
+                sqlalchemy.text("SELECT notification_uuid FROM processed_webhooks WHERE notification_uuid = ANY(:uuids)"),
+                {"uuids": [*expired, fresh]}
+            ).scalars().all()
+        assert remaining == [fresh]
+    finally:
+        with db.engine.begin() as conn:
+            conn.execute(
+                sqlalchemy.text("DELETE FROM processed_webhooks WHERE notification_uuid = :uuid"), {"uuid": fresh}
+            )
+
+
+def test_live_locations_and_notification_logs_are_partitioned():
+    with db.engine.begin() as conn:
+        assert retention._is_partitioned(conn, "live_locations")
+        assert retention._is_partitioned(conn, "notification_logs")
+        assert not retention._is_partitioned(conn, "processed_webhooks")
+
+
+def test_failing_policy_does_not_stop_the_others(monkeypatch):
+    monkeypatch.setattr(retention, "POLICIES", (
+        RetentionPolicy("no_such_table", "created_at", timedelta(days=1)),
+        RetentionPolicy("pending_webhooks", "expires_at", timedelta(0), timezone_aware=True),
+    ))
+
+    results = retention.enforce(db.engine)
+
+    assert "no_such_table" not in results
+    assert results["pending_webhooks"][0] == 0
+
+
+def test_month_partition_bounds():
+    assert retention.partition_start(datetime(2026, 12, 31, 23, 59), "month") == datetime(2026, 12, 1)
+    assert retention.next_partition_start(datetime(2026, 12, 1), "month") == datetime(2027, 1, 1)
+    assert retention.partition_name("notification_logs", datetime(2026, 12, 1), "month") == "notification_logs_p202612"
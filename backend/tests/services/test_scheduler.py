@@ -327,10 +327,15 @@ def create_active_trip_with_notification_settings(
     timezone="UTC",
     last_checkin_reminder=None
 ):
-    """Helper to create an active trip with custom notification settings"""
+    """Helper to create an active trip with custom notification settings
+
+    next_reminder_at is one interval after the last reminder (or the start), as the
+    migration backfilled it, so quiet hours are not folded in yet.
+    """
     now = datetime.utcnow()
     start = now - timedelta(hours=1)
     eta = now + timedelta(hours=2)
+    next_reminder_at = (last_checkin_reminder or start) + timedelta(minutes=checkin_interval_min or 30)
 
     result = conn.execute(
         sqlalchemy.text("""
@@ -339,14 +344,14 @@ def create_active_trip_with_notification_settings(
                 gen_lat, gen_lon, contact1, created_at,
                 notified_starting_soon, notified_trip_started, notified_approaching_eta, notified_eta_reached,
                 checkin_interval_min, notify_start_hour, notify_end_hour, timezone,
-                last_checkin_reminder
+                last_checkin_reminder, next_reminder_at
             )
             VALUES (
                 :user_id, :activity, 'Test Trip', 'active', :start, :eta, 30, 'Test Location',
                 37.7749, -122.4194, :contact1, NOW(),
                 true, true, true, true,
                 :checkin_interval_min, :notify_start_hour, :notify_end_hour, :timezone,
-                :last_checkin_reminder
+                :last_checkin_reminder, :next_reminder_at
             )
             RETURNING id
         """),
@@ -360,7 +365,8 @@ def create_active_trip_with_notification_settings(
             "notify_start_hour": notify_start_hour,
             "notify_end_hour": notify_end_hour,
             "timezone": timezone,
-            "last_checkin_reminder": last_checkin_reminder.isoformat() if last_checkin_reminder else None
+            "last_checkin_reminder": last_checkin_reminder.isoformat() if last_checkin_reminder else None,
+            "next_reminder_at": next_reminder_at
         }
     )
     return result.fetchone()[0]
@@ -661,13 +667,13 @@ async def test_default_interval_used_when_not_specified(test_user_with_trip):
                     user_id, activity, title, status, start, eta, grace_min, location_text,
                     gen_lat, gen_lon, contact1, created_at,
                     notified_starting_soon, notified_trip_started, notified_approaching_eta, notified_eta_reached,
-                    last_checkin_reminder
+                    last_checkin_reminder, next_reminder_at
                 )
                 VALUES (
                     :user_id, :activity, 'Test Trip', 'active', :start, :eta, 30, 'Test Location',
                     37.7749, -122.4194, :contact1, NOW(),
                     true, true, true, true,
-                    :last_checkin_reminder
+                    :last_checkin_reminder, :next_reminder_at
                 )
                 RETURNING id
             """),
@@ -677,7 +683,8 @@ async def test_default_interval_used_when_not_specified(test_user_with_trip):
                 "contact1": contact_id,
                 "start": (now - timedelta(hours=1)).isoformat(),
                 "eta": (now + timedelta(hours=2)).isoformat(),
-                "last_checkin_reminder": (now - timedelta(minutes=35)).isoformat()  # 35 mins ago
+                "last_checkin_reminder": (now - timedelta(minutes=35)).isoformat(),  # 35 mins ago
+                "next_reminder_at": now - timedelta(minutes=5)  # Default 30 min interval
             }
         )
         trip_id = result.fetchone()[0]
@@ -1313,14 +1320,14 @@ async def test_invalid_timezone_graceful_handling(test_user_with_trip):
                     user_id, activity, title, status, start, eta, grace_min, location_text,
                     gen_lat, gen_lon, contact1, created_at, timezone,
                     notified_starting_soon, notified_trip_started, notified_approaching_eta, notified_eta_reached,
-                    checkin_interval_min, last_checkin_reminder,
+                    checkin_interval_min, last_checkin_reminder, next_reminder_at,
                     checkin_token, checkout_token
                 )
                 VALUES (
                     :user_id, :activity, 'Invalid TZ Test', 'active', :start, :eta, 30, 'Test Location',
                     37.7749, -122.4194, :contact1, NOW(), 'Invalid/Timezone',
                     true, true, true, true,
-                    15, :last_reminder,
+                    15, :last_reminder, :next_reminder_at,
                     'invalid_tz_checkin', 'invalid_tz_checkout'
                 )
                 RETURNING id
@@ -1331,7 +1338,8 @@ async def test_invalid_timezone_graceful_handling(test_user_with_trip):
                 "contact1": contact_id,
                 "start": (now - timedelta(hours=1)).isoformat(),
                 "eta": (now + timedelta(hours=2)).isoformat(),
-                "last_reminder": (now - timedelta(minutes=30)).isoformat()  # Due for reminder
+                "last_reminder": (now - timedelta(minutes=30)).isoformat(),  # Due for reminder
+                "next_reminder_at": now - timedelta(minutes=15)
             }
         )
         trip_id = result.fetchone()[0]
@@ -1572,7 +1580,7 @@ async def test_clean_expired_tokens_handles_error():
     """Test that clean_expired_tokens handles database errors gracefully"""
     from src.services.scheduler import clean_expired_tokens
 
-    with patch("src.services.scheduler.db.engine") as mock_engine:
+    with patch("src.services.scheduler.db.scheduler_engine") as mock_engine:
         mock_engine.begin.side_effect = Exception("Database error")
 
         # Should not raise
@@ -1588,6 +1596,28 @@ async def test_clean_expired_tokens_runs_without_error():
     await clean_expired_tokens()
 
 
+# ============================================================================
+# Data Retention Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_enforce_retention_handles_error():
+    """Test that enforce_retention handles database errors gracefully"""
+    from src.services.scheduler import enforce_retention
+
+    with patch("src.services.retention.enforce", side_effect=Exception("Database error")):
+        # Should not raise
+        await enforce_retention()
+
+
+@pytest.mark.asyncio
+async def test_enforce_retention_runs_without_error():
+    """Test that enforce_retention runs without error"""
+    from src.services.scheduler import enforce_retention
+
+    await enforce_retention()
+
+
 # ============================================================================
 # Clean Stale Live Activity Tokens Tests
 # ============================================================================
@@ -1691,7 +1721,7 @@ async def test_clean_stale_live_activity_tokens_handles_error():
     """Test that clean_stale_live_activity_tokens handles errors gracefully"""
     from src.services.scheduler import clean_stale_live_activity_tokens
 
-    with patch("src.services.scheduler.db.engine") as mock_engine:
+    with patch("src.services.scheduler.db.scheduler_engine") as mock_engine:
         mock_engine.begin.side_effect = Exception("Database error")
 
         # Should not raise
@@ -1735,3 +1765,483 @@ def test_stop_scheduler_when_not_running():
         scheduler_module.stop_scheduler()
     finally:
         scheduler_module.scheduler = original_scheduler
+
+
+# ==================== Scheduler Metrics Tests ====================
+
+from src.services import scheduler_metrics
+
+
+@pytest.mark.asyncio
+async def test_overdue_processing_records_deadline_lag(test_user_with_trip):
+    """Test that marking overdue and alerting contacts record how late they were"""
+    user_id = test_user_with_trip["user_id"]
+    activity_id = test_user_with_trip["activity_id"]
+    contact_id = test_user_with_trip["contact_id"]
+
+    with db.engine.begin() as conn:
+        # ETA 2 hours ago with a 30 minute grace period: both deadlines have passed
+        trip_id = create_trip(conn, user_id, activity_id, contact_id, "active", eta_offset_minutes=-120)
+
+    overdue_before = scheduler_metrics.deadline_lag.count(kind="overdue")
+    alert_before = scheduler_metrics.deadline_lag.count(kind="overdue_alert")
+
+    with patch("src.services.scheduler.send_overdue_notifications", AsyncMock()), \
+            patch("src.services.scheduler.send_live_activity_update", AsyncMock()), \
+            patch("src.services.scheduler.send_background_push_to_user", AsyncMock()):
+        from src.services.scheduler import check_overdue_trips
+        await check_overdue_trips()
+
+    assert scheduler_metrics.deadline_lag.count(kind="overdue") == overdue_before + 1
+    assert scheduler_metrics.deadline_lag.count(kind="overdue_alert") == alert_before + 1
+
+    # Cleanup
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM events WHERE trip_id = :trip_id"), {"trip_id": trip_id})
+        conn.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :trip_id"), {"trip_id": trip_id})
+
+
+@pytest.mark.asyncio
+async def test_checkin_reminder_records_deadline_lag(test_user_with_trip):
+    """Test that a sent check-in reminder records its lag past the interval"""
+    user_id = test_user_with_trip["user_id"]
+    activity_id = test_user_with_trip["activity_id"]
+    contact_id = test_user_with_trip["contact_id"]
+
+    with db.engine.begin() as conn:
+        trip_id = create_active_trip_with_notification_settings(
+            conn, user_id, activity_id, contact_id,
+            checkin_interval_min=15,
+            last_checkin_reminder=datetime.utcnow() - timedelta(minutes=20)
+        )
+
+    before = scheduler_metrics.deadline_lag.count(kind="checkin_reminder")
+
+    with patch("src.services.scheduler.send_push_to_user", AsyncMock()):
+        from src.services.scheduler import check_push_notifications
+        await check_push_notifications()
+
+    assert scheduler_metrics.deadline_lag.count(kind="checkin_reminder") >= before + 1
+    assert scheduler_metrics.rows_processed.value(job="check_push_notifications", phase="checkin_reminder") >= 1
+
+    # Cleanup
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :trip_id"), {"trip_id": trip_id})
+
+
+def test_record_deadline_lag_buckets_late_sends():
+    """Test that lag is measured from the due time and clamped at zero"""
+    histogram = scheduler_metrics.deadline_lag
+    now = datetime.utcnow()
+    before = histogram.count(kind="test_kind")
+
+    scheduler_metrics.record_deadline_lag("test_kind", now - timedelta(seconds=45), sent_at=now)
+    scheduler_metrics.record_deadline_lag("test_kind", now + timedelta(seconds=10), sent_at=now)
+
+    assert histogram.count(kind="test_kind") == before + 2
+    lines = histogram.render()
+    assert 'homebound_scheduler_deadline_lag_seconds_bucket{kind="test_kind",le="1"} 1' in lines
+    assert 'homebound_scheduler_deadline_lag_seconds_bucket{kind="test_kind",le="60"} 2' in lines
+
+
+def test_job_event_listener_records_runs_and_skips():
+    """Test that APScheduler job events feed the run metrics"""
+    from datetime import timezone
+
+    from apscheduler.events import (
+        EVENT_JOB_EXECUTED,
+        EVENT_JOB_MAX_INSTANCES,
+        EVENT_JOB_SUBMITTED,
+        JobExecutionEvent,
+        JobSubmissionEvent,
+    )
+
+    job_id = "metrics_test_job"
+    scheduled = datetime.now(timezone.utc)
+    runs = scheduler_metrics.job_runs
+    success_before = runs.value(job=job_id, outcome="success")
+    skipped_before = runs.value(job=job_id, outcome="skipped_max_instances")
+    durations_before = scheduler_metrics.job_duration.count(job=job_id)
+
+    scheduler_metrics._on_job_event(JobSubmissionEvent(EVENT_JOB_SUBMITTED, job_id, None, [scheduled]))
+    scheduler_metrics._on_job_event(JobSubmissionEvent(EVENT_JOB_MAX_INSTANCES, job_id, None, [scheduled]))
+    scheduler_metrics._on_job_event(JobExecutionEvent(EVENT_JOB_EXECUTED, job_id, None, scheduled))
+
+    assert runs.value(job=job_id, outcome="success") == success_before + 1
+    assert runs.value(job=job_id, outcome="skipped_max_instances") == skipped_before + 1
+    assert scheduler_metrics.job_duration.count(job=job_id) == durations_before + 1
+    assert scheduler_metrics.job_start_delay.count(job=job_id) >= 1
+    assert scheduler_metrics.job_last_success.value(job=job_id) > 0
+
+
+# ==================== Push Claim Lease Tests ====================
+
+def _create_approaching_eta_trip(conn, user_id, activity_id, contact_id, push_lease_until=None):
+    """Active trip due for an 'approaching ETA' push, optionally already leased."""
+    trip_id = create_trip(conn, user_id, activity_id, contact_id, "active", eta_offset_minutes=5)
+    conn.execute(
+        sqlalchemy.text("""
+            UPDATE trips SET notified_approaching_eta = false, push_lease_until = :lease
+            WHERE id = :trip_id
+        """),
+        {"trip_id": trip_id, "lease": push_lease_until}
+    )
+    return trip_id
+
+
+def _approaching_eta_calls(mock_push, user_id):
+    return [
+        call for call in mock_push.call_args_list
+        if len(call[0]) >= 2 and call[0][0] == user_id and call[0][1] == "Almost Time"
+    ]
+
+
+def _trip_push_state(trip_id):
+    with db.engine.begin() as conn:
+        return conn.execute(
+            sqlalchemy.text("SELECT notified_approaching_eta, push_lease_until FROM trips WHERE id = :trip_id"),
+            {"trip_id": trip_id}
+        ).fetchone()
+
+
+@pytest.mark.asyncio
+async def test_push_send_does_not_hold_trip_row_lock(test_user_with_trip):
+    """Test that the trip row is not locked while its push is being sent"""
+    user_id = test_user_with_trip["user_id"]
+
+    with db.engine.begin() as conn:
+        trip_id = _create_approaching_eta_trip(
+            conn, user_id, test_user_with_trip["activity_id"], test_user_with_trip["contact_id"]
+        )
+
+    lock_results = []
+
+    async def send_while_checking_lock(target_user_id, title, *args, **kwargs):
+        if target_user_id != user_id or title != "Almost Time":
+            return
+        # A check-in/extend/complete takes this row lock; it must not wait on the send
+        with db.engine.begin() as conn:
+            row = conn.execute(
+                sqlalchemy.text("SELECT id FROM trips WHERE id = :trip_id FOR UPDATE NOWAIT"),
+                {"trip_id": trip_id}
+            ).fetchone()
+            lock_results.append(row is not None)
+
+    with patch("src.services.scheduler.send_push_to_user", AsyncMock(side_effect=send_while_checking_lock)):
+        from src.services.scheduler import check_push_notifications
+        await check_push_notifications()
+
+    assert lock_results == [True]
+    state = _trip_push_state(trip_id)
+    assert state.notified_approaching_eta is True
+    assert state.push_lease_until is None
+
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :trip_id"), {"trip_id": trip_id})
+
+
+@pytest.mark.asyncio
+async def test_leased_trip_skipped_until_lease_expires(test_user_with_trip):
+    """Test that a row claimed by another sweep is skipped until its lease expires"""
+    user_id = test_user_with_trip["user_id"]
+
+    with db.engine.begin() as conn:
+        trip_id = _create_approaching_eta_trip(
+            conn, user_id, test_user_with_trip["activity_id"], test_user_with_trip["contact_id"],
+            push_lease_until=datetime.utcnow() + timedelta(minutes=5)
+        )
+
+    from src.services.scheduler import check_push_notifications
+
+    mock_push = AsyncMock()
+    with patch("src.services.scheduler.send_push_to_user", mock_push):
+        await check_push_notifications()
+    assert _approaching_eta_calls(mock_push, user_id) == []
+    assert _trip_push_state(trip_id).notified_approaching_eta is False
+
+    # Lease expired (e.g. the claiming worker crashed) - row is claimable again
+    with db.engine.begin() as conn:
+        conn.execute(
+            sqlalchemy.text("UPDATE trips SET push_lease_until = :lease WHERE id = :trip_id"),
+            {"trip_id": trip_id, "lease": datetime.utcnow() - timedelta(seconds=1)}
+        )
+
+    mock_push = AsyncMock()
+    with patch("src.services.scheduler.send_push_to_user", mock_push):
+        await check_push_notifications()
+    assert len(_approaching_eta_calls(mock_push, user_id)) == 1
+    assert _trip_push_state(trip_id).notified_approaching_eta is True
+
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :trip_id"), {"trip_id": trip_id})
+
+
+@pytest.mark.asyncio
+async def test_failed_push_releases_claim_for_retry(test_user_with_trip):
+    """Test that a failed send releases the lease without marking the trip notified"""
+    user_id = test_user_with_trip["user_id"]
+
+    with db.engine.begin() as conn:
+        trip_id = _create_approaching_eta_trip(
+            conn, user_id, test_user_with_trip["activity_id"], test_user_with_trip["contact_id"]
+        )
+
+    async def failing_send(target_user_id, title, *args, **kwargs):
+        if target_user_id == user_id and title == "Almost Time":
+            raise RuntimeError("APNs unavailable")
+
+    with patch("src.services.scheduler.send_push_to_user", AsyncMock(side_effect=failing_send)):
+        from src.services.scheduler import check_push_notifications
+        await check_push_notifications()
+
+    state = _trip_push_state(trip_id)
+    assert state.notified_approaching_eta is False
+    assert state.push_lease_until is None
+
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :trip_id"), {"trip_id": trip_id})
+
+
+def _checkin_reminder_calls(mock_push, user_id):
+    return [
+        call for call in mock_push.call_args_list
+        if call[0][0] == user_id and call[0][1] == "Check-in Reminder"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_checkin_reminder_claimed_by_next_reminder_at(test_user_with_trip):
+    """Test that next_reminder_at, not the raw interval, decides when a reminder is due"""
+    user_id = test_user_with_trip["user_id"]
+    now = datetime.utcnow()
+
+    with db.engine.begin() as conn:
+        # Last reminder is long past the interval, but quiet hours pushed the next one out
+        trip_id = create_active_trip_with_notification_settings(
+            conn, user_id, test_user_with_trip["activity_id"], test_user_with_trip["contact_id"],
+            checkin_interval_min=15,
+            last_checkin_reminder=now - timedelta(hours=3)
+        )
+        conn.execute(
+            sqlalchemy.text("UPDATE trips SET next_reminder_at = :next WHERE id = :trip_id"),
+            {"trip_id": trip_id, "next": now + timedelta(minutes=10)}
+        )
+
+    from src.services.scheduler import check_push_notifications
+
+    mock_push = AsyncMock()
+    with patch("src.services.scheduler.send_push_to_user", mock_push):
+        await check_push_notifications()
+    assert _checkin_reminder_calls(mock_push, user_id) == []
+
+    # Now due: sent, and the next one is scheduled one interval out
+    with db.engine.begin() as conn:
+        conn.execute(
+            sqlalchemy.text("UPDATE trips SET next_reminder_at = :next WHERE id = :trip_id"),
+            {"trip_id": trip_id, "next": now - timedelta(minutes=1)}
+        )
+
+    mock_push = AsyncMock()
+    with patch("src.services.scheduler.send_push_to_user", mock_push):
+        await check_push_notifications()
+    assert len(_checkin_reminder_calls(mock_push, user_id)) == 1
+
+    with db.engine.connect() as conn:
+        trip = conn.execute(
+            sqlalchemy.text("SELECT last_checkin_reminder, next_reminder_at FROM trips WHERE id = :trip_id"),
+            {"trip_id": trip_id}
+        ).fetchone()
+    assert trip.next_reminder_at - trip.last_checkin_reminder == timedelta(minutes=15)
+
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :trip_id"), {"trip_id": trip_id})
+
+
+@pytest.mark.asyncio
+async def test_checkin_reminder_in_quiet_hours_rescheduled_to_active_hours(test_user_with_trip):
+    """Test that a due reminder in quiet hours is moved to the start of active hours without sending"""
+    user_id = test_user_with_trip["user_id"]
+    now = datetime.utcnow()
+    # Active window is a single hour that excludes the current one
+    notify_start = (now.hour + 2) % 24
+    notify_end = (now.hour + 3) % 24
+
+    with db.engine.begin() as conn:
+        trip_id = create_active_trip_with_notification_settings(
+            conn, user_id, test_user_with_trip["activity_id"], test_user_with_trip["contact_id"],
+            notify_start_hour=notify_start,
+            notify_end_hour=notify_end,
+            last_checkin_reminder=now - timedelta(minutes=60)
+        )
+
+    mock_push = AsyncMock()
+    with patch("src.services.scheduler.send_push_to_user", mock_push):
+        from src.services.scheduler import check_push_notifications
+        await check_push_notifications()
+    assert _checkin_reminder_calls(mock_push, user_id) == []
+
+    with db.engine.connect() as conn:
+        next_reminder_at = conn.execute(
+            sqlalchemy.text("SELECT next_reminder_at FROM trips WHERE id = :trip_id"),
+            {"trip_id": trip_id}
+        ).scalar()
+    assert next_reminder_at > now
+    assert next_reminder_at.hour == notify_start
+    assert next_reminder_at.minute == 0
+
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :trip_id"), {"trip_id": trip_id})
+
+
+@pytest.mark.asyncio
+async def test_activated_trip_gets_next_reminder_at(test_user_with_trip):
+    """Test that the overdue sweep starts the reminder clock when it activates a planned trip"""
+    user_id = test_user_with_trip["user_id"]
+
+    with db.engine.begin() as conn:
+        trip_id = create_trip(
+            conn, user_id, test_user_with_trip["activity_id"], test_user_with_trip["contact_id"],
+            status="planned", eta_offset_minutes=120
+        )
+        conn.execute(
+            sqlalchemy.text("UPDATE trips SET start = :start, checkin_interval_min = 20 WHERE id = :trip_id"),
+            {"trip_id": trip_id, "start": datetime.utcnow() - timedelta(minutes=1)}
+        )
+
+    from src.services.scheduler import check_overdue_trips
+    await check_overdue_trips()
+
+    with db.engine.connect() as conn:
+        trip = conn.execute(
+            sqlalchemy.text("SELECT status, next_reminder_at FROM trips WHERE id = :trip_id"),
+            {"trip_id": trip_id}
+        ).fetchone()
+    assert trip.status == "active"
+    assert timedelta(minutes=19) < trip.next_reminder_at - datetime.utcnow() <= timedelta(minutes=20)
+
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :trip_id"), {"trip_id": trip_id})
+
+
+# ==================== One-shot Event Idempotency Tests ====================
+
+def _one_shot_events(trip_id):
+    with db.engine.connect() as conn:
+        return [
+            row.what for row in conn.execute(
+                sqlalchemy.text("""
+                    SELECT what FROM events
+                    WHERE trip_id = :trip_id AND what IN ('overdue', 'notify')
+                    ORDER BY id
+                """),
+                {"trip_id": trip_id}
+            )
+        ]
+
+
+def _overdue_candidate(trip_id):
+    with db.engine.connect() as conn:
+        return conn.execute(
+            sqlalchemy.text("""
+                SELECT t.id, t.user_id, t.title, t.eta, t.grace_min, t.location_text, t.status, t.timezone,
+                       t.start, t.notes, t.start_location_text, t.has_separate_locations, t.checkout_token,
+                       t.custom_overdue_message, a.name as activity_name
+                FROM trips t JOIN activities a ON t.activity = a.id
+                WHERE t.id = :trip_id
+            """),
+            {"trip_id": trip_id}
+        ).fetchone()
+
+
+def _delete_trip_with_events(trip_id):
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM events WHERE trip_id = :trip_id"), {"trip_id": trip_id})
+        conn.execute(sqlalchemy.text("DELETE FROM trips WHERE id = :trip_id"), {"trip_id": trip_id})
+
+
+def test_one_shot_events_are_unique_per_trip(test_user_with_trip):
+    """Test that the schema rejects a second overdue event for the same trip"""
+    user_id = test_user_with_trip["user_id"]
+
+    with db.engine.begin() as conn:
+        trip_id = create_trip(
+            conn, user_id, test_user_with_trip["activity_id"], test_user_with_trip["contact_id"], "active"
+        )
+
+    insert = sqlalchemy.text("""
+        INSERT INTO events (user_id, trip_id, what, timestamp) VALUES (:user_id, :trip_id, :what, NOW())
+    """)
+    with db.engine.begin() as conn:
+        conn.execute(insert, {"user_id": user_id, "trip_id": trip_id, "what": "overdue"})
+        # Repeatable kinds are unaffected
+        conn.execute(insert, {"user_id": user_id, "trip_id": trip_id, "what": "checkin"})
+        conn.execute(insert, {"user_id": user_id, "trip_id": trip_id, "what": "checkin"})
+
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        with db.engine.begin() as conn:
+            conn.execute(insert, {"user_id": user_id, "trip_id": trip_id, "what": "overdue"})
+
+    _delete_trip_with_events(trip_id)
+
+
+@pytest.mark.asyncio
+async def test_overlapping_sweeps_alert_contacts_once(test_user_with_trip):
+    """Test that two sweeps processing the same candidate row perform each transition once"""
+    user_id = test_user_with_trip["user_id"]
+
+    with db.engine.begin() as conn:
+        trip_id = create_trip(
+            conn, user_id, test_user_with_trip["activity_id"], test_user_with_trip["contact_id"],
+            "active", eta_offset_minutes=-120
+        )
+
+    # Both sweeps read the trip before either processed it
+    candidate = _overdue_candidate(trip_id)
+    now = datetime.utcnow()
+    mock_overdue = AsyncMock()
+    mock_live_activity = AsyncMock()
+
+    with patch("src.services.scheduler.send_overdue_notifications", mock_overdue), \
+            patch("src.services.scheduler.send_live_activity_update", mock_live_activity), \
+            patch("src.services.scheduler.send_background_push_to_user", AsyncMock()):
+        from src.services.scheduler import _process_overdue_trip
+        await _process_overdue_trip(candidate, now)
+        await _process_overdue_trip(candidate, now)
+
+    assert mock_overdue.call_count == 1
+    assert mock_live_activity.call_count == 1
+    assert _one_shot_events(trip_id) == ["overdue", "notify"]
+
+    _delete_trip_with_events(trip_id)
+
+
+@pytest.mark.asyncio
+async def test_failed_overdue_alert_releases_notify_claim(test_user_with_trip):
+    """Test that a failed alert send gives the notify transition back for the next sweep"""
+    user_id = test_user_with_trip["user_id"]
+
+    with db.engine.begin() as conn:
+        trip_id = create_trip(
+            conn, user_id, test_user_with_trip["activity_id"], test_user_with_trip["contact_id"],
+            "active", eta_offset_minutes=-120
+        )
+
+    from src.services.scheduler import check_overdue_trips
+
+    with patch("src.services.scheduler.send_overdue_notifications", AsyncMock(side_effect=RuntimeError("smtp down"))), \
+            patch("src.services.scheduler.send_live_activity_update", AsyncMock()), \
+            patch("src.services.scheduler.send_background_push_to_user", AsyncMock()):
+        await check_overdue_trips()
+
+    assert _one_shot_events(trip_id) == ["overdue"]
+
+    mock_overdue = AsyncMock()
+    with patch("src.services.scheduler.send_overdue_notifications", mock_overdue), \
+            patch("src.services.scheduler.send_live_activity_update", AsyncMock()), \
+            patch("src.services.scheduler.send_background_push_to_user", AsyncMock()):
+        await check_overdue_trips()
+
+    assert mock_overdue.call_count == 1
+    assert _one_shot_events(trip_id) == ["overdue", "notify"]
+
+    _delete_trip_with_events(trip_id)
@@ -0,0 +1,149 @@
+"""Tests for scheduler leader election"""
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+import sqlalchemy
+
+from src import database as db
+from src.services import scheduler as scheduler_module
+from src.services import scheduler_leader
+
+LEASE_NAME = "test_scheduler_lease"
+
+
+@pytest.fixture
+def clean_lease():
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM scheduler_leases WHERE name = :name"), {"name": LEASE_NAME})
+    yield
+    with db.engine.begin() as conn:
+        conn.execute(sqlalchemy.text("DELETE FROM scheduler_leases WHERE name = :name"), {"name": LEASE_NAME})
+
+
+def _expire_lease():
+    with db.engine.begin() as conn:
+        conn.execute(
+            sqlalchemy.text(
+                "UPDATE scheduler_leases SET expires_at = timezone('utc', now()) - interval '1 second' WHERE name = :name"
+            ),
+            {"name": LEASE_NAME}
+        )
+
+
+def test_only_one_holder_acquires_lease(clean_lease):
+    assert scheduler_leader.try_acquire("worker-a", 30, name=LEASE_NAME) is True
+    assert scheduler_leader.try_acquire("worker-b", 30, name=LEASE_NAME) is False
+    assert scheduler_leader.current_leader(name=LEASE_NAME) == "worker-a"
+
+
+def test_holder_renews_its_own_lease(clean_lease):
+    assert scheduler_leader.try_acquire("worker-a", 30, name=LEASE_NAME) is True
+    assert scheduler_leader.try_acquire("worker-a", 30, name=LEASE_NAME) is True
+    assert scheduler_leader.try_acquire("worker-b", 30, name=LEASE_NAME) is False
+
+
+def test_standby_takes_over_expired_lease(clean_lease):
+    scheduler_leader.try_acquire("worker-a", 30, name=LEASE_NAME)
+    _expire_lease()
+
+    assert scheduler_leader.current_leader(name=LEASE_NAME) is None
+    assert scheduler_leader.try_acquire("worker-b", 30, name=LEASE_NAME) is True
+    # The old leader can't renew once someone else holds it
+    assert scheduler_leader.try_acquire("worker-a", 30, name=LEASE_NAME) is False
+
+
+def test_sqlite_process_always_leads(monkeypatch):
+    """The lease SQL is Postgres-only; a local SQLite process runs the jobs itself"""
+    sqlite_engine = sqlalchemy.create_engine("sqlite://")
+    monkeypatch.setattr(scheduler_leader.db, "scheduler_engine", sqlite_engine)
+
+    assert scheduler_leader.try_acquire("worker-a", 30, name=LEASE_NAME) is True
+    assert scheduler_leader.try_acquire("worker-b", 30, name=LEASE_NAME) is True
+    assert scheduler_leader.current_leader(name=LEASE_NAME) == scheduler_leader.HOLDER_ID
+    scheduler_leader.release("worker-a", name=LEASE_NAME)
+
+
+def test_release_hands_off_immediately(clean_lease):
+    scheduler_leader.try_acquire("worker-a", 30, name=LEASE_NAME)
+
+    # Releasing as a non-holder is a no-op
+    scheduler_leader.release("worker-b", name=LEASE_NAME)
+    assert scheduler_leader.current_leader(name=LEASE_NAME) == "worker-a"
+
+    scheduler_leader.release("worker-a", name=LEASE_NAME)
+    assert scheduler_leader.try_acquire("worker-b", 30, name=LEASE_NAME) is True
+
+
+@pytest_asyncio.fixture
+async def fresh_scheduler():
+    original_scheduler = scheduler_module.scheduler
+    original_leader = scheduler_module.is_leader
+    scheduler_module.scheduler = None
+    scheduler_module.is_leader = False
+    yield
+    with patch.object(scheduler_leader, "release"):
+        scheduler_module.stop_scheduler()
+    scheduler_module.scheduler = original_scheduler
+    scheduler_module.is_leader = original_leader
+
+
+def _work_jobs():
+    return [job for job in scheduler_module.scheduler.get_jobs() if job.id not in scheduler_module.PER_PROCESS_JOB_IDS]
+
+
+@pytest.mark.asyncio
+async def test_standby_keeps_jobs_paused_until_it_becomes_leader(fresh_scheduler):
+    with patch.object(scheduler_leader, "try_acquire", return_value=False):
+        scheduler_module.start_scheduler()
+
+    assert scheduler_module.is_leader is False
+    assert all(job.next_run_time is None for job in _work_jobs())
+    heartbeat = scheduler_module.scheduler.get_job(scheduler_module.LEADER_HEARTBEAT_JOB_ID)
+    assert heartbeat.next_run_time is not None
+    # Standbys still warm their own Apple key caches
+    key_refresh = scheduler_module.scheduler.get_job(scheduler_module.APPLE_KEY_REFRESH_JOB_ID)
+    assert key_refresh.next_run_time is not None
+
+    with patch.object(scheduler_leader, "try_acquire", return_value=True):
+        await scheduler_module.leader_heartbeat()
+
+    assert scheduler_module.is_leader is True
+    assert all(job.next_run_time is not None for job in _work_jobs())
+
+
+@pytest.mark.asyncio
+async def test_leader_pauses_jobs_when_lease_is_lost(fresh_scheduler):
+    with patch.object(scheduler_leader, "try_acquire", return_value=True):
+        scheduler_module.start_scheduler()
+    overdue_first_run = scheduler_module.scheduler.get_job("check_overdue").next_run_time
+
+    assert scheduler_module.is_leader is True
+    assert all(job.next_run_time is not None for job in _work_jobs())
+
+    # Renewing leadership leaves staggered run times alone
+    with patch.object(scheduler_leader, "try_acquire", return_value=True):
+        await scheduler_module.leader_heartbeat()
+    assert scheduler_module.scheduler.get_job("check_overdue").next_run_time == overdue_first_run
+
+    with patch.object(scheduler_leader, "try_acquire", side_effect=sqlalchemy.exc.OperationalError("", {}, Exception("down"))):
+        await scheduler_module.leader_heartbeat()
+
+    assert scheduler_module.is_leader is False
+    assert all(job.next_run_time is None for job in _work_jobs())
+
+
+def test_web_process_without_scheduler_warms_apple_keys(monkeypatch):
+    """With the scheduler in a separate worker, the web lifespan still keeps its own key caches warm"""
+    from fastapi.testclient import TestClient
+
+    from src.api import server
+
+    monkeypatch.setattr(server.settings, "RUN_SCHEDULER_IN_WEB", False)
+    with patch.object(scheduler_module, "keep_apple_key_material_warm") as keep_warm, \
+            patch.object(scheduler_module, "start_scheduler") as start:
+        with TestClient(server.app):
+            pass
+
+    keep_warm.assert_called_once()
+    start.assert_not_called()
@@ -0,0 +1,56 @@
+"""Tests for the hot-path statement registry"""
+import pytest
+from sqlalchemy import Integer, String, event
+from sqlalchemy.engine.default import CACHE_HIT
+
+from src import database as db
+from src.api import checkin, trips  # noqa: F401 - registers their statements
+from src.services import statements
+
+
+@pytest.fixture
+def scratch_name():
+    name = "test.scratch"
+    yield name
+    statements._registry.pop(name, None)
+
+
+def test_register_builds_typed_statement_once(scratch_name):
+    statement = statements.register(scratch_name, "SELECT :n + 1 AS value, :label AS label", n=Integer, label=String)
+
+    assert statements.get(scratch_name) is statement
+    assert isinstance(statement._bindparams["n"].type, Integer)
+    assert isinstance(statement._bindparams["label"].type, String)
+    # The cache key is memoized on the module-level object
+    assert statement._generate_cache_key() is statement._generate_cache_key()
+
+
+def test_duplicate_names_are_rejected(scratch_name):
+    statements.register(scratch_name, "SELECT 1")
+
+    with pytest.raises(ValueError):
+        statements.register(scratch_name, "SELECT 2")
+
+
+def test_hot_path_statements_are_registered():
+    names = set(statements.registered())
+
+    assert {"checkin.check_in", "trips.active_trip", "trips.insert_live_location"} <= names
+
+
+def test_registered_statement_hits_compiled_cache(scratch_name):
+    statement = statements.register(scratch_name, "SELECT :n + 1 AS value", n=Integer)
+    cache_hits = []
+
+    def record(conn, cursor, sql, parameters, context, executemany):
+        cache_hits.append(context.cache_hit == CACHE_HIT)
+
+    event.listen(db.engine, "after_cursor_execute", record)
+    try:
+        with db.engine.connect() as conn:
+            assert conn.execute(statement, {"n": 1}).scalar() == 2
+            assert conn.execute(statement, {"n": 41}).scalar() == 42
+    finally:
+        event.remove(db.engine, "after_cursor_execute", record)
+
+    assert cache_hits == [False, True]